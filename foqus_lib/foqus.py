@@ -327,6 +327,12 @@ def main(args_to_parse=None):
         type=float,
         help="Time between checking for new jobs",
     )
+    parser.add_argument(
+        "--consumer_jobs",
+        default=1,
+        type=int,
+        help="Maximum number of jobs the consumer runs at once",
+    )
     parser.add_argument(
         "--consumer_simulation", help="Only take jobs for a particular simulation name"
     )
@@ -616,14 +622,16 @@ def main(args_to_parse=None):
         listener.start()
         listener.join()
     elif args.consumer:
+        from foqus_lib.framework.sim.turbineLiteConsumer import turbineLiteConsumer
         from foqus_lib.framework.sim.turbineLiteDB import keepAliveTimer, turbineLiteDB
 
         load_gui = False
         # Make ctrl-c do nothing but and SIGINT donothing but interrupt
         # the loop
         signal.signal(signal.SIGINT, signal_handler)
-        # Register consumer TurbineLite DB
-        db = turbineLiteDB()
+        # Register consumer TurbineLite DB, keep connections open between
+        # calls since the consumer polls the database
+        db = turbineLiteDB(close_after=False)
         _logger.info("TurbineLite Database:\n   {0}".format(db.database))
         # add 'foqus' app to TurbineLite DB if not already there
         db.add_new_application("foqus")
@@ -676,200 +684,40 @@ def main(args_to_parse=None):
                 )
                 if guid is not None:
                     db.job_change_status(guid, cleanup)
+        consumer = turbineLiteConsumer(
+            db,
+            consumer_uuid,
+            makeSession=lambda: session(useCurrentWorkingDir=True),
+            maxJobs=args.consumer_jobs,
+            simName=onlySimName,
+            sessionID=onlySession,
+            onlyMyId=args.consumer_only_my_id,
+            delay=args.consumer_delay,
+            cancelJobs=args.consumer_cancel_jobs,
+        )
+        consumer.addSession(dat)
         try:
             _logger.info(
                 "FOQUS consumer {0} started, waiting for jobs...".format(consumer_uuid)
             )
             with open("consumer_uuid.txt", "w") as f:
                 f.write(str(consumer_uuid))
-            lastSim = None  # id for last foqus model ran
-            i = 0
-            terminate = False
-            guid = None
-            while not terminate:
-                i += 1
-                if i >= 10:  # check status, if terminate stop
-                    i = 0
-                    status = db.consumer_status(consumer_uuid)
-                    if status == "terminate" or status == "down":
-                        terminate = True
-                        break
-                guid, jid, simId, reset = db.get_job_id(
-                    simName=onlySimName, sessionID=onlySession, consumerID=onlyConsumer
-                )
-                if not guid:
-                    time.sleep(args.consumer_delay)
-                elif args.consumer_cancel_jobs:
-                    # Just switch job to cancel state
-                    _logger.info("Job {0} will be canceled".format(jid))
-                    db.add_message(
-                        "consumer={0}, canceling job {1}".format(consumer_uuid, jid),
-                        guid,
-                    )
-                    db.job_change_status(guid, "cancel")
-                else:
-                    # Run the job
-                    db.add_message(
-                        "consumer={0}, starting job {1}".format(consumer_uuid, jid),
-                        guid,
-                    )
-                    db.job_change_status(guid, "setup")
-                    configContent = db.get_configuration_file(simId)
-                    _logger.info("Job {0} is submitted".format(jid))
-                    db.jobConsumerID(guid, consumer_uuid)
-                    db.job_prepare(guid, jid, configContent)
-                    workingDirectory = os.path.join("test", str(jid))
-                    # Session file to run
-                    sfile = os.path.join(workingDirectory, "session.foqus")
-                    # result session file to keep on record
-                    rfile = os.path.join(workingDirectory, "results_session.foqus")
-                    # Input values files
-                    vfile = os.path.join(workingDirectory, "input_values.json")
-                    # Output values file
-                    ofile = os.path.join(workingDirectory, "output.json")
-                    # Load the session file
-                    try:
-                        if reset:
-                            _logger.info(
-                                "Reset = True, stopping consumers "
-                                "and reloading foqus file {0}".format(sfile)
-                            )
-                            dat.load(sfile, stopConsumers=True)
-                        elif simId != lastSim:
-                            _logger.info(
-                                "Reset = False, but simulation id does not"
-                                " match previous, reloading simulation"
-                                " stopping consumers, {0}".format(sfile)
-                            )
-                            dat.load(sfile, stopConsumers=True)
-                        else:
-                            _logger.info("Same simulation as prev., not reloading")
-                        lastSim = simId
-                        # Load the input values
-                        _logger.info("Loading input values. {0}".format(vfile))
-                        dat.loadFlowsheetValues(vfile)
-                        # Run graph
-                        db.job_change_status(guid, "running")
-                        _logger.info("Moving job {0} to running state".format(jid))
-                    except:
-                        _logger.exception(
-                            "Error loading session or session inputs"
-                            " for job: {0}".format(jid)
-                        )
-                        db.add_message(
-                            "consumer={0}, job={1} error loading job or"
-                            "inputs".format(consumer_uuid, jid),
-                            guid,
-                        )
-                        with open(ofile, "w") as f:
-                            json.dump({"graphError": 50}, f)
-                        db.job_save_output(guid, workingDirectory)
-                        db.job_change_status(guid, "error")
-                        continue
-                    gt = dat.flowsheet.runAsThread()
-                    while gt.is_alive():
-                        gt.join(10)
-                        status = db.consumer_status(consumer_uuid)
-                        if status == "terminate":
-                            terminate = True
-                            db.job_change_status(guid, "error")
-                            gt.terminate()
-                            break
-                    if terminate:
-                        break
-                    if gt.res[0]:
-                        _logger.debug("GT: %s", gt.res[0])
-                        dat.flowsheet.loadValues(gt.res[0])
-                    else:
-                        dat.flowsheet.errorStat = 19
-                    dat.saveFlowsheetValues(ofile)
-                    db.job_save_output(guid, workingDirectory)
-                    dat.save(
-                        filename=rfile,
-                        updateCurrentFile=False,
-                        changeLogMsg="Saved Turbine Run",
-                        bkp=False,
-                        indent=0,
-                    )
-                    if dat.flowsheet.errorStat == 0:
-                        db.job_change_status(guid, "success")
-                        db.add_message(
-                            "consumer={0}, job {1} finished, success".format(
-                                consumer_uuid, jid
-                            ),
-                            guid,
-                        )
-                        _logger.info("Job {0} finished with success".format(jid))
-                    else:
-                        db.job_change_status(guid, "error")
-                        db.add_message(
-                            "consumer={0}, job {1} finished, error".format(
-                                consumer_uuid, jid
-                            ),
-                            guid,
-                        )
-                        _logger.info("Job {0} finished with error".format(jid))
+            consumer.run()
         except KeyboardInterrupt:
-            if guid:
-                try:
-                    db.add_message(
-                        "consumer={0}, stopping consumer keyboard interrupt".format(
-                            consumer_uuid
-                        ),
-                        guid,
-                    )
-                except:
-                    pass
             _logger.info("FOQUS Consumer stopped due to SIGINT")
-            try:
-                gt.terminate()
-            except:
-                pass
-            if guid:
-                try:
-                    db.job_change_status(guid, "error")
-                except:
-                    pass
+            consumer.stop("keyboard interrupt")
         except Exception as e:
-            if guid:
-                try:
-                    db.add_message(
-                        "consumer={0}, stopping consumer exception, {1}".format(
-                            consumer_uuid, str(e)
-                        ),
-                        guid,
-                    )
-                except:
-                    pass
             _logger.exception("FOQUS Consumer stopped due to exception")
             exit_code = 3
-            try:
-                gt.terminate()
-            except:
-                pass
-            if guid:
-                try:
-                    db.job_change_status(guid, "error")
-                except:
-                    pass
-        if terminate:
-            if guid:
-                try:
-                    db.add_message(
-                        "consumer={0}, stopping consumer terminate status".format(
-                            consumer_uuid
-                        ),
-                        guid,
-                    )
-                    db.job_change_status(guid, "error")
-                except:
-                    pass
+            consumer.stop("exception, {0}".format(str(e)))
+        if consumer.terminated:
             _logger.info(
                 "Stopping FOQUS consumer '{0}' terminate status".format(consumer_uuid)
             )
         kat.terminate()
         # kat.join()
         db.consumer_status(consumer_uuid, "down")
+        db.closeConnection()
     ##
     ## Start GUI, if needed (this is last because some options
     ## automatically disable gui, so I checked for those first
@@ -393,8 +393,6 @@ class Graph(threading.Thread):
         if o is not None:
             self.nvlist = self.input
             self.input_vectorlist.loadValues(o)
-        else:
-            self.input_vectorlist.clear()
         o = sd.get("output_vectorvals", None)
         if o is not None:
             self.nvlist = self.output
@@ -83,12 +83,14 @@ def heatIntegrationCalc(node):
     pointCSet = set()  # set of point sinks for heat
     blockLookup = dict()  # look up the block given a variable name
 
-    nameSets = [node.gr.xnames, node.gr.fnames]  # input and output variable names
-    varSets = [node.gr.x, node.gr.f]  # input and output variables
+    # input and output variables with Block tags, looked up in the tag indexes
+    varSets = [
+        node.gr.input.tagIndex().blockVars,
+        node.gr.output.tagIndex().blockVars,
+    ]
     for ii in range(2):
-        vnames = nameSets[ii]
         vars = varSets[ii]
-        for name in vnames:  # All the inputs
+        for name in vars:  # All the inputs
             blktgs = [tag.split() for tag in vars[name].tags if "Block" in tag]
             # I think there should only be one block tag per variable but
             # maybe there is a reason for more
@@ -145,9 +147,8 @@ def heatIntegrationCalc(node):
 
     # now pull out variables
     for ii in range(2):  # do this loop twice (first pass inputs second pass outputs)
-        vnames = nameSets[ii]
         vars = varSets[ii]
-        for name in vnames:  # loop through all variables
+        for name in vars:  # loop through all variables
             tags = vars[name].tags  # get variable tags
             blk = blockLookup.get(
                 name, None
@@ -1717,6 +1717,7 @@ class Node:
                 allowWarnings=alwarn,
                 app=app,
                 checkConsumer=localRun,
+                sid=sid,
             )
             _logger.debug("Job finished successfully: " + str(jobID))
         except TurbineInterfaceEx as e:
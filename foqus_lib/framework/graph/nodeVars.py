@@ -23,8 +23,10 @@ John Eslick, Carnegie Mellon University, 2014
 import copy
 import logging
 import math
+import operator
 from collections import OrderedDict
 
+import numpy as np
 
 from foqus_lib.framework.foqusException.foqusException import foqusException
 from foqus_lib.framework.uq.Distribution import Distribution
@@ -38,6 +40,50 @@ ivarScales = [  # list of scaling options for input variables
     "Power 2",
 ]
 
+# distribution of variables that haven't been given their own, never changed
+_defaultDist = Distribution(Distribution.UNIFORM)
+
+# array versions of NodeVars.scale2 and unscale2, in the order of ivarScales
+_scaleArray = [
+    None,
+    lambda x, lo, hi: 10 * (x - lo) / (hi - lo),
+    lambda x, lo, hi: (
+        10 * (np.log10(x) - np.log10(lo)) / (np.log10(hi) - np.log10(lo))
+    ),
+    lambda x, lo, hi: (
+        10
+        * (np.power(10, x) - np.power(10, lo))
+        / (np.power(10, hi) - np.power(10, lo))
+    ),
+    lambda x, lo, hi: 10 * np.log10(9 * (x - lo) / (hi - lo) + 1),
+    lambda x, lo, hi: 10.0 / 9.0 * (np.power(10, (x - lo) / (hi - lo)) - 1),
+]
+_unscaleArray = [
+    None,
+    lambda x, lo, hi: x * (hi - lo) / 10.0 + lo,
+    lambda x, lo, hi: lo * np.power((hi / lo), (x / 10.0)),
+    lambda x, lo, hi: np.log10(
+        (x / 10.0) * (np.power(10, hi) - np.power(10, lo)) + np.power(10, lo)
+    ),
+    lambda x, lo, hi: (np.power(10, x / 10.0) - 1) * (hi - lo) / 9.0 + lo,
+    lambda x, lo, hi: np.log10(9.0 * x / 10.0 + 1) * (hi - lo) + lo,
+]
+
+
+class _Revision(object):
+    """
+    Change counter shared by a NodeVarList, its node dicts and variables.
+    It is bumped whenever variables are added, removed or retagged, a tag
+    index built at an older revision is rebuilt the next time it is asked
+    for.  Each list has its own, so changes to one graph don't invalidate
+    the indexes of another.
+    """
+
+    __slots__ = ("n",)
+
+    def __init__(self):
+        self.n = 0
+
 
 class NodeVarEx(foqusException):
     def setCodeStrings(self):
@@ -59,17 +105,120 @@ class NodeVarListEx(foqusException):
         self.codeString[7] = "Var name already in use, cannot add"
 
 
-class NodeVarList(OrderedDict):
+class _TrackedDict(OrderedDict):
+    """
+    OrderedDict that counts adding and removing keys in its _rev, so tag
+    indexes know to rebuild.  The C OrderedDict methods don't go through
+    __setitem__ and __delitem__, so they are all covered here.
+    """
+
+    def __init__(self, *args, **kwargs):
+        self._rev = _Revision()
+        OrderedDict.__init__(self, *args, **kwargs)
+
+    def _changed(self):
+        self._rev.n += 1
+
+    def __setitem__(self, key, value):
+        OrderedDict.__setitem__(self, key, value)
+        self._changed()
+
+    def __delitem__(self, key):
+        OrderedDict.__delitem__(self, key)
+        self._changed()
+
+    def pop(self, *args):
+        self._changed()
+        return OrderedDict.pop(self, *args)
+
+    def popitem(self, last=True):
+        self._changed()
+        return OrderedDict.popitem(self, last)
+
+    def setdefault(self, key, default=None):
+        if key not in self:
+            self[key] = default
+        return self[key]
+
+    def clear(self):
+        OrderedDict.clear(self)
+        self._changed()
+
+
+class NodeVarDict(_TrackedDict):
+    """
+    The variables of one node in a NodeVarList, keyed by variable name.
+    The dict and its variables count changes in the list's _rev.
+    """
+
+    def __setitem__(self, key, var):
+        if isinstance(var, NodeVars):
+            var._rev = self._rev
+        _TrackedDict.__setitem__(self, key, var)
+
+    def _setRevision(self, rev):
+        self._rev = rev
+        for var in self.values():
+            if isinstance(var, NodeVars):
+                var._rev = rev
+        rev.n += 1
+
+
+class NodeVarTagIndex(object):
+    """
+    Inverted index of the variables in a NodeVarList by tag and by block,
+    so heat integration doesn't need to scan every tag of every variable.
+    The variables are keyed by "node.var" names in the same order as
+    NodeVarList.createOldStyleDict().
+
+    Attributes:
+        revision: variable list revision the index was built at
+        tags: dict of tag -> OrderedDict of variables with the tag
+        blocks: dict of block name -> OrderedDict of variables, the block
+            name is the second word of a tag containing "Block"
+        blockVars: OrderedDict of variables with any tag containing "Block"
+    """
+
+    __slots__ = ("revision", "tags", "blocks", "blockVars")
+
+    def __init__(self, nvl):
+        self.revision = nvl._rev.n
+        self.tags = {}
+        self.blocks = {}
+        self.blockVars = OrderedDict()
+        for node in sorted(nvl, key=lambda s: s.lower()):
+            nodeVars = nvl[node]
+            for vname in sorted(nodeVars, key=lambda s: s.lower()):
+                var = nodeVars[vname]
+                name = ".".join([node, vname])
+                for tag in var.tags:
+                    self.tags.setdefault(tag, OrderedDict())[name] = var
+                    if "Block" in tag:
+                        self.blockVars[name] = var
+                        words = tag.split()
+                        if len(words) > 1:
+                            self.blocks.setdefault(words[1], OrderedDict())
+                            self.blocks[words[1]][name] = var
+
+    def withTag(self, tag):
+        """
+        Return an OrderedDict of the variables with a tag, keyed by name
+        """
+        return self.tags.get(tag, OrderedDict())
+
+
+class NodeVarList(_TrackedDict):
     """
     This class contains a dictionary of dictionaries the first key is the node
-    name, the second key is the variable name.
+    name, the second key is the variable name.  Adding, removing and
+    retagging variables is tracked to keep the tag index up to date.
     """
 
     def __init__(self):
         """
         Initialize the variable list dictionary
         """
-        OrderedDict.__init__(self)
+        _TrackedDict.__init__(self)
 
     def clone(self):
         """
@@ -89,7 +238,25 @@ class NodeVarList(OrderedDict):
         """
         if nodeName in self:
             raise NodeVarListEx(code=5, msg=str(nodeName))
-        self[nodeName] = OrderedDict()
+        self[nodeName] = NodeVarDict()
+
+    def __setitem__(self, nodeName, nodeVars):
+        # node variable dicts need to track changes too, in this list
+        if not isinstance(nodeVars, NodeVarDict):
+            nodeVars = NodeVarDict(nodeVars)
+        if nodeVars._rev is not self._rev:
+            nodeVars._setRevision(self._rev)
+        _TrackedDict.__setitem__(self, nodeName, nodeVars)
+
+    def tagIndex(self):
+        """
+        Return a NodeVarTagIndex of the variables, it is only rebuilt after
+        variables are added, removed or retagged.
+        """
+        index = getattr(self, "_tagIndex", None)
+        if index is None or index.revision != self._rev.n:
+            index = self._tagIndex = NodeVarTagIndex(self)
+        return index
 
     def addVariable(self, nodeName, varName, var=None):
         """
@@ -285,14 +452,12 @@ class NodeVarList(OrderedDict):
             names: A list of variable names to return node.var form
             scale: If true return scaled values
         """
-        res = []
+        va = self.varArray(names)
+        res = va.values()
         if scaled:
-            for name in names:
-                self.get(name).scale()
-                res.append(self.get(name).scaled)
-        else:
-            for name in names:
-                res.append(self.get(name).value)
+            res = va.scale(res).tolist()
+            for var, x in zip(va.vars, res):
+                var.scaled = x
         return res
 
     def unflatten(self, nameList, valueList, unScale=False):
@@ -307,20 +472,139 @@ class NodeVarList(OrderedDict):
             valueList: a list of values for the variables
             unScale: the values are scaled so unscale them before putting in dict
         """
-        sd = {}
-        pos = 0
-        for i, name in enumerate(nameList):
-            if not isinstance(name, (list, tuple)):
-                name = self.splitName(name)
-            if not name[0] in sd:
-                sd[name[0]] = {}
-            sd[name[0]][name[1]] = valueList[pos]
-            pos += 1
-            if unScale:
-                sd[name[0]][name[1]] = self[name[0]][name[1]].unscale2(
-                    sd[name[0]][name[1]]
-                )
-        return sd
+        return self.varArray(nameList).unflatten([valueList], unScale)[0]
+
+    def unflattenRows(self, nameList, values, unScale=False):
+        """
+        Like unflatten, but for a 2-D array of values with a row for each
+        sample, returns a list of dictionaries.  The values are unscaled as
+        one array operation.
+        """
+        return self.varArray(nameList).unflatten(values, unScale)
+
+    def varArray(self, names):
+        """
+        Return a NodeVarArray of the variables in names, to get, set and
+        scale their values as arrays.
+        """
+        return NodeVarArray(self, names)
+
+
+class NodeVarArray(object):
+    """
+    Variables of a NodeVarList in the order of a list of names, for working
+    with the values of a whole population of samples at once.  Value arrays
+    have a column for each variable, and a row for each sample if 2-D.  The
+    variables are looked up when first needed and their scaling and bounds
+    are read when scaling, so they can be changed between calls.
+    """
+
+    def __init__(self, nvl, names):
+        """
+        Args:
+            nvl: the NodeVarList with the variables
+            names: list of node.var names or (node, var) pairs
+        """
+        self.nvl = nvl
+        self.names = [
+            (
+                tuple(name)
+                if isinstance(name, (list, tuple))
+                else tuple(nvl.splitName(name))
+            )
+            for name in names
+        ]
+        self.slot = {name: i for i, name in enumerate(self.names)}
+        self._vars = None
+
+    @property
+    def vars(self):
+        """The NodeVars objects in order"""
+        if self._vars is None:
+            self._vars = [self._lookup(node, var) for node, var in self.names]
+        return self._vars
+
+    def _lookup(self, node, var):
+        try:
+            return self.nvl[node][var]
+        except KeyError:
+            if node in self.nvl:
+                raise NodeVarListEx(3, msg=var)
+            raise NodeVarListEx(2, msg=node)
+
+    def values(self):
+        """List of the variable values"""
+        return [var.value for var in self.vars]
+
+    def setValues(self, values):
+        """Set the variable values from a flat list or 1-D array"""
+        for var, x in zip(self.vars, values):
+            var.value = x
+
+    def scaling(self):
+        """
+        Return arrays of the scaling type (index in ivarScales), minimum and
+        maximum of each variable.
+        """
+        n = len(self.names)
+        kind = np.zeros(n, dtype=np.int8)
+        lo = np.zeros(n)
+        hi = np.zeros(n)
+        for i, var in enumerate(self.vars):
+            if var.scaling == "None":
+                continue
+            try:
+                kind[i] = ivarScales.index(var.scaling)
+            except ValueError:
+                raise NodeVarEx(code=9, msg="scaling method = {0}".format(var.scaling))
+            lo[i] = var.min
+            hi[i] = var.max
+        return kind, lo, hi
+
+    def scale(self, values):
+        """Return an array of the scaled values of an array of values"""
+        return self._apply(values, _scaleArray)
+
+    def unscale(self, values):
+        """Return an array of the unscaled values of an array of scaled values"""
+        return self._apply(values, _unscaleArray)
+
+    def _apply(self, values, functions):
+        x = np.array(values, dtype=float)
+        kind, lo, hi = self.scaling()
+        out = x.copy()
+        with np.errstate(all="ignore"):
+            for k in np.unique(kind[kind > 0]):
+                cols = kind == k
+                out[..., cols] = functions[k](x[..., cols], lo[cols], hi[cols])
+        # where NodeVars.scale2 would have had a math error
+        bad = ~np.isfinite(out) & np.isfinite(x)
+        if bad.any():
+            i = tuple(np.argwhere(bad)[0])
+            raise NodeVarEx(
+                code=9,
+                msg="value = {0}, scaling method = {1}".format(
+                    x[i], ivarScales[kind[i[-1]]]
+                ),
+            )
+        return out
+
+    def unflatten(self, values, unScale=False):
+        """
+        Make a dictionary of variable values for each row of a 2-D array of
+        values, see NodeVarList.unflatten.
+        """
+        if unScale:
+            values = self.unscale(np.array(values, dtype=float, ndmin=2)).tolist()
+        res = []
+        for row in values:
+            sd = {}
+            for (node, var), x in zip(self.names, row):
+                if node not in sd:
+                    sd[node] = {}
+                sd[node][var] = x
+            res.append(sd)
+        return res
 
 
 class NodeVarVectorList(OrderedDict):
@@ -490,8 +774,35 @@ class NodeVarVectorList(OrderedDict):
 class NodeVars(object):
     """
     Class for variable attributes, variable scaling, and saving/loading.
+
+    Variables are slotted, there can be a lot of them in a flowsheet.  The
+    value, min, max and default attributes are properties that convert to
+    the variable's dtype when set.  Variables share one default uniform
+    distribution until dist is used, then get their own copy.
     """
 
+    __slots__ = (
+        "dtype",
+        "_value",
+        "_min",
+        "_max",
+        "_default",
+        "unit",
+        "set",
+        "desc",
+        "scaled",
+        "scaling",
+        "minScaled",
+        "maxScaled",
+        "_tags",
+        "con",
+        "ipvname",
+        "opvname",
+        "optVar",
+        "_dist",
+        "_rev",
+    )
+
     def __init__(
         self,
         value=0,
@@ -506,7 +817,7 @@ class NodeVars(object):
         vdesc="",
         tags=[],
         dtype=float,
-        dist=Distribution(Distribution.UNIFORM),
+        dist=None,
     ):
         """
         Initialize the variable list
@@ -521,7 +832,7 @@ class NodeVars(object):
             vdesc: A sentence or so describing the variable
             tags: List of string tags for the variable
             dtype: type of data {float, int, str, object}
-            dist: distribution type for UQ
+            dist: distribution type for UQ, None for uniform
         """
         self.dtype = dtype
         value = value
@@ -543,14 +854,16 @@ class NodeVars(object):
         self.scaling = "None"  # type of variable scaling
         self.minScaled = 0.0  # scaled minimum
         self.maxScaled = 0.0  # scaled maximum
-        self.tags = tags  # set of tags for use in heat integration or
+        self._tags = tags  # set of tags for use in heat integration or
         # other searching and sorting
+        self._rev = None  # change counter of the NodeVarList holding this
         self.con = False  # true if the input is set through connection
         self.setValue(value)  # value of the variable
         # self.setVector(vector) # dictionary for vector variables
         self.setType(dtype)
         self.setname(ipvname, opvname)
-        self.dist = copy.copy(dist)
+        # None until used, for the shared default distribution
+        self._dist = None if dist is None else copy.copy(dist)
 
     def typeStr(self):
         """
@@ -595,62 +908,56 @@ class NodeVars(object):
         """
         Set the minimum value
         """
-        self.__min = self.dtype(val)
+        self._min = self.dtype(val)
 
     def setMax(self, val):
         """
         Set the maximum value
         """
-        self.__max = self.dtype(val)
+        self._max = self.dtype(val)
 
     def setDefault(self, val):
         """
         Set the default value
         """
-        self.__default = self.dtype(val)
+        self._default = self.dtype(val)
 
     def setValue(self, val):
         """
         Set the variable value
         """
-        self.__value = self.dtype(val)
+        self._value = self.dtype(val)
+
+    def setTags(self, tags):
+        """
+        Set the variable tags, tag indexes are rebuilt when next used
+        """
+        self._tags = tags
+        if self._rev is not None:
+            self._rev.n += 1
+
+    # getting these is on the hot path so the getters are attrgetters
+    value = property(operator.attrgetter("_value"), setValue)
+    min = property(operator.attrgetter("_min"), setMin)
+    max = property(operator.attrgetter("_max"), setMax)
+    default = property(operator.attrgetter("_default"), setDefault)
+    tags = property(operator.attrgetter("_tags"), setTags)
+
+    @property
+    def dist(self):
+        """The UQ distribution, copied from the default when first used"""
+        if self._dist is None:
+            self._dist = copy.copy(_defaultDist)
+        return self._dist
+
+    @dist.setter
+    def dist(self, dist):
+        self._dist = dist
 
     def setname(self, ip, op):
         self.ipvname = ip
         self.opvname = op
 
-    def __getattr__(self, name):
-        """
-        This should only be called if a variable doesn't have the attribute name.
-        """
-        if name == "value":
-            return self.__value
-        elif name == "min":
-            return self.__min
-        elif name == "max":
-            return self.__max
-        elif name == "default":
-            return self.__default
-        else:
-            print(name)
-            raise AttributeError
-
-    def __setattr__(self, name, val):
-        """
-        This is called when setting an attribute, if the attribute is value,
-        min, max, default, convert data type, otherwise do normal stuff
-        """
-        if name == "value":
-            self.setValue(val)
-        elif name == "min":
-            self.setMin(val)
-        elif name == "max":
-            self.setMax(val)
-        elif name == "default":
-            self.setDefault(val)
-        else:
-            super(NodeVars, self).__setattr__(name, val)
-
     def scale(self):
         """
         Scale the value stored in the value field and put the result in the
@@ -779,7 +1086,7 @@ class NodeVars(object):
         sd["desc"] = self.desc
         sd["scaling"] = self.scaling
         sd["tags"] = self.tags
-        sd["dist"] = self.dist.saveDict()
+        sd["dist"] = (self._dist or _defaultDist).saveDict()
         return sd
 
     def loadDict(self, sd):
@@ -819,7 +1126,8 @@ class NodeVars(object):
         self.tags = sd.get("tags", [])
         dist = sd.get("dist", None)
         if dist is not None:
-            self.dist.loadDict(dist)
+            if self._dist is not None or dist != _defaultDist.saveDict():
+                self.dist.loadDict(dist)
         self.scale()
         self.scaleBounds()
 
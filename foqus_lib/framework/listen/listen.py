@@ -19,14 +19,33 @@
   (executable) to do additional sampling. The executable will tell FOQUS to run
   a simulation and return results by connecting to the socket of the listener.
 
+  foqusListener also takes whole batches of samples with "submit_batch" and
+  streams back finished samples with "results_since", so a client can keep
+  submitting while earlier samples are still running:
+
+    conn.send(["submit_batch", X])        # X is a 2-D array, one row/sample
+    conn.recv() -> ["submitted_batch", firstIndex, nSamples]
+    conn.send(["results_since", index, timeout])
+    conn.recv() -> ["results_since", indexes, outputs, status]
+
+  indexes, outputs (nFinished x nOutputs) and status are numpy arrays of
+  the samples with index >= index that have finished.  With a timeout
+  the listener waits up to that many seconds for a new sample to finish.
+  Each batch, and each "run" of samples added with "submit", starts in its
+  own graph thread, so it runs alongside the batches before it.  "status"
+  and "result" refer to the most recently started graph thread.
+
 John Eslick, Carnegie Mellon University, 2014
 """
 
 import copy
 import logging
 import threading
+import time
 from multiprocessing.connection import Listener
 
+import numpy as np
+
 
 class foqusListener2(threading.Thread):
     """
@@ -115,6 +134,11 @@ class foqusListener(threading.Thread):
         self.samples = []
         self.gt = None
         self.scaled = False
+        # graph threads with the index of their first sample, a new thread
+        # starts for each batch while the earlier ones keep running
+        self.batchRuns = []
+        self.started = 0  # samples handed to a graph thread
+        self.reported = set()  # samples stored in the flowsheet results
         # Create a listener
         self.address = (host, port)
         self.listener = Listener(self.address)
@@ -125,6 +149,113 @@ class foqusListener(threading.Thread):
     def setOutputs(self, l):
         self.outputNames = l
 
+    def sampleInputs(self, inpDict, values):
+        """
+        Make input dictionaries for the rows of a 2-D array of values of
+        the inputNames variables.  Only the node dictionaries that change
+        are copied, the rest are shared with inpDict which is not modified.
+        """
+        inputs = self.dat.flowsheet.input
+        names = [
+            n if isinstance(n, (list, tuple)) else inputs.splitName(n)
+            for n in self.inputNames
+        ]
+        values = np.array(values, dtype=float, ndmin=2)
+        if values.shape[1] != len(names):
+            raise ValueError(
+                "Expected {0} input values per sample, got {1}".format(
+                    len(names), values.shape[1]
+                )
+            )
+        if self.scaled:
+            values = inputs.varArray(names).unscale(values)
+        rows = values.tolist()
+        nodes = {nkey for nkey, vkey in names}
+        samples = []
+        for row in rows:
+            sampInput = dict(inpDict)
+            for nkey in nodes:
+                sampInput[nkey] = dict(inpDict[nkey])
+            for (nkey, vkey), val in zip(names, row):
+                sampInput[nkey][vkey] = val
+            samples.append(sampInput)
+        return samples
+
+    def startPending(self):
+        """Start a graph thread on the submitted samples not yet started.
+        It becomes self.gt and runs alongside any earlier batches."""
+        if self.started >= len(self.samples):
+            return
+        runList = self.samples[self.started :]
+        useTurbine = self.dat.foqusSettings.runFlowsheetMethod != 0
+        self.gt = self.dat.flowsheet.runListAsThread(runList, useTurbine=useTurbine)
+        self.batchRuns.append((self.started, self.gt))
+        self.started = len(self.samples)
+
+    def storeResult(self, index, res):
+        """Add a sample result to the flowsheet results once"""
+        if res is None or index in self.reported:
+            return
+        self.dat.flowsheet.results.addFromSavedValues(
+            self.resStoreSet, "res_{0}".format(self.runid), None, res
+        )
+        self.runid += 1
+        self.reported.add(index)
+
+    def sampleOutputs(self, res, stat):
+        if res is None or stat != 0:
+            return [self.failValue] * len(self.outputNames)
+        r = []
+        for vn in self.outputNames:
+            nodeName, varName = vn.split(".", 1)
+            r.append(res["output"][nodeName][varName])
+        return r
+
+    def resultsSince(self, index):
+        """
+        Finished samples with index >= index as numpy arrays of sample
+        indexes, outputs and status codes.  Samples are added to the
+        flowsheet results the first time they are returned.
+        """
+        idx = []
+        out = []
+        stat = []
+        for offset, gt in self.batchRuns:
+            n = len(gt.res)
+            if offset + n <= index:
+                continue
+            alive = gt.is_alive()
+            with gt.resLock:
+                res = list(gt.res)
+                fin = list(gt.res_fin)
+            for i in range(max(0, index - offset), n):
+                if alive and fin[i] == -1:
+                    continue  # not finished
+                j = offset + i
+                self.storeResult(j, res[i])
+                st = res[i]["graphError"] if res[i] is not None else fin[i]
+                idx.append(j)
+                stat.append(st)
+                out.append(self.sampleOutputs(res[i], st))
+        return (
+            np.array(idx, dtype=int),
+            np.array(out, dtype=float).reshape(len(idx), len(self.outputNames)),
+            np.array(stat, dtype=int),
+        )
+
+    def waitResultsSince(self, index, timeout=0):
+        """resultsSince(), waiting up to timeout seconds for a result"""
+        deadline = time.time() + timeout
+        while True:
+            ret = self.resultsSince(index)
+            remaining = deadline - time.time()
+            if len(ret[0]) or remaining <= 0:
+                return ret
+            running = [gt for offset, gt in self.batchRuns if gt.is_alive()]
+            if not running:
+                return ret  # nothing left running
+            running[0].join(min(remaining, 0.1))
+
     def run(self):
         """Called by Thread when you run start() method"""
         quitListening = False
@@ -151,16 +282,14 @@ class foqusListener(threading.Thread):
                 elif msg[0] == "clear":
                     # clear the list of samples
                     self.samples = []
+                    self.gt = None
+                    self.batchRuns = []
+                    self.started = 0
+                    self.reported = set()
                 elif msg[0] == "run":
-                    # Start up a thread to run samples
-                    # Run samples either locally or through Turbine
-                    if self.dat.foqusSettings.runFlowsheetMethod == 0:
-                        # run local
-                        self.gt = self.dat.flowsheet.runListAsThread(self.samples)
-                    else:  # run in turbine
-                        self.gt = self.dat.flowsheet.runListAsThread(
-                            self.samples, useTurbine=True
-                        )
+                    # Start up a thread to run the samples not started yet
+                    # either locally or through Turbine
+                    self.startPending()
                     conn.send(["run", len(self.samples)])
                 elif msg[0] == "submit":
                     # put a run on the input queue
@@ -175,33 +304,46 @@ class foqusListener(threading.Thread):
                     self.samples.append(sampInput)
                     runIndex = len(self.samples) - 1
                     conn.send(["submitted", runIndex])
+                elif msg[0] == "submit_batch":
+                    # queue a 2-D array of samples and start running them
+                    try:
+                        samples = self.sampleInputs(inpDict, msg[1])
+                    except Exception as e:
+                        logging.exception("Error in submitted batch")
+                        conn.send(["error", str(e)])
+                        continue
+                    runIndex = len(self.samples)
+                    self.samples.extend(samples)
+                    self.startPending()
+                    conn.send(["submitted_batch", runIndex, len(samples)])
+                elif msg[0] == "results_since":
+                    # send the samples finished so far from an index on
+                    index = msg[1] if len(msg) > 1 else 0
+                    timeout = msg[2] if len(msg) > 2 else 0
+                    idx, out, stat = self.waitResultsSince(index, timeout)
+                    conn.send(["results_since", idx, out, stat])
                 elif msg[0] == "status":
-                    # send run status
+                    # send run status of the latest graph thread
+                    if self.gt is None:
+                        conn.send(["error", "No samples have been run"])
+                        continue
                     conn.send(["status", self.gt.status])
                 elif msg[0] == "result":
                     # Store results in FOQUS and send them to client also
+                    if self.gt is None:
+                        conn.send(["error", "No samples have been run"])
+                        continue
                     self.gt.join()
+                    offset = [o for o, gt in self.batchRuns if gt is self.gt][0]
                     ret = []
                     stat = []
                     # WHY pylint infers `res` as an unsubscriptable object
                     # (possibly because of None default value?)
                     # pylint: disable=unsubscriptable-object
-                    for res in self.gt.res:
-                        self.dat.flowsheet.results.addFromSavedValues(
-                            self.resStoreSet, "res_{0}".format(self.runid), None, res
-                        )
-                        self.runid += 1
+                    for i, res in enumerate(self.gt.res):
+                        self.storeResult(offset + i, res)
                         stat.append(res["graphError"])
-                        r = []
-                        for vn in self.outputNames:
-                            vn = vn.split(".", 1)
-                            nodeName = vn[0]
-                            varName = vn[1]
-                            r.append(res["output"][nodeName][varName])
-                        if res["graphError"] != 0:
-                            for i in range(len(r)):
-                                r[i] = self.failValue
-                        ret.append(r)
+                        ret.append(self.sampleOutputs(res, res["graphError"]))
                     # pylint: enable=unsubscriptable-object
                     conn.send(["result", stat, ret])
                 elif msg[0] == "save":
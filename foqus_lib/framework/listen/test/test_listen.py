@@ -0,0 +1,145 @@
+#################################################################################
+# FOQUS Copyright (c) 2012 - 2026, by the software owners: Oak Ridge Institute
+# for Science and Education (ORISE), TRIAD National Security, LLC., Lawrence
+# Livermore National Security, LLC., The Regents of the University of
+# California, through Lawrence Berkeley National Laboratory, Battelle Memorial
+# Institute, Pacific Northwest Division through Pacific Northwest National
+# Laboratory, Carnegie Mellon University, West Virginia University, Boston
+# University, the Trustees of Princeton University, The University of Texas at
+# Austin, URS Energy & Construction, Inc., et al.  All rights reserved.
+#
+# Please see the file LICENSE.md for full copyright and license information,
+# respectively. This file is also available online at the URL
+# "https://github.com/CCSI-Toolset/FOQUS".
+#################################################################################
+import math
+import os
+import tempfile
+import time
+import unittest
+from multiprocessing.connection import Client
+from pathlib import Path
+
+import numpy as np
+
+from foqus_lib.framework.listen import listen
+from foqus_lib.framework.session.session import session
+
+# calc.z = x1*sqrt(x2), negative x2 makes the sample fail
+EXAMPLE = (
+    Path(__file__).parents[4]
+    / "examples"
+    / "tutorial_files"
+    / "Flowsheets"
+    / "Tutorial_1"
+    / "Simple_flow.foqus"
+)
+
+
+class TestFoqusListenerBatch(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.cwd = os.getcwd()
+        os.chdir(self.tmp.name)
+        os.mkdir("logs")
+        self.dat = session(useCurrentWorkingDir=True)
+        self.dat.load(str(EXAMPLE))
+        self.listener = listen.foqusListener(self.dat, port=0)
+        self.listener.setInputs(["calc.x1", "calc.x2"])
+        self.listener.setOutputs(["calc.z"])
+        self.listener.start()
+        self.conn = Client(self.listener.listener.address)
+
+    def tearDown(self):
+        self.conn.send(["quit"])
+        self.conn.close()
+        self.listener.join(10)
+        os.chdir(self.cwd)
+        self.tmp.cleanup()
+
+    def collect(self, n, timeout=60):
+        idx, out, stat = [], [], []
+        deadline = time.time() + timeout
+        while len(idx) < n and time.time() < deadline:
+            self.conn.send(["results_since", len(idx), 1.0])
+            msg = self.conn.recv()
+            self.assertEqual(msg[0], "results_since")
+            idx.extend(msg[1].tolist())
+            out.extend(msg[2].tolist())
+            stat.extend(msg[3].tolist())
+        return idx, out, stat
+
+    def test_submit_batch_streams_results(self):
+        nRows = self.dat.flowsheet.results.count_rows()
+        x = np.array([[1.0, 4.0], [2.0, 9.0], [3.0, 1.0]])
+        self.conn.send(["submit_batch", x])
+        self.assertEqual(self.conn.recv(), ["submitted_batch", 0, 3])
+        # pipeline a second batch while the first may still be running
+        self.conn.send(["submit_batch", [[0.5, -1.0], [1.5, 4.0]]])
+        self.assertEqual(self.conn.recv(), ["submitted_batch", 3, 2])
+        idx, out, stat = self.collect(5)
+        self.assertEqual(idx, [0, 1, 2, 3, 4])
+        self.assertEqual([s == 0 for s in stat], [True, True, True, False, True])
+        np.testing.assert_allclose(
+            [o[0] for o in out], [2.0, 6.0, 3.0, self.listener.failValue, 3.0]
+        )
+        # results are stored once, repeated requests only resend them
+        self.conn.send(["results_since", 3])
+        msg = self.conn.recv()
+        self.assertEqual(msg[1].tolist(), [3, 4])
+        self.assertEqual(self.listener.runid, 5)
+        self.assertEqual(self.dat.flowsheet.results.count_rows(), nRows + 5)
+
+    def test_submit_batch_rejects_wrong_width(self):
+        self.conn.send(["submit_batch", [[1.0, 2.0, 3.0]]])
+        msg = self.conn.recv()
+        self.assertEqual(msg[0], "error")
+        self.conn.send(["results_since", 0])
+        msg = self.conn.recv()
+        self.assertEqual(msg[2].shape, (0, 1))
+
+    def test_sample_inputs_share_unchanged_values(self):
+        inpDict = self.dat.flowsheet.saveValues()["input"]
+        samples = self.listener.sampleInputs(inpDict, [[1.0, 2.0], [3.0, 4.0]])
+        self.assertEqual(samples[1]["calc"], {"x1": 3.0, "x2": 4.0})
+        self.assertIsNot(samples[0]["calc"], samples[1]["calc"])
+        self.assertEqual(inpDict["calc"]["x1"], 0.0)
+        self.assertTrue(math.isclose(samples[0]["calc"]["x2"], 2.0))
+
+    def test_status_and_result_after_submit_batch(self):
+        self.conn.send(["status"])
+        self.assertEqual(self.conn.recv()[0], "error")
+        self.conn.send(["result"])
+        self.assertEqual(self.conn.recv()[0], "error")
+        self.conn.send(["submit_batch", [[1.0, 4.0], [2.0, 9.0]]])
+        self.assertEqual(self.conn.recv(), ["submitted_batch", 0, 2])
+        self.conn.send(["result"])
+        msg = self.conn.recv()
+        self.assertEqual(msg[1], [0, 0])
+        np.testing.assert_allclose([r[0] for r in msg[2]], [2.0, 6.0])
+        self.conn.send(["status"])
+        msg = self.conn.recv()
+        self.assertEqual(msg[0], "status")
+        self.assertEqual(msg[1]["success"], 2)
+        # streaming the same samples does not store them again
+        idx, out, stat = self.collect(2)
+        self.assertEqual(idx, [0, 1])
+        self.assertEqual(self.listener.runid, 2)
+
+    def test_run_starts_only_new_samples(self):
+        self.conn.send(["submit_batch", [[1.0, 4.0]]])
+        self.assertEqual(self.conn.recv(), ["submitted_batch", 0, 1])
+        self.conn.send(["submit", [2.0, 9.0]])
+        self.assertEqual(self.conn.recv(), ["submitted", 1])
+        self.conn.send(["submit", [3.0, 1.0]])
+        self.assertEqual(self.conn.recv(), ["submitted", 2])
+        self.conn.send(["run"])
+        self.assertEqual(self.conn.recv(), ["run", 3])
+        self.conn.send(["result"])
+        msg = self.conn.recv()
+        np.testing.assert_allclose([r[0] for r in msg[2]], [6.0, 3.0])
+        self.assertEqual([n for n, gt in self.listener.batchRuns], [0, 1])
+        self.assertEqual(len(self.listener.batchRuns[1][1].res), 2)
+        idx, out, stat = self.collect(3)
+        self.assertEqual(idx, [0, 1, 2])
+        self.assertEqual(self.listener.runid, 3)
@@ -116,6 +116,7 @@ class opt(optimization):
             desc="Jacobian approximation step size",
             dtype=float,
         )
+        self.addBatchGradientOptions()
         self.options.add(
             name="maxeval",
             default=1000000,
@@ -158,6 +159,8 @@ class opt(optimization):
                 "{0} obj: {1}".format(self.prob.iterationNumber, self.bestSoFar)
             )
         self.prob.iterationNumber += 1
+        self.lastX = numpy.array(x)
+        self.lastObj = obj
         return obj
 
     def optimize(self):
@@ -195,6 +198,13 @@ class opt(optimization):
         bounds = []
         for i in range(n):
             bounds.append((lower[i], upper[i]))
+        self.lower = lower
+        self.upper = upper
+        self.lastX = None
+        if self.options["Batch gradient"].value:
+            jac = self.jac
+        else:
+            jac = None
         ftol = self.options["ftol"].value
         eps = self.options["eps"].value
         maxeval = self.options["maxeval"].value
@@ -220,6 +230,7 @@ class opt(optimization):
             xinit,
             method="L-BFGS-B",
             bounds=bounds,
+            jac=jac,
             options={"ftol": ftol, "eps": eps, "maxfun": maxeval},
         )
         # Print some final words
@@ -0,0 +1,449 @@
+#################################################################################
+# FOQUS Copyright (c) 2012 - 2026, by the software owners: Oak Ridge Institute
+# for Science and Education (ORISE), TRIAD National Security, LLC., Lawrence
+# Livermore National Security, LLC., The Regents of the University of
+# California, through Lawrence Berkeley National Laboratory, Battelle Memorial
+# Institute, Pacific Northwest Division through Pacific Northwest National
+# Laboratory, Carnegie Mellon University, West Virginia University, Boston
+# University, the Trustees of Princeton University, The University of Texas at
+# Austin, URS Energy & Construction, Inc., et al.  All rights reserved.
+#
+# Please see the file LICENSE.md for full copyright and license information,
+# respectively. This file is also available online at the URL
+# "https://github.com/CCSI-Toolset/FOQUS".
+#################################################################################
+"""#FOQUS_OPT_PLUGIN
+
+Optimization plugins need to have the string "#FOQUS_OPT_PLUGIN" near the
+beginning of the file (see pluginSearch.plugins() for exact character count of
+text).  They also need to have a .py extension and inherit the optimization class.
+
+* FOQUS optimization plugin running several scipy local searches at once
+  from Latin hypercube, Sobol or random starting points
+* Each local search runs in its own thread, the points they ask for are
+  collected and run together in one call to runSamples, so they share one
+  pool of flowsheet evaluations
+"""
+
+import logging
+import math
+import threading
+import time
+import warnings
+
+import numpy
+
+from foqus_lib.framework.optimizer.optimization import optimization
+
+try:
+    import scipy.optimize
+    from scipy.stats import qmc
+
+    multistart_available = True
+except ImportError:
+    logging.getLogger("foqus." + __name__).info(
+        "Failed to import scipy package used for multi-start optimization"
+    )
+    multistart_available = False
+
+_log = logging.getLogger("foqus." + __name__)
+
+
+def checkAvailable():
+    """
+    Plugins should have this function to check availability of any
+    additional required software.  If requirements are not available
+    plugin will not be available.
+    """
+    return multistart_available
+
+
+class stopLocalSearch(Exception):
+    """Raised in a local search thread to end that search"""
+
+    pass
+
+
+class localSearch:
+    """State of one local search"""
+
+    def __init__(self, index, x0):
+        self.index = index
+        self.x0 = x0
+        self.best = float("inf")
+        self.bestX = x0
+        self.evals = 0
+        self.lastImprovement = 0  # evaluation count of the last improvement
+        self.stopReason = None  # set to stop the search at its next evaluation
+        self.status = "running"
+        self.thread = None
+
+
+class opt(optimization):
+    """
+    The optimization solver class.  Should be called opt and inherit
+    optimization.  The are several attributes from the optimization
+    base class that should be set for an optimization plug-in:
+    - available True or False, False it some required thing is not
+        present
+    - name The name of the solver
+    - mp True or False, can use multiprocessing?
+    - mobj True or False, handles multiple objectives?
+    - options An optionList object to add solver options to
+
+    Some functions must also be implemented.  Following this example
+    __init()__ call base class init, set attributes, add options
+    optimize() run optimization periodically send out results for
+        monitoring, and check stop flag
+    """
+
+    def __init__(self, dat=None):
+        """
+        Initialize multi-start optimization module
+        """
+        optimization.__init__(self, dat)
+        self.name = "MultiStart"
+        self.methodDescription = (
+            "<html>\n<head>"
+            ".hangingindent {\n"
+            "    margin-left: 22px ;\n"
+            "    text-indent: -22px ;\n"
+            "}\n"
+            "</head>\n"
+            '<p class="hangingindent">'
+            "<p>Algorithm Type: Multi-start local search</p>"
+            "<p>Runs several SciPy local searches at the same time from "
+            "Latin hypercube, Sobol or random starting points. The points "
+            "all the searches need are run together as one batch of "
+            "flowsheet samples. Searches that have stopped improving and "
+            "are worse than the best result found are stopped early.</p>"
+            "<p>Optimization Problems handled: Multimodal problems with "
+            "variable bounds</p>"
+            "</html>"
+        )
+        self.available = multistart_available
+        self.description = "Multi-start local search"
+        self.mp = True
+        self.mobj = False
+        self.minVars = 1
+        self.maxVars = 10000
+        self.options.add(
+            name="Local solver",
+            default="L-BFGS-B",
+            dtype=str,
+            validValues=["L-BFGS-B", "SLSQP", "Nelder-Mead", "Powell"],
+            desc="SciPy local solver run from each starting point",
+        )
+        self.options.add(
+            name="Starts",
+            default=8,
+            dtype=int,
+            desc="Number of starting points",
+        )
+        self.options.add(
+            name="Concurrent starts",
+            default=8,
+            dtype=int,
+            desc="Maximum number of local searches running at the same time",
+        )
+        self.options.add(
+            name="Start design",
+            default="LHS",
+            dtype=str,
+            validValues=["LHS", "Sobol", "Random"],
+            desc="How starting points are sampled in the variable bounds",
+        )
+        self.options.add(
+            name="Include initial point",
+            default=True,
+            dtype=bool,
+            desc="Use the current flowsheet values as the first start",
+        )
+        self.options.add(
+            name="Seed",
+            default=0,
+            dtype=int,
+            desc="Random seed for the starting points",
+        )
+        self.options.add(
+            name="upper",
+            default=10.0,
+            dtype=float,
+            desc="Upper bound on scaled variables (usually 10.0)",
+        )
+        self.options.add(
+            name="lower",
+            default=0.0,
+            desc="Lower bound on scaled variables (usually 0.0)",
+        )
+        self.options.add(
+            name="ftol",
+            default=1.0e-9,
+            desc="Function abs tolerance termination condition",
+            dtype=float,
+        )
+        self.options.add(
+            name="eps",
+            default=1.0e-6,
+            desc="Jacobian approximation step size (L-BFGS-B and SLSQP)",
+            dtype=float,
+        )
+        self.options.add(
+            name="maxeval",
+            default=1000,
+            desc="maximum number of objective function evaluations per start",
+            dtype=int,
+        )
+        self.options.add(
+            name="Stall evaluations",
+            default=20,
+            dtype=int,
+            desc=(
+                "Stop a search that has not improved in this many evaluations "
+                "and is worse than the best result (<= 0 never stop)"
+            ),
+        )
+        self.options.add(
+            name="Dominance tolerance",
+            default=0.01,
+            dtype=float,
+            desc=(
+                "Relative amount a search's best must be worse than the "
+                "overall best before it can be stopped"
+            ),
+        )
+        self.options.add(
+            name="maxtime",
+            default=48.0,
+            desc="maximum time to allow for optimization (hours)",
+            dtype=float,
+        )
+        self.options.add(
+            name="Save results", default=True, desc="Save all flowsheet results?"
+        )
+        self.options.add(
+            name="Set Name",
+            default="MultiStart",
+            dtype=str,
+            desc="Name of flowsheet result set to store data",
+        )
+
+    def startPoints(self, xinit, lower, upper):
+        """
+        Return the starting points, a k by n array of scaled variables
+        """
+        k = max(1, self.options["Starts"].value)
+        design = self.options["Start design"].value
+        seed = self.options["Seed"].value
+        n = len(xinit)
+        starts = []
+        if self.options["Include initial point"].value:
+            starts.append(numpy.clip(xinit, lower, upper))
+        m = k - len(starts)
+        if m > 0:
+            if design == "Sobol":
+                with warnings.catch_warnings():
+                    # Sobol warns if m is not a power of 2
+                    warnings.simplefilter("ignore")
+                    u = qmc.Sobol(d=n, scramble=True, seed=seed).random(m)
+            elif design == "LHS":
+                u = qmc.LatinHypercube(d=n, seed=seed).random(m)
+            else:
+                u = numpy.random.default_rng(seed).random((m, n))
+            starts.extend(lower + u * (upper - lower))
+        return numpy.array(starts)
+
+    def evaluate(self, search, x):
+        """
+        Objective function for a local search thread.  The point is put
+        in the pool and this waits until the main thread has run it.
+        """
+        with self.cond:
+            if search.stopReason is not None:
+                raise stopLocalSearch(search.stopReason)
+            req = dict(search=search, x=numpy.array(x, dtype=float), obj=None)
+            self.pending.append(req)
+            self.cond.notify_all()
+            while req["obj"] is None and search.stopReason is None:
+                self.cond.wait()
+            if req["obj"] is None:
+                raise stopLocalSearch(search.stopReason)
+            return req["obj"]
+
+    def runLocalSearch(self, search):
+        """Thread target running one local search"""
+        method = self.options["Local solver"].value
+        ftol = self.options["ftol"].value
+        if method in ["L-BFGS-B", "SLSQP"]:
+            options = {"ftol": ftol, "eps": self.options["eps"].value}
+        elif method == "Nelder-Mead":
+            options = {"fatol": ftol}
+        else:
+            options = {"ftol": ftol}
+        try:
+            scipy.optimize.minimize(
+                lambda x: self.evaluate(search, x),
+                search.x0,
+                method=method,
+                bounds=self.bounds,
+                options=options,
+            )
+            search.status = "converged"
+        except stopLocalSearch as e:
+            search.status = str(e)
+        except Exception:
+            _log.exception("Error in local search {0}".format(search.index))
+            search.status = "error"
+        with self.cond:
+            self.running.remove(search)
+            self.cond.notify_all()
+
+    def startSearch(self, search):
+        self.running.append(search)
+        search.thread = threading.Thread(
+            target=self.runLocalSearch, args=(search,), daemon=True
+        )
+        search.thread.start()
+
+    def runBatch(self, batch):
+        """Run the points in the pool and wake the searches waiting on them"""
+        X = [req["x"] for req in batch]
+        objValues, cv, pv = self.prob.runSamples(X, self)
+        if self.stop.isSet():
+            self.userInterupt = True
+        obj = [float(o[0]) for o in objValues]
+        nres = len(self.prob.gt.res) // len(X)
+        maxeval = self.options["maxeval"].value
+        for i, req in enumerate(batch):
+            search = req["search"]
+            search.evals += 1
+            if obj[i] < search.best:
+                search.best = obj[i]
+                search.bestX = X[i]
+                search.lastImprovement = search.evals
+            if obj[i] < self.bestSoFar:
+                self.bestSoFar = obj[i]
+                self.bestX = X[i]
+                self.graph.loadValues(self.prob.gt.res[i * nres])
+                self.updateGraph = True
+                self.resQueue.put(["BEST", [self.bestSoFar], X[i]])
+            if maxeval > 0 and search.evals >= maxeval:
+                search.stopReason = "evaluation limit"
+        self.resQueue.put(["IT", self.prob.iterationNumber, self.bestSoFar])
+        if not self.prob.iterationNumber % 10:
+            self.msgQueue.put(
+                "{0} obj: {1} searches running: {2}".format(
+                    self.prob.iterationNumber, self.bestSoFar, len(self.running)
+                )
+            )
+        self.prob.iterationNumber += 1
+        # Set the results last, so a search can't ask for another point
+        # before this batch is done
+        for i, req in enumerate(batch):
+            req["obj"] = obj[i]
+
+    def stopDominated(self):
+        """Stop searches that stalled with a best worse than the overall best"""
+        stall = self.options["Stall evaluations"].value
+        tol = self.options["Dominance tolerance"].value
+        if stall <= 0:
+            return
+        limit = self.bestSoFar + tol * max(1.0, abs(self.bestSoFar))
+        for search in self.running:
+            if (
+                search.stopReason is None
+                and search.evals - search.lastImprovement >= stall
+                and search.best > limit
+            ):
+                search.stopReason = "dominated"
+                self.msgQueue.put(
+                    "Stopping start {0}, best {1} worse than {2}".format(
+                        search.index, search.best, self.bestSoFar
+                    )
+                )
+
+    def optimize(self):
+        """
+        This is the optimization routine.
+        """
+        xinit = numpy.array(self.graph.input.getFlat(self.prob.v, scaled=True))
+        self.msgQueue.put(
+            "Starting multi-start optimization at {0}".format(
+                time.strftime("%a, %d %b %Y %H:%M:%S", time.localtime())
+            )
+        )
+        n = len(xinit)
+        upper = self.options["upper"].value
+        lower = self.options["lower"].value
+        if type(upper) == float or type(upper) == int:
+            upper = upper * numpy.ones(n)
+        else:
+            upper = numpy.array(upper)
+        if type(lower) == float or type(lower) == int:
+            lower = lower * numpy.ones(n)
+        else:
+            lower = numpy.array(lower)
+        self.bounds = list(zip(lower, upper))
+        concurrent = max(1, self.options["Concurrent starts"].value)
+        maxtime = self.options["maxtime"].value
+        saveRes = self.options["Save results"].value
+        setName = self.options["Set Name"].value
+        if saveRes:
+            setName = self.dat.flowsheet.results.incrementSetName(setName)
+        start = time.time()
+        self.userInterupt = False
+        self.bestSoFar = float("inf")
+        self.bestX = xinit
+        self.prob.iterationNumber = 0
+        self.prob.initSolverParameters()
+        self.prob.solverStart = start
+        self.prob.maxSolverTime = maxtime
+        if saveRes:
+            self.prob.storeResults = setName
+        else:
+            self.prob.storeResults = None
+        self.prob.prep(self)
+        starts = self.startPoints(xinit, lower, upper)
+        searches = [localSearch(i, x0) for i, x0 in enumerate(starts)]
+        waiting = list(searches)
+        self.msgQueue.put(
+            "{0} starts, up to {1} at once".format(len(searches), concurrent)
+        )
+        self.cond = threading.Condition()
+        self.pending = []
+        self.running = []
+        with self.cond:
+            while waiting or self.running:
+                while waiting and len(self.running) < concurrent:
+                    self.startSearch(waiting.pop(0))
+                # wait for every running search to ask for a point or end
+                while self.running and len(self.pending) < len(self.running):
+                    self.cond.wait()
+                if not self.pending:
+                    continue
+                batch = sorted(self.pending, key=lambda req: req["search"].index)
+                self.pending = []
+                self.runBatch(batch)
+                if self.userInterupt or self.prob.maxTimeInterupt:
+                    waiting = []
+                    for search in self.running:
+                        search.stopReason = "interrupted"
+                else:
+                    self.stopDominated()
+                self.cond.notify_all()
+        for search in searches:
+            self.msgQueue.put(
+                "Start {0}: {1} evaluations, best {2}, {3}".format(
+                    search.index, search.evals, search.best, search.status
+                )
+            )
+        # Print some final words
+        eltime = time.time() - start
+        self.msgQueue.put(
+            "{0}, Total Elapsed Time {1}s, Obj: {2}".format(
+                self.prob.iterationNumber, math.floor(eltime), self.bestSoFar
+            )
+        )
+        self.resQueue.put(["IT", self.prob.iterationNumber, self.bestSoFar])
+        self.resQueue.put(["BEST", [self.bestSoFar], self.bestX])
+        self.msgQueue.put("Best result found stored in graph")
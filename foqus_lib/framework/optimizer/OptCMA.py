@@ -214,6 +214,21 @@ class opt(optimization):
             default="",
             desc="Append objective mix/max after every iteration",
         )
+        self.options.add(
+            name="Asynchronous",
+            default=False,
+            dtype=bool,
+            desc="Start a new sample as soon as one finishes instead of "
+            "waiting for the whole population, the CMA-ES distribution is "
+            "updated each time popsize samples have finished",
+        )
+        self.options.add(
+            name="Async workers",
+            default=0,
+            dtype=int,
+            desc="Number of samples running at once in asynchronous mode "
+            "(0 uses popsize)",
+        )
 
     def optimize(self):
         """
@@ -244,17 +259,13 @@ class opt(optimization):
         sd0 = self.options["sd0"].value
         setName = self.options["Results name"].value
         pickIn = self.options["Restart in"].value
-        pickOut = self.options["Restart out"].value
-        pickMod = self.options["Restart modulus"].value
         maxTime = self.options["Max time"].value
         itTimeout = self.options["It timeout"].value
         popsize = self.options["popsize"].value
         storeRes = self.options["Save results"].value
-        backupInt = self.options["Backup interval"].value
         tolfun = self.options["tolfun"].value
         tolx = self.options["tolx"].value
         tolstagnation = self.options["tolstagnation"].value
-        objRecFile = self.options["Log Objective"].value
         # Increment set name it already used
         setName = self.dat.flowsheet.results.incrementSetName(setName)
         #
@@ -331,7 +342,14 @@ class opt(optimization):
         ###
         picklec = 0  # iterations since last pickle
         self.prob.prep(self)
-        while not es.stop() and it < itmax:  # iteration loop
+        userInterupt = False
+        maxTimeInterupt = False
+        asynchronous = self.options["Asynchronous"].value
+        if asynchronous:
+            it, bestSoFar = self.optimizeAsync(es, it, itmax, bestSoFar, start)
+            userInterupt = self.prob.userInterupt
+            maxTimeInterupt = self.prob.maxTimeInterupt
+        while not asynchronous and not es.stop() and it < itmax:  # iteration loop
             # set prob iteration number (just for status messages
             # that come from prob while it is running samples)
             self.prob.iterationNumber = it
@@ -356,73 +374,10 @@ class opt(optimization):
             # display information if it has
             f = numpy.array([o[0] for o in objValues])
             i = numpy.argmin(f)
-            if (
-                f[i] < bestSoFar
-                and self.prob.gt.res[i * self.prob.numSamples()] is not None
-            ):
-                bestSoFar = f[i]
-                self.graph.loadValues(self.prob.gt.res[i * self.prob.numSamples()])
-                self.updateGraph = True
-                self.resQueue.put(["BEST", [bestSoFar], X[i]])
-            #
-            # Create a file that just logs the basic objective function
-            # information, this will give you some performance info
-            # That can be analyzed later.
-            if objRecFile:
-                with open(objRecFile, "ab") as orf:
-                    orf.write(
-                        "\n{0}, {1}, {2}, {3}, {4}".format(
-                            it,
-                            bestSoFar,
-                            numpy.min(objValues),
-                            numpy.max(objValues),
-                            time.time() - start,
-                        )
-                    )
-            #
-            # Pass the objective information back to CMA-ES
-            # So will be ready in next cycle to ask for more samples
-            #
-            es.tell(X, numpy.array(f))  # pass result to CMA-ES
-            #
-            # Try to save restart file (optional)
-            #
-            try:
-                if pickMod and not it % pickMod:  # pickle if its time
-                    if pickOut and pickOut != "":  # and file name
-                        pickOut2 = pickOut.replace("{n}", str(it).zfill(4))
-                        with open(pickOut2, "wb") as pf:
-                            pickle.dump(es, pf)
-            except Exception as e:
-                logging.getLogger("foqus." + __name__).exception(
-                    "Failed to save restart {0}".format(str(e))
-                )
-            #
-            # Try to backup the session including results if stored
-            # (optional)
-            #
-            try:
-                if backupInt and it % backupInt == 0:
-                    self.dat.save(  # save backup with data
-                        filename="".join(["Opt_Backup_", self.dat.name, ".foqus"]),
-                        updateCurrentFile=False,
-                        bkp=False,
-                    )
-            except Exception as e:
-                logging.getLogger("foqus." + __name__).exception(
-                    "Failed to save session backup {0}".format(str(e))
-                )
-            #
-            # Finish up iteration loop
-            #
-            eltime = time.time() - start
-            r = es.result  # get the results from CMA-ES
-            self.msgQueue.put(
-                "{0}, Total Elapsed Time {1}s, Obj: {2}".format(
-                    it, math.floor(eltime), r[1]
-                )
+            bestSoFar = self.updateBest(
+                f[i], X[i], self.prob.gt.res[i * self.prob.gt.nsamples], bestSoFar
             )
-            self.resQueue.put(["IT", it, r[1]])
+            self.iterationDone(es, it, X, f, bestSoFar, start)
             it += 1  # increment iteration count
         ###
         # End of the iteration loop
@@ -460,3 +415,157 @@ class opt(optimization):
         if maxTimeInterupt:
             self.msgQueue.put("**Stopped due to maximum allowed time**")
         self.msgQueue.put("\n\nBest inputs are stored in graph")
+
+    def optimizeAsync(self, es, it, itmax, bestSoFar, start):
+        """
+        Steady-state iteration loop.  Each CMA-ES point runs in its own
+        graph thread and a new point is started as soon as one finishes,
+        so there are always "Async workers" samples running, instead of
+        waiting for the slowest sample of each population.  CMA-ES is
+        told the results in the order they finish, popsize at a time.
+        Points asked for but not started when CMA-ES is told are
+        dropped, new points come from the updated distribution.  Points
+        still running finish and are told with a later iteration.
+
+        Returns the iteration index and best objective so far
+        """
+        popsize = es.popsize
+        workers = self.options["Async workers"].value
+        if workers < 1:
+            workers = popsize
+        bestSoFar = float(numpy.min(bestSoFar))
+        pending = []  # points asked for but not started
+        running = []  # (point, graph thread)
+        done = []  # (point, objective) not told to CMA-ES yet
+        errors = 0  # failed samples this iteration
+        self.prob.iterationNumber = it
+        while not es.stop() and it < itmax:
+            if self.stop.isSet():
+                self.prob.userInterupt = True
+            if self.prob.overTime():
+                self.prob.maxTimeInterupt = True
+            if self.prob.userInterupt or self.prob.maxTimeInterupt:
+                break
+            while len(running) < workers:
+                if not pending:
+                    pending = list(es.ask())
+                x = pending.pop(0)
+                running.append((x, self.prob.startSamples([x], self)))
+            finished = [r for r in running if not r[1].is_alive()]
+            if not finished:
+                running[0][1].join(0.05)
+                continue
+            running = [r for r in running if all(r is not d for d in finished)]
+            for x, gt in finished:
+                gt.firstSample = len(done) * gt.nsamples
+                objValues, cv, pv = self.prob.finishSamples(gt, self)
+                errors += gt.status["error"]
+                fx = objValues[0][0]
+                done.append((x, fx))
+                bestSoFar = self.updateBest(fx, x, gt.res[0], bestSoFar)
+                self.resQueue.put(
+                    [
+                        "PROG",
+                        len(done),
+                        popsize,
+                        errors,
+                        it,
+                        self.prob.totalSamplesRead,
+                        self.prob.totalSampleErrors,
+                    ]
+                )
+            if len(done) >= popsize:
+                X = [d[0] for d in done[:popsize]]
+                f = numpy.array([d[1] for d in done[:popsize]])
+                done = done[popsize:]
+                pending = []
+                self.iterationDone(es, it, X, f, bestSoFar, start)
+                it += 1
+                errors = 0
+                self.prob.iterationNumber = it
+        for x, gt in running:
+            gt.terminate()
+        for x, gt in running:
+            gt.join()
+        return it, bestSoFar
+
+    def updateBest(self, fx, x, res, bestSoFar):
+        """
+        If fx is better than bestSoFar, load the sample result in the
+        graph and send the new best out.  Return the best so far.
+        """
+        if fx < bestSoFar and res is not None:
+            bestSoFar = fx
+            self.graph.loadValues(res)
+            self.updateGraph = True
+            self.resQueue.put(["BEST", [bestSoFar], x])
+        return bestSoFar
+
+    def iterationDone(self, es, it, X, f, bestSoFar, start):
+        """
+        Tell CMA-ES the objective values f of the points X, then log,
+        save restart and backup files and send out iteration messages
+        """
+        objRecFile = self.options["Log Objective"].value
+        pickOut = self.options["Restart out"].value
+        pickMod = self.options["Restart modulus"].value
+        backupInt = self.options["Backup interval"].value
+        #
+        # Create a file that just logs the basic objective function
+        # information, this will give you some performance info
+        # That can be analyzed later.
+        if objRecFile:
+            with open(objRecFile, "ab") as orf:
+                orf.write(
+                    "\n{0}, {1}, {2}, {3}, {4}".format(
+                        it,
+                        bestSoFar,
+                        numpy.min(f),
+                        numpy.max(f),
+                        time.time() - start,
+                    )
+                )
+        #
+        # Pass the objective information back to CMA-ES
+        # So will be ready in next cycle to ask for more samples
+        #
+        es.tell(X, numpy.array(f))  # pass result to CMA-ES
+        #
+        # Try to save restart file (optional)
+        #
+        try:
+            if pickMod and not it % pickMod:  # pickle if its time
+                if pickOut and pickOut != "":  # and file name
+                    pickOut2 = pickOut.replace("{n}", str(it).zfill(4))
+                    with open(pickOut2, "wb") as pf:
+                        pickle.dump(es, pf)
+        except Exception as e:
+            logging.getLogger("foqus." + __name__).exception(
+                "Failed to save restart {0}".format(str(e))
+            )
+        #
+        # Try to backup the session including results if stored
+        # (optional)
+        #
+        try:
+            if backupInt and it % backupInt == 0:
+                self.dat.save(  # save backup with data
+                    filename="".join(["Opt_Backup_", self.dat.name, ".foqus"]),
+                    updateCurrentFile=False,
+                    bkp=False,
+                )
+        except Exception as e:
+            logging.getLogger("foqus." + __name__).exception(
+                "Failed to save session backup {0}".format(str(e))
+            )
+        #
+        # Finish up iteration loop
+        #
+        eltime = time.time() - start
+        r = es.result  # get the results from CMA-ES
+        self.msgQueue.put(
+            "{0}, Total Elapsed Time {1}s, Obj: {2}".format(
+                it, math.floor(eltime), r[1]
+            )
+        )
+        self.resQueue.put(["IT", it, r[1]])
@@ -112,6 +112,7 @@ class opt(optimization):
             desc="Jacobian approximation step size",
             dtype=float,
         )
+        self.addBatchGradientOptions()
         self.options.add(
             name="maxiter",
             default=1000000,
@@ -154,6 +155,8 @@ class opt(optimization):
                 "{0} obj: {1}".format(self.prob.iterationNumber, self.bestSoFar)
             )
         self.prob.iterationNumber += 1
+        self.lastX = numpy.array(x)
+        self.lastObj = obj
         return obj
 
     def optimize(self):
@@ -191,6 +194,13 @@ class opt(optimization):
         bounds = []
         for i in range(n):
             bounds.append((lower[i], upper[i]))
+        self.lower = lower
+        self.upper = upper
+        self.lastX = None
+        if self.options["Batch gradient"].value:
+            jac = self.jac
+        else:
+            jac = None
         ftol = self.options["ftol"].value
         eps = self.options["eps"].value
         maxiter = self.options["maxiter"].value
@@ -216,6 +226,7 @@ class opt(optimization):
             xinit,
             method="SLSQP",
             bounds=bounds,
+            jac=jac,
             options={"ftol": ftol, "eps": eps, "maxiter": maxiter},
         )
         # Print some final words
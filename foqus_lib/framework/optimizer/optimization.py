@@ -23,6 +23,8 @@ import logging
 import queue
 import threading
 
+import numpy
+
 from foqus_lib.framework.foqusOptions.optionList import optionList
 
 
@@ -51,6 +53,12 @@ class optimization(threading.Thread):
         self.resQueue = queue.Queue()  # a queue for plots and monitoring
         self.ex = None
         self.updateGraph = False
+        # scaled variable bounds and the last objective evaluation, set by
+        # solvers that use jac()
+        self.lower = None
+        self.upper = None
+        self.lastX = None
+        self.lastObj = None
 
     def setData(self, dat=None):
         """
@@ -79,6 +87,122 @@ class optimization(threading.Thread):
     def optimize(self):
         raise NotImplementedError
 
+    def addBatchGradientOptions(self):
+        """
+        Add the "Batch gradient" and "Gradient scheme" options used by
+        jac().  The step size is the solver's "eps" option.
+        """
+        self.options.add(
+            name="Batch gradient",
+            default=False,
+            dtype=bool,
+            desc=(
+                "Run all the finite difference points of a gradient as one "
+                "batch of flowsheet samples, which can run in parallel"
+            ),
+        )
+        self.options.add(
+            name="Gradient scheme",
+            default="forward",
+            dtype=str,
+            validValues=["forward", "central"],
+            desc="Batch gradient finite difference scheme",
+        )
+
+    def jac(self, x):
+        """
+        Batched finite difference gradient for scipy solvers, the
+        objective at x is reused if it was just calculated.  The solver's
+        f() sets self.lastX and self.lastObj and optimize() sets
+        self.lower and self.upper.
+        """
+        fx = None
+        if self.lastX is not None and numpy.array_equal(x, self.lastX):
+            fx = self.lastObj
+        return self.batchGradient(
+            x,
+            self.options["eps"].value,
+            self.options["Gradient scheme"].value,
+            self.lower,
+            self.upper,
+            fx=fx,
+        )
+
+    def batchGradient(self, x, step, scheme="forward", lower=None, upper=None, fx=None):
+        """
+        Finite difference gradient of the objective at x.  All the
+        perturbed points are run in one call to prob.runSamples, so they
+        can run in parallel or on Turbine, instead of the solver running
+        them one at a time.  Like the solver f() functions this keeps
+        self.bestSoFar and sends the best result and iteration to the
+        result queue.
+
+        Args:
+            x: scaled decision variable values
+            step: finite difference step size
+            scheme: "forward" (n points, n+1 if fx is not given) or
+                "central" (2n points)
+            lower, upper: variable bounds, points are kept inside them
+            fx: objective value at x, if already known
+
+        Returns:
+            gradient as a numpy array
+        """
+        x = numpy.array(x, dtype=float)
+        n = len(x)
+        lower = numpy.full(n, -numpy.inf) if lower is None else numpy.asarray(lower)
+        upper = numpy.full(n, numpy.inf) if upper is None else numpy.asarray(upper)
+        if scheme == "central":
+            xp = numpy.minimum(x + step, upper)
+            xm = numpy.maximum(x - step, lower)
+        elif scheme == "forward":
+            # step backward from variables at the upper bound
+            xp = x + step
+            back = xp > upper
+            xp[back] = numpy.maximum(x[back] - step, lower[back])
+            xm = x
+        else:
+            raise ValueError("Unknown finite difference scheme {0}".format(scheme))
+        X = []
+        for i in range(n):
+            X.append(x.copy())
+            X[-1][i] = xp[i]
+        if scheme == "central":
+            for i in range(n):
+                X.append(x.copy())
+                X[-1][i] = xm[i]
+        elif fx is None:
+            X.insert(0, x.copy())
+        objValues, cv, pv = self.prob.runSamples(X, self)
+        if self.stop.isSet():
+            self.userInterupt = True
+            raise Exception("User interrupt")
+        obj = numpy.array([float(o[0]) for o in objValues])
+        i = int(numpy.argmin(numpy.where(numpy.isnan(obj), numpy.inf, obj)))
+        if obj[i] < self.bestSoFar:
+            self.bestSoFar = obj[i]
+            # there may be several flowsheet runs per objective evaluation
+            nres = len(self.prob.gt.res) // len(X)
+            self.graph.loadValues(self.prob.gt.res[i * nres])
+            self.updateGraph = True
+            self.resQueue.put(["BEST", [self.bestSoFar], X[i]])
+        self.resQueue.put(["IT", self.prob.iterationNumber, self.bestSoFar])
+        if not self.prob.iterationNumber % 10:
+            self.msgQueue.put(
+                "{0} obj: {1}".format(self.prob.iterationNumber, self.bestSoFar)
+            )
+        self.prob.iterationNumber += 1
+        if scheme == "central":
+            df = obj[:n] - obj[n:]
+        else:
+            if fx is None:
+                fx = obj[0]
+            df = obj[-n:] - fx
+        # fixed variables (lower == upper) have no room to step, their
+        # gradient is 0 rather than inf or nan
+        h = xp - xm
+        return numpy.divide(df, h, out=numpy.zeros(n), where=h != 0)
+
     def run(self):
         """
         This function overloads the Thread class function, and is
@@ -19,16 +19,101 @@
 John Eslick, Carnegie Mellon University, 2014
 """
 
+import builtins
 import copy
 import csv
 import json
 import logging
+import numbers
 import operator
 import time
+import types
 from functools import reduce
 
+import numpy
+
 from foqus_lib.framework.at_dict.at_dict import AtDict
 
+_log = logging.getLogger("foqus." + __name__)
+
+# Names an objective or constraint expression can use and still be
+# evaluated for a whole population at once.  Any other built-in or local
+# name (max, min, sum, fail, self, ...) may not work element-wise on arrays.
+_VECTOR_NAMES = {"x", "f", "abs", "pow"}
+_SCALAR_NAMES = (set(dir(builtins)) - _VECTOR_NAMES) | {
+    "self",
+    "fail",
+    "failVec",
+    "o",
+    "res_e",
+    "const_e",
+    "penTotal",
+    "vi",
+    "pen",
+    "objfunc",
+}
+
+
+class populationNode(dict):
+    """
+    Variable name -> array of the variable's values over a population.
+    The arrays are made the first time an expression uses them.
+    """
+
+    def __init__(self, pop, node):
+        super().__init__()
+        self._pop = pop
+        self._node = node
+
+    def __getattr__(self, name):
+        try:
+            return self[name]
+        except KeyError:
+            raise AttributeError(name)
+
+    def __missing__(self, name):
+        pop = self._pop
+        vals = []
+        for sv, fail in zip(pop._svlist, pop._fail):
+            if fail:
+                vals.append(float("nan"))
+                continue
+            v = sv[pop._key][self._node][name]
+            if not isinstance(v, numbers.Real):
+                # strings, lists, ... don't have element-wise arithmetic
+                raise TypeError("{0} is not a number".format(name))
+            vals.append(v)
+        col = numpy.array(vals, dtype=float)
+        self[name] = col
+        return col
+
+
+class populationValues(dict):
+    """
+    The x or f argument of an expression evaluated for a whole population,
+    node name -> populationNode
+    """
+
+    def __init__(self, svlist, key, fail):
+        super().__init__()
+        self._svlist = svlist
+        self._key = key
+        self._fail = fail
+
+    def __getattr__(self, name):
+        try:
+            return self[name]
+        except KeyError:
+            raise AttributeError(name)
+
+    def __missing__(self, name):
+        for sv, fail in zip(self._svlist, self._fail):
+            if not fail and name not in sv[self._key]:
+                raise KeyError(name)
+        node = populationNode(self, name)
+        self[name] = node
+        return node
+
 
 class objectiveFunction(object):
     def __init__(self, pycode="", ps=1, failval=1000):
@@ -86,6 +171,8 @@ class problem(object):
         self.solverOptions = {}  # option list object for solver options
         self.initSolverParameters()
         self.runMethod = 0  # 0 -- run locally, 1 -- use turbine/foqus
+        self.vectorizeObj = True  # evaluate objectives for a population at once
+        self.exprCache = {}  # expression text -> code object
 
     def initSolverParameters(self):
         # Attributes used to interact with solver, don't need to save
@@ -263,45 +350,10 @@ class problem(object):
         """
         self.userInterupt = False
         self.maxTimeInterupt = False
-        snum = 1
-        # Setup new sample vectors that have the decision and sample
-        # variables and the
-        samp = []  # the sample set for FOQUS graph
-        if len(self.vs) > 0 and self.numSamples() > 0:
-            snum = self.numSamples()
-            for xvec in X:
-                vals = slv.graph.input.unflatten(self.v, xvec, unScale=True)
-                for s in range(self.numSamples()):
-                    samp.append(copy.deepcopy(self.inpDict))
-                    for nkey in vals:
-                        for vkey in vals[nkey]:
-                            samp[-1][nkey][vkey] = vals[nkey][vkey]
-                    # Now add on sample variable info
-                    for vname in self.vs:
-                        vname2 = vname.split(".", 1)
-                        samp[-1][vname2[0]][vname2[1]] = self.samp[vname][s]
-        else:
-            for xvec in X:  # create sample set in correct format
-                # need to unscale the inputs the solver sees to run sims
-                vals = slv.graph.input.unflatten(self.v, xvec, unScale=True)
-                samp.append(copy.deepcopy(self.inpDict))
-                for nkey in vals:
-                    for vkey in vals[nkey]:
-                        samp[-1][nkey][vkey] = vals[nkey][vkey]
-        nsam = len(samp)  # number of samples this iteration
-        # sumbmit samples to a new graph thread that will run them
-        if self.dat.foqusSettings.runFlowsheetMethod == 0:
-            # run the flowsheet in this FOQUS
-            gt = slv.graph.runListAsThread(samp)
-        elif self.dat.foqusSettings.runFlowsheetMethod == 1:
-            # run the flowsheet using turbine/foqus consumer
-            # first save a session file (need to upload to turbine)
-            gt = slv.graph.runListAsThread(samp, useTurbine=True)
-        else:
-            raise Exception("Invalid Run Mode")
+        gt = self.startSamples(X, slv)
+        nsam = len(gt.res)  # number of samples this iteration
         # Start monitoring the jobs
         finished = 0  # number of samples that have finished this it
-        readres = [False] * len(gt.res)
         goagain = True
         while goagain:  # wait for samples to run
             if slv.stop.isSet():  # check for stop flag
@@ -309,10 +361,9 @@ class problem(object):
                 gt.terminate()
                 # keep wait loop going, gt should kill current job
                 # and fill rest of jobs with error status then stop
-            if self.maxSolverTime > 0.0002:
-                if (time.time() - self.solverStart) / 3600.0 > self.maxSolverTime:
-                    self.maxTimeInterupt = True
-                    gt.terminate()
+            if self.overTime():
+                self.maxTimeInterupt = True
+                gt.terminate()
             gt.join(2)  # wait for gt to finish, time out after 2 sec
             goagain = gt.is_alive()
             with gt.statLock:
@@ -336,21 +387,71 @@ class problem(object):
                     ]
                 )
                 # get sample result
-                with gt.resLock:
-                    if self.storeResults:
-                        for i in range(len(gt.res)):
-                            if not readres[i] and gt.res_fin[i] != -1:
-                                readres[i] = True
-                                slv.graph.results.addFromSavedValues(
-                                    self.storeResults,
-                                    "res_{0:05d}_{1:05d}".format(
-                                        self.iterationNumber, i
-                                    ),
-                                    None,
-                                    gt.res[i],
-                                )
-        self.totalSamplesRead = self.totalSamplesRead + nsam
-        self.totalSampleErrors = self.totalSampleErrors + status["error"]
+                self.storeSampleResults(gt, slv)
+        return self.finishSamples(gt, slv)
+
+    def startSamples(self, X, slv, first=0):
+        """
+        Start running the flowsheet samples for X in a new graph thread
+        and return the thread without waiting for it.  Once the thread is
+        finished, finishSamples returns the objective values.  Several
+        sets of samples can run at the same time this way.
+
+        Args:
+        X: a list of flat vector of decision variable values
+        slv: the solver running the samples
+        first: index of the first sample in the stored result names
+        """
+        samp, snum = self.makeSamples(X, slv.graph)
+        # sumbmit samples to a new graph thread that will run them
+        if self.dat.foqusSettings.runFlowsheetMethod == 0:
+            # run the flowsheet in this FOQUS
+            gt = slv.graph.runListAsThread(samp)
+        elif self.dat.foqusSettings.runFlowsheetMethod == 1:
+            # run the flowsheet using turbine/foqus consumer
+            # first save a session file (need to upload to turbine)
+            gt = slv.graph.runListAsThread(samp, useTurbine=True)
+        else:
+            raise Exception("Invalid Run Mode")
+        gt.nsamples = snum
+        gt.firstSample = first
+        gt.readres = [False] * len(gt.res)
+        return gt
+
+    def overTime(self):
+        """True if the solver has run longer than maxSolverTime hours"""
+        return (
+            self.maxSolverTime > 0.0002
+            and (time.time() - self.solverStart) / 3600.0 > self.maxSolverTime
+        )
+
+    def storeSampleResults(self, gt, slv):
+        """Add the finished results of a graph thread to the result set"""
+        with gt.resLock:
+            if self.storeResults:
+                for i in range(len(gt.res)):
+                    if not gt.readres[i] and gt.res_fin[i] != -1:
+                        gt.readres[i] = True
+                        slv.graph.results.addFromSavedValues(
+                            self.storeResults,
+                            "res_{0:05d}_{1:05d}".format(
+                                self.iterationNumber, gt.firstSample + i
+                            ),
+                            None,
+                            gt.res[i],
+                        )
+
+    def finishSamples(self, gt, slv):
+        """
+        Store the results of a finished graph thread started by
+        startSamples and return the objective values, constraint
+        values and penalties
+        """
+        self.storeSampleResults(gt, slv)
+        with gt.statLock:
+            errors = gt.status["error"]
+        self.totalSamplesRead = self.totalSamplesRead + len(gt.res)
+        self.totalSampleErrors = self.totalSampleErrors + errors
         self.gt = gt
         if gt.errorStat == 40:
             raise Exception("Error connecting to Turbine")
@@ -359,9 +460,44 @@ class problem(object):
         for n in slv.graph.nodes:
             mergecopy = inputvectorscopy[n].keys() | outputvectorscopy[n].keys()
             if any(k in self.obj[0].pycode for k in mergecopy):
-                return self.calculateObjVector(gt.res, nsamples=snum)
+                return self.calculateObjVector(gt.res, nsamples=gt.nsamples)
             else:
-                return self.calculateObj(gt.res, nsamples=snum)
+                return self.calculateObj(gt.res, nsamples=gt.nsamples)
+
+    def makeSamples(self, X, graph):
+        """
+        Make the flowsheet input sets for a list of decision variable
+        vectors, return the list of input sets and the number of input
+        sets per objective evaluation.  Input sets share the node
+        dictionaries of self.inpDict they don't change, so a sample only
+        copies the nodes with decision or sample variables.
+        """
+        snum = 1
+        samp = []  # the sample set for FOQUS graph
+        if len(self.vs) > 0 and self.numSamples() > 0:
+            snum = self.numSamples()
+            sampVars = [vname.split(".", 1) for vname in self.vs]
+            for vals in graph.input.unflattenRows(self.v, X, unScale=True):
+                for s in range(snum):
+                    inp = dict(self.inpDict)
+                    for nkey in vals:
+                        inp[nkey] = dict(self.inpDict[nkey])
+                        inp[nkey].update(vals[nkey])
+                    # Now add on sample variable info
+                    for vname, (nkey, vkey) in zip(self.vs, sampVars):
+                        if inp[nkey] is self.inpDict[nkey]:
+                            inp[nkey] = dict(self.inpDict[nkey])
+                        inp[nkey][vkey] = self.samp[vname][s]
+                    samp.append(inp)
+        else:
+            # need to unscale the inputs the solver sees to run sims
+            for vals in graph.input.unflattenRows(self.v, X, unScale=True):
+                inp = dict(self.inpDict)
+                for nkey in vals:
+                    inp[nkey] = dict(self.inpDict[nkey])
+                    inp[nkey].update(vals[nkey])
+                samp.append(inp)
+        return samp, snum
 
     def prep(self, slv):
         """
@@ -371,8 +507,37 @@ class problem(object):
         if self.objtype == self.OBJ_TYPE_CUST:
             exec(self.custpy, globals())
             self.custObjFunc = objfunc  # pylint: disable=undefined-variable
+        # compile the objective and constraint expressions once
+        self.exprCache = {}
+        for o in self.g + self.obj:
+            try:
+                self.compiledExpression(o.pycode)
+            except SyntaxError as e:
+                _log.error("Error compiling {0}: {1}".format(o.pycode, e))
         self.inpDict = slv.graph.saveValues()["input"]
 
+    def compiledExpression(self, pycode):
+        """
+        Return the compiled code object for an objective or constraint
+        expression, expressions are only compiled the first time
+        """
+        code = self.exprCache.get(pycode)
+        if code is None:
+            code = compile(pycode, "<expression>", "eval")
+            self.exprCache[pycode] = code
+        return code
+
+    @staticmethod
+    def canVectorize(code):
+        """
+        True if an expression's code only uses names that also work
+        with arrays of a population's values
+        """
+        if any(isinstance(c, types.CodeType) for c in code.co_consts):
+            # comprehensions, lambdas
+            return False
+        return not any(name in _SCALAR_NAMES for name in code.co_names)
+
     def calculateObj(self, svlist, nsamples=1):
         """
         Do some commnon preliminary setup then call the right type
@@ -384,6 +549,97 @@ class problem(object):
             so that there are blocks of samples use to cacluatate
             objective functions
         """
+        if (
+            self.vectorizeObj
+            and nsamples == 1
+            and len(svlist) > 1
+            and self.objtype == self.OBJ_TYPE_EVAL
+        ):
+            res = self.calculateObjArray(svlist)
+            if res is not None:
+                return res
+        return self.calculateObjEach(svlist, nsamples)
+
+    @staticmethod
+    def sampleFailed(sv, inKey="input", outKey="output"):
+        return (
+            sv is None
+            or sv.get(inKey, None) is None
+            or sv.get(outKey, None) is None
+            or sv["graphError"] != 0
+        )
+
+    def calculateObjArray(self, svlist):
+        """
+        Evaluate the objectives and constraints of a population, one
+        flowsheet result per objective evaluation, with each expression
+        evaluated once over arrays of the population's values.  Returns
+        the same as calculateObjEach, or None if an expression can't be
+        evaluated that way.  Results that aren't finite are calculated
+        again one at a time, so errors like division by zero are handled
+        the same way as calculateObjEach.
+        """
+        n = len(svlist)
+        fail = numpy.array([self.sampleFailed(sv) for sv in svlist], dtype=bool)
+        x = populationValues(svlist, "input", fail)
+        f = populationValues(svlist, "output", fail)
+        ns = {"__builtins__": {"abs": abs, "pow": pow}, "x": x, "f": f}
+
+        def evalArray(pycode):
+            code = self.compiledExpression(pycode)
+            if not self.canVectorize(code):
+                raise TypeError("not vectorizable")
+            v = numpy.array(eval(code, ns), dtype=float)
+            if v.shape == (n,):
+                return v
+            if v.shape == () and not {"x", "f"} & set(code.co_names):
+                # constant expression
+                return numpy.full(n, float(v))
+            # a reduction over the population like sum(f.a.b)
+            raise TypeError("not element-wise")
+
+        try:
+            with numpy.errstate(all="ignore"):
+                penTotal = numpy.zeros(n)
+                const = []
+                for o in self.g:
+                    vi = evalArray(o.pycode)
+                    vi[fail | (vi <= 0)] = 0
+                    if o.penForm == "Linear":
+                        pen = vi * o.penalty
+                    elif o.penForm == "Quadratic":
+                        pen = vi * vi * o.penalty
+                    elif o.penForm == "Step":
+                        pen = numpy.where(vi > 0.0, float(o.penalty), 0.0)
+                    else:
+                        raise TypeError("unknown penalty form")
+                    penTotal += pen
+                    const.append(pen)
+                res = []
+                for o in self.obj:
+                    obj = evalArray(o.pycode) + penTotal * o.penScale
+                    obj[fail] = o.fail
+                    res.append(obj)
+        except Exception:
+            return None
+        res = numpy.array(res).reshape(len(self.obj), n).T
+        const = numpy.array(const).reshape(len(self.g), n).T
+        redo = ~fail & ~(
+            numpy.isfinite(res).all(axis=1)
+            & numpy.isfinite(const).all(axis=1)
+            & numpy.isfinite(penTotal)
+        )
+        res, const, penTotal = res.tolist(), const.tolist(), penTotal.tolist()
+        for i in numpy.flatnonzero(redo):
+            r, c, p = self.calculateObjEach([svlist[i]])
+            res[i], const[i], penTotal[i] = r[0], c[0], p[0]
+        return res, const, penTotal
+
+    def calculateObjEach(self, svlist, nsamples=1):
+        """
+        Calculate the objectives one evaluation at a time, arguments
+        and return value are the same as calculateObj
+        """
         numObj = len(svlist) // nsamples  # number of obj. func. evals.
         res = [[float("nan")]] * numObj
         const = [[0.0]] * numObj
@@ -392,8 +648,8 @@ class problem(object):
             # split up sv lists into parts for objcalcs
             istart = obj_index * nsamples
             model_res = svlist[istart : istart + nsamples]
-            x = [0] * nsamples
-            f = [0] * nsamples
+            x = [{}] * nsamples
+            f = [{}] * nsamples
             fail = [False] * nsamples
             for i, sv in enumerate(model_res):
                 if sv is None:
@@ -449,8 +705,8 @@ class problem(object):
             # split up sv lists into parts for objcalcs
             istart = obj_index * nsamples
             model_res = svlist[istart : istart + nsamples]
-            xvector = [0] * nsamples
-            fvector = [0] * nsamples
+            xvector = [{}] * nsamples
+            fvector = [{}] * nsamples
             fail = [False] * nsamples
             for i, sv in enumerate(model_res):
                 if sv is None:
@@ -518,7 +774,7 @@ class problem(object):
             if fail:
                 vi = 0
             else:
-                vi = eval(o.pycode, locals())
+                vi = eval(self.compiledExpression(o.pycode), locals())
             if vi <= 0:
                 # if vi is negative no constraint violation so set
                 # vi to 0 for zero penalty
@@ -528,8 +784,8 @@ class problem(object):
                 pen = vi * o.penalty
             elif o.penForm == "Quadratic":
                 pen = vi * vi * o.penalty
-            elif o.penForm == "Step" and vi > 0.0:
-                pen = o.penalty
+            elif o.penForm == "Step":
+                pen = o.penalty if vi > 0.0 else 0.0
             penTotal += pen
             const_e.append(pen)
         # Evaluate objective functions there may be more than one
@@ -539,12 +795,10 @@ class problem(object):
                 objfunc = o.fail
             else:
                 try:
-                    objfunc = eval(o.pycode, locals())
+                    objfunc = eval(self.compiledExpression(o.pycode), locals())
                     objfunc += penTotal * o.penScale
                 except Exception as e:
-                    logging.getLogger("foqus." + __name__).error(
-                        "Error executing objective calc " + str(e)
-                    )
+                    _log.error("Error executing objective calc " + str(e))
                     objfunc = o.fail
             res_e.append(objfunc)
         return res_e, const_e, penTotal
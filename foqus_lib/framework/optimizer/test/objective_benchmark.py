@@ -0,0 +1,107 @@
+#################################################################################
+# FOQUS Copyright (c) 2012 - 2026, by the software owners: Oak Ridge Institute
+# for Science and Education (ORISE), TRIAD National Security, LLC., Lawrence
+# Livermore National Security, LLC., The Regents of the University of
+# California, through Lawrence Berkeley National Laboratory, Battelle Memorial
+# Institute, Pacific Northwest Division through Pacific Northwest National
+# Laboratory, Carnegie Mellon University, West Virginia University, Boston
+# University, the Trustees of Princeton University, The University of Texas at
+# Austin, URS Energy & Construction, Inc., et al.  All rights reserved.
+#
+# Please see the file LICENSE.md for full copyright and license information,
+# respectively. This file is also available online at the URL
+# "https://github.com/CCSI-Toolset/FOQUS".
+#################################################################################
+"""Time the objective calculation for one CMA-ES generation
+
+Compares making the flowsheet input sets with a deep copy per sample to
+problem.makeSamples, and evaluating the objective and constraints one
+sample at a time to evaluating them over the whole population.
+"""
+
+import copy
+import time
+from types import SimpleNamespace
+
+import numpy as np
+
+from foqus_lib.framework.graph.nodeVars import NodeVarList, NodeVars
+from foqus_lib.framework.optimizer.problem import (
+    inequalityConstraint,
+    objectiveFunction,
+    problem,
+)
+
+
+def timeit(f, repeat=5):
+    best = float("inf")
+    for i in range(repeat):
+        t0 = time.perf_counter()
+        f()
+        best = min(best, time.perf_counter() - t0)
+    return best
+
+
+def main(popSize=200, nodes=20, nvars=40):
+    rng = np.random.default_rng(0)
+    prob = problem()
+    prob.v = ["n0.x0", "n0.x1", "n1.x0", "n2.x3"]
+    prob.obj = [objectiveFunction("f.n0.y0 + 2*f.n1.y1**2 - x.n2.x3/(1 + f.n3.y2)")]
+    prob.g = [
+        inequalityConstraint("f.n4.y0 - 0.9", 100, "Linear"),
+        inequalityConstraint("abs(x.n0.x1 - f.n5.y3) - 0.5", 10, "Quadratic"),
+    ]
+    prob.inpDict = {
+        "n{0}".format(i): {"x{0}".format(j): 1.0 for j in range(nvars)}
+        for i in range(nodes)
+    }
+    inputs = NodeVarList()
+    for nkey, vals in prob.inpDict.items():
+        inputs.addNode(nkey)
+        for vkey, x in vals.items():
+            inputs.addVariable(nkey, vkey, NodeVars(value=x))
+    graph = SimpleNamespace(input=inputs)
+    X = rng.random((popSize, len(prob.v)))
+    svlist = []
+    for i in range(popSize):
+        out = {
+            "n{0}".format(k): {"y{0}".format(j): rng.random() for j in range(nvars)}
+            for k in range(nodes)
+        }
+        svlist.append({"input": prob.inpDict, "output": out, "graphError": 0})
+
+    def deepcopySamples():
+        samp = []
+        for xvec in X:
+            vals = graph.input.unflatten(prob.v, xvec, unScale=True)
+            samp.append(copy.deepcopy(prob.inpDict))
+            for nkey in vals:
+                for vkey in vals[nkey]:
+                    samp[-1][nkey][vkey] = vals[nkey][vkey]
+        return samp
+
+    def eachSample():
+        prob.vectorizeObj = False
+        return prob.calculateObj(svlist)
+
+    def population():
+        prob.vectorizeObj = True
+        return prob.calculateObj(svlist)
+
+    assert deepcopySamples() == prob.makeSamples(X, graph)[0]
+    np.testing.assert_allclose(eachSample()[0], population()[0])
+    rows = [
+        ("Input sets, deepcopy", timeit(deepcopySamples)),
+        ("Input sets, makeSamples", timeit(lambda: prob.makeSamples(X, graph))),
+        ("Objective, each sample", timeit(eachSample)),
+        ("Objective, population", timeit(population)),
+    ]
+    print(
+        "Population size {0}, {1} nodes x {2} variables".format(popSize, nodes, nvars)
+    )
+    for name, t in rows:
+        print("{0:<28}{1:10.3f} ms".format(name, 1000 * t))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,139 @@
+#################################################################################
+# FOQUS Copyright (c) 2012 - 2026, by the software owners: Oak Ridge Institute
+# for Science and Education (ORISE), TRIAD National Security, LLC., Lawrence
+# Livermore National Security, LLC., The Regents of the University of
+# California, through Lawrence Berkeley National Laboratory, Battelle Memorial
+# Institute, Pacific Northwest Division through Pacific Northwest National
+# Laboratory, Carnegie Mellon University, West Virginia University, Boston
+# University, the Trustees of Princeton University, The University of Texas at
+# Austin, URS Energy & Construction, Inc., et al.  All rights reserved.
+#
+# Please see the file LICENSE.md for full copyright and license information,
+# respectively. This file is also available online at the URL
+# "https://github.com/CCSI-Toolset/FOQUS".
+#################################################################################
+import queue
+import unittest
+from types import SimpleNamespace
+from unittest.mock import MagicMock
+
+import numpy as np
+
+from foqus_lib.framework.optimizer import BFGS, SLSQP
+
+CENTER = np.array([1.0, 2.5, 4.0, 7.0])
+
+
+class quadraticProblem:
+    """Stands in for the optimization problem, records runSamples batches"""
+
+    def __init__(self, n=len(CENTER)):
+        self.v = ["x{0}".format(i) for i in range(n)]
+        self.batches = []
+        self.iterationNumber = 0
+
+    def initSolverParameters(self):
+        pass
+
+    def prep(self, slv):
+        pass
+
+    def runSamples(self, X, slv):
+        self.batches.append(len(X))
+        obj = [[float(np.sum((np.asarray(x) - CENTER) ** 2))] for x in X]
+        self.gt = SimpleNamespace(res=[{"x": list(x)} for x in X])
+        return obj, [[0.0]] * len(X), [[0.0]] * len(X)
+
+
+def makeSolver(module, batch, scheme="forward", eps=1e-6):
+    prob = quadraticProblem()
+    dat = MagicMock()
+    dat.optProblem = prob
+    dat.flowsheet.input.getFlat.return_value = [5.0] * len(prob.v)
+    dat.flowsheet.results.incrementSetName.return_value = "set"
+    slv = module.opt(dat)
+    slv.options["eps"].value = eps
+    slv.options["Batch gradient"].value = batch
+    slv.options["Gradient scheme"].value = scheme
+    return slv, prob
+
+
+def best(slv):
+    res = None
+    while True:
+        try:
+            msg = slv.resQueue.get_nowait()
+        except queue.Empty:
+            return res
+        if msg[0] == "BEST":
+            res = msg
+
+
+class TestBatchGradient(unittest.TestCase):
+    def test_forward_and_central_gradients(self):
+        slv, prob = makeSolver(BFGS, True)
+        slv.bestSoFar = float("inf")
+        x = np.array([0.0, 3.0, 4.0, 10.0])
+        exact = 2 * (x - CENTER)
+        g = slv.batchGradient(x, 1e-6, "forward")
+        np.testing.assert_allclose(g, exact, atol=1e-4)
+        self.assertEqual(prob.batches, [5])
+        g = slv.batchGradient(x, 1e-6, "forward", fx=float(np.sum((x - CENTER) ** 2)))
+        np.testing.assert_allclose(g, exact, atol=1e-4)
+        self.assertEqual(prob.batches[-1], 4)
+        # variables on a bound step inward
+        upper = np.full(4, 10.0)
+        lower = np.zeros(4)
+        g = slv.batchGradient(x, 1e-3, "central", lower, upper)
+        np.testing.assert_allclose(g, exact, atol=1e-2)
+        self.assertEqual(prob.batches[-1], 8)
+        g = slv.batchGradient(x, 1e-3, "forward", lower, upper)
+        np.testing.assert_allclose(g, exact, atol=1e-2)
+        self.assertEqual(prob.iterationNumber, 4)
+        with self.assertRaises(ValueError):
+            slv.batchGradient(x, 1e-3, "backward")
+
+    def test_fixed_variable_gradient(self):
+        slv, prob = makeSolver(BFGS, True)
+        slv.bestSoFar = float("inf")
+        x = np.array([0.0, 3.0, 4.0, 10.0])
+        exact = 2 * (x - CENTER)
+        exact[2] = 0.0
+        # the third variable is fixed, the fourth is at its upper bound
+        lower = np.array([0.0, 0.0, 4.0, 0.0])
+        upper = np.array([10.0, 10.0, 4.0, 10.0])
+        with np.errstate(divide="raise", invalid="raise"):
+            for scheme in ("central", "forward"):
+                g = slv.batchGradient(x, 1e-3, scheme, lower, upper)
+                self.assertTrue(np.all(np.isfinite(g)))
+                np.testing.assert_allclose(g, exact, atol=1e-2)
+
+    def test_optimizers_use_batches(self):
+        for module in (BFGS, SLSQP):
+            for scheme in ("forward", "central"):
+                slv, prob = makeSolver(module, True, scheme)
+                slv.optimize()
+                np.testing.assert_allclose(best(slv)[2], CENTER, atol=1e-4)
+                # the gradients are whole batches, not one run per variable
+                self.assertIn(4 if scheme == "forward" else 8, prob.batches)
+                self.assertLess(prob.batches.count(1), len(prob.batches))
+
+    def test_default_is_unbatched(self):
+        slv, prob = makeSolver(BFGS, False, eps=1e-8)
+        slv.optimize()
+        np.testing.assert_allclose(best(slv)[2], CENTER, atol=1e-3)
+        self.assertEqual(set(prob.batches), {1})
+
+    def test_shared_jac(self):
+        for module in (BFGS, SLSQP):
+            slv, prob = makeSolver(module, True)
+            self.assertEqual(
+                slv.options["Gradient scheme"].validValues, ["forward", "central"]
+            )
+            slv.bestSoFar = float("inf")
+            x = np.array([0.0, 3.0, 4.0, 10.0])
+            slv.lower, slv.upper = np.zeros(4), np.full(4, 10.0)
+            slv.f(x)
+            # the objective at x comes from f(), only n points are run
+            np.testing.assert_allclose(slv.jac(x), 2 * (x - CENTER), atol=1e-4)
+            self.assertEqual(prob.batches, [1, 4])
@@ -0,0 +1,188 @@
+#################################################################################
+# FOQUS Copyright (c) 2012 - 2026, by the software owners: Oak Ridge Institute
+# for Science and Education (ORISE), TRIAD National Security, LLC., Lawrence
+# Livermore National Security, LLC., The Regents of the University of
+# California, through Lawrence Berkeley National Laboratory, Battelle Memorial
+# Institute, Pacific Northwest Division through Pacific Northwest National
+# Laboratory, Carnegie Mellon University, West Virginia University, Boston
+# University, the Trustees of Princeton University, The University of Texas at
+# Austin, URS Energy & Construction, Inc., et al.  All rights reserved.
+#
+# Please see the file LICENSE.md for full copyright and license information,
+# respectively. This file is also available online at the URL
+# "https://github.com/CCSI-Toolset/FOQUS".
+#################################################################################
+import queue
+import threading
+import time
+import unittest
+from concurrent.futures import ThreadPoolExecutor
+from unittest.mock import MagicMock
+
+import numpy as np
+
+from foqus_lib.framework.optimizer import OptCMA
+
+CENTER = np.array([3.0, 4.0, 6.0])
+TARGET = 1e-2
+
+
+class sampleThread(threading.Thread):
+    """Stands in for a graph thread running one synthetic flowsheet sample"""
+
+    def __init__(self, prob, x, delay):
+        super().__init__(daemon=True)
+        self.prob = prob
+        self.x = x
+        self.delay = delay
+        self.nsamples = 1
+        self.status = {"error": 0}
+        self.res = [None]
+        self.cancel = threading.Event()
+
+    def run(self):
+        if self.cancel.wait(self.delay):
+            self.status["error"] = 1
+            return
+        self.res = [{"x": list(self.x)}]
+
+    def terminate(self):
+        self.cancel.set()
+
+
+class slowProblem:
+    """
+    Stands in for the optimization problem, a quadratic objective with
+    random sample run times, mostly fast with some very slow samples.
+    Both modes run at most `workers` samples at once.
+    """
+
+    def __init__(self, workers, seed=1):
+        self.v = ["x0", "x1", "x2"]
+        self.workers = workers
+        self.rng = np.random.default_rng(seed)
+        self.lock = threading.Lock()
+        self.running = 0
+        self.peak = 0
+        self.evaluations = 0
+        self.reached = None  # time the objective got below TARGET
+        self.userInterupt = False
+        self.maxTimeInterupt = False
+        self.totalSamplesRead = 0
+        self.totalSampleErrors = 0
+        self.threads = []
+
+    def initSolverParameters(self):
+        self.start = time.time()
+
+    def prep(self, slv):
+        self.slv = slv
+
+    def numSamples(self):
+        return 0
+
+    def overTime(self):
+        return False
+
+    def delay(self):
+        with self.lock:
+            return 0.3 if self.rng.random() < 0.1 else 0.01
+
+    def objective(self, x):
+        fx = float(np.sum((np.asarray(x) - CENTER) ** 2))
+        with self.lock:
+            self.evaluations += 1
+            if fx < TARGET and self.reached is None:
+                self.reached = time.time() - self.start
+                # only the time to target is compared
+                self.slv.stop.set()
+        return fx
+
+    def runOne(self, x):
+        with self.lock:
+            self.running += 1
+            self.peak = max(self.peak, self.running)
+        time.sleep(self.delay())
+        with self.lock:
+            self.running -= 1
+        return self.objective(x)
+
+    def runSamples(self, X, slv):
+        with ThreadPoolExecutor(self.workers) as pool:
+            obj = [[fx] for fx in pool.map(self.runOne, X)]
+        self.userInterupt = slv.stop.isSet()
+        self.gt = MagicMock(res=[{"x": list(x)} for x in X], nsamples=1)
+        return obj, [[0.0]] * len(X), [[0.0]] * len(X)
+
+    def startSamples(self, X, slv, first=0):
+        with self.lock:
+            self.running += 1
+            self.peak = max(self.peak, self.running)
+        gt = sampleThread(self, X[0], self.delay())
+        gt.start()
+        self.threads.append(gt)
+        return gt
+
+    def finishSamples(self, gt, slv):
+        with self.lock:
+            self.running -= 1
+        self.totalSamplesRead += 1
+        if gt.res[0] is None:
+            return [[1000.0]], [[0.0]], [0.0]
+        return [[self.objective(gt.x)]], [[0.0]], [0.0]
+
+
+def makeSolver(asynchronous, workers=6, itmax=0):
+    prob = slowProblem(workers)
+    dat = MagicMock()
+    dat.optProblem = prob
+    dat.name = "test"
+    dat.flowsheet.input.getFlat.return_value = [5.0, 5.0, 5.0]
+    dat.flowsheet.results.incrementSetName.return_value = "set"
+    slv = OptCMA.opt(dat)
+    slv.options["Asynchronous"].value = asynchronous
+    slv.options["Async workers"].value = workers
+    slv.options["popsize"].value = 6
+    slv.options["seed"].value = 3
+    slv.options["tolfun"].value = 1e-3
+    slv.options["itmax"].value = itmax
+    slv.options["Backup interval"].value = 0
+    return slv, prob
+
+
+def messages(q):
+    msgs = []
+    while True:
+        try:
+            msgs.append(q.get_nowait())
+        except queue.Empty:
+            return msgs
+
+
+class TestOptCMAAsync(unittest.TestCase):
+    def test_async_reaches_target_sooner(self):
+        sync, syncProb = makeSolver(False)
+        sync.optimize()
+        asyn, asynProb = makeSolver(True)
+        asyn.optimize()
+        self.assertIsNotNone(syncProb.reached)
+        self.assertIsNotNone(asynProb.reached)
+        # the slow samples hold up every synchronous iteration they are in
+        self.assertLess(asynProb.reached, 0.8 * syncProb.reached)
+        self.assertEqual(asynProb.peak, 6)
+        best = [m for m in messages(asyn.resQueue) if m[0] == "BEST"][-1]
+        self.assertLess(best[1][0], TARGET)
+
+    def test_async_iterations_and_stop(self):
+        slv, prob = makeSolver(True, workers=4, itmax=3)
+        slv.optimize()
+        its = [m[1] for m in messages(slv.resQueue) if m[0] == "IT"]
+        self.assertEqual(its, [0, 1, 2])
+        self.assertEqual(prob.peak, 4)
+        # running samples are stopped when the optimization ends
+        self.assertFalse(any(gt.is_alive() for gt in prob.threads))
+        slv, prob = makeSolver(True)
+        slv.stop.set()
+        slv.optimize()
+        self.assertTrue(prob.userInterupt)
+        self.assertEqual(prob.evaluations, 0)
@@ -0,0 +1,120 @@
+#################################################################################
+# FOQUS Copyright (c) 2012 - 2026, by the software owners: Oak Ridge Institute
+# for Science and Education (ORISE), TRIAD National Security, LLC., Lawrence
+# Livermore National Security, LLC., The Regents of the University of
+# California, through Lawrence Berkeley National Laboratory, Battelle Memorial
+# Institute, Pacific Northwest Division through Pacific Northwest National
+# Laboratory, Carnegie Mellon University, West Virginia University, Boston
+# University, the Trustees of Princeton University, The University of Texas at
+# Austin, URS Energy & Construction, Inc., et al.  All rights reserved.
+#
+# Please see the file LICENSE.md for full copyright and license information,
+# respectively. This file is also available online at the URL
+# "https://github.com/CCSI-Toolset/FOQUS".
+#################################################################################
+import queue
+import threading
+import unittest
+from types import SimpleNamespace
+from unittest.mock import MagicMock
+
+import numpy as np
+
+from foqus_lib.framework.optimizer import MultiStart
+
+GLOBAL = np.array([8.0, 8.0])
+LOCAL = np.array([2.0, 2.0])
+
+
+class twoBasinProblem:
+    """
+    Stands in for the optimization problem, a global minimum of 0 at
+    GLOBAL and a local minimum of 1 at LOCAL.  Records runSamples batches
+    and the thread they were run from.
+    """
+
+    def __init__(self):
+        self.v = ["x0", "x1"]
+        self.batches = []
+        self.threads = set()
+        self.iterationNumber = 0
+        self.maxTimeInterupt = False
+
+    def initSolverParameters(self):
+        pass
+
+    def prep(self, slv):
+        pass
+
+    @staticmethod
+    def f(x):
+        x = np.asarray(x)
+        return float(
+            min(np.sum((x - GLOBAL) ** 2), 1.0 + 0.5 * np.sum((x - LOCAL) ** 2))
+        )
+
+    def runSamples(self, X, slv):
+        self.batches.append(len(X))
+        self.threads.add(threading.current_thread())
+        obj = [[self.f(x)] for x in X]
+        self.gt = SimpleNamespace(res=[{"x": list(x)} for x in X])
+        return obj, [[0.0]] * len(X), [[0.0]] * len(X)
+
+
+def makeSolver(**options):
+    prob = twoBasinProblem()
+    dat = MagicMock()
+    dat.optProblem = prob
+    dat.flowsheet.input.getFlat.return_value = [1.0, 1.0]
+    dat.flowsheet.results.incrementSetName.return_value = "set"
+    slv = MultiStart.opt(dat)
+    for key, value in options.items():
+        slv.options[key].value = value
+    return slv, prob
+
+
+def messages(q):
+    msgs = []
+    while True:
+        try:
+            msgs.append(q.get_nowait())
+        except queue.Empty:
+            return msgs
+
+
+class TestMultiStart(unittest.TestCase):
+    def test_finds_global_minimum_with_shared_batches(self):
+        for design in ("LHS", "Sobol", "Random"):
+            slv, prob = makeSolver(**{"Start design": design, "Starts": 6})
+            slv.optimize()
+            best = [m for m in messages(slv.resQueue) if m[0] == "BEST"][-1]
+            np.testing.assert_allclose(best[2], GLOBAL, atol=1e-3)
+            self.assertLess(best[1][0], 1e-6)
+            # the searches' points are run together from the calling thread
+            self.assertEqual(prob.threads, {threading.current_thread()})
+            self.assertEqual(max(prob.batches), 6)
+            self.assertEqual(prob.iterationNumber, len(prob.batches))
+
+    def test_concurrent_limit_and_dominated_searches(self):
+        slv, prob = makeSolver(
+            **{
+                "Starts": 8,
+                "Concurrent starts": 3,
+                "Stall evaluations": 3,
+                "Local solver": "Nelder-Mead",
+            }
+        )
+        slv.optimize()
+        self.assertEqual(max(prob.batches), 3)
+        text = messages(slv.msgQueue)
+        self.assertEqual(sum("Start " in m and "evaluations" in m for m in text), 8)
+        self.assertTrue(any(m.endswith("dominated") for m in text))
+        best = [m for m in messages(slv.resQueue) if m[0] == "BEST"][-1]
+        np.testing.assert_allclose(best[2], GLOBAL, atol=1e-3)
+
+    def test_stop_flag_ends_all_searches(self):
+        slv, prob = makeSolver(**{"Starts": 4})
+        slv.stop.set()
+        slv.optimize()
+        self.assertEqual(prob.batches, [4])
+        self.assertTrue(slv.userInterupt)
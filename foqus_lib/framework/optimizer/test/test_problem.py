@@ -0,0 +1,136 @@
+#################################################################################
+# FOQUS Copyright (c) 2012 - 2026, by the software owners: Oak Ridge Institute
+# for Science and Education (ORISE), TRIAD National Security, LLC., Lawrence
+# Livermore National Security, LLC., The Regents of the University of
+# California, through Lawrence Berkeley National Laboratory, Battelle Memorial
+# Institute, Pacific Northwest Division through Pacific Northwest National
+# Laboratory, Carnegie Mellon University, West Virginia University, Boston
+# University, the Trustees of Princeton University, The University of Texas at
+# Austin, URS Energy & Construction, Inc., et al.  All rights reserved.
+#
+# Please see the file LICENSE.md for full copyright and license information,
+# respectively. This file is also available online at the URL
+# "https://github.com/CCSI-Toolset/FOQUS".
+#################################################################################
+import unittest
+from types import SimpleNamespace
+
+import numpy as np
+
+from foqus_lib.framework.optimizer.problem import (
+    inequalityConstraint,
+    objectiveFunction,
+    problem,
+)
+
+
+def result(x1, x2, z, err=0):
+    return {
+        "input": {"calc": {"x1": x1, "x2": x2}},
+        "output": {"calc": {"z": z, "name": "a"}},
+        "graphError": err,
+    }
+
+
+def population():
+    res = [result(float(i), 2.0 + i, i * 0.5 - 3.0) for i in range(8)]
+    res[2]["graphError"] = 3
+    res[5] = None
+    res[6]["output"]["calc"]["z"] = 0.0  # division by zero below
+    return res
+
+
+def makeProblem(obj, g=(), penForm="Linear"):
+    prob = problem()
+    prob.obj = [objectiveFunction(o, ps=2, failval=99) for o in obj]
+    prob.g = [inequalityConstraint(c, 10, penForm) for c in g]
+    return prob
+
+
+class unflattenInput:
+    def unflatten(self, names, xvec, unScale=False):
+        sd = {}
+        for name, v in zip(names, xvec):
+            node, var = name.split(".", 1)
+            sd.setdefault(node, {})[var] = 10 * v
+        return sd
+
+    def unflattenRows(self, names, values, unScale=False):
+        return [self.unflatten(names, xvec, unScale) for xvec in values]
+
+
+class TestProblemObjectives(unittest.TestCase):
+    def assertSameObj(self, prob, svlist):
+        prob.vectorizeObj = True
+        vec = prob.calculateObj(svlist)
+        prob.vectorizeObj = False
+        each = prob.calculateObj(svlist)
+        for a, b in zip(vec, each):
+            np.testing.assert_allclose(np.array(a, dtype=float), b)
+        return vec
+
+    def test_vectorized_matches_each_sample(self):
+        for penForm in ("Linear", "Quadratic", "Step"):
+            prob = makeProblem(
+                ["x.calc.x1 + 1/f.calc.z", "-abs(f.calc.z)**2", "7"],
+                ["f.calc.z - 0.5", "x.calc.x2 - 6"],
+                penForm,
+            )
+            res, const, pen = self.assertSameObj(prob, population())
+            self.assertEqual(res[2], [99, 99, 99])
+            self.assertEqual(res[5], [99, 99, 99])
+            # the division by zero is an objective error
+            self.assertEqual(res[6][0], 99)
+            self.assertEqual(pen[5], 0.0)
+            self.assertEqual(
+                const[7][1], {"Linear": 30, "Quadratic": 90}.get(penForm, 10)
+            )
+
+    def test_falls_back_for_scalar_expressions(self):
+        svlist = population()
+        for expr in (
+            "max(f.calc.z, 0)",
+            "sum(f.calc.z for i in [0])",
+            "f.calc.z @ f.calc.z",
+            "f.calc.z if x.calc.x1 > 3 else 0",
+            "f.calc.name + 'b'",
+            "f.calc.missing",
+            "f.calc.z + fail",
+        ):
+            prob = makeProblem([expr])
+            self.assertIsNone(prob.calculateObjArray(svlist), expr)
+            self.assertSameObj(prob, svlist)
+        # the constant isn't a reduction over the population
+        prob = makeProblem(["2 + 3"])
+        self.assertEqual(prob.calculateObjArray(svlist)[0][0], [5.0])
+
+    def test_expressions_compiled_once(self):
+        prob = makeProblem(["f.calc.z"], ["x.calc.x1 - 3"])
+        prob.inpDict = {}
+        prob.prep(
+            SimpleNamespace(graph=SimpleNamespace(saveValues=lambda: {"input": {}}))
+        )
+        code = prob.exprCache["f.calc.z"]
+        prob.calculateObj(population())
+        prob.calculateObj(population()[:1])
+        self.assertIs(prob.exprCache["f.calc.z"], code)
+        self.assertEqual(len(prob.exprCache), 2)
+
+    def test_make_samples_copies_only_changed_nodes(self):
+        prob = problem()
+        prob.v = ["a.x"]
+        prob.inpDict = {"a": {"x": 0.0, "y": 1.0}, "b": {"z": [1, 2]}}
+        graph = SimpleNamespace(input=unflattenInput())
+        samp, snum = prob.makeSamples([[1.0], [2.0]], graph)
+        self.assertEqual(snum, 1)
+        self.assertEqual(samp[1]["a"], {"x": 20.0, "y": 1.0})
+        self.assertIs(samp[0]["b"], prob.inpDict["b"])
+        self.assertEqual(prob.inpDict["a"]["x"], 0.0)
+        # sample variables
+        prob.vs = ["b.z"]
+        prob.samp = {"b.z": [5.0, 6.0, 7.0]}
+        samp, snum = prob.makeSamples([[1.0], [2.0]], graph)
+        self.assertEqual(snum, 3)
+        self.assertEqual([s["b"]["z"] for s in samp], [5.0, 6.0, 7.0] * 2)
+        self.assertEqual([s["a"]["x"] for s in samp], [10.0] * 3 + [20.0] * 3)
+        self.assertEqual(prob.inpDict["b"]["z"], [1, 2])
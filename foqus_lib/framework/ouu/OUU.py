@@ -23,6 +23,7 @@ from PyQt5 import QtCore
 from foqus_lib.framework.uq.Common import Common
 from foqus_lib.framework.uq.Distribution import Distribution
 from foqus_lib.framework.uq.LocalExecutionModule import LocalExecutionModule
+from foqus_lib.framework.uq.PsuadeSession import PsuadeSession
 from foqus_lib.framework.uq.RSAnalyzer import RSAnalyzer
 from foqus_lib.framework.uq.SampleData import SampleData
 from foqus_lib.framework.uq.SamplingMethods import SamplingMethods
@@ -285,7 +286,9 @@ class OUU(
         return outfile
 
     @staticmethod
-    def compress(fname):
+    def compress(fname, usePsuade=False):
+        # Compress the x3 sample into histogram scenarios for 2 to 19 bins per
+        # dimension.  Returns {number of scenarios: (scenario file, nbins)}.
 
         N = 0  # number of samples in x3sample['file']
         with open(fname) as f:  ### TO DO for Jeremy: check sample size in GUI
@@ -301,55 +304,122 @@ class OUU(
             Common.showError(warn)
             return {N: fname}  # return original sample file
 
+        if usePsuade:
+            return OUU.compressPsuade(fname, N, nInputs)
+
+        x = np.loadtxt(fname, skiprows=1, ndmin=2)
+        weights = None
+        if x.shape[1] > nInputs:  # last column holds sample probabilities
+            weights = x[:, nInputs]
+        x = x[:N, :nInputs]
+        if weights is not None:
+            weights = weights[:N]
+
+        if not os.path.exists(OUU.dname):
+            os.makedirs(OUU.dname)
         outfiles = {}
         nbins_max = 20
         nscenarios_max = 1501
-        for nbins in range(2, nbins_max):
+        for nbins, (centers, probs) in OUU.histogramScenarios(
+            x, range(2, nbins_max), weights
+        ):
+            Ns = len(probs)
+            if len(outfiles) > 1 and Ns > min(N, nscenarios_max):
+                return outfiles
+            sfile = Common.getLocalFileName(OUU.dname, fname, ".compressed" + str(Ns))
+            np.savetxt(
+                sfile,
+                np.column_stack((centers, probs)),
+                fmt="%24.16e",
+                header="%d %d" % (Ns, nInputs),
+                comments="",
+            )
+            outfiles[Ns] = (sfile, nbins)
 
-            # write script to invoke scenario compression
-            f = tempfile.SpooledTemporaryFile(mode="wt")
-            if platform.system() == "Windows":
-                import win32api
+        return outfiles
 
-                fname = win32api.GetShortPathName(fname)
-            f.write("read_std %s\n" % fname)
-            f.write("genhistogram\n")
-            for x in range(nInputs):
-                f.write("%d\n" % nbins)
-            f.write("quit\n")
-            f.seek(0)
+    @staticmethod
+    def histogramScenarios(x, binCounts, weights=None):
+        # Generator of (nbins, (bin centers, bin probabilities)) for the
+        # nonempty cells of an nbins-per-dimension histogram of sample x,
+        # matching psuade genhistogram.  The data are scaled to [0, 1] once
+        # and every bin count reuses it.
+        N, nInputs = x.shape
+        if weights is None:
+            weights = np.ones(N)
+        weights = weights / weights.sum()
+        lo = x.min(axis=0)
+        width = x.max(axis=0) - lo
+        width[width == 0] = 1.0
+        u = (x - lo) / width
+        for nbins in binCounts:
+            idx = np.minimum((u * nbins).astype(np.int64), nbins - 1)
+            if float(nbins) ** nInputs < 2**62:
+                keys = np.ravel_multi_index(idx.T, (nbins,) * nInputs)
+                keys, inverse = np.unique(keys, return_inverse=True)
+                cells = np.column_stack(np.unravel_index(keys, (nbins,) * nInputs))
+            else:
+                cells, inverse = np.unique(idx, axis=0, return_inverse=True)
+            probs = np.bincount(inverse.ravel(), weights=weights, minlength=len(cells))
+            centers = lo + (cells + 0.5) * (width / nbins)
+            yield nbins, (centers, probs)
 
-            # invoke psuade
-            out, error = Common.invokePsuade(f)
-            f.close()
-            if error:
-                return None
+    @staticmethod
+    def compressPsuade(fname, N, nInputs):
+        # Scenario compression through psuade genhistogram, one call per
+        # bin count
 
-            # check output file
-            sfile = "psuade_pdfhist_sample"
-            if os.path.exists(sfile):
-                Ns = 0  # number of samples in psuade_pdfhist_sample
-                with open(sfile) as f:
-                    header = f.readline()
-                    header = header.split()
-                    Ns = int(header[0])
-                sfile_ = Common.getLocalFileName(
-                    OUU.dname, fname, ".compressed" + str(Ns)
-                )
-                if os.path.exists(sfile_):
-                    os.remove(sfile_)
-                os.rename(sfile, sfile_)
-                sfile = sfile_
-            else:
-                error = "OUU: %s does not exist." % sfile
-                Common.showError(error, out)
-                return None
+        outfiles = {}
+        nbins_max = 20
+        nscenarios_max = 1501
+        # all bin counts go through one psuade worker
+        with PsuadeSession.ensure():
+            for nbins in range(2, nbins_max):
 
-            # append scenario file to data structure
-            if len(outfiles) > 1 and Ns > min(N, nscenarios_max):
-                return outfiles
-            else:
-                outfiles[Ns] = (sfile, nbins)
+                # write script to invoke scenario compression
+                f = tempfile.SpooledTemporaryFile(mode="wt")
+                if platform.system() == "Windows":
+                    import win32api
+
+                    fname = win32api.GetShortPathName(fname)
+                f.write("read_std %s\n" % fname)
+                f.write("genhistogram\n")
+                for x in range(nInputs):
+                    f.write("%d\n" % nbins)
+                f.write("quit\n")
+                f.seek(0)
+
+                # invoke psuade
+                out, error = Common.invokePsuade(f)
+                f.close()
+                if error:
+                    return None
+
+                # check output file
+                sfile = "psuade_pdfhist_sample"
+                if os.path.exists(sfile):
+                    Ns = 0  # number of samples in psuade_pdfhist_sample
+                    with open(sfile) as f:
+                        header = f.readline()
+                        header = header.split()
+                        Ns = int(header[0])
+                    sfile_ = Common.getLocalFileName(
+                        OUU.dname, fname, ".compressed" + str(Ns)
+                    )
+                    if os.path.exists(sfile_):
+                        os.remove(sfile_)
+                    os.rename(sfile, sfile_)
+                    sfile = sfile_
+                else:
+                    error = "OUU: %s does not exist." % sfile
+                    Common.showError(error, out)
+                    return None
+
+                # append scenario file to data structure
+                if len(outfiles) > 1 and Ns > min(N, nscenarios_max):
+                    return outfiles
+                else:
+                    outfiles[Ns] = (sfile, nbins)
 
         return outfiles
 
@@ -856,13 +926,13 @@ class psuadeThread(QtCore.QThread):
 
 
 class psuadeWorker(QtCore.QObject):
-    finishedSignal = QtCore.Signal()
-    functionSignal = QtCore.Signal(str, str)
-    textDialogShowSignal = QtCore.Signal()
-    textDialogCloseSignal = QtCore.Signal()
-    textDialogInsertSignal = QtCore.Signal(str)
-    textDialogEnsureVisibleSignal = QtCore.Signal()
-    showErrorSignal = QtCore.Signal(str, str)
+    finishedSignal = QtCore.pyqtSignal()
+    functionSignal = QtCore.pyqtSignal(str, str)
+    textDialogShowSignal = QtCore.pyqtSignal()
+    textDialogCloseSignal = QtCore.pyqtSignal()
+    textDialogInsertSignal = QtCore.pyqtSignal(str)
+    textDialogEnsureVisibleSignal = QtCore.pyqtSignal()
+    showErrorSignal = QtCore.pyqtSignal(str, str)
 
     def __init__(
         self, parent, fileHandle, onFinishedFunctionHandle, textDialog, plotValuesSignal
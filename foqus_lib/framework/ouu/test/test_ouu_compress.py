@@ -0,0 +1,82 @@
+#################################################################################
+# FOQUS Copyright (c) 2012 - 2026, by the software owners: Oak Ridge Institute
+# for Science and Education (ORISE), TRIAD National Security, LLC., Lawrence
+# Livermore National Security, LLC., The Regents of the University of
+# California, through Lawrence Berkeley National Laboratory, Battelle Memorial
+# Institute, Pacific Northwest Division through Pacific Northwest National
+# Laboratory, Carnegie Mellon University, West Virginia University, Boston
+# University, the Trustees of Princeton University, The University of Texas at
+# Austin, URS Energy & Construction, Inc., et al.  All rights reserved.
+#
+# Please see the file LICENSE.md for full copyright and license information,
+# respectively. This file is also available online at the URL
+# "https://github.com/CCSI-Toolset/FOQUS".
+#################################################################################
+import os
+import tempfile
+import unittest
+from pathlib import Path
+from unittest.mock import patch
+
+import numpy as np
+
+from foqus_lib.framework.ouu.OUU import OUU
+from foqus_lib.framework.uq.LocalExecutionModule import LocalExecutionModule
+
+EXAMPLE = (
+    Path(__file__).parents[4]
+    / "examples"
+    / "tutorial_files"
+    / "OUU"
+    / "ex1_x3sample.smp"
+)
+
+
+class TestOUUCompress(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.dname = os.path.join(self.tmp.name, "OUU_files")
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_histogram_scenarios(self):
+        x = np.array([[0.0, 0.0], [0.1, 0.9], [1.0, 1.0], [0.9, 0.95]])
+        ((nbins, (centers, probs)),) = OUU.histogramScenarios(x, [2])
+        self.assertEqual(nbins, 2)
+        np.testing.assert_allclose(centers, [[0.25, 0.25], [0.25, 0.75], [0.75, 0.75]])
+        np.testing.assert_allclose(probs, [0.25, 0.25, 0.5])
+
+    def test_weighted_histogram(self):
+        x = np.array([[0.0], [0.2], [1.0]])
+        w = np.array([0.5, 0.25, 0.25])
+        ((_, (centers, probs)),) = OUU.histogramScenarios(x, [2], w)
+        np.testing.assert_allclose(centers, [[0.25], [0.75]])
+        np.testing.assert_allclose(probs, [0.75, 0.25])
+
+    def test_compress_writes_scenario_files(self):
+        fname = os.path.join(self.tmp.name, "z3Samples.smp")
+        rng = np.random.default_rng(0)
+        LocalExecutionModule.writeSimpleFile(
+            fname, rng.uniform(size=(300, 2)).tolist(), rowLabels=False
+        )
+        with patch.object(OUU, "dname", self.dname):
+            outfiles = OUU.compress(fname)
+        self.assertEqual(outfiles[4][1], 2)
+        self.assertGreater(len(outfiles), 2)
+        for Ns, (sfile, nbins) in outfiles.items():
+            self.assertLessEqual(Ns, nbins**2)
+            data, _, nInputs, _ = LocalExecutionModule.readDataFromSimpleFile(
+                sfile, hasColumnNumbers=False
+            )
+            self.assertEqual(nInputs, 2)
+            self.assertEqual(data.shape[0], Ns)
+            probs = np.loadtxt(sfile, skiprows=1)[:, -1]
+            self.assertAlmostEqual(probs.sum(), 1.0)
+
+    def test_compress_example_with_probabilities(self):
+        with patch.object(OUU, "dname", self.dname):
+            outfiles = OUU.compress(str(EXAMPLE))
+        # stops once the scenario count exceeds the 200 samples
+        self.assertTrue(all(Ns <= 200 for Ns in outfiles))
+        self.assertEqual(min(outfiles), 16)
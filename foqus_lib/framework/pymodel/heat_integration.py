@@ -15,13 +15,20 @@
 #
 # FOQUS_PYMODEL_PLUGIN
 
-import subprocess
+import logging
 
 import numpy
 
 from foqus_lib.framework.graph.nodeVars import NodeVars
+from foqus_lib.framework.pymodel.heat_integration_solver import (
+    HeatIntegrationData,
+    HeatIntegrationEx,
+    makeSolver,
+)
 from foqus_lib.framework.pymodel.pymodel import pymodel
 
+_log = logging.getLogger("foqus." + __name__)
+
 
 def checkAvailable():
     """
@@ -111,6 +118,27 @@ class pymodel_pg(pymodel):
             vst="pymodel",
             tags=[],
         )
+        self.inputs["Solver"] = NodeVars(
+            value="highs",
+            vmin="highs",
+            vmax="highs",
+            vdflt="highs",
+            unit="",
+            vdesc="Heat integration solver, highs (in-process LP) or gams",
+            vst="pymodel",
+            tags=[],
+            dtype=str,
+        )
+        self.inputs["Solver.Time.Limit"] = NodeVars(
+            value=600.0,
+            vmax=86400.0,
+            vdflt=600.0,
+            unit="s",
+            vdesc="Heat integration solver time limit, 0 for none",
+            vst="pymodel",
+            tags=[],
+            dtype=float,
+        )
         # Output variables
         self.outputs["Utility.Cost"] = NodeVars(
             unit="$MM/yr", vdesc="Utility cost", vst="pymodel", dtype=float, tags=[]
@@ -189,6 +217,9 @@ class pymodel_pg(pymodel):
             dtype=float,
             tags=[],
         )
+        # solver objects by name, HighsSolver keeps its LP models in a
+        # module level cache so node copies share them
+        self.solvers = {}
 
     def run(self):
         # Search for the block tag and create a set of blocks
@@ -200,12 +231,14 @@ class pymodel_pg(pymodel):
         pointCSet = set()  # set of point sinks for heat
         blockLookup = dict()  # look up the block given a variable name
         node = self.node
-        nameSets = [node.gr.xnames, node.gr.fnames]  # input and output variable names
-        varSets = [node.gr.x, node.gr.f]  # input and output variables
+        # input and output variables with Block tags, looked up in the tag indexes
+        varSets = [
+            node.gr.input.tagIndex().blockVars,
+            node.gr.output.tagIndex().blockVars,
+        ]
         for ii in range(2):
-            vnames = nameSets[ii]
             vars = varSets[ii]
-            for name in vnames:  # All the inputs
+            for name in vars:  # All the inputs
                 blktgs = [tag.split() for tag in vars[name].tags if "Block" in tag]
                 # I think there should only be one block tag per variable but
                 # maybe there is a reason for more
@@ -268,9 +301,8 @@ class pymodel_pg(pymodel):
         for ii in range(
             2
         ):  # do this loop twice (first pass inputs second pass outputs)
-            vnames = nameSets[ii]
             vars = varSets[ii]
-            for name in vnames:  # loop through all variables
+            for name in vars:  # loop through all variables
                 tags = vars[name].tags  # get variable tags
                 blk = blockLookup.get(
                     name, None
@@ -561,314 +593,91 @@ class pymodel_pg(pymodel):
         maxAreaShell = 500.0
         # maximum area per shell (m^2)
 
-        # write GAMS input
-        #
-        try:
-            f = open("gams/GamsInput.inc", "w")
-        except:
-            print("Couldn't open GAMS input file")
-            return
-        # Comments
-        f.write("* Input parameters \n\n")
-        # hot stream set
-        f.write("Set H  hot process streams\n")
-        f.write("/ \n")
-        for heater in heaterSet:
-            if heaterIsH[heater]:
-                f.write("\t" + heater + "\n")
-        for hxH in hxHSet:
-            if hxHIsH[hxH]:
-                f.write("\t" + hxH + "\n")
-        for hxC in hxCSet:
-            if hxCIsH[hxC]:
-                f.write("\t" + hxC + "\n")
-        for pointH in pointHSet:
-            if pointHIsH[pointH]:
-                f.write("\t" + pointH + "\n")
-        f.write("/;\n\n")
-        # cold stream set
-        f.write("Set C  cold process streams\n")
-        f.write("/\n")
-        for heater in heaterSet:
-            if heaterIsC[heater]:
-                f.write("\t" + heater + "\n")
-        for hxC in hxCSet:
-            if hxCIsC[hxC]:
-                f.write("\t" + hxC + "\n")
-        for hxH in hxHSet:
-            if hxHIsC[hxH]:
-                f.write("\t" + hxH + "\n")
-        for pointC in pointCSet:
-            if pointCIsC[pointC]:
-                f.write("\t" + pointC + "\n")
-        if feedIs:
-            for feedC in feedSet:
-                f.write("\t" + feedC + "\n")
-        f.write("/;\n\n")
-        # hot stream FCps
-        f.write("Parameter FCpH(H)  F*Cp for hot process streams\n")
-        f.write("/\n")
-        # Ignoring trailing digits in a number
-        f.write("$offDigit\n")
-        for heater in heaterSet:
-            if heaterIsH[heater]:
-                f.write("\t" + heater + "\t" + str(heaterFCp[heater]) + "\n")
-        for hxH in hxHSet:
-            if hxHIsH[hxH]:
-                f.write("\t" + hxH + "\t" + str(hxHFCp[hxH]) + "\n")
-        for hxC in hxCSet:
-            if hxCIsH[hxC]:
-                f.write("\t" + hxC + "\t" + str(hxCFCp[hxC]) + "\n")
-        for pointH in pointHSet:
-            if pointHIsH[pointH]:
-                f.write("\t" + pointH + "\t" + str(pointHFCp[pointH]) + "\n")
-        f.write("/;\n\n")
-        # cold stream FCps
-        f.write("Parameter FCpC(C)  F*Cp for cold process streams\n")
-        f.write("/\n")
-        # Ignoring trailing digits in a number
-        f.write("$offDigit\n")
-        for heater in heaterSet:
-            if heaterIsC[heater]:
-                f.write("\t" + heater + "\t" + str(heaterFCp[heater]) + "\n")
-        for hxC in hxCSet:
-            if hxCIsC[hxC]:
-                f.write("\t" + hxC + "\t" + str(hxCFCp[hxC]) + "\n")
-        for hxH in hxHSet:
-            if hxHIsC[hxH]:
-                f.write("\t" + hxH + "\t" + str(hxHFCp[hxH]) + "\n")
-        for pointC in pointCSet:
-            if pointCIsC[pointC]:
-                f.write("\t" + pointC + "\t" + str(pointCFCp[pointC]) + "\n")
-        if feedIs:
-            for feedC in feedSet:
-                f.write("\t" + feedC + "\t" + str(feedFCp[feedC]) + "\n")
-        f.write("/;\n\n")
-        # hot stream inlet temperatures
-        f.write("Parameter TinH(H)  inlet temperature of hot process streams\n")
-        f.write("/\n")
-        # Ignoring trailing digits in a number
-        f.write("$offDigit\n")
-        for heater in heaterSet:
-            if heaterIsH[heater]:
-                f.write("\t" + heater + "\t" + str(heaterTin[heater]) + "\n")
-        for hxH in hxHSet:
-            if hxHIsH[hxH]:
-                f.write("\t" + hxH + "\t" + str(hxHTin[hxH]) + "\n")
-        for hxC in hxCSet:
-            if hxCIsH[hxC]:
-                f.write("\t" + hxC + "\t" + str(hxCTin[hxC]) + "\n")
-        for pointH in pointHSet:
-            if pointHIsH[pointH]:
-                f.write("\t" + pointH + "\t" + str(pointHTin[pointH]) + "\n")
-        f.write("/;\n\n")
-        # hot stream outlet temperatures
-        f.write("Parameter ToutH(H)  outlet temperature of hot process streams\n")
-        f.write("/\n")
-        # Ignoring trailing digits in a number
-        f.write("$offDigit\n")
+        # heat integration problem, streams in the same order as the GAMS sets
+        data = HeatIntegrationData()
         for heater in heaterSet:
             if heaterIsH[heater]:
-                f.write("\t" + heater + "\t" + str(heaterTout[heater]) + "\n")
+                data.addHot(
+                    heater, heaterFCp[heater], heaterTin[heater], heaterTout[heater]
+                )
         for hxH in hxHSet:
             if hxHIsH[hxH]:
-                f.write("\t" + hxH + "\t" + str(hxHTout[hxH]) + "\n")
+                data.addHot(hxH, hxHFCp[hxH], hxHTin[hxH], hxHTout[hxH])
         for hxC in hxCSet:
             if hxCIsH[hxC]:
-                f.write("\t" + hxC + "\t" + str(hxCTout[hxC]) + "\n")
+                data.addHot(hxC, hxCFCp[hxC], hxCTin[hxC], hxCTout[hxC])
         for pointH in pointHSet:
             if pointHIsH[pointH]:
-                f.write("\t" + pointH + "\t" + str(pointHTout[pointH]) + "\n")
-        f.write("/;\n\n")
-        # cold stream inlet temperatures
-        f.write("Parameter TinC(C)  inlet temperature of cold process streams\n")
-        f.write("/\n")
-        # Ignoring trailing digits in a number
-        f.write("$offDigit\n")
-        for heater in heaterSet:
-            if heaterIsC[heater]:
-                f.write("\t" + heater + "\t" + str(heaterTin[heater]) + "\n")
-        for hxC in hxCSet:
-            if hxCIsC[hxC]:
-                f.write("\t" + hxC + "\t" + str(hxCTin[hxC]) + "\n")
-        for hxH in hxHSet:
-            if hxHIsC[hxH]:
-                f.write("\t" + hxH + "\t" + str(hxHTin[hxH]) + "\n")
-        for pointC in pointCSet:
-            if pointCIsC[pointC]:
-                f.write("\t" + pointC + "\t" + str(pointCTin[pointC]) + "\n")
-        if feedIs:
-            for feedC in feedSet:
-                f.write("\t" + feedC + "\t" + str(feedTin[feedC]) + "\n")
-        f.write("/;\n\n")
-        # cold stream outlet temperatures
-        f.write("Parameter ToutC(C)  outlet temperature of cold process streams\n")
-        f.write("/\n")
-        # Ignoring trailing digits in a number
-        f.write("$offDigit\n")
+                data.addHot(
+                    pointH, pointHFCp[pointH], pointHTin[pointH], pointHTout[pointH]
+                )
         for heater in heaterSet:
             if heaterIsC[heater]:
-                f.write("\t" + heater + "\t" + str(heaterTout[heater]) + "\n")
+                data.addCold(
+                    heater, heaterFCp[heater], heaterTin[heater], heaterTout[heater]
+                )
         for hxC in hxCSet:
             if hxCIsC[hxC]:
-                f.write("\t" + hxC + "\t" + str(hxCTout[hxC]) + "\n")
+                data.addCold(hxC, hxCFCp[hxC], hxCTin[hxC], hxCTout[hxC])
         for hxH in hxHSet:
             if hxHIsC[hxH]:
-                f.write("\t" + hxH + "\t" + str(hxHTout[hxH]) + "\n")
+                data.addCold(hxH, hxHFCp[hxH], hxHTin[hxH], hxHTout[hxH])
         for pointC in pointCSet:
             if pointCIsC[pointC]:
-                f.write("\t" + pointC + "\t" + str(pointCTout[pointC]) + "\n")
+                data.addCold(
+                    pointC, pointCFCp[pointC], pointCTin[pointC], pointCTout[pointC]
+                )
         if feedIs:
             for feedC in feedSet:
-                f.write("\t" + feedC + "\t" + str(feedTout[feedC]) + "\n")
-        f.write("/;\n\n")
-        # hot utility set
-        f.write("Set S  hot utility streams\n")
-        f.write("/\n")
-        for hotU in hotUSet:
-            f.write("\t" + hotU + "\n")
-        f.write("/;\n\n")
-        # cold utility set
-        f.write("Set W  cold utility streams\n")
-        f.write("/\n")
-        for coldU in coldUSet:
-            f.write("\t" + coldU + "\n")
-        f.write("/;\n\n")
-        # hot utility inlet temperatures
-        f.write("Parameter TinS(S)  inlet temperature of hot utility streams\n")
-        f.write("/\n")
-        for hotU in hotUSet:
-            f.write("\t" + hotU + "\t" + str(hotUTin[hotU]) + "\n")
-        f.write("/;\n\n")
-        # hot utility outlet temperatures
-        f.write("Parameter ToutS(S)  outlet temperature of hot utility streams\n")
-        f.write("/\n")
-        for hotU in hotUSet:
-            f.write("\t" + hotU + "\t" + str(hotUTout[hotU]) + "\n")
-        f.write("/;\n\n")
-        # cold utility inlet temperatures
-        f.write("Parameter TinW(W)  inlet temperature of cold utility streams\n")
-        f.write("/\n")
-        for coldU in coldUSet:
-            f.write("\t" + coldU + "\t" + str(coldUTin[coldU]) + "\n")
-        f.write("/;\n\n")
-        # cold utility outlet temperatures
-        f.write("Parameter ToutW(W)  outlet temperature of cold utility streams\n")
-        f.write("/\n")
-        for coldU in coldUSet:
-            f.write("\t" + coldU + "\t" + str(coldUTout[coldU]) + "\n")
-        f.write("/;\n\n")
-        # whether cold utility is cooling water
-        f.write("Parameter WW(W)  whether the cold utility is cooling water\n")
-        f.write("/\n")
-        for coldU in coldUSet:
-            f.write("\t" + coldU + "\t" + str(coldUW[coldU]) + "\n")
-        f.write("/;\n\n")
-        # cold utility actual outlet temperatures
-        f.write("Parameter ToutWA(W)  actual outlet temperature of cold utility\n")
-        f.write("/\n")
-        for coldU in coldUSet:
-            f.write("\t" + coldU + "\t" + str(coldUToutA[coldU]) + "\n")
-        f.write("/;\n\n")
-        # hot utility cost
-        f.write("Parameter CS(S)  cost of hot utilities\n")
-        f.write("/\n")
+                data.addCold(
+                    feedC,
+                    feedFCp[feedC],
+                    feedTin[feedC],
+                    feedTout[feedC],
+                    rank=feedRank[feedC],
+                )
         for hotU in hotUSet:
-            f.write("\t" + hotU + "\t" + str(hotUCost[hotU]) + "\n")
-        f.write("/;\n\n")
-        # cold utility cost
-        f.write("Parameter CW(W)  cost of cold utilities\n")
-        f.write("/\n")
+            data.addHotUtility(hotU, hotUTin[hotU], hotUTout[hotU], hotUCost[hotU])
         for coldU in coldUSet:
-            f.write("\t" + coldU + "\t" + str(coldUCost[coldU]) + "\n")
-        f.write("/;\n\n")
-        # temperature interval set
-        f.write("Set K  possible temperature intervals\n")
-        f.write("/\n")
-        f.write("\t" + "1*" + str(NumK) + "\n")
-        f.write("/;\n\n")
-        # heat recovery approach temperature
-        f.write("Scalar dT  heat recovery approach temperature (HRAT)\n")
-        f.write("/\n")
-        f.write("\t" + str(HRAT) + "\n")
-        f.write("/;\n\n")
-        # minimum exchanger approach temperature
-        f.write("Scalar dTA  exchanger minimum approach temperature (EMAT)\n")
-        f.write("/\n")
-        f.write("\t" + str(EMAT) + "\n")
-        f.write("/;\n\n")
-        # correction factor for a noncountercurrent flow pattern
-        f.write("Scalar Ft  correction factor for a noncountercurrent flow pattern\n")
-        f.write("/\n")
-        f.write("\t" + str(CorrFac) + "\n")
-        f.write("/;\n\n")
-        # stream film heat-transfer coefficient
-        f.write(
-            "Parameter hH(H)  stream film heat-transfer coefficient for hot process streams;\n"
-        )
-        f.write(
-            "Parameter hC(C)  stream film heat-transfer coefficient for cold process streams;\n"
-        )
-        f.write(
-            "Parameter hS(S)  stream film heat-transfer coefficient for hot utilities;\n"
-        )
-        f.write(
-            "Parameter hW(W)  stream film heat-transfer coefficient for cold utilities;\n"
-        )
-        f.write("\n")
-        f.write("hH(H) = " + str(hCoefHotP) + ";\n")
-        f.write("hC(C) = " + str(hCoefColdP) + ";\n")
-        f.write("hS(S) = " + str(hCoefHotU) + ";\n")
-        f.write("hW(W) = " + str(hCoefColdU) + ";\n")
-        f.write("\n")
-        # define set for feed water heaters
-        f.write("Set CR(C)  set of cold streams except feed water streams;\n\n")
-        f.write("    CR(C) = yes;\n")
-        if feedIs:
-            for feedC in feedSet:
-                f.write('    CR("' + feedC + '") = no;\n')
-        f.write("\n")
-        f.write("Set CF(C)  set of feed water streams;\n\n")
-        f.write("    CF(C) = no;\n")
-        if feedIs:
-            for feedC in feedSet:
-                f.write('    CF("' + feedC + '") = yes;\n')
-        f.write("\n")
-        f.write("Parameter RankCF(C)  order of feed water streams;\n\n")
-        f.write("    RankCF(C) = 0;\n")
-        if feedIs:
-            for feedC in feedSet:
-                f.write('    RankCF("' + feedC + '") = ' + str(feedRank[feedC]) + ";\n")
-
-        # write whatever
-
-        # done writing GAMS input
-        f.close()
-
-        # execute gams code with system call
-        try:
-            process = subprocess.Popen(
-                ["gams", "HeatIntegration.gms", "lo=0"], cwd="gams"
+            data.addColdUtility(
+                coldU,
+                coldUTin[coldU],
+                coldUTout[coldU],
+                coldUCost[coldU],
+                coldUW[coldU],
+                coldUToutA[coldU],
             )
-            process.wait()  # could get fancy later and add a timeout
-        except:
+        data.HRAT = HRAT
+        data.EMAT = EMAT
+        data.corrFac = CorrFac
+        data.hHotP = hCoefHotP
+        data.hColdP = hCoefColdP
+        data.hHotU = hCoefHotU
+        data.hColdU = hCoefColdU
+        data.numK = NumK
+
+        # solve in-process or with GAMS, the HiGHS LP models are cached by
+        # stream and utility structure to reuse work between runs
+        solverName = self.inputs["Solver"].value
+        timeLimit = self.inputs["Solver.Time.Limit"].value
+        try:
+            if solverName not in self.solvers:
+                self.solvers[solverName] = makeSolver(solverName)
+            solver = self.solvers[solverName]
+            solver.timeLimit = timeLimit if timeLimit > 0 else None
+            result = solver.solve(data)
+        except HeatIntegrationEx as e:
             node.calcError = -2
-            print("Is GAMS installed?  Are the heat integration GAMS files available?")
+            _log.error("Heat integration failed: %s %s", e.getCodeString(), e.msg)
             return
 
-        # read GAMS output file
-        try:
-            f = open("gams\GamsOutput.txt", "r")
-        except:
-            print("couldn't open GAMS output file")
-            return
-        # pull GAMS results in the node variables
-        costUtiHr = float((f.readline()).strip())  # utility cost (hourly) ($MM/hr)
+        # pull results in the node variables
+        costUtiHr = result.utilityCost  # utility cost (hourly) ($/hr)
         costUtiYr = costUtiHr * timeOpe / 1e6  # utility cost (annually) ($MM/yr)
         self.outputs["Utility.Cost"].value = (
             costUtiYr  # utility cost (annually) ($MM/yr)
         )
-        areaHx = float((f.readline()).strip())  # heat exchanger area (m^2)
+        areaHx = result.area  # heat exchanger area (m^2)
         self.outputs["Heat.Exchanger.Area"].value = areaHx  # heat exchanger area (m^2)
         numShell_2 = numpy.ceil(
             areaHx / maxAreaShell
@@ -880,12 +689,8 @@ class pymodel_pg(pymodel):
         self.outputs["Capital.Cost"].value = costCap  # approximated capital cost ($MM)
         costTot = costUtiYr + AnnuFac * costCap  # approximated total cost ($MM/yr)
         self.outputs["Total.Cost"].value = costTot  # approximated total cost ($MM/yr)
-        Uhot = dict()  # hot utility consumption (GJ/hr)
-        Ucold = dict()  # cold utility consumption (GJ/hr)
-        for hotU in hotUSet:
-            Uhot[hotU] = float((f.readline()).strip())
-        for coldU in coldUSet:
-            Ucold[coldU] = float((f.readline()).strip())
+        Uhot = dict(zip(data.hotUNames, result.hotUtility))  # (GJ/hr)
+        Ucold = dict(zip(data.coldUNames, result.coldUtility))  # (GJ/hr)
         self.outputs["IP_Steam.Consumption"].value = Uhot[
             "IP_Steam"
         ]  # intermediate-pressure steam consumption (GJ/hr)
@@ -895,9 +700,7 @@ class pymodel_pg(pymodel):
         self.outputs["Cooling_Water.Consumption"].value = Ucold[
             "Cooling_Water"
         ]  # cooling water consumption (GJ/hr)
-        #        self.outputs["FH.Heat.Addition"].value = 10000  ### remove after testing 7/11/2019
         if feedIs:
-            #            self.outputs["FH.Heat.Addition"].value = [0, 0, 0, 0, 0]
             FH_Heat_Addition = [
                 self.outputs["FH.Heat.Addition1"],
                 self.outputs["FH.Heat.Addition2"],
@@ -906,17 +709,10 @@ class pymodel_pg(pymodel):
                 self.outputs["FH.Heat.Addition5"],
             ]
             for i in range(len(feedSet)):
-                #                self.outputs["FH.Heat.Addition"].value[i] = float((f.readline()).strip())      # heat addition to feed water heater (GJ/hr)
-                FH_Heat_Addition[i].value = float(
-                    (f.readline()).strip()
-                )  # heat addition to feed water heater (GJ/hr)
+                FH_Heat_Addition[i].value = result.feedHeat[
+                    i
+                ]  # heat addition to feed water heater (GJ/hr)
         else:
-            #            self.outputs["FH.Heat.Addition"].value = [
-            #                numpy.nan,
-            #                numpy.nan,
-            #                numpy.nan,
-            #                numpy.nan,
-            #                numpy.nan]
             self.outputs["FH.Heat.Addition1"].value = numpy.nan
             self.outputs["FH.Heat.Addition2"].value = numpy.nan
             self.outputs["FH.Heat.Addition3"].value = numpy.nan
@@ -929,6 +725,3 @@ class pymodel_pg(pymodel):
         #        for var in node.outVars:
         #            if self.outputs[var]:
         #                self.outputs[var].toNumpy()
-
-        # done reading GAMS output
-        f.close()
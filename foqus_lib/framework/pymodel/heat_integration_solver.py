@@ -0,0 +1,831 @@
+#################################################################################
+# FOQUS Copyright (c) 2012 - 2026, by the software owners: Oak Ridge Institute
+# for Science and Education (ORISE), TRIAD National Security, LLC., Lawrence
+# Livermore National Security, LLC., The Regents of the University of
+# California, through Lawrence Berkeley National Laboratory, Battelle Memorial
+# Institute, Pacific Northwest Division through Pacific Northwest National
+# Laboratory, Carnegie Mellon University, West Virginia University, Boston
+# University, the Trustees of Princeton University, The University of Texas at
+# Austin, URS Energy & Construction, Inc., et al.  All rights reserved.
+#
+# Please see the file LICENSE.md for full copyright and license information,
+# respectively. This file is also available online at the URL
+# "https://github.com/CCSI-Toolset/FOQUS".
+#################################################################################
+"""heat_integration_solver.py
+
+* Solvers for the heat integration plugin's utility and area targeting
+  models (foqus_lib/framework/gams/HeatIntegration.gms)
+* HighsSolver builds the LP transshipment and transportation models from
+  arrays and solves them in-process with the SciPy HiGHS solver, the models
+  are cached at module level so graph copies and new plugin instances
+  reuse them
+* GamsSolver writes the GAMS model input and runs GAMS in a new working
+  directory for each call
+"""
+
+import collections
+import logging
+import os
+import shutil
+import subprocess
+import tempfile
+import threading
+
+import numpy as np
+import scipy.sparse
+from scipy.optimize import linprog
+
+from foqus_lib.framework.foqusException.foqusException import foqusException
+
+_log = logging.getLogger("foqus." + __name__)
+
+
+class HeatIntegrationEx(foqusException):
+    def setCodeStrings(self):
+        self.codeString[0] = "Other exception"
+        self.codeString[1] = "No process streams for heat integration"
+        self.codeString[2] = "Heat integration LP failed"
+        self.codeString[3] = "Unknown heat integration solver"
+        self.codeString[4] = "Failed to run GAMS"
+        self.codeString[5] = "GAMS time limit exceeded"
+        self.codeString[6] = "Couldn't read GAMS output"
+
+
+class HeatIntegrationData(object):
+    """
+    Streams, utilities and parameters of a heat integration problem, the
+    inputs of HeatIntegration.gms.  Process and utility stream data are
+    arrays in the same order as the name lists.
+
+    Attributes:
+        hotNames, hotFCp, hotTin, hotTout: hot process streams
+        coldNames, coldFCp, coldTin, coldTout: cold process streams
+        coldRank: feed water heater order of cold streams, 0 if not a feed
+            water heater (their heat isn't charged as utility)
+        hotUNames, hotUTin, hotUTout, hotUCost: hot utilities
+        coldUNames, coldUTin, coldUTout, coldUCost: cold utilities
+        coldUW, coldUToutA: cooling water indicator and actual outlet
+            temperature of cold utilities, only passed on to GAMS
+        HRAT: heat recovery approach temperature
+        EMAT: exchanger minimum approach temperature
+        corrFac: correction factor for a noncountercurrent flow pattern
+        hHotP, hColdP, hHotU, hColdU: film heat-transfer coefficients of hot
+            and cold process streams and utilities
+        numK: maximum number of temperature interval end points
+    """
+
+    def __init__(self):
+        self.hotNames = []
+        self.coldNames = []
+        self.hotUNames = []
+        self.coldUNames = []
+        for name in [
+            "hotFCp",
+            "hotTin",
+            "hotTout",
+            "coldFCp",
+            "coldTin",
+            "coldTout",
+            "hotUTin",
+            "hotUTout",
+            "hotUCost",
+            "coldUTin",
+            "coldUTout",
+            "coldUCost",
+            "coldUW",
+            "coldUToutA",
+        ]:
+            setattr(self, name, np.zeros(0))
+        self.coldRank = np.zeros(0, dtype=int)
+        self.HRAT = 10.0
+        self.EMAT = 5.0
+        self.corrFac = 1.0
+        self.hHotP = 1.0
+        self.hColdP = 1.0
+        self.hHotU = 1.0
+        self.hColdU = 1.0
+        self.numK = 500
+
+    def addHot(self, name, FCp, Tin, Tout):
+        """Add a hot process stream"""
+        self.hotNames.append(name)
+        self.hotFCp = np.append(self.hotFCp, FCp)
+        self.hotTin = np.append(self.hotTin, Tin)
+        self.hotTout = np.append(self.hotTout, Tout)
+
+    def addCold(self, name, FCp, Tin, Tout, rank=0):
+        """Add a cold process stream, rank > 0 for feed water heaters"""
+        self.coldNames.append(name)
+        self.coldFCp = np.append(self.coldFCp, FCp)
+        self.coldTin = np.append(self.coldTin, Tin)
+        self.coldTout = np.append(self.coldTout, Tout)
+        self.coldRank = np.append(self.coldRank, rank)
+
+    def addHotUtility(self, name, Tin, Tout, cost):
+        """Add a hot utility"""
+        self.hotUNames.append(name)
+        self.hotUTin = np.append(self.hotUTin, Tin)
+        self.hotUTout = np.append(self.hotUTout, Tout)
+        self.hotUCost = np.append(self.hotUCost, cost)
+
+    def addColdUtility(self, name, Tin, Tout, cost, water=1, ToutActual=None):
+        """Add a cold utility"""
+        self.coldUNames.append(name)
+        self.coldUTin = np.append(self.coldUTin, Tin)
+        self.coldUTout = np.append(self.coldUTout, Tout)
+        self.coldUCost = np.append(self.coldUCost, cost)
+        self.coldUW = np.append(self.coldUW, water)
+        self.coldUToutA = np.append(
+            self.coldUToutA, Tout if ToutActual is None else ToutActual
+        )
+
+    def feedWater(self):
+        """Indexes of the feed water heater cold streams in rank order"""
+        feed = np.flatnonzero(self.coldRank > 0)
+        return feed[np.argsort(self.coldRank[feed], kind="stable")]
+
+    def structureKey(self):
+        """
+        Everything but the stream heat capacity flows, problems with the
+        same key have the same temperature intervals and LP structure.
+        """
+        return (
+            tuple(self.hotNames),
+            tuple(self.coldNames),
+            tuple(self.hotUNames),
+            tuple(self.coldUNames),
+            self.hotTin.tobytes(),
+            self.hotTout.tobytes(),
+            self.coldTin.tobytes(),
+            self.coldTout.tobytes(),
+            self.coldRank.tobytes(),
+            self.hotUTin.tobytes(),
+            self.hotUTout.tobytes(),
+            self.hotUCost.tobytes(),
+            self.coldUTin.tobytes(),
+            self.coldUTout.tobytes(),
+            self.coldUCost.tobytes(),
+            self.HRAT,
+            self.EMAT,
+            self.corrFac,
+            self.hHotP,
+            self.hColdP,
+            self.hHotU,
+            self.hColdU,
+            self.numK,
+        )
+
+
+class HeatIntegrationResult(object):
+    """
+    Heat integration solution, the values HeatIntegration.gms writes to
+    GamsOutput.txt.
+
+    Attributes:
+        utilityCost: minimum utility cost ($/hr)
+        area: heat exchanger area target (m^2)
+        hotUtility: array of hot utility consumption, less heat added to
+            feed water (GJ/hr), same order as HeatIntegrationData.hotUNames
+        coldUtility: array of cold utility consumption (GJ/hr)
+        feedHeat: array of heat added to feed water heaters in rank order
+    """
+
+    def __init__(self, utilityCost, area, hotUtility, coldUtility, feedHeat):
+        self.utilityCost = utilityCost
+        self.area = area
+        self.hotUtility = hotUtility
+        self.coldUtility = coldUtility
+        self.feedHeat = feedHeat
+
+
+def _intervals(hi, lo, candidates, numK):
+    """
+    Temperature interval end points, hi, the distinct candidates between lo
+    and hi from high to low and lo.  Like the GAMS loops, candidates must
+    be positive and there are at most numK points.
+    """
+    c = candidates[(candidates < hi) & (candidates > lo) & (candidates > 0)]
+    c = np.unique(c)[::-1][: max(numK - 2, 0)]
+    return np.concatenate(([hi], c, [lo]))
+
+
+def _keepFirst(mask, last=False):
+    """
+    Clear all but the first (or last) True in each row of a 2D bool array
+    """
+    out = np.zeros_like(mask)
+    rows = np.flatnonzero(mask.any(axis=1))
+    if last:
+        cols = mask.shape[1] - 1 - np.argmax(mask[rows, ::-1], axis=1)
+    else:
+        cols = np.argmax(mask[rows], axis=1)
+    out[rows, cols] = True
+    return out
+
+
+def _heatContents(FCp, T, Tout, mask):
+    """Heat content of hot streams in each interval of end points T"""
+    return FCp[:, None] * (T[None, :-1] - np.maximum(T[None, 1:], Tout[:, None])) * mask
+
+
+def _coldContents(FCp, T, Tout, mask):
+    """Heat content of cold streams in each interval of end points T"""
+    return FCp[:, None] * (np.minimum(T[None, :-1], Tout[:, None]) - T[None, 1:]) * mask
+
+
+def _stackMax(*arrays):
+    return np.max(np.concatenate(arrays), initial=-np.inf)
+
+
+def _stackMin(*arrays):
+    return np.min(np.concatenate(arrays), initial=np.inf)
+
+
+class _LPBuilder(object):
+    """
+    Collect the columns and sparse equality rows of an LP.  Variables are
+    added in blocks, one for each True in a mask, and given a -1 index
+    elsewhere so rows can be built with numpy indexing.
+    """
+
+    def __init__(self):
+        self.n = 0
+        self.m = 0
+        self.cost = []
+        self.rows = []
+        self.cols = []
+        self.vals = []
+
+    def variables(self, mask, cost=0.0):
+        idx = np.full(mask.shape, -1, dtype=np.int64)
+        k = int(np.count_nonzero(mask))
+        idx[mask] = np.arange(self.n, self.n + k)
+        self.n += k
+        self.cost.append(np.broadcast_to(cost, mask.shape)[mask])
+        return idx
+
+    def equations(self, mask):
+        """Row numbers for a block of equations, one for each True in mask"""
+        idx = np.full(mask.shape, -1, dtype=np.int64)
+        k = int(np.count_nonzero(mask))
+        idx[mask] = np.arange(self.m, self.m + k)
+        self.m += k
+        return idx
+
+    def add(self, rows, cols, vals=1.0):
+        """Add vals to A[rows, cols] where both indexes are >= 0"""
+        rows, cols, vals = np.broadcast_arrays(rows, cols, vals)
+        keep = (rows >= 0) & (cols >= 0)
+        self.rows.append(rows[keep])
+        self.cols.append(cols[keep])
+        self.vals.append(vals[keep].astype(float))
+
+    def matrices(self):
+        A = scipy.sparse.csr_matrix(
+            (
+                np.concatenate(self.vals + [np.zeros(0)]),
+                (
+                    np.concatenate(self.rows + [np.zeros(0, dtype=np.int64)]),
+                    np.concatenate(self.cols + [np.zeros(0, dtype=np.int64)]),
+                ),
+            ),
+            shape=(self.m, self.n),
+        )
+        return np.concatenate(self.cost + [np.zeros(0)]), A
+
+
+class _HighsModel(object):
+    """
+    The transshipment (utility targeting) and transportation (area
+    targeting) LPs of HeatIntegration.gms for one set of stream
+    temperatures.  Only the right hand sides depend on the stream heat
+    capacity flows, so a model is reused while the temperatures don't
+    change.
+    """
+
+    def __init__(self, d):
+        nH, nC = len(d.hotNames), len(d.coldNames)
+        nS, nW = len(d.hotUNames), len(d.coldUNames)
+        if nH + nC == 0:
+            raise HeatIntegrationEx(1)
+        self.nS = nS
+        self.nW = nW
+        self.feed = d.feedWater()
+        isCF = d.coldRank > 0
+        dT, dTA = d.HRAT, d.EMAT
+        TinH, ToutH, TinC, ToutC = d.hotTin, d.hotTout, d.coldTin, d.coldTout
+        TinS, ToutS, TinW, ToutW = d.hotUTin, d.hotUTout, d.coldUTin, d.coldUTout
+
+        # temperature intervals for utility targeting
+        TH = _intervals(
+            _stackMax(TinH, ToutC + dT),
+            _stackMin(ToutH, TinC + dT),
+            np.concatenate([TinH, TinC + dT, TinS, TinW + dT, ToutH, ToutC + dT]),
+            d.numK,
+        )
+        TC = TH - dT
+        nk = len(TH) - 1
+        top = TH[None, :-1]
+        bottom = TC[None, 1:]
+        Hk = (TinH[:, None] >= top) & (ToutH[:, None] < top)
+        Hkp = TinH[:, None] >= top
+        Ck = (TinC[:, None] <= bottom) & (ToutC[:, None] > bottom)
+        first = np.arange(nk) == 0
+        Sk = _keepFirst(
+            ((TinS[:, None] >= top) & (ToutS[:, None] < top))
+            | ((TinS[:, None] > top) & first)
+        )
+        Skp = TinS[:, None] >= top
+        last = np.arange(nk) == nk - 1
+        Wk = _keepFirst(
+            ((TinW[:, None] <= bottom) & (ToutW[:, None] > bottom))
+            | ((TinW[:, None] < bottom) & last),
+            last=True,
+        )
+        self.TH, self.TC = TH, TC
+        self.Hk, self.Ck = Hk, Ck
+
+        # transshipment model, variables
+        lp = _LPBuilder()
+        QS = lp.variables(np.ones(nS, dtype=bool))
+        QW = lp.variables(np.ones(nW, dtype=bool), d.coldUCost)
+        QSR = lp.variables(np.ones(nS, dtype=bool), d.hotUCost)
+        QHC = lp.variables(Hkp[:, None, :] & Ck[None, :, :])
+        QSC = lp.variables(Skp[:, None, :] & Ck[None, :, :])
+        QHW = lp.variables(Hkp[:, None, :] & Wk[None, :, :])
+        RH = lp.variables(Hkp & ~last)  # residual leaving the last is 0
+        RS = lp.variables(Skp)
+        self.QHC = QHC
+        # HeatBalH(H,K)
+        rH = lp.equations(Hkp)
+        lp.add(rH, RH)
+        lp.add(rH[:, 1:], RH[:, :-1], -1.0)
+        lp.add(rH[:, None, :], QHC)
+        lp.add(rH[:, None, :], QHW)
+        # HeatBalS(S,K)
+        rS = lp.equations(Skp)
+        lp.add(rS, RS)
+        lp.add(rS[:, 1:], RS[:, :-1], -1.0)
+        lp.add(rS[:, None, :], QSC)
+        lp.add(np.where(Sk, rS, -1), QS[:, None], -1.0)
+        # HeatBalC(C,K)
+        rC = lp.equations(Ck)
+        lp.add(rC[None, :, :], QHC)
+        lp.add(rC[None, :, :], QSC)
+        # HeatBalW(W,K)
+        rW = lp.equations(Wk)
+        lp.add(rW[None, :, :], QHW)
+        lp.add(rW, QW[:, None], -1.0)
+        # QSRQS(S)
+        rQSR = lp.equations(np.ones(nS, dtype=bool))
+        lp.add(rQSR, QSR)
+        lp.add(rQSR, QS, -1.0)
+        lp.add(rQSR[:, None, None], np.where(isCF[None, :, None], QSC, -1))
+        self.c1, self.A1 = lp.matrices()
+        self.rows1 = (rH, rC)
+        self.QS, self.QW, self.QSR = QS, QW, QSR
+
+        # temperature intervals for area targeting
+        THA0 = _intervals(
+            _stackMax(TinH, ToutC + dTA, TinS),
+            _stackMin(ToutH, TinC + dTA, TinW + dTA),
+            np.concatenate([TinH, TinC + dTA, TinS, TinW + dTA, ToutH, ToutC + dTA]),
+            d.numK,
+        )
+        deltaT = THA0[:-1] - THA0[1:]
+        deltaTmean = max(3 * deltaT.min(), dTA)
+        Nad = np.ceil(deltaT / deltaTmean).astype(int)
+        THA = [THA0[:1]]
+        for j, n in enumerate(Nad):
+            i = np.arange(1, n + 1)
+            THA.append(THA0[j] + i * (THA0[j + 1] - THA0[j]) / n)
+        THA = np.concatenate(THA)
+        TCA = THA - dTA
+        nka = len(THA) - 1
+        # log mean temperature differences between hot interval k and cold
+        # interval k2 >= k
+        dh = THA[:-1, None] - TCA[None, :-1]
+        dc = THA[1:, None] - TCA[None, 1:]
+        upper = np.triu(np.ones((nka, nka), dtype=bool))
+        with np.errstate(divide="ignore", invalid="ignore"):
+            LMTD = np.where(
+                dh == dc,
+                np.cbrt(dh * dc * (dh + dc) / 2),
+                (dh - dc) / np.log(dh / dc),
+            )
+        LMTD = np.where(upper, LMTD, np.inf)
+        top = THA[None, :-1]
+        bottom = TCA[None, 1:]
+        HAk = (TinH[:, None] >= top) & (ToutH[:, None] < top)
+        CAk = (TinC[:, None] <= bottom) & (ToutC[:, None] > bottom)
+        SAk = _keepFirst((TinS[:, None] >= top) & (ToutS[:, None] < top))
+        WAk = _keepFirst(
+            (TinW[:, None] <= bottom) & (ToutW[:, None] > bottom), last=True
+        )
+        self.THA = THA
+        self.HAk, self.CAk = HAk, CAk
+
+        # transportation model, variables indexed [stream, stream, k, k2]
+        lp = _LPBuilder()
+        area = 1.0 / (d.corrFac * LMTD)
+        hH, hC, hS, hW = 1 / d.hHotP, 1 / d.hColdP, 1 / d.hHotU, 1 / d.hColdU
+        qHC = lp.variables(
+            HAk[:, None, :, None] & CAk[None, :, None, :] & upper,
+            (hH + hC) * area,
+        )
+        qSC = lp.variables(
+            SAk[:, None, :, None] & CAk[None, :, None, :] & upper,
+            np.where(isCF[None, :, None, None], 0.0, (hS + hC) * area),
+        )
+        qHW = lp.variables(
+            HAk[:, None, :, None] & WAk[None, :, None, :] & upper,
+            (hH + hW) * area,
+        )
+        # DisHeatBalH(H,K)
+        rH = lp.equations(HAk)
+        lp.add(rH[:, None, :, None], qHC)
+        lp.add(rH[:, None, :, None], qHW)
+        # DisHeatBalS(S,K)
+        rS = lp.equations(SAk)
+        lp.add(rS[:, None, :, None], qSC)
+        # DisHeatBalC(C,K)
+        rC = lp.equations(CAk)
+        lp.add(rC[None, :, None, :], qHC)
+        lp.add(rC[None, :, None, :], qSC)
+        # DisHeatBalW(W,K)
+        rW = lp.equations(WAk)
+        lp.add(rW[None, :, None, :], qHW)
+        # DisQSRQS(S)
+        rQSR = lp.equations(np.ones(nS, dtype=bool))
+        lp.add(rQSR[:, None, None, None], np.where(isCF[None, :, None, None], qSC, -1))
+        self.c2, self.A2 = lp.matrices()
+        self.rows2 = (rH, rS, rC, rW, rQSR)
+
+    def solve(self, d, timeLimit=None):
+        options = {} if timeLimit is None else {"time_limit": timeLimit}
+        # transshipment model for the minimum utility cost, dual simplex so
+        # the process stream heat to feed water comes from a vertex solution
+        rH, rC = self.rows1
+        QH = _heatContents(d.hotFCp, self.TH, d.hotTout, self.Hk)
+        QC = _coldContents(d.coldFCp, self.TC, d.coldTout, self.Ck)
+        b = np.zeros(self.A1.shape[0])
+        b[rH[rH >= 0]] = QH[rH >= 0]
+        b[rC[rC >= 0]] = QC[rC >= 0]
+        res = linprog(
+            self.c1,
+            A_eq=self.A1,
+            b_eq=b,
+            bounds=(0, None),
+            method="highs",
+            options=options,
+        )
+        if res.status != 0:
+            raise HeatIntegrationEx(2, msg="Utility targeting: " + res.message)
+        x = np.maximum(res.x, 0.0) + 0.0  # no -0.0 or round off below 0
+        QS, QW, QSR = x[self.QS], x[self.QW], x[self.QSR]
+        QHC = np.where(self.QHC >= 0, x[self.QHC], 0.0)
+        feedHeat = QHC.sum(axis=(0, 2))[self.feed]
+        # transportation model for the minimum area, with utilities fixed.
+        # It has a column for each pair of intervals, HiGHS presolve is slow
+        # on it and interior point is faster than simplex.
+        rH, rS, rC, rW, rQSR = self.rows2
+        QHA = _heatContents(d.hotFCp, self.THA, d.hotTout, self.HAk)
+        QCA = _coldContents(d.coldFCp, self.THA - d.EMAT, d.coldTout, self.CAk)
+        b = np.zeros(self.A2.shape[0])
+        b[rH[rH >= 0]] = QHA[rH >= 0]
+        b[rC[rC >= 0]] = QCA[rC >= 0]
+        si, _ = np.nonzero(rS >= 0)
+        b[rS[rS >= 0]] = QS[si]
+        wi, _ = np.nonzero(rW >= 0)
+        b[rW[rW >= 0]] = QW[wi]
+        b[rQSR] = QS - QSR
+        res = linprog(
+            self.c2,
+            A_eq=self.A2,
+            b_eq=b,
+            bounds=(0, None),
+            method="highs-ipm",
+            options=dict(options, presolve=False),
+        )
+        if res.status != 0:
+            raise HeatIntegrationEx(2, msg="Area targeting: " + res.message)
+        return HeatIntegrationResult(
+            utilityCost=float(self.c1 @ x),
+            area=float(res.fun),
+            hotUtility=QSR,
+            coldUtility=QW,
+            feedHeat=feedHeat,
+        )
+
+
+# LP models by HeatIntegrationData.structureKey(), most recently used last,
+# with the last heat capacity flows and result solved with each.  They are
+# module level so they outlive the node copies each flowsheet run makes.
+_cacheLock = threading.Lock()
+_models = collections.OrderedDict()
+_lastResults = {}
+cacheSize = 8
+
+
+def clearCache():
+    """Drop the cached HiGHS LP models and results"""
+    with _cacheLock:
+        _models.clear()
+        _lastResults.clear()
+
+
+class HighsSolver(object):
+    """
+    Solve heat integration problems in-process with the SciPy HiGHS LP
+    solver.  The SciPy interface can't pass a starting basis, so instead
+    the LP models are cached and reused while the stream temperatures are
+    unchanged, and the last result is returned again for the same problem.
+    The cache is shared by all HighsSolver objects.
+    """
+
+    def __init__(self, timeLimit=None):
+        """
+        Args:
+            timeLimit: time limit for each LP solve in seconds or None
+        """
+        self.timeLimit = timeLimit
+        self.model = None  # model used by the last solve
+
+    def solve(self, data):
+        """
+        Solve a heat integration problem
+
+        Args:
+            data: a HeatIntegrationData object
+
+        Returns:
+            HeatIntegrationResult
+        """
+        key = data.structureKey()
+        FCp = (data.hotFCp.tobytes(), data.coldFCp.tobytes())
+        with _cacheLock:
+            model = _models.get(key)
+            if model is not None:
+                _models.move_to_end(key)
+                last = _lastResults.get(key)
+                if last is not None and last[0] == FCp:
+                    self.model = model
+                    return last[1]
+        if model is None:
+            # build outside the lock, models are only read by solve
+            model = _HighsModel(data)
+            with _cacheLock:
+                model = _models.setdefault(key, model)
+                while len(_models) > cacheSize:
+                    oldKey, _ = _models.popitem(last=False)
+                    _lastResults.pop(oldKey, None)
+        self.model = model
+        result = model.solve(data, self.timeLimit)
+        with _cacheLock:
+            if key in _models:
+                _lastResults[key] = (FCp, result)
+        return result
+
+
+class GamsSolver(object):
+    """
+    Solve heat integration problems with GAMS.  Each call writes the model
+    input to a new working directory under gamsDir, so calls can run
+    concurrently, and GAMS is stopped after the time limit.  The working
+    directory is kept for debugging if GAMS fails.
+    """
+
+    gamsFile = "HeatIntegration.gms"
+
+    def __init__(self, gamsDir="gams", timeLimit=None, gams="gams"):
+        """
+        Args:
+            gamsDir: directory for the working directories, the GAMS model is
+                copied from here or from FOQUS if not found there
+            timeLimit: time limit for GAMS in seconds or None
+            gams: GAMS executable
+        """
+        self.gamsDir = gamsDir
+        self.timeLimit = timeLimit
+        self.gams = gams
+
+    def solve(self, data):
+        """
+        Solve a heat integration problem
+
+        Args:
+            data: a HeatIntegrationData object
+
+        Returns:
+            HeatIntegrationResult
+        """
+        os.makedirs(self.gamsDir, exist_ok=True)
+        model = os.path.join(self.gamsDir, self.gamsFile)
+        if not os.path.exists(model):
+            model = os.path.join(
+                os.path.dirname(os.path.dirname(__file__)), "gams", self.gamsFile
+            )
+        wdir = tempfile.mkdtemp(prefix="hi_", dir=self.gamsDir)
+        shutil.copy(model, wdir)
+        with open(os.path.join(wdir, "GamsInput.inc"), "w") as f:
+            writeGamsInput(f, data)
+        try:
+            subprocess.run(
+                [self.gams, self.gamsFile, "lo=0"], cwd=wdir, timeout=self.timeLimit
+            )
+        except subprocess.TimeoutExpired:
+            raise HeatIntegrationEx(5, msg=wdir)
+        except OSError as e:
+            raise HeatIntegrationEx(
+                4,
+                msg="Is GAMS installed?  Are the heat integration GAMS files "
+                "available? {0}".format(e),
+            )
+        try:
+            with open(os.path.join(wdir, "GamsOutput.txt"), "r") as f:
+                result = readGamsOutput(f, data)
+        except (OSError, ValueError) as e:
+            raise HeatIntegrationEx(6, msg="{0}: {1}".format(wdir, e))
+        shutil.rmtree(wdir, ignore_errors=True)
+        return result
+
+
+solvers = {"highs": HighsSolver, "gams": GamsSolver}
+
+
+def makeSolver(name, timeLimit=None):
+    """
+    Create a solver by name, "highs" or "gams"
+    """
+    try:
+        return solvers[name.strip().lower()](timeLimit=timeLimit)
+    except KeyError:
+        raise HeatIntegrationEx(3, msg=name)
+
+
+def readGamsOutput(f, data):
+    """
+    Read the results HeatIntegration.gms writes to GamsOutput.txt
+    """
+    values = [float(line) for line in f if line.strip()]
+    nS, nW = len(data.hotUNames), len(data.coldUNames)
+    nF = len(data.feedWater())
+    if len(values) < 2 + nS + nW + nF:
+        raise ValueError("Expected {0} values".format(2 + nS + nW + nF))
+    return HeatIntegrationResult(
+        utilityCost=values[0],
+        area=values[1],
+        hotUtility=np.array(values[2 : 2 + nS]),
+        coldUtility=np.array(values[2 + nS : 2 + nS + nW]),
+        feedHeat=np.array(values[2 + nS + nW : 2 + nS + nW + nF]),
+    )
+
+
+def _writeSet(f, title, names, head="/\n"):
+    f.write(title + "\n")
+    f.write(head)
+    for name in names:
+        f.write("\t" + name + "\n")
+    f.write("/;\n\n")
+
+
+def _writeParameter(f, title, names, values, offDigit=False):
+    f.write(title + "\n")
+    f.write("/\n")
+    if offDigit:
+        # Ignoring trailing digits in a number
+        f.write("$offDigit\n")
+    for name, value in zip(names, values):
+        f.write("\t" + name + "\t" + str(value) + "\n")
+    f.write("/;\n\n")
+
+
+def _writeScalar(f, title, value):
+    f.write(title + "\n")
+    f.write("/\n")
+    f.write("\t" + str(value) + "\n")
+    f.write("/;\n\n")
+
+
+def writeGamsInput(f, data):
+    """
+    Write the GamsInput.inc file included by HeatIntegration.gms
+    """
+    d = data
+    hot = d.hotNames
+    cold = d.coldNames
+    feed = [cold[i] for i in range(len(cold)) if d.coldRank[i] > 0]
+    # Comments
+    f.write("* Input parameters \n\n")
+    _writeSet(f, "Set H  hot process streams", hot, head="/ \n")
+    _writeSet(f, "Set C  cold process streams", cold)
+    for title, names, values in [
+        ("Parameter FCpH(H)  F*Cp for hot process streams", hot, d.hotFCp),
+        ("Parameter FCpC(C)  F*Cp for cold process streams", cold, d.coldFCp),
+        (
+            "Parameter TinH(H)  inlet temperature of hot process streams",
+            hot,
+            d.hotTin,
+        ),
+        (
+            "Parameter ToutH(H)  outlet temperature of hot process streams",
+            hot,
+            d.hotTout,
+        ),
+        (
+            "Parameter TinC(C)  inlet temperature of cold process streams",
+            cold,
+            d.coldTin,
+        ),
+        (
+            "Parameter ToutC(C)  outlet temperature of cold process streams",
+            cold,
+            d.coldTout,
+        ),
+    ]:
+        _writeParameter(f, title, names, values.tolist(), offDigit=True)
+    hotU = d.hotUNames
+    coldU = d.coldUNames
+    _writeSet(f, "Set S  hot utility streams", hotU)
+    _writeSet(f, "Set W  cold utility streams", coldU)
+    for title, names, values in [
+        (
+            "Parameter TinS(S)  inlet temperature of hot utility streams",
+            hotU,
+            d.hotUTin,
+        ),
+        (
+            "Parameter ToutS(S)  outlet temperature of hot utility streams",
+            hotU,
+            d.hotUTout,
+        ),
+        (
+            "Parameter TinW(W)  inlet temperature of cold utility streams",
+            coldU,
+            d.coldUTin,
+        ),
+        (
+            "Parameter ToutW(W)  outlet temperature of cold utility streams",
+            coldU,
+            d.coldUTout,
+        ),
+        (
+            "Parameter WW(W)  whether the cold utility is cooling water",
+            coldU,
+            d.coldUW,
+        ),
+        (
+            "Parameter ToutWA(W)  actual outlet temperature of cold utility",
+            coldU,
+            d.coldUToutA,
+        ),
+        ("Parameter CS(S)  cost of hot utilities", hotU, d.hotUCost),
+        ("Parameter CW(W)  cost of cold utilities", coldU, d.coldUCost),
+    ]:
+        _writeParameter(f, title, names, values.tolist())
+    _writeSet(f, "Set K  possible temperature intervals", ["1*" + str(d.numK)])
+    _writeScalar(f, "Scalar dT  heat recovery approach temperature (HRAT)", d.HRAT)
+    _writeScalar(f, "Scalar dTA  exchanger minimum approach temperature (EMAT)", d.EMAT)
+    _writeScalar(
+        f,
+        "Scalar Ft  correction factor for a noncountercurrent flow pattern",
+        d.corrFac,
+    )
+    # stream film heat-transfer coefficient
+    f.write(
+        "Parameter hH(H)  stream film heat-transfer coefficient for hot process streams;\n"
+    )
+    f.write(
+        "Parameter hC(C)  stream film heat-transfer coefficient for cold process streams;\n"
+    )
+    f.write(
+        "Parameter hS(S)  stream film heat-transfer coefficient for hot utilities;\n"
+    )
+    f.write(
+        "Parameter hW(W)  stream film heat-transfer coefficient for cold utilities;\n"
+    )
+    f.write("\n")
+    f.write("hH(H) = " + str(d.hHotP) + ";\n")
+    f.write("hC(C) = " + str(d.hColdP) + ";\n")
+    f.write("hS(S) = " + str(d.hHotU) + ";\n")
+    f.write("hW(W) = " + str(d.hColdU) + ";\n")
+    f.write("\n")
+    # define set for feed water heaters
+    f.write("Set CR(C)  set of cold streams except feed water streams;\n\n")
+    f.write("    CR(C) = yes;\n")
+    for feedC in feed:
+        f.write('    CR("' + feedC + '") = no;\n')
+    f.write("\n")
+    f.write("Set CF(C)  set of feed water streams;\n\n")
+    f.write("    CF(C) = no;\n")
+    for feedC in feed:
+        f.write('    CF("' + feedC + '") = yes;\n')
+    f.write("\n")
+    f.write("Parameter RankCF(C)  order of feed water streams;\n\n")
+    f.write("    RankCF(C) = 0;\n")
+    for i in range(len(cold)):
+        if d.coldRank[i] > 0:
+            f.write(
+                '    RankCF("' + cold[i] + '") = ' + str(int(d.coldRank[i])) + ";\n"
+            )
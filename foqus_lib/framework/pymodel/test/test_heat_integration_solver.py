@@ -0,0 +1,211 @@
+#################################################################################
+# FOQUS Copyright (c) 2012 - 2026, by the software owners: Oak Ridge Institute
+# for Science and Education (ORISE), TRIAD National Security, LLC., Lawrence
+# Livermore National Security, LLC., The Regents of the University of
+# California, through Lawrence Berkeley National Laboratory, Battelle Memorial
+# Institute, Pacific Northwest Division through Pacific Northwest National
+# Laboratory, Carnegie Mellon University, West Virginia University, Boston
+# University, the Trustees of Princeton University, The University of Texas at
+# Austin, URS Energy & Construction, Inc., et al.  All rights reserved.
+#
+# Please see the file LICENSE.md for full copyright and license information,
+# respectively. This file is also available online at the URL
+# "https://github.com/CCSI-Toolset/FOQUS".
+#################################################################################
+import json
+import os
+import stat
+import sys
+import tempfile
+import types
+import unittest
+from pathlib import Path
+
+import numpy as np
+
+from foqus_lib.framework.graph.nodeVars import NodeVarList
+from foqus_lib.framework.pymodel.heat_integration import pymodel_pg
+from foqus_lib.framework.pymodel.heat_integration_solver import (
+    GamsSolver,
+    HeatIntegrationData,
+    HeatIntegrationEx,
+    HighsSolver,
+    clearCache,
+    makeSolver,
+)
+
+# results of GAMS runs saved in the flowsheet
+EXAMPLE = (
+    Path(__file__).parents[4]
+    / "examples"
+    / "tutorial_files"
+    / "Heat_Integration"
+    / "Methanol_HI.foqus"
+)
+
+
+def makeData(HRAT=10.0, EMAT=10.0):
+    """Utilities and coefficients used by the heat integration plugin"""
+    d = HeatIntegrationData()
+    d.addHotUtility("IP_Steam", 230, 229, 8.04)
+    d.addHotUtility("LP_Steam", 164, 163, 6.25)
+    d.addColdUtility("Cooling_Water", 20, 21, 0.21, 1, 30)
+    d.HRAT = HRAT
+    d.EMAT = EMAT
+    d.corrFac = 0.81
+    d.hHotP = d.hColdP = 7.2e-4
+    d.hHotU = 2.16e-2
+    d.hColdU = 1.35e-2
+    return d
+
+
+class TestHighsSolver(unittest.TestCase):
+    """Test cases for the in-process heat integration LPs"""
+
+    def test_matched_streams(self):
+        # the cold stream is the hot stream 10 C lower, no utilities and
+        # all exchange is vertical at the minimum approach temperature
+        d = makeData()
+        d.addHot("H1", 1.0, 200, 50)
+        d.addCold("C1", 1.0, 40, 190)
+        r = HighsSolver().solve(d)
+        self.assertAlmostEqual(r.utilityCost, 0.0)
+        np.testing.assert_allclose(r.hotUtility, [0, 0], atol=1e-9)
+        np.testing.assert_allclose(r.coldUtility, [0], atol=1e-9)
+        self.assertAlmostEqual(r.area, 150 * 2 / 7.2e-4 / (0.81 * 10), places=6)
+
+    def test_utility_targets(self):
+        # hot 100 -> 40 can only heat the cold stream up to 90 C, the last
+        # 30 GJ/hr come from the cheaper low pressure steam
+        d = makeData()
+        d.addHot("H1", 1.0, 100, 40)
+        d.addCold("C1", 1.0, 30, 120)
+        r = HighsSolver().solve(d)
+        np.testing.assert_allclose(r.hotUtility, [0, 30], atol=1e-9)
+        np.testing.assert_allclose(r.coldUtility, [0], atol=1e-9)
+        self.assertAlmostEqual(r.utilityCost, 6.25 * 30)
+        self.assertEqual(len(r.feedHeat), 0)
+        # steam to feed water isn't charged, hot process heat goes to C1
+        d.addCold("FH2", 1.0, 50, 60, rank=2)
+        d.addCold("FH1", 1.0, 35, 50, rank=1)
+        r = HighsSolver().solve(d)
+        self.assertAlmostEqual(r.utilityCost, 6.25 * 30)
+        np.testing.assert_allclose(r.feedHeat, [0, 0], atol=1e-9)
+
+    def test_reuse(self):
+        clearCache()
+        d = makeData()
+        d.addHot("H1", 1.0, 100, 40)
+        d.addCold("C1", 1.0, 30, 120)
+        solver = HighsSolver()
+        r = solver.solve(d)
+        model = solver.model
+        self.assertIs(solver.solve(d), r)
+        # a new solver, as in a copied plugin node, shares the cache
+        solver = HighsSolver()
+        self.assertIs(solver.solve(d), r)
+        self.assertIs(solver.model, model)
+        d.hotFCp = d.hotFCp * 0.5
+        r2 = solver.solve(d)
+        self.assertIs(solver.model, model)
+        self.assertAlmostEqual(r2.utilityCost, 6.25 * 60)
+        d.coldTout = d.coldTout + 10
+        solver.solve(d)
+        self.assertIsNot(solver.model, model)
+        d.coldTout = d.coldTout - 10
+        solver.solve(d)
+        self.assertIs(solver.model, model)
+
+    def test_errors(self):
+        with self.assertRaises(HeatIntegrationEx) as cm:
+            HighsSolver().solve(makeData())
+        self.assertEqual(cm.exception.code, 1)
+        with self.assertRaises(HeatIntegrationEx) as cm:
+            makeSolver("cplex")
+        self.assertEqual(cm.exception.code, 3)
+        self.assertIsInstance(makeSolver("GAMS", timeLimit=5), GamsSolver)
+
+    def test_plugin_matches_gams(self):
+        fs = json.loads(EXAMPLE.read_text())["flowsheet"]
+        inputs, outputs = NodeVarList(), NodeVarList()
+        inputs.loadDict(fs["input"])
+        outputs.loadDict(fs["output"])
+        node = types.SimpleNamespace(
+            gr=types.SimpleNamespace(input=inputs, output=outputs), calcError=-1
+        )
+        model = pymodel_pg()
+        for name, var in inputs["HI"].items():
+            model.inputs[name].value = var.value
+        model.setNode(node)
+        model.run()
+        self.assertEqual(node.calcError, -1)
+        for name in [
+            "IP_Steam.Consumption",
+            "LP_Steam.Consumption",
+            "Cooling_Water.Consumption",
+            "Heat.Exchanger.Area",
+        ]:
+            # GAMS writes 4 decimal places
+            self.assertAlmostEqual(
+                model.outputs[name].value, outputs["HI"][name].value, delta=1e-4
+            )
+        self.assertAlmostEqual(
+            model.outputs["Utility.Cost"].value,
+            outputs["HI"]["Utility.Cost"].value,
+            delta=1e-4 * 8000 / 1e6,
+        )
+
+
+@unittest.skipIf(sys.platform == "win32", "uses a shell script for GAMS")
+class TestGamsSolver(unittest.TestCase):
+    """Test running GAMS in separate working directories"""
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.gamsDir = os.path.join(self.tmp.name, "gams")
+        self.data = makeData()
+        self.data.addHot("H1", 1.0, 100, 40)
+        self.data.addCold("C1", 1.0, 30, 120)
+        self.data.addCold("FH1", 2.0, 34, 64.7, rank=1)
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def fakeGams(self, script):
+        path = os.path.join(self.tmp.name, "gams.sh")
+        with open(path, "w") as f:
+            f.write("#!/bin/sh\n" + script)
+        os.chmod(path, os.stat(path).st_mode | stat.S_IEXEC)
+        return path
+
+    def test_run(self):
+        gams = self.fakeGams(
+            "test -f HeatIntegration.gms || exit 1\n"
+            'grep -q "RankCF(\\"FH1\\") = 1;" GamsInput.inc || exit 1\n'
+            "printf '187.5\\n21597.1\\n0.0\\n30.0\\n0.0\\n61.4\\n' > GamsOutput.txt\n"
+        )
+        r = GamsSolver(gamsDir=self.gamsDir, gams=gams).solve(self.data)
+        self.assertEqual(r.utilityCost, 187.5)
+        self.assertEqual(r.area, 21597.1)
+        self.assertEqual(r.hotUtility.tolist(), [0.0, 30.0])
+        self.assertEqual(r.coldUtility.tolist(), [0.0])
+        self.assertEqual(r.feedHeat.tolist(), [61.4])
+        # the working directory is removed after a successful run
+        self.assertEqual(os.listdir(self.gamsDir), [])
+
+    def test_failures(self):
+        solver = GamsSolver(gamsDir=self.gamsDir, gams=self.fakeGams("exit 3\n"))
+        with self.assertRaises(HeatIntegrationEx) as cm:
+            solver.solve(self.data)
+        self.assertEqual(cm.exception.code, 6)
+        solver.gams = self.fakeGams("sleep 10\n")
+        solver.timeLimit = 0.2
+        with self.assertRaises(HeatIntegrationEx) as cm:
+            solver.solve(self.data)
+        self.assertEqual(cm.exception.code, 5)
+        solver.gams = os.path.join(self.tmp.name, "missing")
+        with self.assertRaises(HeatIntegrationEx) as cm:
+            solver.solve(self.data)
+        self.assertEqual(cm.exception.code, 4)
+        # failed runs are kept for debugging
+        self.assertEqual(len(os.listdir(self.gamsDir)), 3)
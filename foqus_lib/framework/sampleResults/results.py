@@ -19,18 +19,160 @@
 John Eslick, Carnegie Mellon University, 2014
 """
 
+import ast
 import datetime
+import functools
 import json
 import logging
 import re
-from collections import OrderedDict
+from collections import Counter, OrderedDict
 from io import StringIO
 
 import numpy as np
 import pandas as pd
 
+try:
+    import numexpr
+
+    numexpr_available = True
+except ImportError:
+    numexpr_available = False
+
 _log = logging.getLogger("foqus.{}".format(__name__))
 
+# numpy functions that work element by element, so an expression only using
+# these gives the same value for a row no matter what other rows are present.
+# The values are the numexpr names, None if numexpr doesn't have it.
+_ROW_FUNCTIONS = {
+    "abs": "abs",
+    "absolute": "abs",
+    "sqrt": "sqrt",
+    "exp": "exp",
+    "expm1": "expm1",
+    "log": "log",
+    "log10": "log10",
+    "log1p": "log1p",
+    "sin": "sin",
+    "cos": "cos",
+    "tan": "tan",
+    "arcsin": "arcsin",
+    "arccos": "arccos",
+    "arctan": "arctan",
+    "arctan2": "arctan2",
+    "sinh": "sinh",
+    "cosh": "cosh",
+    "tanh": "tanh",
+    "where": "where",
+    "isnan": None,
+    "isfinite": None,
+    "isinf": None,
+    "logical_and": None,
+    "logical_or": None,
+    "logical_not": None,
+}
+
+_ROW_NODES = (
+    ast.Expression,
+    ast.Compare,
+    ast.BinOp,
+    ast.UnaryOp,
+    ast.Constant,
+    ast.Load,
+    ast.operator,
+    ast.unaryop,
+    ast.cmpop,
+)
+
+
+class compiledExpr(object):
+    """
+    A compiled filter or calculated column expression.  Columns are
+    referenced in expressions as c("column name").
+
+    rowwise is True if the expression is known to be evaluated row by row,
+    so it can be evaluated on just the rows appended to a table.  If
+    numexpr can evaluate the expression, ne_expr is the numexpr text and
+    ne_cols the columns for its variables _c0, _c1, ...
+    """
+
+    def __init__(self, expr):
+        tree = ast.parse(expr.strip(), mode="eval")
+        self.code = compile(tree, "<results expression>", "eval")
+        self.ne_expr = None
+        self.ne_cols = []
+        self.rowwise = True
+        numexpr_ok = True
+        col_names = set()  # the c("name") constants
+        for node in ast.walk(tree):
+            if isinstance(node, ast.Call):
+                name = self._call_name(node)
+                if name == "c":
+                    if (
+                        len(node.args) == 1
+                        and isinstance(node.args[0], ast.Constant)
+                        and isinstance(node.args[0].value, str)
+                    ):
+                        col_names.add(id(node.args[0]))
+                    else:
+                        self.rowwise = False
+                elif name in _ROW_FUNCTIONS and not node.keywords:
+                    numexpr_ok = numexpr_ok and _ROW_FUNCTIONS[name] is not None
+                else:
+                    self.rowwise = False
+            elif isinstance(node, ast.Constant) and id(node) not in col_names:
+                numexpr_ok = numexpr_ok and not isinstance(node.value, (str, bytes))
+            elif isinstance(node, ast.Name):
+                if node.id not in ("c", "abs", "np", "numpy"):
+                    self.rowwise = False
+            elif isinstance(node, ast.Attribute):
+                if not (
+                    isinstance(node.value, ast.Name)
+                    and node.value.id in ("np", "numpy")
+                ):
+                    self.rowwise = False
+            elif not isinstance(node, _ROW_NODES):
+                self.rowwise = False
+        if self.rowwise and numexpr_ok:
+            self.ne_expr = ast.unparse(self._numexpr_tree(tree))
+
+    @staticmethod
+    def _call_name(node):
+        """Name of a function call c(), abs(), or np.<name>(), else None"""
+        f = node.func
+        if isinstance(f, ast.Name) and f.id in ("c", "abs"):
+            return f.id
+        if (
+            isinstance(f, ast.Attribute)
+            and isinstance(f.value, ast.Name)
+            and f.value.id in ("np", "numpy")
+        ):
+            return f.attr
+        return None
+
+    def _numexpr_tree(self, tree):
+        """Replace c("name") with _c<i> and np.f() with f() for numexpr"""
+        cols = self.ne_cols
+
+        class _toNumexpr(ast.NodeTransformer):
+            def visit_Call(self, node):
+                self.generic_visit(node)
+                name = compiledExpr._call_name(node)
+                if name == "c":
+                    col = node.args[0].value
+                    if col not in cols:
+                        cols.append(col)
+                    return ast.Name(id="_c{}".format(cols.index(col)), ctx=ast.Load())
+                node.func = ast.Name(id=_ROW_FUNCTIONS[name], ctx=ast.Load())
+                return node
+
+        return _toNumexpr().visit(tree)
+
+
+@functools.lru_cache(maxsize=256)
+def compile_expr(expr):
+    """Return the compiledExpr for an expression string, cached by text"""
+    return compiledExpr(expr)
+
 
 class dataFilter(object):
     def __init__(self, no_results=False):
@@ -173,6 +315,135 @@ def increment_name(name, exnames):
     return "".join([name, "_", str(index).zfill(4)])
 
 
+def _split_suffix(name):
+    """
+    Split a name into the base name and number of an incremented name
+    <base>_<number>, return (None, None) if it doesn't have a number suffix.
+    """
+    if not isinstance(name, str):
+        return None, None
+    base, sep, tail = name.rpartition("_")
+    if sep and tail.isascii() and tail.isdigit():
+        return base, int(tail)
+    return None, None
+
+
+class nameIndex(object):
+    """
+    A multiset of names that also keeps the numeric suffixes used with each
+    base name, so the name increment_name() would generate is found without
+    searching all the names.
+    """
+
+    def __init__(self, names=()):
+        self.counts = Counter()
+        self.suffixes = {}  # base name: Counter of suffix numbers
+        self.maxSuffix = {}  # base name: largest suffix number
+        for name in names:
+            self.add(name)
+
+    def __contains__(self, name):
+        return self.counts.get(name, 0) > 0
+
+    def add(self, name):
+        self.counts[name] += 1
+        base, i = _split_suffix(name)
+        if base is not None:
+            self.suffixes.setdefault(base, Counter())[i] += 1
+            if i > self.maxSuffix.get(base, -1):
+                self.maxSuffix[base] = i
+
+    def remove(self, name):
+        if name not in self:
+            return
+        self.counts[name] -= 1
+        if self.counts[name] == 0:
+            del self.counts[name]
+        base, i = _split_suffix(name)
+        if base is not None:
+            suffixes = self.suffixes[base]
+            suffixes[i] -= 1
+            if suffixes[i] == 0:
+                del suffixes[i]
+                if not suffixes:
+                    del self.suffixes[base]
+                    del self.maxSuffix[base]
+                elif i == self.maxSuffix[base]:
+                    self.maxSuffix[base] = max(suffixes)
+
+    def increment(self, name):
+        """The same as increment_name(name, names)"""
+        if name not in self:
+            return name
+        index = self.maxSuffix.get(name, 0) + 1
+        return "".join([name, "_", str(index).zfill(4)])
+
+
+# Results column dtypes by column group, see column_group()
+_CATEGORY_GROUPS = ("label", "setting")
+_FLOAT_GROUPS = ("input", "output", "calc", "solution_time")
+_INT_GROUPS = ("err", "node_err")
+_NUMERIC_INFERRED = ("floating", "integer", "mixed-integer-float", "empty")
+_INT32 = np.iinfo(np.int32)
+
+
+def column_group(col):
+    """
+    Return the group a results column belongs to: label (set and result),
+    time, solution_time, err (graph error), or the column name prefix
+    input, output, setting, node_err, turb or calc.
+    """
+    if col in ("set", "result"):
+        return "label"
+    return str(col).split(".", 1)[0]
+
+
+def compact_series(col, s):
+    """
+    Return the values s of results column col converted to the compact dtype
+    of the column's group, or s if the values don't fit it.  Inputs, outputs,
+    calculated columns and solution time are float64, error codes int32 if
+    they are all integers (float64 if some are missing or stored as floats),
+    and set, result and node settings are categorical.
+    """
+    group = column_group(col)
+    if group in _CATEGORY_GROUPS:
+        if isinstance(s.dtype, pd.CategoricalDtype):
+            return s
+        # object categories, appending to them is faster than to strings
+        c = pd.Categorical(s)
+        dtype = pd.CategoricalDtype(c.categories.astype(object))
+        return pd.Series(
+            pd.Categorical.from_codes(c.codes, dtype=dtype), index=s.index, name=s.name
+        )
+    if group not in _FLOAT_GROUPS + _INT_GROUPS:
+        return s
+    inferred = pd.api.types.infer_dtype(s, skipna=False)
+    if group in _INT_GROUPS and inferred == "integer" and s.dtype != np.int32:
+        v = s.to_numpy()
+        if np.all((v >= _INT32.min) & (v <= _INT32.max)):
+            return s.astype(np.int32)
+    if s.dtype.kind == "f" or s.dtype == np.int32:
+        return s
+    if s.dtype.kind in "iu" or inferred in _NUMERIC_INFERRED:
+        return s.astype(np.float64)
+    return s
+
+
+def _missing(v):
+    return pd.api.types.is_scalar(v) and pd.isna(v)
+
+
+def _fits_dtype(v, dtype):
+    """True if value v can be stored in a numeric column of dtype"""
+    if isinstance(v, (bool, np.bool_)) or not isinstance(v, (int, float, np.number)):
+        return False
+    if dtype.kind == "f":
+        return True
+    info = np.iinfo(dtype)
+    return not np.isnan(v) and v == int(v) and info.min <= v <= info.max
+
+
 def search_term_list(st):
     st = st.strip()
     if st.startswith("["):
@@ -222,6 +493,8 @@ class Results(pd.DataFrame):
             self["set"] = []
             self["result"] = []
             self._filter_mask = None
+            self._filter_cache = None  # table state the filter was applied to
+            self._name_index = None  # set and result names, see names_index()
             self.hidden_cols = None  # avoid set column from attribute warn
             self.hidden_cols = []
             self.calculated_columns = None  # avoid set column from attribute warn
@@ -230,10 +503,151 @@ class Results(pd.DataFrame):
         if "time" not in self.columns:
             self["time"] = []
 
-        self["set"] = self["set"].astype(str)
-        self["result"] = self["result"].astype(str)
-        self["time"] = self["time"].astype(str)
-        self[self.columns[-1]] = self[self.columns[-1]].astype(object)
+        self["set"] = compact_series("set", self["set"])
+        self["result"] = compact_series("result", self["result"])
+        if self["time"].dtype != object:
+            self["time"] = self["time"].astype(object)
+
+    def compact_columns(self, columns=None):
+        """
+        Convert columns, all by default, to the compact dtype of their
+        column group (see compact_series).
+        """
+        if columns is None:
+            columns = list(self.columns)
+        changed = False
+        for c in columns:
+            s = self[c]
+            cs = compact_series(c, s)
+            if cs is not s:
+                self[c] = cs
+                changed = True
+        if changed:
+            # setting columns leaves one block per column, put columns of the
+            # same dtype back into one block so rows can be added quickly
+            self._consolidate_inplace()
+
+    def memory_report(self):
+        """
+        Return a data frame with the number of columns, the dtypes, and the
+        bytes used, including the contents of object columns, for each column
+        group, with a total row.
+        """
+        usage = self.memory_usage(deep=True, index=False)
+        report = OrderedDict()
+        for c, dtype, nbytes in zip(self.columns, self.dtypes, usage):
+            r = report.setdefault(
+                column_group(c), {"columns": 0, "dtypes": set(), "bytes": 0}
+            )
+            r["columns"] += 1
+            r["dtypes"].add(str(dtype))
+            r["bytes"] += int(nbytes)
+        df = pd.DataFrame.from_dict(report, orient="index")
+        df["dtypes"] = [", ".join(sorted(d)) for d in df["dtypes"]]
+        df.loc["total"] = [df["columns"].sum(), "", df["bytes"].sum()]
+        return df
+
+    def set_row(self, row, values):
+        """
+        Set values of the row with index label row from a dict of column
+        name: value, adding the row and any new columns.  Column dtypes are
+        kept where the values fit and new columns get their compact dtype.
+        """
+        new_row = row not in self.index
+        names = self._name_index is not None and (
+            new_row or "set" in values or "result" in values
+        )
+        if names and not new_row:
+            self._unindex_rows([row])
+        new_cols = [c for c in values if c not in self.columns]
+        for c in new_cols:
+            # object until the values are in, then compacted
+            self[c] = pd.Series(np.nan, index=self.index, dtype=object)
+        dtypes = self.dtypes
+        for c, v in values.items():
+            dtype = dtypes[c]
+            if isinstance(dtype, pd.CategoricalDtype) and not _missing(v):
+                if v not in dtype.categories:
+                    self._add_category(c, v)
+        if not new_row:
+            for c, v in values.items():
+                try:
+                    self.loc[row, c] = v
+                except (TypeError, ValueError):
+                    self[c] = self[c].astype(object)
+                    self.loc[row, c] = v
+            # edited rows may no longer match the filter
+            self._filter_cache = None
+        else:
+            # appending a row with .loc would lose the column dtypes
+            self._update_inplace(pd.concat([self, self._row_frame(row, values)]))
+        if new_cols:
+            self.compact_columns(new_cols)
+        if names:
+            self._index_names(self._row_names([row]))
+
+    def _add_category(self, c, v):
+        """
+        Add v to the categories of column c.  Rebuilding from the codes is
+        much faster than cat.add_categories for columns like result with a
+        category for nearly every row.
+        """
+        values = self[c].array
+        categories = np.append(values.categories.to_numpy(dtype=object), [v])
+        dtype = pd.CategoricalDtype(pd.Index(categories, dtype=object))
+        self[c] = pd.Categorical.from_codes(values.codes, dtype=dtype)
+
+    def names_index(self):
+        """
+        Return (set names, {set name: result names}) as nameIndex objects,
+        built from the table the first time and then kept up to date as rows
+        are added, edited and deleted.
+        """
+        if self._name_index is None:
+            self._name_index = (nameIndex(), {})
+            self._index_names(zip(self["set"], self["result"]))
+        return self._name_index
+
+    def _row_names(self, idxs):
+        return [(self.at[i, "set"], self.at[i, "result"]) for i in idxs]
+
+    def _index_names(self, names):
+        sets, results = self._name_index
+        for s, r in names:
+            s = None if _missing(s) else s
+            sets.add(s)
+            results.setdefault(s, nameIndex()).add(r)
+
+    def _unindex_rows(self, idxs):
+        if self._name_index is None:
+            return
+        sets, results = self._name_index
+        for s, r in self._row_names(idxs):
+            s = None if _missing(s) else s
+            sets.remove(s)
+            if s in results:
+                results[s].remove(r)
+
+    def unique_result_name(self, set_name, result_name):
+        """Return result_name made unique within the set, see increment_name"""
+        names = self.names_index()[1].get(set_name)
+        return result_name if names is None else names.increment(result_name)
+
+    def _row_frame(self, row, values):
+        """A one row data frame of values with the column dtypes of self"""
+        data = {}
+        for c, dtype in zip(self.columns, self.dtypes):
+            v = values.get(c, np.nan)
+            if isinstance(dtype, pd.CategoricalDtype):
+                data[c] = pd.Categorical([v], dtype=dtype)
+            elif dtype.kind in "iuf" and _fits_dtype(v, dtype):
+                data[c] = np.array([v], dtype=dtype)
+            elif dtype.kind in "iu" and _missing(v):
+                data[c] = np.array([np.nan])
+            else:
+                data[c] = np.empty(1, dtype=object)
+                data[c][0] = v
+        return pd.DataFrame(data, index=[row])
 
     def row_to_flow(self, fs, row, filtered=True):
         idx = list(self.get_indexes(filtered=filtered))[row]
@@ -261,19 +675,43 @@ class Results(pd.DataFrame):
         c = "calc.{}".format(name)
         if c not in self.columns:
             self[c] = [np.nan] * self.count_rows(filtered=False)
+        self._filter_cache = None
 
     def calculate_columns(self):
-        def c(key):
-            return self.filter_term(key)
-
         for key in self.calculated_columns:
-            self["calc." + key] = eval(self.calculated_columns[key])
+            self["calc." + key] = self.evaluate_expr(self.calculated_columns[key])
+        self._filter_cache = None
+
+    def calculate_filter_expr(self, expr, start=0):
+        """
+        Return a boolean array with the value of the filter expression for
+        each row from row number start on.
+        """
+        mask = np.asarray(self.evaluate_expr(expr, start=start), dtype=bool)
+        return np.broadcast_to(mask, (len(self.index) - start,)).copy()
+
+    def evaluate_expr(self, expr, start=0):
+        """
+        Evaluate a filter or calculated column expression for the rows from
+        row number start on.  The expression is compiled once, and if
+        numexpr is available and can handle the expression it is used.
+        """
+        ce = compile_expr(expr)
+        if numexpr_available and ce.ne_expr is not None:
+            cols = {
+                "_c{}".format(i): self.filter_term(col, start)
+                for i, col in enumerate(ce.ne_cols)
+            }
+            if all(a.dtype.kind in "biuf" for a in cols.values()):
+                try:
+                    return numexpr.evaluate(ce.ne_expr, local_dict=cols)
+                except Exception:
+                    _log.debug("numexpr could not evaluate {}".format(expr))
 
-    def calculate_filter_expr(self, expr):
         def c(key):
-            return self.filter_term(key)
+            return self.filter_term(key, start)
 
-        return np.array(eval(expr), dtype=bool)
+        return eval(ce.code, globals(), {"c": c, "self": self})
 
     def delete_calculation(self, name):
         try:
@@ -287,31 +725,93 @@ class Results(pd.DataFrame):
 
     def delete_rows(self, rows, filtered=True):
         idxs = [list(self.get_indexes(filtered=filtered))[i] for i in rows]
+        self._unindex_rows(idxs)
         self.drop(idxs, axis=0, inplace=True)
-        self.update_filter_indexes()
+        self.update_filter_indexes(full=True)
 
     def edit_set_name(self, name, rows, filtered=True):
         idxs = [list(self.get_indexes(filtered=filtered))[i] for i in rows]
         for idx in idxs:
-            self.loc[idx, "set"] = name
-        self.update_filter_indexes()
+            self.set_row(idx, {"set": name})
+        self.update_filter_indexes(full=True)
 
     def incrementSetName(self, name):
-        return increment_name(name, list(self["set"]))
+        return self.names_index()[0].increment(name)
 
     def set_filter(self, fltr=None):
         """
         Set the current filter name, can be None for no filter
         """
         self._current_filter = fltr
-        self.update_filter_indexes()
+        self.update_filter_indexes(full=True)
 
-    def update_filter_indexes(self):
+    def update_filter_indexes(self, full=False):
         """
         Apply the filter to the data to get a list of indexes of data rows that
-        match filter.
+        match filter.  If the filter is unchanged and rows have only been
+        appended since the last update, just the new rows are sorted in and
+        filtered, unless full is True.
+        """
+        key = self._filter_key()
+        cache = self._filter_cache
+        if full or cache is None or cache["key"] != key or not self._append_rows(cache):
+            self._filter_indexes, self._filter_mask = self.filter_indexes()
+        self._filter_cache = {"key": key, "index": self.index}
+
+    def _filter_key(self):
+        """The filter settings the filter indexes depend on"""
+        fltr = self.current_filter()
+        f = self.filters.get(fltr) if fltr is not None else None
+        if f is None:
+            return (fltr,)
+        return (fltr, f.filterTerm, f.sortTerm, f.no_results)
+
+    def _append_rows(self, cache):
+        """
+        Update the filter indexes and mask for rows appended since they were
+        last calculated.  Return False if a full update is needed, because
+        other rows changed, the new rows don't sort to the end of the table,
+        or the filter expression can't be evaluated row by row.
         """
-        self._filter_indexes, self._filter_mask = self.filter_indexes()
+        n = len(cache["index"])
+        if len(self.index) < n or not self.index[:n].equals(cache["index"]):
+            return False
+        k = len(self.index) - n
+        if k == 0:
+            return True
+        fltr = self.current_filter()
+        if fltr is not None and fltr != "all":
+            fltr = self.filters[fltr]
+        if fltr == "none" or getattr(fltr, "no_results", False):
+            new_mask = np.zeros(k, dtype=bool)
+        elif fltr is None or fltr == "all":
+            if not self.index.is_monotonic_increasing:
+                return False
+            new_mask = np.ones(k, dtype=bool)
+        else:
+            st = fltr.sortTerm
+            st, ascend = search_term_list(st) if st else ([], [])
+            if st:
+                tail = pd.DataFrame({t: self[t].iloc[max(n - 1, 0) :] for t in st})
+                order = tail.sort_values(by=st, ascending=ascend, kind="stable")
+                if not order.index.equals(tail.index):
+                    return False
+            elif not self.index.is_monotonic_increasing:
+                return False
+            ft = fltr.filterTerm
+            if ft is None or ft == "" or ft == False:
+                new_mask = np.ones(k, dtype=bool)
+            elif compile_expr(ft).rowwise:
+                new_mask = self.calculate_filter_expr(ft, start=n)
+            else:
+                return False
+        self._filter_mask = np.concatenate((self._filter_mask, new_mask))
+        new_indexes = self.index[n:][new_mask]
+        if fltr is None or fltr == "all":
+            self._filter_indexes.extend(new_indexes)
+        else:
+            self._filter_indexes.extend(map(int, new_indexes))
+        return True
 
     def current_filter(self):
         """
@@ -331,7 +831,7 @@ class Results(pd.DataFrame):
 
     def copy_dataframe(self, filtered=False):
         if filtered:
-            self.update_filter_indexes()
+            self.update_filter_indexes(full=True)
             return pd.DataFrame(self[self._filter_mask])
         else:
             return pd.DataFrame(self)
@@ -355,14 +855,10 @@ class Results(pd.DataFrame):
         }
         for f in self.filters:
             sd["__filters"][f] = self.filters[f].saveDict()
-        for i in self.index:
-            key = str(i)
-            sd[key] = list(self.loc[i])
-            for j, e in enumerate(sd[key]):
-                if isinstance(e, np.float64):
-                    sd[key][j] = e.item()
-                elif isinstance(e, np.bool_):
-                    sd[key][j] = bool(e)
+        # converting to object gives python values for numpy and categorical
+        rows = pd.DataFrame(self).astype(object).to_numpy().tolist()
+        for i, row in zip(self.index, rows):
+            sd[str(i)] = [e.item() if isinstance(e, np.generic) else e for e in row]
         sd["calculated_columns"] = self.calculated_columns
         return sd
 
@@ -372,16 +868,25 @@ class Results(pd.DataFrame):
         """
         self.filters = {}
         self._current_filter = sd.get("__current_filter", None)
+        self._name_index = None
         self.drop(self.index, inplace=True)
         self.drop(self.columns, axis=1, inplace=True)
         self["set"] = []
         self["result"] = []
         try:
             columns = sd["__columns"]
-            for c in columns:
-                self[c] = []
-            for i in sd["__indexes"]:
-                self.loc[i] = sd[str(i)]
+            indexes = sd["__indexes"]
+            df = pd.DataFrame(
+                [sd[str(i)] for i in indexes],
+                index=indexes,
+                columns=columns,
+                dtype=object,
+            )
+            order = ["set", "result"] + [
+                c for c in columns if c not in ("set", "result")
+            ]
+            self._update_inplace(df.reindex(columns=order))
+            self.compact_columns()
         except:
             logging.getLogger("foqus." + __name__).exception(
                 "Error loading stored results"
@@ -397,7 +902,7 @@ class Results(pd.DataFrame):
             self.filters["all"] = dataFilter()
         self.calculated_columns = sd.get("calculated_columns", OrderedDict())
 
-        self.update_filter_indexes()
+        self.update_filter_indexes(full=True)
 
     def data_sets(self):
         """Return a set of data set labels"""
@@ -416,101 +921,70 @@ class Results(pd.DataFrame):
         Add a set of flowseheet results to the data frame.  If sd is missing
         anything most values will be left NaN and the graph error will be 1001
         """
-        if len(self["set"]) > 0:
-            names = list(self.loc[self["set"] == set_name].loc[:, "result"])
-        else:
-            names = []
-        result_name = increment_name(result_name, names)
+        result_name = self.unique_result_name(set_name, result_name)
         if sd is not None:
             columns, dat = sd_col_list(sd, time=time)
         else:
             columns, dat = (tuple(), tuple())
-        for c in columns:
-            if c not in self.columns:
-                self[c] = [np.nan] * self.count_rows(filtered=False)
+        if empty:
+            values = dict.fromkeys(columns, np.nan)
+        else:
+            values = dict(zip(columns, dat))
+        values["set"] = set_name
+        values["result"] = result_name
         row = self.count_rows(filtered=False)
-        self.loc[row, "set"] = set_name
-        self.loc[row, "result"] = result_name
-        if not empty:
-            for i, col in enumerate(columns):
-                self.loc[row, col] = dat[i]
-        self.update_filter_indexes()
+        # after deleting rows the new row label may replace an existing row
+        replaced = row in self.index
+        self.set_row(row, values)
+        self.update_filter_indexes(full=replaced)
 
     def uq_add_result(self, data, set_name="default", result_name="res", time=None):
 
-        if len(self["set"]) > 0:
-            names = list(self.loc[self["set"] == set_name].loc[:, "result"])
-        else:
-            names = []
-        result_name = increment_name(result_name, names)
+        result_name = self.unique_result_name(set_name, result_name)
         columns, dat = uq_sd_col_list(data)
 
-        for c in columns:
-            if c not in self.columns:
-                self[c] = [np.nan] * self.count_rows(filtered=False)
         for row in range(data.getNumSamples()):
-            self.loc[row, "set"] = set_name
-            self.loc[row, "result"] = result_name
-            for i, col in enumerate(columns):
-                self.loc[row, col] = dat[row][i]
-        self.update_filter_indexes()
+            values = dict(zip(columns, dat[row]))
+            values["set"] = set_name
+            values["result"] = result_name
+            self.set_row(row, values)
+        self.update_filter_indexes(full=True)
 
     def sdoe_add_result(self, data, set_name="default", result_name="res", time=None):
 
-        if len(self["set"]) > 0:
-            names = list(self.loc[self["set"] == set_name].loc[:, "result"])
-        else:
-            names = []
-        result_name = increment_name(result_name, names)
+        result_name = self.unique_result_name(set_name, result_name)
         columns, dat = sdoe_sd_col_list(data)
 
-        for c in columns:
-            if c not in self.columns:
-                self[c] = [np.nan] * self.count_rows(filtered=False)
         for row in range(data.getNumSamples()):
-            self.loc[row, "set"] = set_name
-            self.loc[row, "result"] = result_name
-            for i, col in enumerate(columns):
-                self.loc[row, col] = dat[row][i]
-        self.update_filter_indexes()
+            values = dict(zip(columns, dat[row]))
+            values["set"] = set_name
+            values["result"] = result_name
+            self.set_row(row, values)
+        self.update_filter_indexes(full=True)
 
     def odoe_add_result(self, data, set_name="default", result_name="res", time=None):
 
-        if len(self["set"]) > 0:
-            names = list(self.loc[self["set"] == set_name].loc[:, "result"])
-        else:
-            names = []
-        result_name = increment_name(result_name, names)
+        result_name = self.unique_result_name(set_name, result_name)
         columns, dat = odoe_sd_col_list(data)
 
-        for c in columns:
-            if c not in self.columns:
-                self[c] = [np.nan] * self.count_rows(filtered=False)
         for row in range(data.getNumSamples()):
-            self.loc[row, "set"] = set_name
-            self.loc[row, "result"] = result_name
-            for i, col in enumerate(columns):
-                self.loc[row, col] = dat[row][i]
-        self.update_filter_indexes()
+            values = dict(zip(columns, dat[row]))
+            values["set"] = set_name
+            values["result"] = result_name
+            self.set_row(row, values)
+        self.update_filter_indexes(full=True)
 
     def eval_add_result(self, data, set_name="default", result_name="res", time=None):
 
-        if len(self["set"]) > 0:
-            names = list(self.loc[self["set"] == set_name].loc[:, "result"])
-        else:
-            names = []
-        result_name = increment_name(result_name, names)
+        result_name = self.unique_result_name(set_name, result_name)
         columns, dat = eval_sd_col_list(data)
 
-        for c in columns:
-            if c not in self.columns:
-                self[c] = [np.nan] * self.count_rows(filtered=False)
         for row in range(data.getNumSamples()):
-            self.loc[row, "set"] = set_name
-            self.loc[row, "result"] = result_name
-            for i, col in enumerate(columns):
-                self.loc[row, col] = dat[row][i]
-        self.update_filter_indexes()
+            values = dict(zip(columns, dat[row]))
+            values["set"] = set_name
+            values["result"] = result_name
+            self.set_row(row, values)
+        self.update_filter_indexes(full=True)
 
     def exportVars(self, inputs, outputs, flat=True) -> pd.DataFrame:
         # flat isn't used, just there for compatibility from when there were vector vars.
@@ -539,12 +1013,10 @@ class Results(pd.DataFrame):
             path = StringIO(s)
             kwargs["filepath_or_buffer"] = path
         df = pd.read_csv(*args, **kwargs)
-        col_del = []
         row = self.count_rows(filtered=False)
         for r in df.index:
             row += 1
-            for c in df.columns:
-                self.loc[row, c] = df.loc[r, c]
+            self.set_row(row, {c: df.loc[r, c] for c in df.columns})
         self.update_filter_indexes()
 
     def count_rows(self, filtered=True):
@@ -565,16 +1037,21 @@ class Results(pd.DataFrame):
 
     def clear_data(self, filtered=False):
         indexes = self.get_indexes(filtered=filtered)
-        for i in indexes:
-            self.drop(i, inplace=True)
-        self.update_filter_indexes()
+        self._unindex_rows(list(indexes))
+        self.drop(list(indexes), inplace=True)
+        self.update_filter_indexes(full=True)
 
-    def filter_term(self, t):
+    def filter_term(self, t, start=0):
         """
-        Return the value of a filter term. Array for all rows.
+        Return the value of a filter term. Array for all rows from row number
+        start on.  Numeric columns are returned without copying, the type of
+        values in object columns is inferred.
         """
         if t in self.columns:
-            return np.array(list(self.loc[:, t]))
+            a = self[t].to_numpy()[start:]
+            if a.dtype == object:
+                a = np.array(a.tolist())
+            return a
         else:
             raise Exception("Filter term ({}) not in columns".format(t))
 
@@ -589,28 +1066,33 @@ class Results(pd.DataFrame):
         if fltr is None:
             fltr = self.current_filter()
         if fltr is None or fltr == "all":
-            self.sort_index(inplace=True)
-            return list(self.index), [True] * len(self.index)
+            self._sort_index()
+            return list(self.index), np.ones(len(self.index), dtype=bool)
         if fltr == "none" or self.filters[fltr].no_results:
-            return [], [False] * len(self.index)
+            return [], np.zeros(len(self.index), dtype=bool)
         # Swap the name for the actual filter object
         fltr = self.filters[fltr]
         # If a sort term string is provided, sort
         st = fltr.sortTerm
         if st is None or st == "" or st == False:
-            self.sort_index(inplace=True)
+            self._sort_index()
         else:
             st, ascend = search_term_list(st)
             if len(st) == 0:
-                self.sort_index(inplace=True)
+                self._sort_index()
             else:
-                self.sort_values(by=st, ascending=ascend, inplace=True)
+                self.sort_values(by=st, ascending=ascend, kind="stable", inplace=True)
         # now look at the filter columns
         ft = fltr.filterTerm
-        mask = [True] * len(self.index)
+        mask = np.ones(len(self.index), dtype=bool)
         if ft is None or ft == "" or ft == False:
             return list(self.index), mask
         else:
             mask = self.calculate_filter_expr(ft)
-        indexes = list(map(int, list(self[mask].index)))
+        indexes = list(map(int, self.index[mask]))
         return indexes, mask
+
+    def _sort_index(self):
+        """Sort by index, skipping the copy if it's already sorted"""
+        if not self.index.is_monotonic_increasing:
+            self.sort_index(inplace=True)
@@ -0,0 +1,137 @@
+#################################################################################
+# FOQUS Copyright (c) 2012 - 2026, by the software owners: Oak Ridge Institute
+# for Science and Education (ORISE), TRIAD National Security, LLC., Lawrence
+# Livermore National Security, LLC., The Regents of the University of
+# California, through Lawrence Berkeley National Laboratory, Battelle Memorial
+# Institute, Pacific Northwest Division through Pacific Northwest National
+# Laboratory, Carnegie Mellon University, West Virginia University, Boston
+# University, the Trustees of Princeton University, The University of Texas at
+# Austin, URS Energy & Construction, Inc., et al.  All rights reserved.
+#
+# Please see the file LICENSE.md for full copyright and license information,
+# respectively. This file is also available online at the URL
+# "https://github.com/CCSI-Toolset/FOQUS".
+#################################################################################
+import numpy as np
+
+from .. import results
+
+
+def result_dict(x, y):
+    return {
+        "solTime": 1.0,
+        "input": {"n": {"x": x}},
+        "output": {"n": {"y": y}},
+        "graphError": 0,
+        "nodeError": {"n": 0},
+        "nodeSettings": {},
+        "turbineMessages": {},
+    }
+
+
+def make_results(values, fltr=None, filterTerm=None, sortTerm=None):
+    res = results.Results()
+    res.filters["f"] = results.dataFilter()
+    res.filters["f"].filterTerm = filterTerm
+    res.filters["f"].sortTerm = sortTerm
+    for i, (x, y) in enumerate(values):
+        res.add_result(result_dict(x, y), set_name="s", result_name="r")
+        if i == 0:
+            # rows after the first are added with the filter applied
+            res.set_filter(fltr)
+    return res
+
+
+def full_update(res):
+    indexes, mask = res.filter_indexes()
+    return list(indexes), list(mask)
+
+
+def test_compile_expr_rowwise():
+    assert results.compile_expr('c("output.n.y") > 2').rowwise
+    assert results.compile_expr(
+        '(np.sqrt(c("output.n.y")) > 1) & (c("set") == "s")'
+    ).rowwise
+    assert not results.compile_expr(
+        'c("output.n.y") > np.mean(c("output.n.y"))'
+    ).rowwise
+    assert not results.compile_expr('c("output.n.y")[0] > 1').rowwise
+    assert not results.compile_expr('c("output.n.y").size > 1').rowwise
+    assert not results.compile_expr("len(self) > 1").rowwise
+    assert results.compile_expr("c('a') + 1") is results.compile_expr("c('a') + 1")
+    ce = results.compile_expr('np.abs(c("a") - c("b")) > c("a")')
+    assert ce.ne_expr == "abs(_c0 - _c1) > _c0"
+    assert ce.ne_cols == ["a", "b"]
+    assert results.compile_expr('c("set") == "s"').ne_expr is None
+
+
+def test_incremental_filter_matches_full():
+    rng = np.random.default_rng(1)
+    values = [(float(x), float(y)) for x, y in rng.random((30, 2))]
+    for sortTerm in (None, "input.n.x", "-output.n.y"):
+        res = make_results(
+            values, fltr="f", filterTerm='c("output.n.y") > 0.5', sortTerm=sortTerm
+        )
+        indexes, mask = list(res.get_indexes(filtered=True)), list(res._filter_mask)
+        assert (indexes, mask) == full_update(res)
+        assert all(res.loc[i, "output.n.y"] > 0.5 for i in indexes)
+
+
+def test_appended_rows_only_filtered():
+    res = make_results(
+        [(1.0, 1.0), (2.0, 2.0)],
+        fltr="f",
+        filterTerm='c("output.n.y") > 1.5',
+        sortTerm="input.n.x",
+    )
+    calls = []
+    calc = res.calculate_filter_expr
+
+    def counted(expr, start=0):
+        calls.append(start)
+        return calc(expr, start=start)
+
+    res.calculate_filter_expr = counted
+    # sorts to the end, only the new row is evaluated
+    res.add_result(result_dict(3.0, 3.0), set_name="s", result_name="r")
+    assert calls == [2]
+    assert res.get_indexes(filtered=True) == [1, 2]
+    # sorts to the front, the table is resorted and refiltered
+    res.add_result(result_dict(0.0, 5.0), set_name="s", result_name="r")
+    assert calls == [2, 0]
+    assert res.get_indexes(filtered=True) == [3, 1, 2]
+    assert list(res.index) == [3, 0, 1, 2]
+
+
+def test_not_rowwise_filter_recalculated():
+    res = make_results(
+        [(1.0, 1.0), (2.0, 2.0), (3.0, 3.0)],
+        fltr="f",
+        filterTerm='c("output.n.y") > np.mean(c("output.n.y"))',
+    )
+    assert res.get_indexes(filtered=True) == [2]
+    res.add_result(result_dict(10.0, 10.0), set_name="s", result_name="r")
+    assert res.get_indexes(filtered=True) == [3]
+
+
+def test_edited_row_refiltered():
+    res = make_results(
+        [(float(i), float(i)) for i in range(6)],
+        fltr="f",
+        filterTerm='c("output.n.y") > 2',
+    )
+    assert list(res.copy_dataframe(filtered=True).index) == [3, 4, 5]
+    res.set_row(4, {"output.n.y": 0.0})
+    assert list(res.copy_dataframe(filtered=True).index) == [3, 5]
+    res.add_result(result_dict(6.0, 6.0), set_name="s", result_name="r")
+    assert res.get_indexes(filtered=True) == [3, 5, 6]
+
+
+def test_calculated_column():
+    res = make_results([(1.0, 4.0), (2.0, 9.0)])
+    res.set_calculated_column("z", 'np.sqrt(c("output.n.y")) + c("input.n.x")')
+    res.calculate_columns()
+    assert list(res["calc.z"]) == [3.0, 5.0]
+    res.filters["f"].filterTerm = 'c("calc.z") > 4'
+    res.set_filter("f")
+    assert res.get_indexes(filtered=True) == [1]
@@ -0,0 +1,81 @@
+#################################################################################
+# FOQUS Copyright (c) 2012 - 2026, by the software owners: Oak Ridge Institute
+# for Science and Education (ORISE), TRIAD National Security, LLC., Lawrence
+# Livermore National Security, LLC., The Regents of the University of
+# California, through Lawrence Berkeley National Laboratory, Battelle Memorial
+# Institute, Pacific Northwest Division through Pacific Northwest National
+# Laboratory, Carnegie Mellon University, West Virginia University, Boston
+# University, the Trustees of Princeton University, The University of Texas at
+# Austin, URS Energy & Construction, Inc., et al.  All rights reserved.
+#
+# Please see the file LICENSE.md for full copyright and license information,
+# respectively. This file is also available online at the URL
+# "https://github.com/CCSI-Toolset/FOQUS".
+#################################################################################
+import random
+
+from .. import results
+
+
+def test_name_index_matches_increment_name():
+    rng = random.Random(3)
+    bases = ["r", "r_0001", "a_b", "x_1_2"]
+    names = []
+    index = results.nameIndex()
+    for _ in range(500):
+        if names and rng.random() < 0.3:
+            name = names.pop(rng.randrange(len(names)))
+            index.remove(name)
+        else:
+            base = rng.choice(bases)
+            if rng.random() < 0.5:
+                name = results.increment_name(base, names)
+            else:
+                name = "{}_{}".format(base, rng.randrange(12))
+            names.append(name)
+            index.add(name)
+        for base in bases + ["y"]:
+            assert index.increment(base) == results.increment_name(base, names)
+
+
+def make_results(n):
+    res = results.Results()
+    for i in range(n):
+        res.add_result(None, set_name="s{}".format(i % 2), result_name="r")
+    return res
+
+
+def test_result_names_after_delete_and_rename():
+    res = make_results(6)
+    assert list(res["result"]) == ["r", "r", "r_0001", "r_0001", "r_0002", "r_0002"]
+    # delete r_0002 of set s0, the name is free again
+    res.delete_rows([4], filtered=False)
+    assert res.unique_result_name("s0", "r") == "r_0002"
+    assert res.unique_result_name("s1", "r") == "r_0003"
+    # move s1's r_0002 into s0 as r_0003
+    res.set_row(5, {"set": "s0", "result": "r_0003"})
+    assert res.unique_result_name("s0", "r") == "r_0004"
+    assert res.unique_result_name("s1", "r") == "r_0002"
+    res.set_row(10, {"set": "s1", "result": "r_0007"})
+    assert res.unique_result_name("s1", "r") == "r_0008"
+    assert res.unique_result_name("s2", "r") == "r"
+
+
+def test_increment_set_name():
+    res = make_results(2)
+    assert res.incrementSetName("s0") == "s0_0001"
+    assert res.incrementSetName("opt") == "opt"
+    res.edit_set_name("s0_0004", [0], filtered=False)
+    assert res.incrementSetName("s0") == "s0"
+    res.edit_set_name("s0", [1], filtered=False)
+    assert res.incrementSetName("s0") == "s0_0005"
+    res.clear_data()
+    assert res.incrementSetName("s0") == "s0"
+
+
+def test_index_rebuilt_after_load():
+    res = make_results(4)
+    loaded = results.Results()
+    loaded.loadDict(res.saveDict())
+    assert loaded.unique_result_name("s0", "r") == "r_0002"
+    assert loaded.incrementSetName("s1") == "s1_0001"
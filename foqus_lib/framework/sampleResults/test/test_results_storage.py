@@ -0,0 +1,123 @@
+#################################################################################
+# FOQUS Copyright (c) 2012 - 2026, by the software owners: Oak Ridge Institute
+# for Science and Education (ORISE), TRIAD National Security, LLC., Lawrence
+# Livermore National Security, LLC., The Regents of the University of
+# California, through Lawrence Berkeley National Laboratory, Battelle Memorial
+# Institute, Pacific Northwest Division through Pacific Northwest National
+# Laboratory, Carnegie Mellon University, West Virginia University, Boston
+# University, the Trustees of Princeton University, The University of Texas at
+# Austin, URS Energy & Construction, Inc., et al.  All rights reserved.
+#
+# Please see the file LICENSE.md for full copyright and license information,
+# respectively. This file is also available online at the URL
+# "https://github.com/CCSI-Toolset/FOQUS".
+#################################################################################
+import json
+
+import numpy as np
+import pandas as pd
+
+from .. import results
+
+
+def result_dict(x, y, settings=None, node_err=0):
+    return {
+        "solTime": 0.5,
+        "input": {"n": {"x": x, "name": "a"}},
+        "output": {"n": {"y": y}},
+        "graphError": 0,
+        "nodeError": {"n": node_err},
+        "nodeSettings": {"n": settings or {"method": "fast", "tol": 1e-6}},
+        "turbineMessages": {},
+    }
+
+
+def make_results():
+    res = results.Results()
+    res.add_result(result_dict(1.0, 2.0), set_name="a", result_name="r")
+    res.add_result(result_dict(3, 4.5), set_name="b", result_name="r")
+    res.add_result(
+        result_dict(5.0, np.nan, settings={"method": "slow", "tol": 1e-6}),
+        set_name="a",
+        result_name="r",
+    )
+    return res
+
+
+def test_column_dtypes():
+    res = make_results()
+    dtypes = res.dtypes
+    assert dtypes["input.n.x"] == np.float64
+    assert dtypes["output.n.y"] == np.float64
+    assert dtypes["solution_time"] == np.float64
+    assert dtypes["err"] == np.int32
+    assert dtypes["node_err.n"] == np.int32
+    for c in ("set", "result", "setting.n.method", "setting.n.tol"):
+        assert isinstance(dtypes[c], pd.CategoricalDtype)
+    # string inputs are left as they are
+    assert dtypes["input.n.name"] == object
+    assert list(res["set"]) == ["a", "b", "a"]
+    assert list(res["setting.n.method"]) == ["'fast'", "'fast'", "'slow'"]
+
+
+def test_missing_error_code_is_float():
+    res = make_results()
+    sd = result_dict(1.0, 1.0)
+    sd["nodeError"] = {}
+    res.add_result(sd, set_name="a", result_name="r")
+    assert res["node_err.n"].dtype == np.float64
+    assert np.isnan(res.loc[3, "node_err.n"])
+
+
+def test_set_row():
+    res = make_results()
+    res.set_row(1, {"set": "c", "output.n.y": 7.0})
+    assert list(res["set"]) == ["a", "c", "a"]
+    assert res.loc[1, "output.n.y"] == 7.0
+    assert res["output.n.y"].dtype == np.float64
+    # a value that doesn't fit the column's dtype
+    res.set_row(2, {"output.n.y": "failed"})
+    assert res.loc[2, "output.n.y"] == "failed"
+    res.edit_set_name("d", [0], filtered=False)
+    assert list(res["set"]) == ["d", "c", "a"]
+
+
+def test_memory_report():
+    res = make_results()
+    report = res.memory_report()
+    assert report.loc["input", "columns"] == 2
+    assert report.loc["setting", "dtypes"] == "category"
+    assert report.loc["total", "columns"] == len(res.columns)
+    assert (
+        report.loc["total", "bytes"] == res.memory_usage(deep=True, index=False).sum()
+    )
+
+
+def test_save_load_round_trip():
+    res = make_results()
+    sd = json.loads(json.dumps(res.saveDict()))
+    assert sd["1"][res.columns.get_loc("input.n.x")] == 3.0
+    loaded = results.Results()
+    loaded.loadDict(sd)
+    assert list(loaded.columns) == list(res.columns)
+    assert (loaded.dtypes == res.dtypes).all()
+    assert json.dumps(loaded.saveDict()) == json.dumps(sd)
+
+
+def test_float_error_codes_round_trip():
+    sd = {
+        "__columns": ["set", "result", "time", "err", "input.n.x"],
+        "__indexes": [0, 1],
+        "__filters": {},
+        "__current_filter": None,
+        "0": ["a", "r", "t0", 0.0, 1.0],
+        "1": ["a", "r_0001", "t1", 1.0, 2],
+        "calculated_columns": {},
+    }
+    res = results.Results()
+    res.loadDict(sd)
+    assert res["err"].dtype == np.float64
+    assert isinstance(res["set"].dtype, pd.CategoricalDtype)
+    out = res.saveDict()
+    assert out["0"] == sd["0"]
+    assert json.dumps(out["1"]) == json.dumps(["a", "r_0001", "t1", 1.0, 2.0])
@@ -13,7 +13,9 @@
 # "https://github.com/CCSI-Toolset/FOQUS".
 #################################################################################
 import itertools
+import os
 import time
+from concurrent.futures import ProcessPoolExecutor
 from typing import Optional, Tuple, Union, List, Dict, TypedDict
 
 import numpy as np
@@ -75,13 +77,16 @@ def update_min_dist(
     dmat: np.ndarray,
     hist: Optional[np.ndarray] = None,
     val: float = np.inf,
+    rand_gen: Optional[np.random.Generator] = None,
 ) -> Tuple[
     np.ndarray, float, np.ndarray, int, np.ndarray, Optional[int], Optional[int], bool
 ]:
     """
-    args: rcand, cand, md, mdpts, mties, dmat, hist, val
+    args: rcand, cand, md, mdpts, mties, dmat, hist, val, rand_gen
     returns: rcand_, md_, mdpts_, mties_, dmat_, added_, removed_, update_
     """
+    if rand_gen is None:
+        rand_gen = np.random.default_rng()
 
     def update_dmat(
         row: np.ndarray, rcand: np.ndarray, dmat: np.ndarray, k: int, val: float = val
@@ -141,7 +146,7 @@ def update_min_dist(
     removed_ = None
 
     if d0_max > md:  # if maximin increased
-        k = np.random.randint(pts.shape[0])
+        k = rand_gen.integers(pts.shape[0])
         pt = pts[k]
         rcand_, md_, mdpts_, mties_, dmat_, added_, removed_ = step(
             pt, rcand, cand, mdpts_cand, dmat
@@ -150,7 +155,7 @@ def update_min_dist(
         nselect = np.argwhere(mt0[pts[:, 0], pts[:, 1]] < mties).flatten()
         if nselect.size > 0:
             pt = pts[
-                np.random.choice(nselect)
+                rand_gen.choice(nselect)
             ]  # take the subset of pts where the corresponding ties is less than mties
             rcand_, md_, mdpts_, mties_, dmat_, added_, removed_ = step(
                 pt, rcand, cand, mdpts_cand, dmat
@@ -178,43 +183,21 @@ def update_pareto_front(
     args: newdesX, newdesY, newpt, curpfdesX, curpfdesY, curpf
     returns: newpfdesX, newpfdesY, newpf
     """
-    g1 = newpt[0] > curpf[:, 0]
-    g2 = newpt[1] > curpf[:, 1]
-
-    ge1 = newpt[0] >= curpf[:, 0]
-    ge2 = newpt[1] >= curpf[:, 1]
-
-    l1 = np.logical_not(ge1)
-    l2 = np.logical_not(ge2)
-
-    le1 = np.logical_not(g1)
-    le2 = np.logical_not(g2)
-
-    eq1 = newpt[0] == curpf[:, 0]
-    eq2 = newpt[1] == curpf[:, 1]
-
-    cond1 = (
-        np.multiply(g1, ge2) + np.multiply(g2, ge1)
-    ) == 0  # P.N.: should be able to simplify this
-    cond1 = cond1.flatten()
-    cond2 = np.sum(
-        np.multiply(l1, le2) + np.multiply(l2, le1) + np.multiply(eq1, eq2)
-    )  # P.N.: and this
-
-    if np.any(cond1):
-        n_desX = len(newdesX)
-        idxs = np.where(cond1)[0]
-        idxs_des = np.array([i * n_desX + np.arange(n_desX) for i in idxs]).flatten()
-
-        newpf = curpf[idxs]
-        newpfdesX = curpfdesX[idxs_des]
-        newpfdesY = curpfdesY[idxs_des]
-    else:
-        newpf = np.empty((0, len(newpt)))
-        newpfdesX = np.empty((0, np.shape(newdesX)[1]))
-        newpfdesY = np.empty((0, np.shape(newdesY)[1]))
-
-    if cond2 == 0:
+    ge = newpt >= curpf
+    gt = newpt > curpf
+    # keep the current points newpt doesn't dominate
+    keep = ~np.any(gt & ge[:, ::-1], axis=1)
+    # add newpt if no current point dominates or equals it
+    add = not np.any(np.all(~gt, axis=1))
+
+    n_desX = len(newdesX)
+    idxs = np.where(keep)[0]
+    idxs_des = (idxs[:, None] * n_desX + np.arange(n_desX)).ravel()
+    newpf = curpf[idxs]
+    newpfdesX = curpfdesX[idxs_des]
+    newpfdesY = curpfdesY[idxs_des]
+
+    if add:
         newpf = np.append(newpf, [newpt], axis=0)
         newpfdesX = np.append(newpfdesX, newdesX, axis=0)
         newpfdesY = np.append(newpfdesY, newdesY, axis=0)
@@ -222,6 +205,43 @@ def update_pareto_front(
     return newpfdesX, newpfdesY, newpf
 
 
+def pareto_mask(pf: np.ndarray) -> np.ndarray:
+    """
+    args: pf - numpy array of shape (K, 2), criterion values to maximize
+    returns: boolean mask of the points on the Pareto front
+
+    A point is on the front if no other point is at least as good in both
+    values, of equal points only the first one is kept.  This gives the
+    same front as adding the points one at a time with update_pareto_front,
+    with a sort instead of comparing every point with the whole front.
+    """
+    if len(pf) == 0:
+        return np.zeros(0, dtype=bool)
+    # best first value first, then best second value, ties by position
+    order = np.lexsort((np.arange(len(pf)), -pf[:, 1], -pf[:, 0]))
+    y = pf[order, 1]
+    # best second value of the points ahead in the order
+    ahead = np.maximum.accumulate(np.concatenate(([-np.inf], y[:-1])))
+    mask = np.zeros(len(pf), dtype=bool)
+    mask[order] = y > ahead
+    return mask
+
+
+def merge_pareto_fronts(
+    fronts: List[Tuple[np.ndarray, np.ndarray, np.ndarray]], nd: int
+) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    args: fronts - list of (PF_des_x, PF_des_y, PF_mat), nd - design size
+    returns: PF_des_x, PF_des_y, PF_mat of the combined Pareto front
+    """
+    des_x = np.concatenate([f[0] for f in fronts])
+    des_y = np.concatenate([f[1] for f in fronts])
+    pf = np.concatenate([f[2] for f in fronts])
+    idxs = np.where(pareto_mask(pf))[0]
+    idxs_des = (idxs[:, None] * nd + np.arange(nd)).ravel()
+    return des_x[idxs_des], des_y[idxs_des], pf[idxs]
+
+
 def CombPF(PFnew: List, PFcur: Optional[Tuple] = None) -> Union[List, Tuple]:
     """
     args: PFnew, PFcur
@@ -230,21 +250,10 @@ def CombPF(PFnew: List, PFcur: Optional[Tuple] = None) -> Union[List, Tuple]:
     if PFcur is None:
         return PFnew
 
-    combined_pf = PFcur
     dnew = len(PFnew[2])
     N = int(len(PFnew[0]) / dnew)
 
-    for s in range(dnew):
-        combined_pf = update_pareto_front(
-            PFnew[0][s * N : (s + 1) * N, :],
-            PFnew[1][s * N : (s + 1) * N, :],
-            PFnew[2][s, :],
-            combined_pf[0],
-            combined_pf[1],
-            combined_pf[2],
-        )
-
-    return combined_pf
+    return merge_pareto_fronts([PFcur, PFnew], N)
 
 
 def criterion_X(
@@ -254,12 +263,15 @@ def criterion_X(
     nd: int,  # design size <= len(candidates)
     mode: str = "maximin",
     hist: Optional[np.ndarray] = None,
+    rand_gen: Optional[np.random.Generator] = None,
 ) -> float:
     """
-    args: cand, maxit, nr, nd, mode, hist
+    args: cand, maxit, nr, nd, mode, hist, rand_gen
     returns: best_md
     """
     _mode = mode.lower()
+    if rand_gen is None:
+        rand_gen = np.random.default_rng()
 
     ncand = len(cand)
 
@@ -271,7 +283,7 @@ def criterion_X(
         print("Random start {}".format(i))
 
         # sample without replacement <nd> indices
-        rand_index = np.random.choice(ncand, nd, replace=False)
+        rand_index = rand_gen.choice(ncand, nd, replace=False)
         rcand = cand[rand_index]
         dmat = compute_dmat(rcand, hist)
         md, mdpts, mties = compute_min_params(dmat)
@@ -290,7 +302,9 @@ def criterion_X(
                 added_,
                 removed_,
                 update_,
-            ) = update_min_dist(rcand, cand, md, mdpts, mties, dmat, hist=hist)
+            ) = update_min_dist(
+                rcand, cand, md, mdpts, mties, dmat, hist=hist, rand_gen=rand_gen
+            )
 
             if update_:
                 rcand = rcand_
@@ -364,6 +378,7 @@ def update_min_xydist(
     hist_x: Optional[np.ndarray] = None,
     hist_y: Optional[np.ndarray] = None,
     val: float = np.inf,
+    rand_gen: Optional[np.random.Generator] = None,
 ) -> Tuple[
     np.ndarray,
     np.ndarray,
@@ -382,7 +397,7 @@ def update_min_xydist(
 ]:
     """
     args: des_x, des_y, cand_x, cand_y, md, mdpts, mties, dmat_xy, dmat_x, dmat_y, mpdx, mpdy, wt, PF_des_x,
-    PF_des_y, PF_mat, hist_x, hist_y, val
+    PF_des_y, PF_mat, hist_x, hist_y, val, rand_gen
     returns: des_x_, des_y_, md_, mdpts_cand_, mties_, dmat_xy_, dmat_x_, dmat_y_, PF_des_x, PF_des_y, PF_mat,
     added_, removed_, update_
     """
@@ -464,6 +479,9 @@ def update_min_xydist(
         # j: added; k: removed
         return des_x_, des_y_, md_, mdpts_, mties_, dmat_xy_, dmat_x_, dmat_y_, j, k
 
+    if rand_gen is None:
+        rand_gen = np.random.default_rng()
+
     ncand = np.shape(cand_x)[0]
 
     # exclude mdpts indices corresponding to history
@@ -472,6 +490,8 @@ def update_min_xydist(
 
     d0 = np.zeros((n_mdpts, ncand))
     mt0 = np.zeros((n_mdpts, ncand))
+    # Pareto front values of each swap, merged with the front after the loop
+    new_pf = np.zeros((n_mdpts, ncand, 2))
 
     # before:
     for pt in itertools.product(range(n_mdpts), range(ncand)):
@@ -484,10 +504,27 @@ def update_min_xydist(
             pt, des_x, des_y, cand_x, cand_y, mdpts_cand, dmat_xy, dmat_x, dmat_y
         )
 
-        new_pt = np.array([np.min(dmat_x_), np.min(dmat_y_)])
-        PF_des_x, PF_des_y, PF_mat = update_pareto_front(
-            des_x_, des_y_, new_pt, PF_des_x, PF_des_y, PF_mat
-        )
+        new_pf[i, j] = np.min(dmat_x_), np.min(dmat_y_)
+
+    # only make the designs of the swaps that are on the front
+    nd = len(des_x)
+    new_pf = new_pf.reshape(-1, 2)
+    keep = pareto_mask(np.concatenate((PF_mat, new_pf)))
+    keep_cur = np.where(keep[: len(PF_mat)])[0]
+    keep_new = np.where(keep[len(PF_mat) :])[0]
+    keep_des = (keep_cur[:, None] * nd + np.arange(nd)).ravel()
+    new_des_x = np.repeat(des_x[None], len(keep_new), axis=0)
+    new_des_y = np.repeat(des_y[None], len(keep_new), axis=0)
+    for n, (i, j) in enumerate(zip(*np.unravel_index(keep_new, (n_mdpts, ncand)))):
+        new_des_x[n, mdpts_cand[i]] = cand_x[j]
+        new_des_y[n, mdpts_cand[i]] = cand_y[j]
+    PF_des_x = np.concatenate(
+        (PF_des_x[keep_des], new_des_x.reshape(-1, des_x.shape[1]))
+    )
+    PF_des_y = np.concatenate(
+        (PF_des_y[keep_des], new_des_y.reshape(-1, des_y.shape[1]))
+    )
+    PF_mat = np.concatenate((PF_mat[keep_cur], new_pf[keep_new]))
 
     d0_max = np.max(d0)
     pts = np.argwhere(d0 == d0_max)
@@ -496,7 +533,7 @@ def update_min_xydist(
     removed_ = None
 
     if d0_max > md:
-        k = np.random.randint(pts.shape[0])
+        k = rand_gen.integers(pts.shape[0])
         pt = pts[k]
         (
             des_x_,
@@ -513,7 +550,7 @@ def update_min_xydist(
     elif d0_max == md:
         nselect = np.argwhere(mt0[pts[:, 0], pts[:, 1]] < mties).flatten()
         if nselect.size > 0:
-            pt = pts[np.random.choice(nselect)]
+            pt = pts[rand_gen.choice(nselect)]
             (
                 des_x_,
                 des_y_,
@@ -591,6 +628,7 @@ def irsf_tex(
     nd: int,  # number of points (design size N)
     hist_x: Optional[np.ndarray] = None,
     hist_y: Optional[np.ndarray] = None,
+    rand_gen: Optional[np.random.Generator] = None,
 ) -> Tuple[
     np.ndarray,
     np.ndarray,
@@ -605,10 +643,12 @@ def irsf_tex(
     np.ndarray,
 ]:
     """
-    args: cand_x, cand_y, mpdx, mpdy, wt, maxit, nd, hist_x, hist_y
+    args: cand_x, cand_y, mpdx, mpdy, wt, maxit, nd, hist_x, hist_y, rand_gen
     returns: des_x, des_y, md, mdpts, mties, dmat_xy, dmat_x, dmat_y, PF_des_x, PF_des_y, PF_mat
     """
-    rand_index = np.random.choice(len(cand_x), nd)
+    if rand_gen is None:
+        rand_gen = np.random.default_rng()
+    rand_index = rand_gen.choice(len(cand_x), nd)
 
     des_x = cand_x[rand_index]
     des_y = cand_y[rand_index]
@@ -657,6 +697,7 @@ def irsf_tex(
             PF_mat,
             hist_x,
             hist_y,
+            rand_gen=rand_gen,
         )
 
         nit = nit + 1
@@ -697,58 +738,106 @@ def criterion_irsf(
     mode: str,
     hist_x: Optional[np.ndarray],
     hist_y: Optional[np.ndarray],
+    rand_gen: Optional[np.random.Generator] = None,
 ) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
     """
-    args: cand_x, cand_y, mpdx, mpdy, wt, maxit, nr, nd, mode, hist_x, hist_y
+    args: cand_x, cand_y, mpdx, mpdy, wt, maxit, nr, nd, mode, hist_x, hist_y, rand_gen
     returns: PF_des_x, PF_des_y, PF_mat
     """
-    (
-        _,
-        _,
-        md,
-        _,
-        mties,
-        _,
-        _,
-        _,
-        PF_des_x,
-        PF_des_y,
-        PF_mat,
-    ) = irsf_tex(cand_x, cand_y, mpdx, mpdy, wt, maxit, nd, hist_x, hist_y)
+    if rand_gen is None:
+        rand_gen = np.random.default_rng()
 
-    md = None
+    fronts = []
+    for i in range(nr):
+        PF_des_x, PF_des_y, PF_mat = irsf_tex(
+            cand_x,
+            cand_y,
+            mpdx,
+            mpdy,
+            wt,
+            maxit,
+            nd,
+            hist_x,
+            hist_y,
+            rand_gen=rand_gen,
+        )[8:]
+        fronts.append((PF_des_x, PF_des_y, PF_mat))
 
-    for i in range(nr - 1):
-        (
-            _,
-            _,
-            md_,
-            _,
-            mties_,
-            _,
-            _,
-            _,
-            PF_des_x_,
-            PF_des_y_,
-            PF_mat_,
-        ) = irsf_tex(cand_x, cand_y, mpdx, mpdy, wt, maxit, nd, hist_x, hist_y)
-        if (md is None) or ((md_ > md) or (md_ == md) and (mties_ < mties)):
-            md = md_
-            mties = mties_
+    return merge_pareto_fronts(fronts, nd)
 
-        for s in range(PF_mat_.shape[0]):
-            PF_des_x, PF_des_y, PF_mat = update_pareto_front(
-                PF_des_x_[s * nd : (s + 1) * nd, :],
-                PF_des_y_[s * nd : (s + 1) * nd, :],
-                PF_mat_[s, :],
-                PF_des_x,
-                PF_des_y,
-                PF_mat,
-            )
 
-    _mode = mode
+# candidates and history of the random starts run by a worker process
+_irsf_data = {}
 
-    return PF_des_x, PF_des_y, PF_mat
+# with n_jobs=None, random starts times candidates below which the starts
+# run in this process, a pool would take longer to start than the work
+serial_work = 2000
+
+
+def _init_irsf_worker(
+    cand_x: np.ndarray,
+    cand_y: np.ndarray,
+    hist_x: Optional[np.ndarray],
+    hist_y: Optional[np.ndarray],
+) -> None:
+    _irsf_data.update(cand_x=cand_x, cand_y=cand_y, hist_x=hist_x, hist_y=hist_y)
+
+
+def _irsf_start(task: Tuple) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    args: task - (mpdx, mpdy, wt, maxit, nd, seed)
+    returns: PF_des_x, PF_des_y, PF_mat of one random start
+    """
+    mpdx, mpdy, wt, maxit, nd, seed = task
+    return irsf_tex(
+        _irsf_data["cand_x"],
+        _irsf_data["cand_y"],
+        mpdx,
+        mpdy,
+        wt,
+        maxit,
+        nd,
+        _irsf_data["hist_x"],
+        _irsf_data["hist_y"],
+        rand_gen=np.random.default_rng(seed),
+    )[8:]
+
+
+def run_irsf_starts(
+    tasks: List[Tuple],
+    cand_x: np.ndarray,
+    cand_y: np.ndarray,
+    hist_x: Optional[np.ndarray],
+    hist_y: Optional[np.ndarray],
+    n_jobs: Optional[int] = None,
+) -> List[Tuple[np.ndarray, np.ndarray, np.ndarray]]:
+    """
+    args: tasks - list of (mpdx, mpdy, wt, maxit, nd, seed) random starts,
+    cand_x, cand_y, hist_x, hist_y, n_jobs - number of processes (None for
+    one per CPU, or this process for less than serial_work, 1 to run in
+    this process)
+    returns: list of the (PF_des_x, PF_des_y, PF_mat) of each random start
+
+    Each random start has its own seed, so the results don't depend on
+    the number of processes.
+    """
+    if n_jobs is None:
+        if len(tasks) * len(cand_x) < serial_work:
+            n_jobs = 1
+        else:
+            n_jobs = os.cpu_count() or 1
+    n_jobs = min(n_jobs, len(tasks))
+    data = (cand_x, cand_y, hist_x, hist_y)
+    if n_jobs <= 1:
+        _init_irsf_worker(*data)
+        try:
+            return [_irsf_start(task) for task in tasks]
+        finally:
+            _irsf_data.clear()
+    with ProcessPoolExecutor(
+        max_workers=n_jobs, initializer=_init_irsf_worker, initargs=data
+    ) as pool:
+        return list(pool.map(_irsf_start, tasks))
 
 
 def criterion(
@@ -768,6 +857,8 @@ def criterion(
     mode: str = "maximin",
     hist: Optional[pd.DataFrame] = None,
     test: bool = False,
+    rand_seed: Union[int, None] = None,
+    n_jobs: Optional[int] = None,
 ) -> Union[
     TypedDict("results", {"t1": float, "t2": float}),
     TypedDict(
@@ -784,8 +875,12 @@ def criterion(
     ),
 ]:
     """
-    args: cand, args, nr, nd, mode, hist, test
+    args: cand, args, nr, nd, mode, hist, test, rand_seed, n_jobs
     returns: results dictionary
+
+    The random starts of all the weights run in a pool of n_jobs processes
+    (None for one per CPU, serial for small problems), each with a seed
+    spawned from rand_seed.
     """
     cand_x = cand[args["idx"]]
     xcols = list(cand_x.columns)
@@ -814,11 +909,30 @@ def criterion(
         hist_x_norm = None
         hist_y_norm = None
 
+    ws = args["ws"]
+    seeds = np.random.SeedSequence(rand_seed).spawn(2 + len(ws) * nr)
+
     t0 = time.time()
-    best_X = criterion_X(cand_x_norm, args["max_iterations"], nr, nd, mode, hist_x_norm)
+    best_X = criterion_X(
+        cand_x_norm,
+        args["max_iterations"],
+        nr,
+        nd,
+        mode,
+        hist_x_norm,
+        rand_gen=np.random.default_rng(seeds[0]),
+    )
     print("X space Best value in Normalized Scale: ", best_X)
     t1 = time.time() - t0
-    best_Y = criterion_X(cand_y_norm, args["max_iterations"], nr, nd, mode, hist_y_norm)
+    best_Y = criterion_X(
+        cand_y_norm,
+        args["max_iterations"],
+        nr,
+        nd,
+        mode,
+        hist_y_norm,
+        rand_gen=np.random.default_rng(seeds[1]),
+    )
     print("Y space Best value in Normalized Scale: ", best_Y)
 
     # if testing, T1 is for X only search, and T2 for PF search with 0.5 weight
@@ -837,6 +951,7 @@ def criterion(
             mode,
             hist_x_norm,
             hist_y_norm,
+            rand_gen=np.random.default_rng(seeds[2]),
         )
         t2 = time.time() - t0
 
@@ -844,32 +959,27 @@ def criterion(
         return results
 
     # Otherwise IRSF for real
-    # This is the most important function call of IRSF. For each weight value, its calling 'criterion_irsf' function
-    # Possible to parallelize: one call to criterion_irsf for each weight (5 different values)
-    PFxdes, PFydes, PFmdvals = {}, {}, {}
-
-    for i in range(len(args["ws"])):
-        print("Weight: ", round(args["ws"][i], 1))
-        PFxdes[i], PFydes[i], PFmdvals[i] = criterion_irsf(
-            cand_x_norm,
-            cand_y_norm,
-            best_X,
-            best_Y,
-            args["ws"][i],
-            args["max_iterations"],
-            nr,
-            nd,
-            mode,
-            hist_x_norm,
-            hist_y_norm,
-        )
-        # Reverse scaling
-        PFxdes[i] = inv_unit_scale(PFxdes[i], xmin, xmax)
-        PFydes[i] = inv_unit_scale(PFydes[i], ymin, ymax)
+    # This is the most important part of IRSF. Every random start of every
+    # weight value is an independent call to 'irsf_tex', they all run in a
+    # process pool and their Pareto fronts are merged at the end
+    tasks = []
+    for i, wt in enumerate(ws):
+        print("Weight: ", round(wt, 1))
+        for r in range(nr):
+            seed = seeds[2 + i * nr + r]
+            tasks.append((best_X, best_Y, wt, args["max_iterations"], nd, seed))
+    fronts = run_irsf_starts(
+        tasks, cand_x_norm, cand_y_norm, hist_x_norm, hist_y_norm, n_jobs
+    )
 
-    combined_pf = None
-    for i in range(len(args["ws"])):
-        combined_pf = CombPF([PFxdes[i], PFydes[i], PFmdvals[i]], combined_pf)
+    # Reverse scaling
+    combined_pf = merge_pareto_fronts(
+        [
+            (inv_unit_scale(fx, xmin, xmax), inv_unit_scale(fy, ymin, ymax), pf)
+            for fx, fy, pf in fronts
+        ],
+        nd,
+    )
 
     sort_idx = np.argsort(combined_pf[2], axis=0)[:, 0]
 
@@ -20,6 +20,7 @@ import pandas as pd  # only used for the final output of criterion
 from scipy.stats import rankdata
 
 from .distance import compute_dist, compute_min_params
+from .usf import random_starts, restart_blocks
 
 
 def compute_dmat(
@@ -257,6 +258,78 @@ def inv_scale_xs(
     return mat
 
 
+def local_search(
+    rand_index: np.ndarray,
+    cand: np.ndarray,
+    ncand: int,
+    xcols: List,
+    wcol: int,
+    T: int,
+    hist: Optional[np.ndarray],
+    rand_seed: Union[int, None],
+) -> Tuple[np.ndarray, np.ndarray, float, np.ndarray, int, np.ndarray]:
+    """
+    args:
+    rand_index - numpy array of shape (nd, ) containing the random start's rows of cand
+    cand - numpy array of size (ncand, nx+1) containing scaled weights
+    ncand - number of candidates, i.e., cand.shape[0]
+    xcols - list of integers corresponding to column indices for inputs
+    wcol - integer corresponding to the index of the weight column
+    T - maximum number of update_min_dist iterations
+    hist - numpy array of shape (nh, nx+1) containing scaled weights
+    rand_seed - seed for breaking ties between updates
+
+    returns:
+    rand_index - numpy array of shape (nd, ) containing the improved design's rows of cand
+    rcand, md, mdpts, mties, dmat - as returned by update_min_dist
+    """
+    # extract the <nd> rows
+    rcand = cand[rand_index]
+    dmat = compute_dmat(rcand, xcols, wcol, hist=hist)
+    md, mdpts, mties = compute_min_params(dmat)
+
+    update_ = True
+    t = 0
+
+    while update_ and (t < T):
+
+        (
+            rcand_,
+            md_,
+            mdpts_,
+            mties_,
+            dmat_,
+            added_,
+            removed_,
+            update_,
+        ) = update_min_dist(
+            rcand,
+            cand,
+            ncand,
+            xcols,
+            wcol,
+            md,
+            mdpts,
+            mties,
+            dmat,
+            hist=hist,
+            rand_seed=rand_seed + rand_index if rand_seed is not None else None,
+        )
+
+        if update_:
+            rcand = rcand_
+            md = md_
+            mdpts = mdpts_
+            mties = mties_
+            dmat = dmat_
+            if added_ is not None:
+                rand_index[removed_] = added_
+
+        t += 1
+
+    return rand_index, rcand, md, mdpts, mties, dmat
+
+
 def criterion(
     cand: pd.DataFrame,  # candidates
     args: TypedDict(
@@ -325,59 +398,24 @@ def criterion(
 
         t0 = time.time()
 
-        for i in range(nr):
+        wts = cand_np[:, idw_np]
+        wts_sum = np.sum(wts)
+        prob = wts / wts_sum
+        starts = random_starts(restart_blocks(nr, rand_gen), ncand, nd, p=prob)
+        for i, rand_index in enumerate(starts):
 
             print("Random start {}".format(i))
 
-            # sample without replacement <nd> indices
-            wts = cand_np[:, idw_np]
-            wts_sum = np.sum(wts)
-            prob = wts / wts_sum
-            rand_index = rand_gen.choice(ncand, nd, replace=False, p=prob)
-
-            # extract the <nd> rows
-            rcand = cand_np[rand_index]
-            dmat = compute_dmat(rcand, idx_np, idw_np, hist=hist_np)
-            md, mdpts, mties = compute_min_params(dmat)
-
-            update_ = True
-            t = 0
-
-            while update_ and (t < T):
-
-                (
-                    rcand_,
-                    md_,
-                    mdpts_,
-                    mties_,
-                    dmat_,
-                    added_,
-                    removed_,
-                    update_,
-                ) = update_min_dist(
-                    rcand,
-                    cand_np,
-                    ncand,
-                    idx_np,
-                    idw_np,
-                    md,
-                    mdpts,
-                    mties,
-                    dmat,
-                    hist=hist_np,
-                    rand_seed=rand_seed + rand_index if rand_seed is not None else None,
-                )
-
-                if update_:
-                    rcand = rcand_
-                    md = md_
-                    mdpts = mdpts_
-                    mties = mties_
-                    dmat = dmat_
-                    if added_:
-                        rand_index[removed_] = added_
-
-                t += 1
+            rand_index, rcand, md, mdpts, mties, dmat = local_search(
+                rand_index,
+                cand_np,
+                ncand,
+                idx_np,
+                idw_np,
+                T,
+                hist=hist_np,
+                rand_seed=rand_seed,
+            )
 
             if (md > best_md) or ((md == best_md) and (mties < best_mties)):
                 best_index = rand_index  #
@@ -387,9 +425,10 @@ def criterion(
                 best_mties = mties
                 best_dmat = dmat
 
-            elapsed_time = time.time() - t0
             print("Best minimum distance for this random start: {}".format(best_md))
 
+        elapsed_time = time.time() - t0
+
         # no need to inverse-scale; can just use the indices to look up original rows in cand_
         best_cand_unscaled = cand_np_unscaled[best_index]
 
@@ -19,8 +19,9 @@ import dask.bag as db
 import numpy as np
 import pandas as pd  # only used for the final output of criterion
 
-from .distance import compute_min_params
-from .nusf import compute_dmat, scale_xs, scale_y, update_min_dist
+from .nusf import local_search, scale_xs, scale_y
+from .usf import random_starts, restart_blocks
+from .usf_dask import share
 
 
 def criterion(
@@ -76,94 +77,65 @@ def criterion(
 
     rand_gen = np.random.default_rng(rand_seed)
 
-    def step(
-        mwr_tuple: Tuple[int, List[int], np.ndarray, Union[np.ndarray, None]],
-    ) -> Dict:
-        mwr, rands, cand_np, hist_np = mwr_tuple
+    # each mwr's scaled candidates are sent to the workers once, the
+    # partitions generate their random starts from a seed and return only
+    # their best design
+    results = {}
+    for mwr in mwr_vals:
+        t0 = time.time()
+        cand_np = scale_y(scale_method, mwr, cand_np_, idw_np)
+
+        if hist is None:
+            hist_np = None
+        else:
+            hist_np = cand_np[-nhist:]
+            cand_np = cand_np[:ncand]
+
+        wts = cand_np[:, idw_np]
+        wts_sum = np.sum(wts)
+        prob = wts / wts_sum
+        blocks = restart_blocks(nr, rand_gen)
+        shared_cand, shared_hist, shared_prob = share(cand_np, hist_np, prob)
+        part_best = (
+            db.from_sequence(blocks, npartitions=len(blocks))
+            .map_partitions(
+                search_partition,
+                shared_cand,
+                shared_hist,
+                shared_prob,
+                nd,
+                idx_np,
+                idw_np,
+                T,
+                rand_seed,
+            )
+            .compute()
+        )
 
-        best_cand = []
         best_md = 0
         best_mties = 0
         best_index = []
-
-        t0 = time.time()
-
-        def choose(rand_index):
-            # extract the <nd> rows
-            rcand = cand_np[rand_index]
-            dmat = compute_dmat(rcand, idx_np, idw_np, hist=hist_np)
-            md, mdpts, mties = compute_min_params(dmat)
-
-            update_ = True
-            t = 0
-
-            while update_ and (t < T):
-
-                (
-                    rcand_,
-                    md_,
-                    mdpts_,
-                    mties_,
-                    dmat_,
-                    added_,
-                    removed_,
-                    update_,
-                ) = update_min_dist(
-                    rcand,
-                    cand_np,
-                    ncand,
-                    idx_np,
-                    idw_np,
-                    md,
-                    mdpts,
-                    mties,
-                    dmat,
-                    hist=hist_np,
-                    rand_seed=rand_seed + rand_index if rand_seed is not None else None,
-                )
-
-                if update_:
-                    rcand = rcand_
-                    md = md_
-                    mdpts = mdpts_
-                    mties = mties_
-                    dmat = dmat_
-                    if added_:
-                        rand_index[removed_] = added_
-
-                t += 1
-            return {
-                "index": rand_index,
-                "cand": rcand,
-                "md": md,
-                "mdpts": mdpts,
-                "mties": mties,
-                "dmat": dmat,
-            }
-
-        for x in db.from_sequence(rands).map(choose):
-            if (x["md"] > best_md) or (
-                (x["md"] == best_md) and (x["mties"] < best_mties)
-            ):
-                best_index = x["index"]
-                best_cand = x["cand"]
-                best_md = x["md"]
-                best_mdpts = x["mdpts"]
-                best_mties = x["mties"]
-                best_dmat = x["dmat"]
-            print("Best minimum distance for this random start: {}".format(best_md))
+        # partitions are in restart order, so ties go to the earliest start
+        for index, md, mdpts, mties, dmat in part_best:
+            if (md > best_md) or ((md == best_md) and (mties < best_mties)):
+                best_index = index
+                best_md = md
+                best_mdpts = mdpts
+                best_mties = mties
+                best_dmat = dmat
+        print("Best minimum distance for mwr={}: {}".format(mwr, best_md))
 
         elapsed_time = time.time() - t0
 
         # no need to inverse-scale; can just use the indices to look up original rows in cand_
-        best_cand_unscaled = cand_np_unscaled[best_index]
-
-        best_cand = pd.DataFrame(best_cand, index=best_index, columns=list(cand))
+        best_cand = pd.DataFrame(
+            cand_np[best_index], index=best_index, columns=list(cand)
+        )
         best_cand_unscaled = pd.DataFrame(
-            best_cand_unscaled, index=best_index, columns=list(cand)
+            cand_np_unscaled[best_index], index=best_index, columns=list(cand)
         )
 
-        results = {
+        results[mwr] = {
             "best_cand_scaled": best_cand,
             "best_cand": best_cand_unscaled,
             "best_index": best_index,
@@ -178,28 +150,42 @@ def criterion(
             "elapsed_time": elapsed_time,
         }
 
-        return results
-
-    rands, cand_nps, hist_nps = [], [], []
-    for mwr in mwr_vals:
-        cand_np = scale_y(scale_method, mwr, cand_np_, idw_np)
-
-        if hist is None:
-            hist_np = None
-        else:
-            hist_np = cand_np[-nhist:]
-            cand_np = cand_np[:ncand]
-
-        wts = cand_np[:, idw_np]
-        wts_sum = np.sum(wts)
-        prob = wts / wts_sum
-        rand = []
-        for i in range(nr):
-            # sample without replacement <nd> indices
-            rand.append(rand_gen.choice(ncand, nd, replace=False, p=prob))
-        rands.append(rand)
-        cand_nps.append(cand_np)
-        hist_nps.append(hist_np)
-
-    results = db.from_sequence(zip(mwr_vals, rands, cand_nps, hist_nps)).map(step)
-    return dict(zip(mwr_vals, results.compute()))
+    return results
+
+
+def search_partition(
+    blocks: List[Tuple[int, int]],
+    cand_np: np.ndarray,
+    hist_np: Optional[np.ndarray],
+    prob: np.ndarray,
+    nd: int,
+    idx_np: List,
+    idw_np: int,
+    T: int,
+    rand_seed: Union[int, None],
+) -> List[Tuple[np.ndarray, float, np.ndarray, int, np.ndarray]]:
+    """
+    Runs the random starts of <blocks> against the shared candidate array
+    returns: [(index, md, mdpts, mties, dmat)] of the partition's best design,
+    or [] if no start improved on a minimum distance of 0
+    """
+    ncand = len(cand_np)
+    best = []
+    best_md = 0
+    best_mties = 0
+    for rand_index in random_starts(blocks, ncand, nd, p=prob):
+        rand_index, _rcand, md, mdpts, mties, dmat = local_search(
+            rand_index,
+            cand_np,
+            ncand,
+            idx_np,
+            idw_np,
+            T,
+            hist=hist_np,
+            rand_seed=rand_seed,
+        )
+        if (md > best_md) or ((md == best_md) and (mties < best_mties)):
+            best = [(rand_index, md, mdpts, mties, dmat)]
+            best_md = md
+            best_mties = mties
+    return best
@@ -17,7 +17,10 @@ import platform
 import re
 import tempfile
 
+import numpy as np
+
 from foqus_lib.framework.uq.Common import Common
+from foqus_lib.framework.uq.PolynomialRS import PolynomialRS, PolynomialRSError
 from foqus_lib.framework.uq.ResponseSurfaces import ResponseSurfaces
 from foqus_lib.framework.uq.RSAnalyzer import RSAnalyzer
 
@@ -43,6 +46,11 @@ def rseval(rsdata, pdata, cdata, rstypes):
     # rstypes: dictionary with output index as key and string denote RS types as value; possible values: ['MARS',
     # 'linear', 'quadratic', 'cubic']
 
+    if RSAnalyzer.backend == "native" and all(
+        PolynomialRS.isSupported(rstypes[rs]) for rs in rstypes
+    ):
+        return rsevalNative(rsdata, pdata, cdata, rstypes)
+
     # convert the data into psuade files
     cfile = os.path.join(dname, "CandidateSet")
     pfile = os.path.join(dname, "PriorSample")
@@ -99,6 +107,69 @@ def rseval(rsdata, pdata, cdata, rstypes):
     return outfile
 
 
+def rsevalNative(rsdata, pdata, cdata, rstypes):
+    # In-process odoeu_rseval for polynomial response surfaces: for every
+    # candidate, the mean and std dev of each output's RS prediction over
+    # the prior sample of the uncertain inputs.  Writes odoeu_rseval.out
+    # with the candidate inputs followed by (mean, std) for each output.
+    inputNames = rsdata.getInputNames()
+    priorNames = pdata.getInputNames()
+    priorIndices = [inputNames.index(name) for name in priorNames]
+    designIndices = [i for i in range(len(inputNames)) if i not in priorIndices]
+
+    x = np.array(rsdata.getInputData(), dtype=float, ndmin=2)
+    ydat = np.array(rsdata.getOutputData(), dtype=float, ndmin=2)
+    lower = np.array(rsdata.getInputMins(), dtype=float)
+    upper = np.array(rsdata.getInputMaxs(), dtype=float)
+    surfaces = []
+    for i, rs in enumerate(rstypes):
+        yvals = ydat[:, i]
+        valid = np.isfinite(yvals) & (np.abs(yvals) < 1e34)
+        try:
+            surfaces.append(
+                PolynomialRS(rstypes[rs], lower=lower, upper=upper).fit(
+                    x[valid], yvals[valid]
+                )
+            )
+        except PolynomialRSError as e:
+            Common.showError(str(e), str(e))
+            return None
+
+    cand = np.array(cdata.getInputData(), dtype=float, ndmin=2)
+    if cand.shape[1] == len(inputNames):
+        cdesign = cand[:, designIndices]
+    else:
+        cdesign = cand
+    prior = np.array(pdata.getInputData(), dtype=float, ndmin=2)
+    ncand = cand.shape[0]
+    nprior = prior.shape[0]
+
+    stats = np.empty((ncand, 2 * len(surfaces)))
+    chunk = max(1, PolynomialRS.batchSize // nprior)
+    for start in range(0, ncand, chunk):
+        block = cdesign[start : start + chunk]
+        nblock = block.shape[0]
+        xfull = np.empty((nblock, nprior, len(inputNames)))
+        xfull[:, :, designIndices] = block[:, np.newaxis, :]
+        xfull[:, :, priorIndices] = prior[np.newaxis, :, :]
+        xfull = xfull.reshape(nblock * nprior, len(inputNames))
+        for j, surface in enumerate(surfaces):
+            yhat = surface.predict(xfull).reshape(nblock, nprior)
+            stats[start : start + nblock, 2 * j] = yhat.mean(axis=1)
+            stats[start : start + nblock, 2 * j + 1] = yhat.std(axis=1)
+
+    outfile = "odoeu_rseval.out"
+    table = np.column_stack((np.arange(1, ncand + 1), cand, stats))
+    np.savetxt(
+        outfile,
+        table,
+        fmt=["%d"] + ["%24.16e"] * (table.shape[1] - 1),
+        header="%d %d" % (ncand, table.shape[1] - 1),
+        comments="",
+    )
+    return outfile
+
+
 def odoeu(
     cdata,
     cfile,
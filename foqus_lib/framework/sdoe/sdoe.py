@@ -26,7 +26,10 @@ import pandas as pd
 from python_tsp.exact import solve_tsp_dynamic_programming
 
 from foqus_lib.framework.uq.Common import Common
+from foqus_lib.framework.uq.LocalExecutionModule import LocalExecutionModule
+from foqus_lib.framework.uq.PolynomialRS import PolynomialRSError
 from foqus_lib.framework.uq.ResponseSurfaces import ResponseSurfaces
+from foqus_lib.framework.uq.RSAnalyzer import RSAnalyzer
 
 from .df_utils import load, write
 
@@ -205,6 +208,12 @@ def run(config_file: str, nd: int, test: bool = False) -> Tuple[Dict, Dict, floa
             "idx": idx,
             "idy": [x for x, t in zip(include, types) if t == "Response"],
         }
+        # optional, processes for the random starts (default by problem
+        # size) and the seed that makes the designs reproducible
+        irsf_kwargs = {
+            "n_jobs": config["METHOD"].getint("n_jobs", fallback=None),
+            "rand_seed": config["METHOD"].getint("rand_seed", fallback=None),
+        }
         from .irsf import criterion
 
     # do a quick test to get an idea of runtime
@@ -214,7 +223,9 @@ def run(config_file: str, nd: int, test: bool = False) -> Tuple[Dict, Dict, floa
             # irsf.criterion supports the `test` kwarg, so the function is called correctly in this branch
             # but pylint reports an error because it does not support conditionals
             # pylint: disable=unexpected-keyword-arg
-            results = criterion(cand, args, nr, nd, mode=mode, hist=hist, test=True)
+            results = criterion(
+                cand, args, nr, nd, mode=mode, hist=hist, test=True, **irsf_kwargs
+            )
             # pylint: enable=unexpected-keyword-arg
             return results["t1"], results["t2"]
         elif mode == "maxpro":
@@ -233,7 +244,9 @@ def run(config_file: str, nd: int, test: bool = False) -> Tuple[Dict, Dict, floa
     # otherwise, run sdoe for real
     t0 = time.time()
 
-    if mode != "maxpro":
+    if sf_method == "irsf":
+        results = criterion(cand, args, nr, nd, mode=mode, hist=hist, **irsf_kwargs)
+    elif mode != "maxpro":
         results = criterion(cand, args, nr, nd, mode=mode, hist=hist)
     else:
         results = criterion(cand, args, nd, max_iter, hist=hist)
@@ -341,6 +354,9 @@ def dataImputation(fname: str, y: int, rsMethodName: str, eval_fname: str) -> st
     """
     rsIndex = ResponseSurfaces.getEnumValue(rsMethodName)
 
+    if RSAnalyzer.useNative(rsIndex):
+        return dataImputationNative(fname, y, rsIndex, eval_fname)
+
     # write script
     f = tempfile.SpooledTemporaryFile(mode="wt")
     if platform.system() == "Windows":
@@ -375,6 +391,32 @@ def dataImputation(fname: str, y: int, rsMethodName: str, eval_fname: str) -> st
     return outfile
 
 
+def dataImputationNative(fname: str, y: int, rsIndex: int, eval_fname: str) -> str:
+    """
+    args: fname, y, rsIndex, eval_fname
+    returns: outfile filename, written in the psuade eval_sample layout
+    """
+    data = LocalExecutionModule.readSampleFromPsuadeFile(fname)
+    try:
+        rs, x, yvals = RSAnalyzer.nativeRS(data, y, rsIndex, data.getLegendreOrder())
+        rs.fit(x, yvals)
+    except PolynomialRSError as e:
+        Common.showError(str(e), str(e))
+        return None
+    xeval, _, _, _ = LocalExecutionModule.readDataFromSimpleFile(eval_fname)
+    mean, std = rs.predict(xeval, returnStd=True)
+
+    outfile = "eval_sample"
+    np.savetxt(
+        outfile,
+        np.column_stack((xeval, mean, std)),
+        fmt="%24.16e",
+        header="%d %d 2" % xeval.shape,
+        comments="",
+    )
+    return outfile
+
+
 def readEvalSample(fileName: str) -> Tuple[np.ndarray, np.ndarray, int, int]:
     """
     args: fileName
@@ -65,3 +65,77 @@ def test_criterion():
     result = irsf.criterion(cand=df, args=args, nr=nr, nd=nd, mode=mode, hist=hist)
 
     assert result.get("pareto_front") is not None
+
+
+def test_merge_pareto_fronts_matches_update_pareto_front():
+    rng = np.random.default_rng(4)
+    nd = 3
+    fronts = []
+    for k in range(20):
+        n = rng.integers(1, 6)
+        # integer values so there are ties and duplicate points
+        pf = rng.integers(0, 8, size=(n, 2)).astype(float)
+        fronts.append((rng.random((n * nd, 2)), rng.random((n * nd, 1)), pf))
+
+    seq = fronts[0]
+    for des_x, des_y, pf in fronts[1:]:
+        for s in range(len(pf)):
+            seq = irsf.update_pareto_front(
+                des_x[s * nd : (s + 1) * nd],
+                des_y[s * nd : (s + 1) * nd],
+                pf[s],
+                *seq,
+            )
+    # the first front may have points it dominates itself
+    first = irsf.merge_pareto_fronts(fronts[:1], nd)
+    seq = irsf.merge_pareto_fronts([seq], nd)
+    merged = irsf.merge_pareto_fronts([first] + fronts[1:], nd)
+
+    def rows(front):
+        return sorted(
+            (tuple(p), tuple(front[0][i * nd : (i + 1) * nd].ravel()))
+            for i, p in enumerate(front[2])
+        )
+
+    assert rows(seq) == rows(merged)
+    assert len({tuple(p) for p in merged[2]}) == len(merged[2])
+
+
+def test_criterion_same_result_for_any_number_of_processes():
+    with resources.path(__package__, "candidates_irsf.csv") as p:
+        df = pd.read_csv(p).iloc[:60]
+    args = {
+        "icol": "__id",
+        "max_iterations": 100,
+        "ws": np.linspace(0.1, 0.9, 3),
+        "idy": ["Y"],
+        "idx": ["V1", "V2"],
+    }
+    results = [
+        irsf.criterion(cand=df, args=args, nr=2, nd=4, rand_seed=7, n_jobs=n)
+        for n in (1, 3)
+    ]
+    pd.testing.assert_frame_equal(
+        results[0]["pareto_front"], results[1]["pareto_front"]
+    )
+    for i in results[0]["des"]:
+        pd.testing.assert_frame_equal(results[0]["des"][i], results[1]["des"][i])
+
+
+def test_small_problem_runs_without_pool(monkeypatch):
+    with resources.path(__package__, "candidates_irsf.csv") as p:
+        df = pd.read_csv(p).iloc[:30]
+    args = {
+        "icol": "__id",
+        "max_iterations": 50,
+        "ws": np.linspace(0.1, 0.9, 3),
+        "idy": ["Y"],
+        "idx": ["V1", "V2"],
+    }
+
+    def no_pool(*a, **kw):
+        raise AssertionError("process pool started for a small problem")
+
+    monkeypatch.setattr(irsf, "ProcessPoolExecutor", no_pool)
+    result = irsf.criterion(cand=df, args=args, nr=2, nd=3, rand_seed=1)
+    assert result["num_designs"] > 0
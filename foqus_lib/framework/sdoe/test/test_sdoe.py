@@ -12,11 +12,12 @@
 # respectively. This file is also available online at the URL
 # "https://github.com/CCSI-Toolset/FOQUS".
 #################################################################################
+import configparser
 from importlib import resources
 from pathlib import Path
 
 
-from foqus_lib.framework.sdoe import sdoe
+from foqus_lib.framework.sdoe import irsf, sdoe
 
 
 def test_run_irsf():
@@ -131,6 +132,29 @@ def test_run_maxpro_augment():
     assert list(results.keys()) == expected_keys
 
 
+def test_run_irsf_passes_seed_and_jobs(monkeypatch):
+    config_file = "config_irsf.ini"
+    copy_from_package("candidates_irsf.csv")
+    copy_from_package(config_file)
+    config = configparser.ConfigParser(allow_no_value=True)
+    config.read(config_file)
+    config["METHOD"]["n_jobs"] = "1"
+    config["METHOD"]["rand_seed"] = "11"
+    with open(config_file, "w") as f:
+        config.write(f)
+
+    calls = []
+
+    def criterion(*args, **kwargs):
+        calls.append(kwargs)
+        return {"t1": 0.0, "t2": 0.0}
+
+    monkeypatch.setattr(irsf, "criterion", criterion)
+    sdoe.run(config_file=config_file, nd=2, test=True)
+    assert calls[0]["n_jobs"] == 1
+    assert calls[0]["rand_seed"] == 11
+
+
 def copy_from_package(file_name: str) -> None:
     content = resources.read_text(__package__, file_name)
     Path(file_name).write_text(content)
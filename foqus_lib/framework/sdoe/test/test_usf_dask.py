@@ -83,3 +83,33 @@ def test_same_result_as_usf():
         cand, args, nr, nd, mode=mode, hist=hist, rand_gen=rand_gen_dask
     )
     assert results["best_cand"].equals(dask_results["best_cand"])
+
+
+def test_restart_blocks():
+    blocks = usf.restart_blocks(2500, np.random.default_rng(1))
+    assert [count for _seed, count in blocks] == [1000, 1000, 500]
+    starts = list(usf.random_starts(blocks, 10, 3))
+    assert len(starts) == 2500
+    assert all(len(set(s)) == 3 for s in starts)
+
+
+def test_same_result_as_usf_with_history():
+    dconf.set({"dataframe.convert-string": False})
+    rng = np.random.default_rng(7)
+    cand = pd.DataFrame(rng.random((50, 2)), index=range(100, 150))
+    hist = pd.DataFrame(rng.random((5, 2)))
+    args = {
+        "icol": "",
+        "xcols": [0, 1],
+        "scale_factors": pd.Series(1.0, index=[0, 1]),
+    }
+    for mode in ("maximin", "minimax"):
+        results = usf.criterion(
+            cand, args, 1500, 4, mode=mode, hist=hist, rand_gen=np.random.default_rng(3)
+        )
+        dask_results = usf_dask.criterion(
+            cand, args, 1500, 4, mode=mode, hist=hist, rand_gen=np.random.default_rng(3)
+        )
+        assert results["best_cand"].equals(dask_results["best_cand"])
+        assert results["best_val"] == dask_results["best_val"]
+        assert np.array_equal(results["best_dmat"], dask_results["best_dmat"])
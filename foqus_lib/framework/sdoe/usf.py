@@ -14,7 +14,7 @@
 #################################################################################
 import time
 from operator import gt, lt
-from typing import Optional, Tuple, List, TypedDict
+from typing import Iterator, List, Optional, Tuple, TypedDict
 
 import numpy as np
 import pandas as pd
@@ -35,6 +35,38 @@ def compute_min_dist(
     return dmat, min_dist
 
 
+# number of random starts drawn from each seeded generator
+RESTART_BLOCK = 1000
+
+
+def restart_blocks(
+    nr: int, rand_gen: np.random.Generator, block: int = RESTART_BLOCK
+) -> List[Tuple[int, int]]:
+    """
+    Splits <nr> random starts into blocks of at most <block> starts
+    args: nr, rand_gen, block
+    returns: list of (seed, count), one seed drawn from rand_gen per block
+    """
+    nblocks = -(-nr // block)
+    seeds = rand_gen.integers(2**63, size=nblocks)
+    return [(int(seed), min(block, nr - i * block)) for i, seed in enumerate(seeds)]
+
+
+def random_starts(
+    blocks: List[Tuple[int, int]], ncand: int, nd: int, p: Optional[np.ndarray] = None
+) -> Iterator[np.ndarray]:
+    """
+    Generates the random starts of <blocks>, so the serial and dask
+    criteria see the same starts for the same rand_gen
+    args: blocks, ncand, nd, p
+    returns: iterator of <nd> candidate positions sampled without replacement
+    """
+    for seed, count in blocks:
+        rng = np.random.default_rng(seed)
+        for _ in range(count):
+            yield rng.choice(ncand, nd, replace=False, p=p)
+
+
 def criterion(
     cand: pd.DataFrame,
     args: TypedDict("args", {"icol": str, "xcols": List, "scale_factors": pd.Series}),
@@ -93,27 +125,25 @@ def criterion(
     else:
         hist_xs = None
 
-    best_cand = []
-    _best_rand_sample = []
+    # the relevant columns (of type 'Input' only) for dist computations
+    cand_xs = cand[idx].to_numpy(dtype=float)
 
+    # the first start is kept if none beats the initial best_val
+    best_pos = 0
     t0 = time.time()
-    for i in range(nr):
-        # sample without replacement <nd> indices
-        rand_index = rand_gen.choice(cand.index, nd, replace=False)
-        # extract the <nd> rows
-        rand_cand = cand.loc[rand_index]
-        # extract the relevant columns (of type 'Input' only) for dist computations
-        dmat, min_dist = compute_min_dist(rand_cand[idx].values, scl, hist_xs=hist_xs)
+    for rand_pos in random_starts(restart_blocks(nr, rand_gen), len(cand), nd):
+        # sample without replacement <nd> rows
+        dmat, min_dist = compute_min_dist(cand_xs[rand_pos], scl, hist_xs=hist_xs)
         dist = fcn(min_dist)
 
         if cond(dist, best_val):
-            best_cand = rand_cand
-            best_index = rand_index  # for debugging
+            best_pos = rand_pos
             best_val = dist  # for debugging
             best_dmat = dmat  # used for ranking candidates
 
-        elapsed_time = time.time() - t0
-    # best_cand.insert(loc=0, column=id_, value=best_cand.index)
+    best_cand = cand.iloc[best_pos]
+    best_index = best_cand.index.to_numpy()  # for debugging
+    elapsed_time = time.time() - t0
 
     results = {
         "best_cand": best_cand,
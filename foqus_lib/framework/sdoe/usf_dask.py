@@ -14,13 +14,29 @@
 #################################################################################
 import time
 from operator import gt, lt
-from typing import Callable, List, Optional, TypedDict
+from typing import Callable, List, Optional, Tuple, TypedDict
 
+import dask
 import dask.bag as db
 import numpy as np
 import pandas as pd
 
-from .usf import compute_min_dist
+from .usf import compute_min_dist, random_starts, restart_blocks
+
+
+def share(*arrays: Optional[np.ndarray]) -> List:
+    """
+    Puts arrays into the dask graph once, so every partition reads the same
+    copy instead of getting its own.  With a distributed client the arrays
+    are scattered to all workers, otherwise they become delayed objects.
+    """
+    try:
+        from dask.distributed import get_client
+
+        client = get_client()
+    except (ImportError, ValueError):
+        return [dask.delayed(a) for a in arrays]
+    return [client.scatter(a, broadcast=True) for a in arrays]
 
 
 def criterion(
@@ -68,32 +84,46 @@ def criterion(
 
     # history, if provided
     if hist is not None:
-        hist_xs = hist[idx].values
+        hist_xs = hist[idx].to_numpy(dtype=float)
     else:
         hist_xs = None
 
     t0 = time.time()
-    choices = []
-    for i in range(nr):  # create all the choices upfront
-        choices.append(rand_gen.choice(cand.index, nd, replace=False))
-    nrs = db.from_sequence(choices, npartitions=(nr // 1000) + 1)
-    part_choices = nrs.map_partitions(
-        choose_from_partition, best_val, cand, idx, scl, hist_xs, fcn, cond
-    ).to_dataframe()
-    if mode == "maximin":
-        best_val = part_choices["val"].max()
-    else:
-        best_val = part_choices["val"].min()
-
-    best = part_choices[part_choices.val == best_val].compute()
+    # the candidates are sent to the workers once, each partition generates
+    # its own random starts from a seed and returns only its best one
+    shared_cand, shared_hist = share(cand[idx].to_numpy(dtype=float), hist_xs)
+    blocks = restart_blocks(nr, rand_gen)
+    part_best = (
+        db.from_sequence(blocks, npartitions=len(blocks))
+        .map_partitions(
+            choose_from_partition,
+            best_val,
+            shared_cand,
+            nd,
+            scl,
+            shared_hist,
+            fcn,
+            cond,
+        )
+        .compute()
+    )
+    # partitions are in restart order, so ties go to the earliest start
+    for val, pos in part_best:
+        if cond(val, best_val):
+            best_val, best_pos = val, pos
+
+    best_cand = cand.iloc[best_pos]
+    best_dmat, _ = compute_min_dist(
+        best_cand[idx].to_numpy(dtype=float), scl, hist_xs=hist_xs
+    )
 
     elapsed_time = time.time() - t0
 
     results = {
-        "best_cand": best["cand"].iloc[0],
-        "best_index": best["index"].iloc[0],
-        "best_val": best["val"].iloc[0],
-        "best_dmat": best["dmat"].iloc[0],
+        "best_cand": best_cand,
+        "best_index": best_cand.index.to_numpy(),
+        "best_val": best_val,
+        "best_dmat": best_dmat,
         "dmat_cols": idx,
         "mode": mode,
         "design_size": nd,
@@ -105,39 +135,25 @@ def criterion(
 
 
 def choose_from_partition(
-    nums: [int],
-    starting_val: int,
-    cand: pd.DataFrame,
-    idx: List,
-    scl: np.ndarray,
-    hist_xs: np.ndarray,
-    fcn: Callable[[float], float],
-    cond: Callable[[int, int], bool],
-):
-    best_cand, best_val = None, starting_val
-    for i in nums:
-        rand_cand = choose(i, cand, idx, scl, hist_xs, fcn)
-        if cond(rand_cand["val"], best_val):
-            best_cand = rand_cand
-            best_val = rand_cand["val"]
-    return [best_cand]
-
-
-def choose(
-    choice: int,
-    cand: pd.DataFrame,
-    idx: List,
+    blocks: List[Tuple[int, int]],
+    starting_val: float,
+    cand_xs: np.ndarray,
+    nd: int,
     scl: np.ndarray,
-    hist_xs: np.ndarray,
-    fcn: Callable[[float], float],
-):
-    rand_cand = cand.loc[choice]
-    # extract the relevant columns (of type 'Input' only) for dist computations
-    dmat, min_dist = compute_min_dist(rand_cand[idx].values, scl, hist_xs=hist_xs)
-    dist = fcn(min_dist)
-    return {
-        "cand": rand_cand,
-        "index": choice,
-        "val": dist,
-        "dmat": dmat,
-    }
+    hist_xs: Optional[np.ndarray],
+    fcn: Callable[[np.ndarray], float],
+    cond: Callable[[float, float], bool],
+) -> List[Tuple[float, np.ndarray]]:
+    """
+    Runs the random starts of <blocks> against the shared candidate array
+    returns: [(best value, candidate positions)], or [] if no start beat starting_val
+    """
+    best = []
+    best_val = starting_val
+    for rand_pos in random_starts(blocks, len(cand_xs), nd):
+        _dmat, min_dist = compute_min_dist(cand_xs[rand_pos], scl, hist_xs=hist_xs)
+        dist = fcn(min_dist)
+        if cond(dist, best_val):
+            best = [(dist, rand_pos)]
+            best_val = dist
+    return best
@@ -0,0 +1,142 @@
+#################################################################################
+# FOQUS Copyright (c) 2012 - 2026, by the software owners: Oak Ridge Institute
+# for Science and Education (ORISE), TRIAD National Security, LLC., Lawrence
+# Livermore National Security, LLC., The Regents of the University of
+# California, through Lawrence Berkeley National Laboratory, Battelle Memorial
+# Institute, Pacific Northwest Division through Pacific Northwest National
+# Laboratory, Carnegie Mellon University, West Virginia University, Boston
+# University, the Trustees of Princeton University, The University of Texas at
+# Austin, URS Energy & Construction, Inc., et al.  All rights reserved.
+#
+# Please see the file LICENSE.md for full copyright and license information,
+# respectively. This file is also available online at the URL
+# "https://github.com/CCSI-Toolset/FOQUS".
+#################################################################################
+import json
+import math
+import os
+import tempfile
+import unittest
+from pathlib import Path
+
+from foqus_lib.framework.session.session import session
+from foqus_lib.framework.sim.turbineLiteConsumer import turbineLiteConsumer
+from foqus_lib.framework.sim.turbineLiteDB import turbineLiteDB
+
+from .test_turbine_lite_db import (
+    addJob,
+    addSimulation,
+    createDatabase,
+    jobs,
+    setConfiguration,
+)
+
+# calc.z = x1*sqrt(x2)
+EXAMPLE = (
+    Path(__file__).parents[4]
+    / "examples"
+    / "tutorial_files"
+    / "Flowsheets"
+    / "Tutorial_1"
+    / "Simple_flow.foqus"
+)
+
+
+class consumerTestDB(turbineLiteDB):
+    """Tells the consumer to stop once every job is finished"""
+
+    def consumer_status(self, uid, status=None, rc=0):
+        with self.transaction() as curs:
+            curs.execute(
+                "SELECT COUNT(*) FROM Jobs WHERE State IN ('submit','setup','running')"
+            )
+            n = curs.fetchone()[0]
+        return "up" if n else "terminate"
+
+
+class TestTurbineLiteConsumer(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.cwd = os.getcwd()
+        os.chdir(self.tmp.name)
+        os.mkdir("logs")
+        self.content = EXAMPLE.read_text()
+        createDatabase("turbine.sdf")
+        self.db = consumerTestDB(close_after=False, sqlite="turbine.sdf")
+
+    def tearDown(self):
+        self.db.closeConnection()
+        os.chdir(self.cwd)
+        self.tmp.cleanup()
+
+    def makeConsumer(self, maxJobs):
+        consumer = turbineLiteConsumer(
+            self.db,
+            "consumer-1",
+            makeSession=lambda: session(useCurrentWorkingDir=True),
+            maxJobs=maxJobs,
+            delay=0.05,
+            statusInterval=0.05,
+        )
+        consumer.addSession(session(useCurrentWorkingDir=True))
+        return consumer
+
+    @staticmethod
+    def inputs(x1, x2):
+        return {"calc": {"x1": x1, "x2": x2}}
+
+    def output(self, guid):
+        state, consumerId, setup, finished, output = jobs(self.db)[guid]
+        self.assertEqual(state, "success")
+        self.assertEqual(consumerId, "consumer-1")
+        return json.loads(output)["output"]["calc"]["z"]
+
+    def test_concurrent_jobs_share_cached_sessions(self):
+        sd = json.loads(self.content)
+        # slow enough that both jobs of a pair are running at once
+        sd["flowsheet"]["nodes"]["calc"][
+            "pythonCode"
+        ] = "import time\ntime.sleep(0.5)\nf.z = x.x1*math.sqrt(x.x2)"
+        simA = addSimulation(self.db, "A", json.dumps(sd))
+        sd["flowsheet"]["nodes"]["calc"]["pythonCode"] = "f.z = x.x1 + x.x2"
+        simB = addSimulation(self.db, "B", json.dumps(sd))
+        jobsA = [addJob(self.db, simA, self.inputs(x, 4.0)) for x in (1.0, 2.0, 3.0)]
+        jobB = addJob(self.db, simB, self.inputs(1.0, 4.0))
+        consumer = self.makeConsumer(maxJobs=2)
+        peak = []
+        wait = consumer.wait
+
+        def record(timeout):
+            peak.append(len(consumer.running))
+            wait(timeout)
+
+        consumer.wait = record
+        consumer.run()
+        self.assertTrue(consumer.terminated)
+        for x, guid in zip((1.0, 2.0, 3.0), jobsA):
+            self.assertTrue(math.isclose(self.output(guid), 2.0 * x))
+        self.assertTrue(math.isclose(self.output(jobB), 5.0))
+        self.assertEqual(consumer.loads, 2)
+        self.assertEqual(max(peak), 2)
+        self.assertEqual(consumer.running, [])
+
+    def test_reset_and_changed_file_reload(self):
+        simA = addSimulation(self.db, "A", self.content)
+        consumer = self.makeConsumer(maxJobs=1)
+        guid = addJob(self.db, simA, self.inputs(1.0, 9.0))
+        addJob(self.db, simA, self.inputs(1.0, 9.0))
+        consumer.run()
+        self.assertEqual(consumer.loads, 1)
+        self.assertTrue(math.isclose(self.output(guid), 3.0))
+
+        addJob(self.db, simA, self.inputs(1.0, 9.0), reset=True)
+        consumer.run()
+        self.assertEqual(consumer.loads, 2)
+
+        sd = json.loads(self.content)
+        sd["flowsheet"]["nodes"]["calc"]["pythonCode"] = "f.z = x.x1 - x.x2"
+        setConfiguration(self.db, simA, json.dumps(sd))
+        guid = addJob(self.db, simA, self.inputs(1.0, 9.0))
+        consumer.run()
+        self.assertEqual(consumer.loads, 3)
+        self.assertTrue(math.isclose(self.output(guid), -8.0))
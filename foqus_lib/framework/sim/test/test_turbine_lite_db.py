@@ -0,0 +1,216 @@
+#################################################################################
+# FOQUS Copyright (c) 2012 - 2026, by the software owners: Oak Ridge Institute
+# for Science and Education (ORISE), TRIAD National Security, LLC., Lawrence
+# Livermore National Security, LLC., The Regents of the University of
+# California, through Lawrence Berkeley National Laboratory, Battelle Memorial
+# Institute, Pacific Northwest Division through Pacific Northwest National
+# Laboratory, Carnegie Mellon University, West Virginia University, Boston
+# University, the Trustees of Princeton University, The University of Texas at
+# Austin, URS Energy & Construction, Inc., et al.  All rights reserved.
+#
+# Please see the file LICENSE.md for full copyright and license information,
+# respectively. This file is also available online at the URL
+# "https://github.com/CCSI-Toolset/FOQUS".
+#################################################################################
+import json
+import os
+import sqlite3
+import tempfile
+import threading
+import unittest
+import uuid
+
+from foqus_lib.framework.sim.turbineLiteDB import turbineLiteDB
+
+# The TurbineLite tables used by the FOQUS consumer
+SCHEMA = """
+CREATE TABLE Applications (Name TEXT, Inputs TEXT, Outputs TEXT);
+CREATE TABLE Simulations (Id TEXT, Name TEXT, ApplicationName TEXT);
+CREATE TABLE SimulationStagedInputs (SimulationId TEXT, Content BLOB);
+CREATE TABLE Jobs (
+    Id TEXT, Count INTEGER, SimulationId TEXT, SessionId TEXT,
+    ConsumerId TEXT, State TEXT, Reset INTEGER,
+    Setup TEXT, Running TEXT, Finished TEXT
+);
+CREATE TABLE Processes (Id TEXT, Input TEXT, Output TEXT);
+CREATE TABLE Messages (Id TEXT, Value TEXT, "Create" TEXT, JobId TEXT);
+CREATE TABLE JobConsumers (
+    Id TEXT, hostname TEXT, processId INTEGER, status TEXT,
+    keepalive TEXT, AppName TEXT
+);
+"""
+
+
+def createDatabase(path):
+    conn = sqlite3.connect(path)
+    conn.executescript(SCHEMA)
+    conn.close()
+
+
+def addSimulation(db, name, content, application="foqus"):
+    simId = str(uuid.uuid4())
+    with db.transaction() as curs:
+        curs.execute(
+            "INSERT INTO Simulations VALUES (?, ?, ?)", (simId, name, application)
+        )
+        curs.execute(
+            "INSERT INTO SimulationStagedInputs VALUES (?, ?)",
+            (simId, content.encode("utf-8")),
+        )
+    return simId
+
+
+def setConfiguration(db, simId, content):
+    with db.transaction() as curs:
+        curs.execute(
+            "UPDATE SimulationStagedInputs SET Content=? WHERE SimulationId=?",
+            (content.encode("utf-8"), simId),
+        )
+
+
+def addJob(db, simId, inputs, reset=False, sessionId=None):
+    guid = str(uuid.uuid4())
+    with db.transaction() as curs:
+        curs.execute("SELECT COUNT(*) FROM Jobs")
+        count = curs.fetchone()[0] + 1
+        curs.execute(
+            "INSERT INTO Jobs (Id, Count, SimulationId, SessionId, State, Reset)"
+            " VALUES (?, ?, ?, ?, 'submit', ?)",
+            (guid, count, simId, sessionId, int(reset)),
+        )
+        curs.execute(
+            "INSERT INTO Processes VALUES (?, ?, NULL)", (guid, json.dumps(inputs))
+        )
+    return guid
+
+
+def jobs(db):
+    """Return {guid: (State, ConsumerId, Setup, Finished, Output)}"""
+    with db.transaction() as curs:
+        curs.execute(
+            "SELECT Jobs.Id, State, ConsumerId, Setup, Finished, Output FROM Jobs"
+            " INNER JOIN Processes ON Jobs.Id=Processes.Id ORDER BY Count"
+        )
+        return {r[0]: r[1:] for r in curs.fetchall()}
+
+
+class TestTurbineLiteDB(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.cwd = os.getcwd()
+        os.chdir(self.tmp.name)
+        createDatabase("turbine.sdf")
+        self.db = turbineLiteDB(close_after=False, sqlite="turbine.sdf")
+        self.simId = addSimulation(self.db, "sim", '{"flowsheet": {}}')
+
+    def tearDown(self):
+        self.db.closeConnection()
+        os.chdir(self.cwd)
+        self.tmp.cleanup()
+
+    def test_connections_are_pooled(self):
+        self.db.add_new_application("foqus")
+        self.db.add_new_application("foqus")
+        uid = self.db.consumer_register()
+        self.assertEqual(self.db.consumer_status(uid), "up")
+        self.db.consumer_status(uid, "terminate")
+        self.assertEqual(self.db.consumer_status(uid), "terminate")
+        self.assertEqual(self.db.consumer_id(os.getpid()), None)
+        self.assertEqual(self.db._pool.qsize(), 1)
+        with self.db.transaction() as curs:
+            curs.execute("SELECT COUNT(*) FROM Applications")
+            self.assertEqual(curs.fetchone()[0], 1)
+        db = turbineLiteDB(sqlite="turbine.sdf")
+        db.add_message("hello", "job")
+        self.assertEqual(db._pool.qsize(), 0)
+
+    def test_parameters_are_not_formatted_into_sql(self):
+        guid = addJob(self.db, self.simId, {"x": 1})
+        msg = "it's a 'quoted' message; DROP TABLE Jobs"
+        self.db.add_message(msg, guid)
+        with self.db.transaction() as curs:
+            curs.execute("SELECT Value FROM Messages WHERE JobId=?", (guid,))
+            self.assertEqual(curs.fetchone()[0], msg)
+        self.assertEqual(self.db.get_job_id(simName="it's")[0], None)
+        self.assertEqual(self.db.get_job_id(simName="sim")[0], guid)
+
+    def test_claim_jobs(self):
+        other = addSimulation(self.db, "other", "{}", application="gPROMS")
+        addJob(self.db, other, {})
+        guids = [addJob(self.db, self.simId, {"x": i}) for i in range(5)]
+        claimed = self.db.claim_jobs("c1", 3)
+        self.assertEqual([c[0] for c in claimed], guids[:3])
+        self.assertEqual([c[1] for c in claimed], [2, 3, 4])
+        self.assertEqual(claimed[0][2], self.simId)
+        self.assertFalse(claimed[0][3])
+        state = jobs(self.db)
+        for guid in guids[:3]:
+            self.assertEqual(state[guid][:2], ("setup", "c1"))
+            self.assertIsNotNone(state[guid][2])
+        self.assertEqual(state[guids[3]][0], "submit")
+        self.assertEqual([c[0] for c in self.db.claim_jobs("c2", 5)], guids[3:])
+        self.assertEqual(self.db.claim_jobs("c2", 5), [])
+        self.assertEqual(self.db.claim_jobs("c2", 0), [])
+
+    def test_claim_only_my_jobs(self):
+        guids = [addJob(self.db, self.simId, {}) for i in range(2)]
+        self.db.jobConsumerID(guids[1], "c1")
+        self.assertEqual(self.db.jobConsumerID(guids[1]), "c1")
+        self.assertEqual(self.db.jobConsumerID(guids[0]), None)
+        claimed = self.db.claim_jobs("c1", 2, onlyMyId=True)
+        self.assertEqual([c[0] for c in claimed], [guids[1]])
+
+    def test_concurrent_claims_take_each_job_once(self):
+        guids = {addJob(self.db, self.simId, {}) for i in range(40)}
+        claimed = {}
+
+        def consumer(cid):
+            db = turbineLiteDB(close_after=False, sqlite="turbine.sdf")
+            mine = []
+            while True:
+                jobs = db.claim_jobs(cid, 3)
+                if not jobs:
+                    break
+                mine.extend(j[0] for j in jobs)
+            claimed[cid] = mine
+            db.closeConnection()
+
+        threads = [threading.Thread(target=consumer, args=(i,)) for i in range(4)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+        allClaimed = [g for mine in claimed.values() for g in mine]
+        self.assertEqual(len(allClaimed), 40)
+        self.assertEqual(set(allClaimed), guids)
+
+    def test_batched_status_changes(self):
+        guids = [addJob(self.db, self.simId, {}) for i in range(3)]
+        self.db.jobs_change_status(
+            [(guids[0], "running"), (guids[1], "success"), (guids[2], "cancel")],
+            [("done", guids[1])],
+        )
+        state = jobs(self.db)
+        self.assertEqual(state[guids[0]][0], "running")
+        self.assertEqual(state[guids[1]][0], "success")
+        self.assertIsNotNone(state[guids[1]][3])
+        self.assertEqual(state[guids[2]][0], "cancel")
+        # a failing statement rolls back the whole batch
+        with self.assertRaises(ValueError):
+            self.db.jobs_change_status(
+                [(guids[0], "error")], [("msg", guids[0], "extra")]
+            )
+        self.assertEqual(jobs(self.db)[guids[0]][0], "running")
+
+    def test_job_files_and_output(self):
+        guid = addJob(self.db, self.simId, {"calc": {"x1": 2.0}})
+        guid, jid, simId, reset = self.db.claim_jobs("c1")[0]
+        content = self.db.get_configuration_file(simId)
+        self.assertEqual(content, '{"flowsheet": {}}')
+        self.db.job_prepare(guid, jid, content)
+        with open(os.path.join("test", str(jid), "input_values.json")) as f:
+            self.assertEqual(json.load(f), {"input": {"calc": {"x1": 2.0}}})
+        with open(os.path.join("test", str(jid), "output.json"), "w") as f:
+            f.write('{"output": {}}')
+        self.db.job_save_output(guid, os.path.join("test", str(jid)))
+        self.assertEqual(jobs(self.db)[guid][4], '{"output": {}}')
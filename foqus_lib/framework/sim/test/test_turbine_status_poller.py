@@ -0,0 +1,184 @@
+#################################################################################
+# FOQUS Copyright (c) 2012 - 2026, by the software owners: Oak Ridge Institute
+# for Science and Education (ORISE), TRIAD National Security, LLC., Lawrence
+# Livermore National Security, LLC., The Regents of the University of
+# California, through Lawrence Berkeley National Laboratory, Battelle Memorial
+# Institute, Pacific Northwest Division through Pacific Northwest National
+# Laboratory, Carnegie Mellon University, West Virginia University, Boston
+# University, the Trustees of Princeton University, The University of Texas at
+# Austin, URS Energy & Construction, Inc., et al.  All rights reserved.
+#
+# Please see the file LICENSE.md for full copyright and license information,
+# respectively. This file is also available online at the URL
+# "https://github.com/CCSI-Toolset/FOQUS".
+#################################################################################
+import collections
+import json
+import os
+import tempfile
+import threading
+import time
+import unittest
+import urllib.parse
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from foqus_lib.framework.sim.turbineConfiguration import (
+    TurbineConfiguration,
+    TurbineInterfaceEx,
+    TurbineStatusPoller,
+)
+
+
+class mockGateway(ThreadingHTTPServer):
+    """
+    Local stand-in for the Turbine job resources.  A job is running until
+    its finish time, then success with output x*2.  Requests are counted
+    by kind.
+    """
+
+    def __init__(self):
+        ThreadingHTTPServer.__init__(self, ("127.0.0.1", 0), mockGatewayHandler)
+        self.jobs = collections.OrderedDict()
+        self.requests = collections.Counter()
+        self.lock = threading.Lock()
+
+    def addJob(self, jobID, sid, x, duration):
+        self.jobs[jobID] = dict(sid=sid, x=x, finish=time.time() + duration)
+
+    def jobStatus(self, jobID):
+        job = self.jobs[jobID]
+        res = {"Id": jobID, "Session": job["sid"], "Running": "now"}
+        if time.time() >= job["finish"]:
+            res["State"] = "success"
+            res["Output"] = {"y": {"value": job["x"] * 2}}
+        else:
+            res["State"] = "running"
+        return res
+
+    @property
+    def address(self):
+        return "http://127.0.0.1:{0}/TurbineLite".format(self.server_port)
+
+
+class mockGatewayHandler(BaseHTTPRequestHandler):
+    def log_message(self, *args):
+        pass
+
+    def do_GET(self):
+        url = urllib.parse.urlparse(self.path)
+        query = urllib.parse.parse_qs(url.query)
+        parts = [p for p in url.path.split("/") if p]
+        gateway = self.server
+        if parts[:2] != ["TurbineLite", "job"]:
+            self.send_error(404)
+            return
+        with gateway.lock:
+            if len(parts) == 3 and int(parts[2]) in gateway.jobs:
+                gateway.requests["job"] += 1
+                body = gateway.jobStatus(int(parts[2]))
+            elif len(parts) == 2 and "session" in query:
+                gateway.requests["session"] += 1
+                sid = query["session"][0]
+                body = [
+                    gateway.jobStatus(jobID)
+                    for jobID, job in gateway.jobs.items()
+                    if job["sid"] == sid
+                ]
+            else:
+                self.send_error(404)
+                return
+        data = json.dumps(body).encode("utf-8")
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+
+class TestTurbineStatusPoller(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.gateway = mockGateway()
+        threading.Thread(target=self.gateway.serve_forever, daemon=True).start()
+        self.tc = TurbineConfiguration(os.path.join(self.tmp.name, "turbine.cfg"))
+        self.tc.address = self.gateway.address
+        self.tc.writeConfig()
+
+    def tearDown(self):
+        self.tc.stopStatusPoller()
+        self.gateway.shutdown()
+        self.gateway.server_close()
+        self.tmp.cleanup()
+
+    def monitor(self, jobID, sid, results):
+        results[jobID] = self.tc.monitorJob(
+            jobID,
+            minCheckInt=0.05,
+            maxCheckInt=0.2,
+            checkConsumer=False,
+            sid=sid,
+        )
+
+    def test_concurrent_jobs_share_bulk_requests(self):
+        for i in range(8):
+            self.gateway.addJob(i, "s{0}".format(i % 2), x=i, duration=0.3 + 0.1 * i)
+        results = {}
+        threads = [
+            threading.Thread(
+                target=self.monitor, args=(i, "s{0}".format(i % 2), results)
+            )
+            for i in range(8)
+        ]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join(30)
+        self.assertEqual(sorted(results), list(range(8)))
+        for i, res in results.items():
+            self.assertEqual(res["State"], "success")
+            self.assertEqual(res["Output"]["y"]["value"], 2 * i)
+        # one request per session per check, the finished jobs had output
+        self.assertEqual(self.gateway.requests["job"], 0)
+        self.assertGreater(self.gateway.requests["session"], 0)
+        self.assertEqual(self.gateway.requests["session"], self.tc.poller.requests)
+        self.assertLess(self.gateway.requests["session"], 2 * 1.2 / 0.05)
+        self.assertEqual(self.tc.poller.jobs, {})
+        self.assertIs(self.tc.statusPoller(), self.tc.poller)
+
+    def test_future_and_adaptive_interval(self):
+        self.gateway.addJob(1, "s", x=1.0, duration=1.0)
+        poller = TurbineStatusPoller(
+            self.tc, minInterval=0.02, maxInterval=0.16, backoff=2.0
+        )
+        poller.start()
+        try:
+            future = poller.watch(1, "s")
+            time.sleep(0.6)
+            # nothing changed after the first check, backed off to the max
+            self.assertEqual(poller.interval, 0.16)
+            self.assertEqual(poller.status(1)["State"], "running")
+            self.assertEqual(future.result(timeout=5)["Output"]["y"]["value"], 2.0)
+            self.gateway.addJob(2, "s", x=2.0, duration=10.0)
+            poller.watch(2, "s")
+            self.assertEqual(poller.interval, 0.02)
+            poller.unwatch(2)
+        finally:
+            poller.terminate()
+            poller.join(5)
+        self.assertFalse(poller.is_alive())
+
+    def test_job_without_session_and_errors(self):
+        self.gateway.addJob(3, "s", x=3.0, duration=0.0)
+        results = {}
+        self.monitor(3, None, results)
+        self.assertEqual(results[3]["Output"]["y"]["value"], 6.0)
+        self.assertEqual(self.gateway.requests["job"], 1)
+        self.assertEqual(self.gateway.requests["session"], 0)
+        # status failures are raised to the waiting node
+        poller = self.tc.statusPoller()
+        poller.watch(99, None, minInterval=0.02)
+        time.sleep(0.3)
+        with self.assertRaises(TurbineInterfaceEx):
+            poller.status(99)
+        poller.unwatch(99)
+        self.assertEqual(poller.status(99), {})
@@ -22,6 +22,7 @@
 John Eslick, Carnegie Mellon University, 2014
 """
 
+import concurrent.futures
 import configparser
 import importlib
 import json
@@ -33,6 +34,7 @@ import re
 import socket
 import ssl
 import subprocess
+import threading
 import time
 import traceback
 import urllib.parse
@@ -209,6 +211,175 @@ class ConsumerInfo:
         self.location = location  # 0 local, 1 remote
 
 
+class TurbineStatusPoller(threading.Thread):
+    """
+    Background thread that checks the status of every Turbine job being
+    monitored through one TurbineConfiguration.  Jobs are fetched in bulk,
+    one request per Turbine session, so concurrent Turbine nodes share a
+    single stream of status requests instead of each polling its own job.
+
+    watch() returns a Future that is set to the job status when the job
+    reaches a finished state.  The time between checks starts at the
+    smallest minimum interval of the watched jobs, grows by backoff each
+    check where no job changed state, up to the smallest maximum
+    interval, and drops back to the minimum when a job changes state or
+    a new job is watched.
+    """
+
+    finishedStates = ["success", "warning", "error", "expired", "cancel", "terminate"]
+
+    def __init__(self, turbConfig, minInterval=4.0, maxInterval=30.0, backoff=1.5):
+        threading.Thread.__init__(self, daemon=True)
+        self.tc = turbConfig
+        self.minInterval = minInterval
+        self.maxInterval = maxInterval
+        self.backoff = backoff
+        self.interval = minInterval
+        self.requests = 0  # number of status requests sent to Turbine
+        self.lock = threading.Lock()
+        self.wake = threading.Event()
+        self.stop = threading.Event()
+        self.jobs = {}  # str(jobID) -> dict of watched job information
+        self.lastCheck = 0
+
+    def terminate(self):
+        self.stop.set()
+        self.wake.set()
+
+    def watch(self, jobID, sid=None, minInterval=None, maxInterval=None):
+        """
+        Start checking the status of a job.  sid is the job's Turbine
+        session, jobs without a session are checked one at a time.
+        Returns a Future set to the final job status.
+        """
+        with self.lock:
+            job = self.jobs.get(str(jobID))
+            if job is None:
+                job = dict(
+                    jobID=jobID,
+                    sid=sid,
+                    future=concurrent.futures.Future(),
+                    status=None,
+                    error=None,
+                    minInterval=minInterval or self.minInterval,
+                    maxInterval=maxInterval or self.maxInterval,
+                )
+                self.jobs[str(jobID)] = job
+            self.interval = self._bounds()[0]
+        self.wake.set()
+        return job["future"]
+
+    def unwatch(self, jobID):
+        """Stop checking the status of a job"""
+        with self.lock:
+            job = self.jobs.pop(str(jobID), None)
+        if job is not None:
+            job["future"].cancel()
+
+    def status(self, jobID):
+        """
+        Return the last status fetched for a job, an empty dict if it has
+        not been fetched yet.  If the last attempt to get the job status
+        failed, the exception is raised.
+        """
+        with self.lock:
+            job = self.jobs.get(str(jobID))
+            if job is None:
+                return {}
+            e, job["error"] = job["error"], None
+            res = job["status"]
+        if e is not None:
+            raise e
+        return res or {}
+
+    def _bounds(self):
+        """Smallest min and max intervals of the watched jobs"""
+        if not self.jobs:
+            return self.minInterval, self.maxInterval
+        return (
+            min(job["minInterval"] for job in self.jobs.values()),
+            min(job["maxInterval"] for job in self.jobs.values()),
+        )
+
+    def run(self):
+        while not self.stop.isSet():
+            with self.lock:
+                if self.jobs:
+                    timeout = max(0, self.interval - (time.time() - self.lastCheck))
+                else:
+                    timeout = None
+            self.wake.wait(timeout)
+            self.wake.clear()
+            if self.stop.isSet():
+                break
+            with self.lock:
+                if not self.jobs or time.time() - self.lastCheck < self.interval:
+                    # woken by a new job, wait again with the new interval
+                    continue
+            self.lastCheck = time.time()
+            try:
+                changed = self.check()
+            except Exception:
+                _log.exception("Error checking Turbine job status")
+                changed = False
+            with self.lock:
+                minInt, maxInt = self._bounds()
+                if changed:
+                    self.interval = minInt
+                else:
+                    self.interval = min(self.interval * self.backoff, maxInt)
+                self.interval = max(self.interval, minInt)
+
+    def check(self):
+        """
+        Get the status of all watched jobs, set the futures of finished
+        jobs and return True if any job changed state.
+        """
+        with self.lock:
+            sessions = OrderedDict()
+            for key, job in self.jobs.items():
+                sessions.setdefault(job["sid"], []).append(key)
+        changed = False
+        for sid, keys in sessions.items():
+            bulk = {}
+            if sid is not None:
+                try:
+                    self.requests += 1
+                    for res in self.tc.getSessionJobStatus(sid):
+                        bulk[str(res.get("Id"))] = res
+                except Exception:
+                    _log.exception(
+                        "Failed to get job status for session {}".format(sid)
+                    )
+            for key in keys:
+                with self.lock:
+                    job = self.jobs.get(key)
+                if job is None:
+                    continue
+                res = bulk.get(key)
+                try:
+                    if res is None or (
+                        res.get("State") in self.finishedStates and "Output" not in res
+                    ):
+                        # not in the session list or need the full result
+                        self.requests += 1
+                        res = self.tc.getJobStatus(job["jobID"])
+                except TurbineInterfaceEx as e:
+                    with self.lock:
+                        job["error"] = e
+                    continue
+                state = res.get("State", None)
+                with self.lock:
+                    old = job["status"]
+                    job["status"] = res
+                    job["error"] = None
+                if old is None or old.get("State", None) != state:
+                    changed = True
+                if state in self.finishedStates and not job["future"].done():
+                    job["future"].set_result(res)
+        return changed
+
+
 class TurbineConfiguration:
     """
     This class stores the information needed to write a turbine
@@ -259,6 +430,8 @@ class TurbineConfiguration:
         self.aspenVersion = 2
         self.dat = None
         self.tldb = None
+        self.poller = None
+        self.pollerLock = threading.Lock()
         # WHY: setting these directly in makeCopy without defining them as attributes here
         # triggers no-member errors in pylint 2.14.1
         self.configExt = None
@@ -280,6 +453,23 @@ class TurbineConfiguration:
             self.tldb = turbineLiteDB.turbineLiteDB()
         return self.tldb
 
+    def statusPoller(self):
+        """
+        Return the status poller shared by all the jobs monitored through
+        this configuration, starting it if needed.
+        """
+        with self.pollerLock:
+            if self.poller is None or not self.poller.is_alive():
+                self.poller = TurbineStatusPoller(self)
+                self.poller.start()
+            return self.poller
+
+    def stopStatusPoller(self):
+        with self.pollerLock:
+            if self.poller is not None:
+                self.poller.terminate()
+            self.poller = None
+
     def closeTurbineLiteDB(self):
         if self.tldb is not None:
             self.tldb.closeConnection()
@@ -952,6 +1142,27 @@ class TurbineConfiguration:
                 tb=traceback.format_exc(),
             )
 
+    def getSessionJobStatus(self, sid, maxJobs=2000):
+        """
+        Get the status of all the jobs in a session with one request,
+        returns a list of job status dictionaries
+        """
+        kw = dict(session=str(sid))
+        if maxJobs > 0:
+            kw["rpp"] = maxJobs
+        cp = self.turbineConfigParse()
+        url, auth, params = read_configuration(cp, _tjob.SECTION, **kw)
+        try:
+            jobs = get_page_by_url(url, auth, **params)
+        except Exception as e:
+            raise TurbineInterfaceEx(
+                code=0,
+                msg="Failed to get job status, session id: {}".format(sid),
+                e=e,
+                tb=traceback.format_exc(),
+            )
+        return json.loads(jobs)
+
     def simResourceList(self, sim):
         """Get a list of resources for a simulation"""
         kw = {}
@@ -1009,6 +1220,7 @@ class TurbineConfiguration:
         allowWarnings=True,
         app=None,
         checkConsumer=True,
+        sid=None,
     ):
         """
         This function monitors a job submitted to Turbine and
@@ -1030,6 +1242,10 @@ class TurbineConfiguration:
                      checking a jobs status in seconds
         sotpFlag: a flag that when set means to stop monitoring and
                   terminate the job
+        sid: the job's Turbine session, if given the job status is
+             fetched by the shared status poller, and the check interval
+             is only the longest time to wait before checking the
+             consumer, timeouts and stop flag.
         """
         # if exception is thrown I'll still stick
         # the results here if possible still may be useful
@@ -1054,148 +1270,165 @@ class TurbineConfiguration:
         state = "submit"  # initial state of the job
         failedStates = ["error", "expired", "cancel", "terminate"]
         successStates = ["success", "warning"]
-        while True:  # start status checking loop
-            # wait checkInt seconds wait before checking first time,
-            # probably started the job, and it won't finish instantly
-            time.sleep(checkInt)
-            # Check that consumer is still running, had trouble with it
-            # stopping for unknown reasons, so I'll keep an eye on it.
-            if checkConsumer:
-                proc = self.checkConsumer(nodeName)
-                if proc == None:
-                    _log.error("Apparently the consumer died, job failed")
-                    try:
-                        self.killJob(jobID, state)
-                    except Exception as e:
-                        _log.exception(
-                            "Job {} timeout failed to terminate".format(jobID)
-                        )
-                    raise TurbineInterfaceEx(code=356)
-            # Now check job results form Turbine
-            try:
-                # Check status of job
-                # -1 is not done
-                # 0 is okay,
-                # 2 warning,
-                # anything else is an error
-                res = self.getJobStatus(jobID, verbose=False)
-                state = res.get("State", None)
-                if (
-                    not allowWarnings
-                    and state == "success"
-                    and res.get("Status", sinter_AppError.si_OKAY)
-                    == sinter_AppError.si_SIMULATION_WARNING
-                ):
-                    state = "error"
-                failure = state in failedStates
-                success = state in successStates
-
-                # Check for the run start time instead of the state just
-                # in case job started and completed between checks
-                if not setupStart and state == "setup":
-                    setupStart = time.process_time()
-                if not runStart and res.get("Running", False):
-                    runStart = time.process_time()
-                    _log.info("Job " + str(jobID) + " Started Running")
-            except TurbineInterfaceEx as e:
-                # sometimes there is a temporary network disruption just
-                # let the timeout handle this could be another error too
-                if e.code not in self.retryErrors + [12]:
-                    failure = True
-                    comProb = True
-                    _log.exception("Job {} failed".format(jobID))
-                elif e.code == 12:
-                    # this is a 404 error there is a good chance that
-                    # I'm checking the job status too fast and the job
-                    # page has not bee created yet
-                    if time.process_time() - start < 20:
-                        # started less than 20 sec ago give it some time
-                        _log.exception(
-                            "Job {} status check failed retrying".format(jobID)
-                        )
+        poller = None
+        if sid is not None:
+            poller = self.statusPoller()
+            future = poller.watch(
+                jobID, sid, minInterval=minCheckInt, maxInterval=maxCheckInt
+            )
+        try:
+            while True:  # start status checking loop
+                # wait checkInt seconds wait before checking first time,
+                # probably started the job, and it won't finish instantly
+                if poller is None:
+                    time.sleep(checkInt)
+                else:
+                    # the poller wakes this up when the job finishes
+                    concurrent.futures.wait([future], timeout=checkInt)
+                # Check that consumer is still running, had trouble with it
+                # stopping for unknown reasons, so I'll keep an eye on it.
+                if checkConsumer:
+                    proc = self.checkConsumer(nodeName)
+                    if proc == None:
+                        _log.error("Apparently the consumer died, job failed")
+                        try:
+                            self.killJob(jobID, state)
+                        except Exception as e:
+                            _log.exception(
+                                "Job {} timeout failed to terminate".format(jobID)
+                            )
+                        raise TurbineInterfaceEx(code=356)
+                # Now check job results form Turbine
+                try:
+                    # Check status of job
+                    # -1 is not done
+                    # 0 is okay,
+                    # 2 warning,
+                    # anything else is an error
+                    if poller is None:
+                        res = self.getJobStatus(jobID, verbose=False)
                     else:
-                        # started more than 20 seconds ago
-                        # probably something wrong job failed
+                        res = poller.status(jobID)
+                    state = res.get("State", None)
+                    if (
+                        not allowWarnings
+                        and state == "success"
+                        and res.get("Status", sinter_AppError.si_OKAY)
+                        == sinter_AppError.si_SIMULATION_WARNING
+                    ):
+                        state = "error"
+                    failure = state in failedStates
+                    success = state in successStates
+
+                    # Check for the run start time instead of the state just
+                    # in case job started and completed between checks
+                    if not setupStart and state == "setup":
+                        setupStart = time.process_time()
+                    if not runStart and res.get("Running", False):
+                        runStart = time.process_time()
+                        _log.info("Job " + str(jobID) + " Started Running")
+                except TurbineInterfaceEx as e:
+                    # sometimes there is a temporary network disruption just
+                    # let the timeout handle this could be another error too
+                    if e.code not in self.retryErrors + [12]:
                         failure = True
                         comProb = True
-                        _log.exception("Failed Job: {}".format(jobID))
-                else:
-                    # If error was in list of errors that could be
-                    # temporary, will keep trying.
-                    _log.debug(
+                        _log.exception("Job {} failed".format(jobID))
+                    elif e.code == 12:
+                        # this is a 404 error there is a good chance that
+                        # I'm checking the job status too fast and the job
+                        # page has not bee created yet
+                        if time.process_time() - start < 20:
+                            # started less than 20 sec ago give it some time
+                            _log.exception(
+                                "Job {} status check failed retrying".format(jobID)
+                            )
+                        else:
+                            # started more than 20 seconds ago
+                            # probably something wrong job failed
+                            failure = True
+                            comProb = True
+                            _log.exception("Failed Job: {}".format(jobID))
+                    else:
+                        # If error was in list of errors that could be
+                        # temporary, will keep trying.
+                        _log.debug(
+                            "Job "
+                            + str(jobID)
+                            + " failed to check status will retry, Ex: "
+                            + str(e)
+                        )
+                except Exception as e:
+                    # if it is some other exception give up and log it
+                    failure = True
+                    comProb = True
+                    _log.info(
                         "Job "
                         + str(jobID)
-                        + " failed to check status will retry, Ex: "
+                        + " failed, Exception: "
                         + str(e)
+                        + "\n "
+                        + traceback.format_exc()
                     )
-            except Exception as e:
-                # if it is some other exception give up and log it
-                failure = True
-                comProb = True
-                _log.info(
-                    "Job "
-                    + str(jobID)
-                    + " failed, Exception: "
-                    + str(e)
-                    + "\n "
-                    + traceback.format_exc()
-                )
-            # Have the job status, figure out what to do next
-            if success:
-                # Return the job results if success
-                self.res = res
-                return res
-            elif failure:
-                # get results again with more detailed messages that
-                # may help show why the job failed.
-                try:
-                    res = self.getJobStatus(jobID, verbose=True)
+                # Have the job status, figure out what to do next
+                if success:
+                    # Return the job results if success
                     self.res = res
-                except:
-                    pass
-                if comProb:
-                    raise TurbineInterfaceEx(
-                        code=354, msg="".join(["Results: ", str(res)])
-                    )
-                else:
-                    raise TurbineInterfaceEx(
-                        code=350, msg="".join(["Results: ", str(res)])
-                    )
-            elif time.process_time() - start > maxWaitTime:
-                # Jobs not done but I'm not waiting any more (timeout)
-                try:
-                    self.killJob(jobID, state)
-                except Exception:
-                    _log.exception(
-                        "Job " + str(jobID) + " Wait time-out, failed to terminate"
-                        " job on Turbine\n"
-                    )
-                finally:
-                    raise TurbineInterfaceEx(
-                        code=353, msg="".join(["Results: ", str(res)])
-                    )
-            elif runStart and time.process_time() - runStart > maxRunTime:
-                try:
-                    self.killJob(jobID, state)
-                except Exception:
-                    _log.exception(
-                        "Job " + str(jobID) + " Run time-out, failed to terminate"
-                        " job on Turbine\n"
-                    )
-                finally:
-                    raise TurbineInterfaceEx(
-                        code=352, msg="".join(["Results: ", str(res)])
-                    )
-            elif stopFlag != None and stopFlag.isSet():
-                try:
-                    self.killJob(jobID, state)
-                except Exception:
-                    _log.exception(
-                        "Job " + str(jobID) + " Graph thread terminate, failed to"
-                        " terminate job on Turbine\n"
-                    )
-                finally:
-                    raise TurbineInterfaceEx(code=355)
+                    return res
+                elif failure:
+                    # get results again with more detailed messages that
+                    # may help show why the job failed.
+                    try:
+                        res = self.getJobStatus(jobID, verbose=True)
+                        self.res = res
+                    except:
+                        pass
+                    if comProb:
+                        raise TurbineInterfaceEx(
+                            code=354, msg="".join(["Results: ", str(res)])
+                        )
+                    else:
+                        raise TurbineInterfaceEx(
+                            code=350, msg="".join(["Results: ", str(res)])
+                        )
+                elif time.process_time() - start > maxWaitTime:
+                    # Jobs not done but I'm not waiting any more (timeout)
+                    try:
+                        self.killJob(jobID, state)
+                    except Exception:
+                        _log.exception(
+                            "Job " + str(jobID) + " Wait time-out, failed to terminate"
+                            " job on Turbine\n"
+                        )
+                    finally:
+                        raise TurbineInterfaceEx(
+                            code=353, msg="".join(["Results: ", str(res)])
+                        )
+                elif runStart and time.process_time() - runStart > maxRunTime:
+                    try:
+                        self.killJob(jobID, state)
+                    except Exception:
+                        _log.exception(
+                            "Job " + str(jobID) + " Run time-out, failed to terminate"
+                            " job on Turbine\n"
+                        )
+                    finally:
+                        raise TurbineInterfaceEx(
+                            code=352, msg="".join(["Results: ", str(res)])
+                        )
+                elif stopFlag != None and stopFlag.isSet():
+                    try:
+                        self.killJob(jobID, state)
+                    except Exception:
+                        _log.exception(
+                            "Job " + str(jobID) + " Graph thread terminate, failed to"
+                            " terminate job on Turbine\n"
+                        )
+                    finally:
+                        raise TurbineInterfaceEx(code=355)
+        finally:
+            if poller is not None:
+                poller.unwatch(jobID)
 
     def getAppByExtension(self, modelFile):
         junk, modelExt = os.path.splitext(modelFile)  # get model ext
@@ -0,0 +1,324 @@
+#################################################################################
+# FOQUS Copyright (c) 2012 - 2026, by the software owners: Oak Ridge Institute
+# for Science and Education (ORISE), TRIAD National Security, LLC., Lawrence
+# Livermore National Security, LLC., The Regents of the University of
+# California, through Lawrence Berkeley National Laboratory, Battelle Memorial
+# Institute, Pacific Northwest Division through Pacific Northwest National
+# Laboratory, Carnegie Mellon University, West Virginia University, Boston
+# University, the Trustees of Princeton University, The University of Texas at
+# Austin, URS Energy & Construction, Inc., et al.  All rights reserved.
+#
+# Please see the file LICENSE.md for full copyright and license information,
+# respectively. This file is also available online at the URL
+# "https://github.com/CCSI-Toolset/FOQUS".
+#################################################################################
+"""turbineLiteConsumer.py
+* The FOQUS TurbineLite consumer loop, run by foqus.py --consumer
+
+Jobs are taken from the TurbineLite database and run up to maxJobs at a
+time.  Loaded FOQUS sessions are kept per simulation ID and only reloaded
+when a job asks for a Reset or the simulation's session file changed.
+Each job loads its input values into the cached session and runs a copy
+of the flowsheet in a graph thread, so jobs of the same simulation can
+share one loaded session.
+
+Jobs are claimed from the database several at a time with
+turbineLiteDB.claim_jobs, which moves them to setup for this consumer in
+one transaction, and each status change is written together with its
+message.
+"""
+
+import collections
+import hashlib
+import json
+import logging
+import os
+import time
+
+_log = logging.getLogger("foqus." + __name__)
+
+
+class consumerJob:
+    """A job that has been started in a graph thread"""
+
+    def __init__(self, guid, jid, simId, entry, gt):
+        self.guid = guid
+        self.jid = jid
+        self.simId = simId
+        self.entry = entry
+        self.gt = gt
+        self.workingDirectory = os.path.join("test", str(jid))
+        # result session file to keep on record
+        self.rfile = os.path.join(self.workingDirectory, "results_session.foqus")
+        # Output values file
+        self.ofile = os.path.join(self.workingDirectory, "output.json")
+
+
+class turbineLiteConsumer:
+    def __init__(
+        self,
+        db,
+        consumerId,
+        makeSession,
+        maxJobs=1,
+        simName=None,
+        sessionID=None,
+        onlyMyId=False,
+        delay=5,
+        cancelJobs=False,
+        statusInterval=10,
+        maxSessions=None,
+    ):
+        """
+        Args:
+            db: turbineLiteDB or an object with the same consumer methods
+            consumerId: this consumer's ID in the JobConsumers table
+            makeSession: function returning a new FOQUS session
+            maxJobs: maximum number of jobs running at once
+            simName, sessionID: only take jobs of this simulation/session
+            onlyMyId: only take jobs assigned to this consumer
+            delay: time between checking for new jobs when idle
+            cancelJobs: cancel jobs instead of running them
+            statusInterval: time between checking the consumer status
+            maxSessions: number of loaded sessions to keep, default maxJobs+1
+        """
+        self.db = db
+        self.consumerId = consumerId
+        self.makeSession = makeSession
+        self.maxJobs = max(1, int(maxJobs))
+        self.simName = simName
+        self.sessionID = sessionID
+        self.onlyMyId = onlyMyId
+        self.delay = delay
+        self.cancelJobs = cancelJobs
+        self.statusInterval = statusInterval
+        if maxSessions is None:
+            maxSessions = self.maxJobs + 1
+        self.maxSessions = maxSessions
+        # simId -> dict(dat, digest, running), least recently used first
+        self.sessions = collections.OrderedDict()
+        self.running = []
+        self.terminated = False
+        self.loads = 0  # number of session files loaded
+
+    def addSession(self, dat):
+        """Give the consumer an existing session to load the first job into"""
+        self.sessions[None] = dict(dat=dat, digest=None, running=0)
+
+    def getSession(self, simId, configContent, sfile, reset):
+        """
+        Return the session cache entry for simId with the session file
+        loaded.  The file is loaded only if there is no cached session, the
+        job asks for a reset or the staged configuration has changed.  A
+        session with jobs still running is left to them and a new one is
+        made for the reload.
+        """
+        content = configContent or ""
+        if not isinstance(content, bytes):
+            content = content.encode("utf-8")
+        digest = hashlib.sha1(content).hexdigest()
+        entry = self.sessions.get(simId)
+        if entry is not None and not reset and entry["digest"] == digest:
+            _log.info("Same simulation as prev., not reloading")
+            self.sessions.move_to_end(simId)
+            return entry
+        if reset:
+            _log.info(
+                "Reset = True, stopping consumers "
+                "and reloading foqus file {0}".format(sfile)
+            )
+        else:
+            _log.info(
+                "Simulation {0} not loaded or changed, reloading simulation"
+                " stopping consumers, {1}".format(simId, sfile)
+            )
+        if entry is None or entry["running"]:
+            entry = self.takeIdleSession(simId)
+        entry["digest"] = None
+        self.sessions[simId] = entry
+        self.sessions.move_to_end(simId)
+        entry["dat"].load(sfile, stopConsumers=True)
+        entry["digest"] = digest
+        self.loads += 1
+        self.evictSessions()
+        return entry
+
+    def takeIdleSession(self, simId):
+        """Reuse the unused starting session, else make a new one"""
+        entry = self.sessions.get(None)
+        if entry is not None:
+            del self.sessions[None]
+            return entry
+        return dict(dat=self.makeSession(), digest=None, running=0)
+
+    def evictSessions(self):
+        """Drop least recently used idle sessions over maxSessions"""
+        for key in list(self.sessions):
+            if len(self.sessions) <= self.maxSessions:
+                break
+            if self.sessions[key]["running"] == 0:
+                del self.sessions[key]
+
+    def getJobs(self, n):
+        """Return up to n (guid, jid, simId, reset) jobs to run or cancel"""
+        if self.cancelJobs:
+            job = self.db.get_job_id(
+                simName=self.simName,
+                sessionID=self.sessionID,
+                consumerID=self.consumerId if self.onlyMyId else None,
+            )
+            return [job] if job[0] else []
+        return self.db.claim_jobs(
+            self.consumerId,
+            n,
+            simName=self.simName,
+            sessionID=self.sessionID,
+            onlyMyId=self.onlyMyId,
+        )
+
+    def cancelJob(self, guid, jid):
+        # Just switch job to cancel state
+        _log.info("Job {0} will be canceled".format(jid))
+        self.db.jobs_change_status(
+            [(guid, "cancel")],
+            [("consumer={0}, canceling job {1}".format(self.consumerId, jid), guid)],
+        )
+
+    def startJob(self, guid, jid, simId, reset):
+        """
+        Set up a claimed job and start running it, return the consumerJob
+        """
+        db = self.db
+        db.add_message(
+            "consumer={0}, starting job {1}".format(self.consumerId, jid), guid
+        )
+        configContent = db.get_configuration_file(simId)
+        _log.info("Job {0} is submitted".format(jid))
+        db.job_prepare(guid, jid, configContent)
+        workingDirectory = os.path.join("test", str(jid))
+        # Session file to run
+        sfile = os.path.join(workingDirectory, "session.foqus")
+        # Input values files
+        vfile = os.path.join(workingDirectory, "input_values.json")
+        try:
+            entry = self.getSession(simId, configContent, sfile, reset)
+            dat = entry["dat"]
+            # Load the input values
+            _log.info("Loading input values. {0}".format(vfile))
+            dat.loadFlowsheetValues(vfile)
+            # Run graph
+            db.job_change_status(guid, "running")
+            _log.info("Moving job {0} to running state".format(jid))
+        except:
+            _log.exception(
+                "Error loading session or session inputs for job: {0}".format(jid)
+            )
+            with open(os.path.join(workingDirectory, "output.json"), "w") as f:
+                json.dump({"graphError": 50}, f)
+            db.job_save_output(guid, workingDirectory)
+            db.jobs_change_status(
+                [(guid, "error")],
+                [
+                    (
+                        "consumer={0}, job={1} error loading job or"
+                        "inputs".format(self.consumerId, jid),
+                        guid,
+                    )
+                ],
+            )
+            return None
+        gt = dat.flowsheet.runAsThread()
+        entry["running"] += 1
+        job = consumerJob(guid, jid, simId, entry, gt)
+        self.running.append(job)
+        return job
+
+    def finishJob(self, job):
+        """Save the results of a job whose graph thread has finished"""
+        db = self.db
+        dat = job.entry["dat"]
+        job.entry["running"] -= 1
+        self.running.remove(job)
+        if job.gt.res[0]:
+            _log.debug("GT: %s", job.gt.res[0])
+            dat.flowsheet.loadValues(job.gt.res[0])
+        else:
+            dat.flowsheet.errorStat = 19
+        dat.saveFlowsheetValues(job.ofile)
+        db.job_save_output(job.guid, job.workingDirectory)
+        dat.save(
+            filename=job.rfile,
+            updateCurrentFile=False,
+            changeLogMsg="Saved Turbine Run",
+            bkp=False,
+            indent=0,
+        )
+        if dat.flowsheet.errorStat == 0:
+            status = "success"
+        else:
+            status = "error"
+        msg = "consumer={0}, job {1} finished, {2}".format(
+            self.consumerId, job.jid, status
+        )
+        db.jobs_change_status([(job.guid, status)], [(msg, job.guid)])
+        _log.info("Job {0} finished with {1}".format(job.jid, status))
+        self.evictSessions()
+
+    def finishJobs(self):
+        for job in [j for j in self.running if not j.gt.is_alive()]:
+            self.finishJob(job)
+
+    def wait(self, timeout):
+        """Wait for the oldest running job up to timeout seconds"""
+        if self.running:
+            self.running[0].gt.join(timeout)
+        else:
+            time.sleep(timeout)
+
+    def checkStatus(self):
+        status = self.db.consumer_status(self.consumerId)
+        if status == "terminate" or status == "down":
+            self.terminated = True
+        return self.terminated
+
+    def run(self):
+        """Run jobs until the consumer status is set to terminate or down"""
+        self.terminated = False
+        lastCheck = time.time()
+        while True:
+            self.finishJobs()
+            if time.time() - lastCheck >= self.statusInterval:
+                lastCheck = time.time()
+                if self.checkStatus():
+                    break
+            if len(self.running) >= self.maxJobs:
+                self.wait(min(1.0, self.statusInterval))
+                continue
+            jobs = self.getJobs(self.maxJobs - len(self.running))
+            if not jobs:
+                self.wait(self.delay)
+            for guid, jid, simId, reset in jobs:
+                if self.cancelJobs:
+                    self.cancelJob(guid, jid)
+                else:
+                    self.startJob(guid, jid, simId, reset)
+        if self.terminated:
+            self.stop("terminate status")
+
+    def stop(self, reason):
+        """Terminate running jobs and put them in the error state"""
+        msg = "consumer={0}, stopping consumer {1}".format(self.consumerId, reason)
+        for job in self.running:
+            try:
+                job.gt.terminate()
+            except:
+                pass
+            job.entry["running"] -= 1
+        try:
+            self.db.jobs_change_status(
+                [(job.guid, "error") for job in self.running],
+                [(msg, job.guid) for job in self.running],
+            )
+        except:
+            _log.exception("Error setting stopped jobs to error")
+        self.running = []
@@ -16,19 +16,34 @@
 * Some functions to work directly with a local TurbineLite DB
 
 John Eslick, Carnegie Mellon University, 2014
+
+Connections are pooled and reused between calls unless close_after is
+True.  All statements use qmark parameters, which both adodbapi and
+sqlite3 support.  Passing sqlite=<path> uses a SQLite database with the
+TurbineLite schema instead of the SQL Server CE file, for testing
+without TurbineLite.
 """
 
+import contextlib
 import os
 import os.path
+import queue
+import sqlite3
 import threading
 import time
 import uuid
 
-import adodbapi
-import adodbapi.apibase
+try:
+    import adodbapi
+    import adodbapi.apibase
+
+    adodbapi.adodbapi.defaultCursorLocation = 2  # adodbapi.adUseServer
+except ImportError:
+    adodbapi = None
+
 from foqus_lib import core
 
-adodbapi.adodbapi.defaultCursorLocation = 2  # adodbapi.adUseServer
+FINISHED_STATES = ["success", "error", "terminate", "cancel"]
 
 
 class DBException(Exception):
@@ -56,16 +71,43 @@ class keepAliveTimer(threading.Thread):
                 i = 0
 
 
+def _timestamp():
+    return time.strftime("%m/%d/%Y %I:%M %p", time.gmtime())
+
+
+def _statusTimeColumn(status):
+    """Jobs table column holding the time a job entered status"""
+    if status == "setup":
+        return "Setup"
+    elif status == "running":
+        return "Running"
+    elif status in FINISHED_STATES:
+        return "Finished"
+    return None
+
+
 class turbineLiteDB:
-    def __init__(self, close_after=True):
-        self.conn = None
+    def __init__(self, close_after=True, sqlite=None, poolSize=4):
+        """
+        Args:
+            close_after: close connections after each call instead of
+                keeping them in the pool
+            sqlite: path of a SQLite database to use instead of the
+                TurbineLite SQL Server CE database
+            poolSize: maximum number of idle connections kept open
+        """
         self.close_after = close_after
+        self.sqlite = sqlite
+        self.poolSize = poolSize
+        self._pool = queue.LifoQueue()
 
     def __del__(self):
         self.closeConnection()
 
     @property
     def database(self):
+        if self.sqlite is not None:
+            return self.sqlite
         return core.TurbineLiteDependencyTracker.load().database
 
     def connectionString(self):
@@ -73,28 +115,96 @@ class turbineLiteDB:
         data = "Data Source={0};".format(self.database)
         return " ".join([prov, data])
 
+    def connect(self):
+        """Open a new connection, not in autocommit mode"""
+        if self.sqlite is not None:
+            # transactions are started explicitly in transaction()
+            return sqlite3.connect(
+                self.sqlite, timeout=30, isolation_level=None, check_same_thread=False
+            )
+        if adodbapi is None:
+            raise DBException("adodbapi is required to use the TurbineLite database")
+        return adodbapi.connect(self.connectionString(), autocommit=False)
+
     def getConnection(self, rc=0):
-        if self.conn is not None:
-            return self.conn, self.conn.cursor()
+        """Get a connection from the pool or open a new one"""
         try:
-            conn = adodbapi.connect(self.connectionString(), autocommit=True)
-            self.conn = conn
+            return self._pool.get_nowait()
+        except queue.Empty:
+            pass
+        try:
+            return self.connect()
         except Exception as e:
             if rc <= 5:
                 time.sleep(10 * rc**2)
-                conn, curs = self.getConnection(rc + 1)
-            else:
-                raise (e)
-        return conn, conn.cursor()
+                return self.getConnection(rc + 1)
+            raise e
+
+    def releaseConnection(self, conn):
+        """Return a connection to the pool or close it"""
+        if self.close_after or self._pool.qsize() >= self.poolSize:
+            self._close(conn)
+        else:
+            self._pool.put(conn)
+
+    @staticmethod
+    def _close(conn):
+        try:
+            conn.close()
+        except:
+            pass
 
     def closeConnection(self):
-        if self.conn is None:
-            return
+        """Close all pooled connections"""
+        pool = getattr(self, "_pool", None)
+        while pool is not None:
+            try:
+                self._close(pool.get_nowait())
+            except queue.Empty:
+                break
+
+    @contextlib.contextmanager
+    def transaction(self):
+        """
+        Context manager giving a cursor; everything executed with it is
+        committed together when the block exits, or rolled back if it
+        raises.  A connection that failed is not returned to the pool.
+        """
+        conn = self.getConnection()
         try:
-            self.conn.close()
-            self.conn = None
+            curs = conn.cursor()
+            if self.sqlite is not None:
+                # take the write lock now, so reads and updates in the
+                # transaction are atomic
+                curs.execute("BEGIN IMMEDIATE")
+            yield curs
+            conn.commit()
         except:
-            self.conn = None
+            try:
+                conn.rollback()
+            except:
+                pass
+            self._close(conn)
+            raise
+        self.releaseConnection(conn)
+
+    def _run(self, f, rc=0):
+        """Run f(cursor) in a transaction, retrying on errors"""
+        while True:
+            try:
+                with self.transaction() as curs:
+                    return f(curs)
+            except Exception as e:
+                if rc > 1:
+                    raise e
+                rc += 1
+
+    def _top(self, n, sqlstr):
+        """Limit a SELECT statement to its first n rows"""
+        n = int(n)
+        if self.sqlite is not None:
+            return "{0} LIMIT {1}".format(sqlstr, n)
+        return sqlstr.replace("SELECT", "SELECT TOP {0}".format(n), 1)
 
     def add_new_application(self, applicationName, rc=0):
         """
@@ -106,122 +216,108 @@ class turbineLiteDB:
 
         return value
         """
-        conn, curs = self.getConnection()
-        try:
-            sqlstr = "SELECT Name FROM Applications WHERE Name='{0}'".format(
-                applicationName
+
+        def f(curs):
+            curs.execute(
+                "SELECT Name FROM Applications WHERE Name=?", (applicationName,)
             )
-            curs.execute(sqlstr)
             if curs.fetchone() is None:
-                sqlstr = "INSERT INTO Applications VALUES ('{0}', NULL, NULL)".format(
-                    applicationName
+                curs.execute(
+                    "INSERT INTO Applications VALUES (?, NULL, NULL)",
+                    (applicationName,),
                 )
-                curs.execute(sqlstr)
-            self.closeConnection()
-        except Exception as e:
-            self.closeConnection()
-            if rc > 1:
-                raise e
-            else:
-                self.add_new_application(applicationName, rc=rc + 1)
+
+        self._run(f, rc)
+
+    @staticmethod
+    def _add_message(curs, msg, jobid):
+        curs.execute(
+            "INSERT INTO Messages VALUES (?, ?, ?, ?)",
+            (str(uuid.uuid4()), msg, _timestamp(), jobid),
+        )
 
     def add_message(self, msg, jobid, rc=0):
-        conn, curs = self.getConnection()
-        try:
-            uid = str(uuid.uuid4())
-            t = time.strftime("%m/%d/%Y %I:%M %p", time.gmtime())
-            sqlstr = "INSERT INTO Messages VALUES ('{0}', '{1}', '{2}', '{3}')".format(
-                uid, msg, t, jobid
-            )
-            curs.execute(sqlstr)
-            self.closeConnection()
-        except Exception as e:
-            self.closeConnection()
-            if rc > 1:
-                raise e
-            else:
-                self.add_message(msg, jobid, rc=rc + 1)
+        self._run(lambda curs: self._add_message(curs, msg, jobid), rc)
 
     def consumer_keepalive(self, uid, rc=0):
-        conn, curs = self.getConnection()
-        try:
-            t = time.strftime("%m/%d/%Y %I:%M %p", time.gmtime())
-            sqlstr = "UPDATE JobConsumers SET keepalive='{0}' WHERE Id='{1}'".format(
-                t, uid
-            )
-            curs.execute(sqlstr)
-            self.closeConnection()
-        except Exception as e:
-            self.closeConnection()
-            if rc > 1:
-                raise e
-            else:
-                self.consumer_keepalive(uid, rc=rc + 1)
+        self._run(
+            lambda curs: curs.execute(
+                "UPDATE JobConsumers SET keepalive=? WHERE Id=?", (_timestamp(), uid)
+            ),
+            rc,
+        )
 
     def consumer_status(self, uid, status=None, rc=0):
-        conn, curs = self.getConnection()
-        try:
+        def f(curs):
             if status is not None:
-                sqlstr = "UPDATE JobConsumers SET status='{0}' WHERE Id='{1}'".format(
-                    status, uid
+                curs.execute(
+                    "UPDATE JobConsumers SET status=? WHERE Id=?", (status, uid)
                 )
-                curs.execute(sqlstr)
-                self.closeConnection()
-            else:
-                sqlstr = "SELECT status FROM JobConsumers WHERE Id='{0}'".format(uid)
-                curs.execute(sqlstr)
-                s = curs.fetchone()
-                self.closeConnection()
-                if s == None:
-                    return None
-                return s[0]
-        except Exception as e:
-            self.closeConnection()
-            if rc > 1:
-                raise e
-            else:
-                self.consumer_status(uid, status, rc=rc + 1)
+                return None
+            curs.execute("SELECT status FROM JobConsumers WHERE Id=?", (uid,))
+            s = curs.fetchone()
+            if s == None:
+                return None
+            return s[0]
+
+        return self._run(f, rc)
 
     def consumer_id(self, pid, rc=0):
-        conn, curs = self.getConnection()
-        try:
-            sqlstr = "SELECT Id FROM JobConsumers WHERE processId='{0}' AND status='up'".format(
-                pid
+        def f(curs):
+            curs.execute(
+                "SELECT Id FROM JobConsumers WHERE processId=? AND status='up'",
+                (pid,),
             )
-            curs.execute(sqlstr)
             s = curs.fetchone()
-            self.closeConnection()
             if s == None:
                 return None
             return s[0]
-        except Exception as e:
-            self.closeConnection()
-            if rc > 1:
-                raise e
-            else:
-                self.consumer_id(pid, rc=rc + 1)
+
+        return self._run(f, rc)
 
     def consumer_register(self, rc=0):
-        conn, curs = self.getConnection()
-        try:
-            uid = str(uuid.uuid4())
-            t = time.strftime("%m/%d/%Y %I:%M %p", time.gmtime())
-            sqlstr = (
-                "INSERT INTO JobConsumers "
-                "VALUES "
-                "('{0}', 'localhost', {1}, 'up', '{2}', 'foqus')".format(
-                    uid, os.getpid(), t
-                )
-            )
-            curs.execute(sqlstr)
-            self.closeConnection()
-            return uid
-        except Exception as e:
-            self.closeConnection()
-            if rc > 1:
-                raise e
+        uid = str(uuid.uuid4())
+        self._run(
+            lambda curs: curs.execute(
+                "INSERT INTO JobConsumers VALUES (?, 'localhost', ?, 'up', ?, 'foqus')",
+                (uid, os.getpid(), _timestamp()),
+            ),
+            rc,
+        )
+        return uid
+
+    def _select_jobs(
+        self, curs, n, simName=None, sessionID=None, consumerID=None, state="submit"
+    ):
+        """Return up to n (guid, count, simId, reset) of jobs in state"""
+        sqlstr = (
+            "SELECT Jobs.Id, Jobs.Count, Jobs.SimulationId, Jobs.Reset"
+            " FROM Jobs INNER JOIN Simulations"
+            " ON Jobs.SimulationId=Simulations.Id"
+            " WHERE Jobs.State=?"
+            " AND Simulations.ApplicationName='foqus'"
+        )
+        params = [state]
+        if sessionID is not None:
+            sqlstr += " AND Jobs.SessionId=?"
+            params.append(sessionID)
+        if simName is not None:
+            sqlstr += " AND Simulations.Name=?"
+            params.append(simName)
+        if consumerID is not None:
+            sqlstr += " AND Jobs.ConsumerId=?"
+            params.append(consumerID)
+        sqlstr += " ORDER BY Jobs.Count"
+        curs.execute(self._top(n, sqlstr), params)
+        jobs = []
+        for row in curs.fetchall():
+            reset = row[3]
+            if not reset or reset == "false":
+                reset = False
             else:
-                self.consumer_register(rc=rc + 1)
+                reset = True
+            jobs.append((row[0].strip("{}"), row[1], row[2].strip("{}"), reset))
+        return jobs
 
     def get_job_id(
         self, simName=None, sessionID=None, consumerID=None, state="submit", rc=0
@@ -236,73 +332,81 @@ class turbineLiteDB:
 
         return value
         """
-        conn, curs = self.getConnection()
-        try:
-            sqlstr = (
-                "SELECT TOP 1 Jobs.Id, Jobs.Count, Jobs.SimulationId, Jobs.Reset"
-                " FROM Jobs INNER JOIN Simulations"
-                " ON Jobs.SimulationId=Simulations.Id"
-                " WHERE "
-                " Jobs.State='{0}' "
-                " AND Simulations.ApplicationName='foqus'".format(state)
+        jobs = self._run(
+            lambda curs: self._select_jobs(
+                curs, 1, simName, sessionID, consumerID, state
+            ),
+            rc,
+        )
+        if jobs:
+            return jobs[0]
+        return None, None, None, None
+
+    def claim_jobs(
+        self, consumerID, n=1, simName=None, sessionID=None, onlyMyId=False, rc=0
+    ):
+        """
+        Turbine Consumer Function
+        ---
+        Atomically take up to n foqus jobs in the submit state for a
+        consumer, moving them to setup and setting their ConsumerId in one
+        transaction.  A job is only taken if it is still in the submit
+        state when it is updated, so two consumers never claim the same
+        job.
+
+        args
+            consumerID: ID of the consumer taking the jobs
+            n: maximum number of jobs to take
+            simName, sessionID: only take jobs of this simulation/session
+            onlyMyId: only take jobs already assigned to consumerID
+
+        return value
+            list of (job GUID, job ID, simulation ID, reset) tuples
+        """
+
+        def f(curs):
+            jobs = self._select_jobs(
+                curs,
+                n,
+                simName,
+                sessionID,
+                consumerID if onlyMyId else None,
+                "submit",
             )
-            if sessionID is not None:
-                sqlstr += " AND Jobs.SessionId='{0}'".format(sessionID)
-            if simName is not None:
-                sqlstr += " AND Simulations.Name='{0}'".format(simName)
-            if consumerID is not None:
-                sqlstr += " AND Jobs.ConsumerId='{0}'".format(consumerID)
-            curs.execute(sqlstr)
-            row = curs.fetchone()
-            self.closeConnection()
-            if row is not None:
-                jobsGUID = row[0].strip("{}")
-                jobsID = row[1]
-                simID = row[2].strip("{}")
-                reset = row[3]
-                if not reset or reset == "false":
-                    reset = False
-                else:
-                    reset = True
-                return jobsGUID, jobsID, simID, reset
-            return None, None, None, None
-        except Exception as e:
-            self.closeConnection()
-            if rc > 1:
-                raise e
-            else:
-                self.get_job_id(simName, sessionID, consumerID, state, rc=rc + 1)
+            t = _timestamp()
+            claimed = []
+            for job in jobs:
+                curs.execute(
+                    "UPDATE Jobs SET State='setup', Setup=?, ConsumerId=?"
+                    " WHERE Id=? AND State='submit'",
+                    (t, consumerID, job[0]),
+                )
+                if curs.rowcount == 1:
+                    claimed.append(job)
+            return claimed
+
+        if n < 1:
+            return []
+        return self._run(f, rc)
 
     def jobConsumerID(self, jid, cid=None, rc=0):
         """
         Get or set job consumer ID
         """
-        conn, curs = self.getConnection()
-        try:
-            if cid is None:
-                # get the job's consumer ID
-                sqlstr = "SELECT ConsumerId FROM Jobs WHERE Id='{0}'".format(jid)
-                curs.execute(sqlstr)
-                row = curs.fetchone()
-                self.closeConnection()
-                if row is None:
-                    cid = None
-                else:
-                    cid = row[0].strip("{}")
-            else:
+
+        def f(curs):
+            if cid is not None:
                 # set the job's consumer ID
-                sqlstr = "UPDATE Jobs SET ConsumerId='{0}' WHERE Id='{1}'".format(
-                    cid, jid
-                )
-                curs.execute(sqlstr)
-                self.closeConnection()
-            return cid
-        except Exception as e:
-            self.closeConnection()
-            if rc > 1:
-                raise e
-            else:
-                self.jobConsumerID(jid, cid, rc=rc + 1)
+                curs.execute("UPDATE Jobs SET ConsumerId=? WHERE Id=?", (cid, jid))
+                return cid
+            # get the job's consumer ID
+            curs.execute("SELECT ConsumerId FROM Jobs WHERE Id=?", (jid,))
+            row = curs.fetchone()
+            if row is None or row[0] is None:
+                return None
+            return row[0].strip("{}")
+
+        return self._run(f, rc)
 
     def get_configuration_file(self, simulationId, rc=0):
         """
@@ -314,24 +418,18 @@ class turbineLiteDB:
 
         return value
         """
-        conn, curs = self.getConnection()
-        try:
-            sqlstr = (
-                "SELECT Content FROM SimulationStagedInputs "
-                "WHERE SimulationId='{0}'".format(simulationId)
+
+        def f(curs):
+            curs.execute(
+                "SELECT Content FROM SimulationStagedInputs WHERE SimulationId=?",
+                (simulationId,),
             )
-            curs.execute(sqlstr)
             row = curs.fetchone()
-            self.closeConnection()
             if row is None:
                 return None
-            return row[0].decode("utf-8")
-        except Exception as e:
-            self.closeConnection()
-            if rc > 1:
-                raise e
-            else:
-                self.get_configuration_file(simulationId, rc=rc + 1)
+            return bytes(row[0]).decode("utf-8")
+
+        return self._run(f, rc)
 
     def job_prepare(self, jobGuid, jobId, configFile, rc=0):
         """
@@ -343,33 +441,36 @@ class turbineLiteDB:
 
         return value
         """
-        conn, curs = self.getConnection()
-        try:
-            sqlstr = "SELECT Input FROM Processes WHERE Id='{0}'".format(jobGuid)
-            curs.execute(sqlstr)
-            row = curs.fetchone()
-            self.closeConnection()
-            jobPath = "test/{0}".format(jobId)
-            if not os.path.exists("test"):
-                os.makedirs("test")
-            if not os.path.exists(jobPath):
-                os.makedirs(jobPath)
-            ifile = os.path.join(jobPath, "input_values.json")
-            cfile = os.path.join(jobPath, "session.foqus")
-            if row is not None:
-                assert configFile is not None, "Missing configFile"
-                headerStr = '{"input":'
-                footerStr = "}"
-                with open(ifile, "w") as text_file:
-                    text_file.write("".join([headerStr, row[0], footerStr]))
-                with open(cfile, "w") as config_file:
-                    config_file.write(configFile)
-        except Exception as e:
-            self.closeConnection()
-            if rc > 1:
-                raise e
-            else:
-                self.job_prepare(jobGuid, jobId, configFile, rc=rc + 1)
+
+        def f(curs):
+            curs.execute("SELECT Input FROM Processes WHERE Id=?", (jobGuid,))
+            return curs.fetchone()
+
+        row = self._run(f, rc)
+        jobPath = "test/{0}".format(jobId)
+        if not os.path.exists(jobPath):
+            os.makedirs(jobPath)
+        ifile = os.path.join(jobPath, "input_values.json")
+        cfile = os.path.join(jobPath, "session.foqus")
+        if row is not None:
+            assert configFile is not None, "Missing configFile"
+            headerStr = '{"input":'
+            footerStr = "}"
+            with open(ifile, "w") as text_file:
+                text_file.write("".join([headerStr, row[0], footerStr]))
+            with open(cfile, "w") as config_file:
+                config_file.write(configFile)
+
+    @staticmethod
+    def _change_status(curs, jobGuid, status, t):
+        col = _statusTimeColumn(status)
+        if col is None:
+            curs.execute("UPDATE Jobs SET State=? WHERE Id=?", (status, jobGuid))
+        else:
+            curs.execute(
+                "UPDATE Jobs SET State=?, {0}=? WHERE Id=?".format(col),
+                (status, t, jobGuid),
+            )
 
     def job_change_status(self, jobGuid, status, rc=0):
         """
@@ -381,33 +482,35 @@ class turbineLiteDB:
 
         return value
         """
-        conn, curs = self.getConnection()
-        try:
-            t = time.strftime("%m/%d/%Y %I:%M %p", time.gmtime())
-            sqlstr = "UPDATE Jobs SET State='{0}' WHERE Id='{1}'".format(
-                status, jobGuid
-            )
-            curs.execute(sqlstr)
-            if status == "setup":
-                sqlstr = "UPDATE Jobs SET Setup='{0}' WHERE Id='{1}'".format(t, jobGuid)
-                curs.execute(sqlstr)
-            elif status == "running":
-                sqlstr = "UPDATE Jobs SET Running='{0}' WHERE Id='{1}'".format(
-                    t, jobGuid
-                )
-                curs.execute(sqlstr)
-            elif status in ["success", "error", "terminate", "cancel"]:
-                sqlstr = "UPDATE Jobs SET Finished='{0}' WHERE Id='{1}'".format(
-                    t, jobGuid
-                )
-                curs.execute(sqlstr)
-            self.closeConnection()
-        except Exception as e:
-            self.closeConnection()
-            if rc > 1:
-                raise e
-            else:
-                self.job_change_status(jobGuid, status, rc=rc + 1)
+        self._run(
+            lambda curs: self._change_status(curs, jobGuid, status, _timestamp()), rc
+        )
+
+    def jobs_change_status(self, changes, messages=(), rc=0):
+        """
+        Turbine Consumer Function
+        ---
+        Change the status of several jobs and add messages in one
+        transaction
+
+        args
+            changes: iterable of (job GUID, status)
+            messages: iterable of (message, job GUID) to add
+
+        return value
+        """
+        changes = list(changes)
+        messages = list(messages)
+
+        def f(curs):
+            t = _timestamp()
+            for jobGuid, status in changes:
+                self._change_status(curs, jobGuid, status, t)
+            for msg, jobid in messages:
+                self._add_message(curs, msg, jobid)
+
+        if changes or messages:
+            self._run(f, rc)
 
     def job_save_output(self, jobGuid, workingDir, rc=0):
         """
@@ -419,18 +522,11 @@ class turbineLiteDB:
 
         return value
         """
-        conn, curs = self.getConnection()
-        try:
-            with open(os.path.join(workingDir, "output.json")) as outfile:
-                output = outfile.read()
-            sqlstr = "UPDATE Processes SET Output='{0}' WHERE Id='{1}'".format(
-                output, jobGuid
-            )
-            curs.execute(sqlstr)
-            self.closeConnection()
-        except Exception as e:
-            self.closeConnection()
-            if rc > 1:
-                raise e
-            else:
-                self.job_save_output(jobGuid, workingDir, rc=rc + 1)
+        with open(os.path.join(workingDir, "output.json")) as outfile:
+            output = outfile.read()
+        self._run(
+            lambda curs: curs.execute(
+                "UPDATE Processes SET Output=? WHERE Id=?", (output, jobGuid)
+            ),
+            rc,
+        )
@@ -37,6 +37,7 @@ else:
 
 class Common(obj):
     dialog = None
+    psuadeSession = None  # active PsuadeSession, see PsuadeSession.py
 
     if usePyside:
 
@@ -143,12 +144,6 @@ class Common(obj):
         showErrorSignal=None,
         plotOuuValuesSignal=None,
     ):
-        from .LocalExecutionModule import LocalExecutionModule
-
-        psuadePath = LocalExecutionModule.getPsuadePath()
-        if psuadePath is None:
-            return (None, None)
-
         scriptHandle = None
         psFileName = ""
 
@@ -179,6 +174,35 @@ class Common(obj):
                         "Second argument is not script file handle nor True/False for printing output to screen"
                     )
 
+        # scripts run in the persistent worker when a session is active
+        session = Common.psuadeSession
+        if session is not None and scriptHandle is not None and not psFileName:
+            from .PsuadeSession import PsuadeSessionError
+
+            try:
+                out, error = session.run(
+                    scriptHandle, printOutputToScreen=printOutputToScreen
+                )
+            except (PsuadeSessionError, OSError) as e:
+                # the worker could not be restarted, run psuade directly
+                logging.getLogger("foqus." + __name__).warning(
+                    "PSUADE session failed, %s", e
+                )
+                scriptHandle.seek(0)
+            else:
+                if error:
+                    if showErrorSignal is None:
+                        Common.showError(error, out)
+                    else:
+                        showErrorSignal.emit(error, out)
+                return (out, error)
+
+        from .LocalExecutionModule import LocalExecutionModule
+
+        psuadePath = LocalExecutionModule.getPsuadePath()
+        if psuadePath is None:
+            return (None, None)
+
         return Common.runCommandInWindow(
             psuadePath + " " + psFileName,
             "psuadelog",
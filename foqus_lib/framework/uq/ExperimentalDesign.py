@@ -26,9 +26,21 @@ from foqus_lib.framework.uq.SamplingMethods import SamplingMethods
 from .Common import Common
 from .LocalExecutionModule import LocalExecutionModule
 from .RSAnalyzer import RSAnalyzer
+from .SampleGenerator import SampleGenerator
 
 
 class ExperimentalDesign:
+
+    # "native" generates the methods SampleGenerator supports in process,
+    # every other method always goes through psuade
+    backend = "native"
+
+    @staticmethod
+    def useNative(data):
+        return ExperimentalDesign.backend == "native" and SampleGenerator.isSupported(
+            data.getSampleMethod(), data.getInputDistributions()
+        )
+
     @staticmethod
     def createPsuadeInFile(data, filename, includePDF=True):
         outf = open(filename, "w")
@@ -128,7 +140,12 @@ class ExperimentalDesign:
 
     @staticmethod
     def generateSamples(
-        data, selectedInputs, selectedOutputs, numSamples=None, sampleMethod=-1
+        data,
+        selectedInputs,
+        selectedOutputs,
+        numSamples=None,
+        sampleMethod=-1,
+        seed=None,
     ):
         psuadeDataFile = os.getcwd() + os.path.sep + "psuadeData"
         if os.path.exists(psuadeDataFile):
@@ -162,6 +179,11 @@ class ExperimentalDesign:
             os.remove("psuadeMetisInfo")
 
         distributions = data.getInputDistributions()
+        if len(distributions) == data.getNumInputs():
+            # keep the distributions of the selected inputs
+            distributions = list(
+                numpy.array(distributions, dtype=object)[selectedInputs]
+            )
         pdfconvert = False
         for dist in distributions:
             distType = dist.getDistributionType()
@@ -171,6 +193,8 @@ class ExperimentalDesign:
             ]:
                 pdfconvert = True
         returnData.setInputDistributions(distributions)
+        if ExperimentalDesign.useNative(returnData):
+            return SampleGenerator.generate(returnData, seed)
 
         curDir = os.getcwd()
         if platform.system() == "Windows":
@@ -0,0 +1,321 @@
+#################################################################################
+# FOQUS Copyright (c) 2012 - 2026, by the software owners: Oak Ridge Institute
+# for Science and Education (ORISE), TRIAD National Security, LLC., Lawrence
+# Livermore National Security, LLC., The Regents of the University of
+# California, through Lawrence Berkeley National Laboratory, Battelle Memorial
+# Institute, Pacific Northwest Division through Pacific Northwest National
+# Laboratory, Carnegie Mellon University, West Virginia University, Boston
+# University, the Trustees of Princeton University, The University of Texas at
+# Austin, URS Energy & Construction, Inc., et al.  All rights reserved.
+#
+# Please see the file LICENSE.md for full copyright and license information,
+# respectively. This file is also available online at the URL
+# "https://github.com/CCSI-Toolset/FOQUS".
+#################################################################################
+"""
+In-process global sensitivity analysis
+
+Computes sensitivity measures from NumPy arrays for all outputs at once,
+without writing PSUADE scripts or parsing PSUADE output.  Every estimator
+takes inputs x with one row per sample and outputs y with one row per
+sample and one column per output, and returns arrays with one row per
+input and one column per output.
+
+* Sobol first- and total-order indices (Saltelli and Jansen estimators)
+  and second-order indices from a Saltelli design, for models and
+  response surfaces that can be evaluated at any point.
+* Sobol first-, second- and total-order indices from a given sample,
+  using nearest neighbours in the conditioning inputs.
+* Morris elementary effects from the one-at-a-time steps of a MOAT sample.
+* Pearson and Spearman correlation coefficients.
+
+bootstrap() resamples any of these in a thread pool and returns the means,
+standard deviations and percentile confidence intervals.  writeMatlab()
+writes results in the layout of the PSUADE matlab files the analysis
+plots read.
+
+Usage:
+    x = GlobalSensitivity.saltelliSample(lower, upper, 4096, dists, seed=1)
+    indices = GlobalSensitivity.sobol(f(x), len(lower))
+    ci = GlobalSensitivity.bootstrap(
+        lambda i: GlobalSensitivity.correlation(x[i], y[i]), len(x)
+    )
+"""
+
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+from scipy import stats
+from scipy.spatial import cKDTree
+
+from .Model import Model
+from .SampleGenerator import SampleGenerator
+
+
+class GlobalSensitivityError(Exception):
+    pass
+
+
+class GlobalSensitivity(object):
+    # steps that change an input by less than this fraction of its range
+    # are not counted as changes by morris()
+    morrisTolerance = 1.0e-10
+
+    @staticmethod
+    def sampleArrays(data, outputs=None):
+        """Variable inputs, outputs, bounds and distributions of a SampleData
+
+        outputs are 1-based output numbers, all outputs by default.  Samples
+        with an undefined value in any of the outputs are dropped.
+        """
+        x = np.array(data.getInputData(), dtype=float, ndmin=2)
+        lower = np.array(data.getInputMins(), dtype=float)
+        upper = np.array(data.getInputMaxs(), dtype=float)
+        dists = list(data.getInputDistributions())
+        var = [i for i, t in enumerate(data.getInputTypes()) if t == Model.VARIABLE]
+        if x.shape[1] == len(data.getInputTypes()):
+            x = x[:, var]
+            lower = lower[var]
+            upper = upper[var]
+            if len(dists) > len(var):
+                dists = [dists[i] for i in var]
+        y = np.array(data.getOutputData(), dtype=float, ndmin=2)
+        if outputs is not None:
+            y = y[:, [i - 1 for i in outputs]]
+        valid = (np.isfinite(y) & (np.abs(y) < 1e34)).all(axis=1)
+        return x[valid], y[valid], lower, upper, dists
+
+    @staticmethod
+    def _outputs(y):
+        y = np.asarray(y, dtype=float)
+        return y[:, None] if y.ndim == 1 else y
+
+    @staticmethod
+    def _ratio(a, v):
+        with np.errstate(divide="ignore", invalid="ignore"):
+            return np.where(v > 0, a / v, np.nan)
+
+    @staticmethod
+    def saltelliSample(
+        lower, upper, numSamples, distributions=None, secondOrder=False, seed=None
+    ):
+        """Saltelli design of numSamples*(numInputs + 2) rows
+
+        The rows are blocks A, B and AB_1 ... AB_d, where AB_i is A with
+        column i taken from B.  A second-order design adds the blocks BA_1
+        ... BA_d, B with column i taken from A.
+        """
+        d = len(lower)
+        u = SampleGenerator.unitSample("LPTAU", numSamples, 2 * d, seed)
+        a = SampleGenerator.transform(u[:, :d], lower, upper, distributions)
+        b = SampleGenerator.transform(u[:, d:], lower, upper, distributions)
+        blocks = [a, b]
+        for src, dst in [(b, a), (a, b)] if secondOrder else [(b, a)]:
+            for i in range(d):
+                block = dst.copy()
+                block[:, i] = src[:, i]
+                blocks.append(block)
+        return np.vstack(blocks)
+
+    @staticmethod
+    def sobol(y, numInputs, secondOrder=False):
+        """Sobol indices from outputs on a saltelliSample() design
+
+        Returns a dict with first-order "S1" and total-order "ST" arrays,
+        and with secondOrder a "S2" array of numInputs x numInputs x outputs
+        holding the first-order indices on the diagonal.
+        """
+        y = GlobalSensitivity._outputs(y)
+        d = numInputs
+        n = y.shape[0] // (2 * d + 2 if secondOrder else d + 2)
+        blocks = y[: n * (2 * d + 2 if secondOrder else d + 2)].reshape(
+            -1, n, y.shape[1]
+        )
+        a, b, ab = blocks[0], blocks[1], blocks[2 : d + 2]
+        v = np.var(np.concatenate([a, b]), axis=0)
+        s1 = GlobalSensitivity._ratio(np.mean(b * (ab - a), axis=1), v)
+        st = GlobalSensitivity._ratio(0.5 * np.mean((a - ab) ** 2, axis=1), v)
+        result = {"S1": s1, "ST": st}
+        if secondOrder:
+            ba = blocks[d + 2 :]
+            vij = np.mean(ba[:, None] * ab[None, :] - a * b, axis=2)
+            s2 = GlobalSensitivity._ratio(vij, v) - s1[:, None] - s1[None, :]
+            # the (i, j) and (j, i) estimates use different blocks
+            s2 = 0.5 * (s2 + s2.transpose(1, 0, 2))
+            idx = np.arange(d)
+            s2[idx, idx] = s1
+            result["S2"] = s2
+        return result
+
+    @staticmethod
+    def _neighbourVariance(x, y, columns):
+        # half the mean squared output difference to the nearest sample in
+        # the given (unit scaled) input columns estimates E[Var(y|x_cols)]
+        if len(columns) == 0:
+            return np.var(y, axis=0)
+        _, nn = cKDTree(x[:, columns]).query(x[:, columns], k=2, workers=-1)
+        # repeated points may come back in either order
+        other = np.where(nn[:, 0] == np.arange(len(x)), nn[:, 1], nn[:, 0])
+        return 0.5 * np.mean((y - y[other]) ** 2, axis=0)
+
+    @staticmethod
+    def _unitScale(x):
+        x = np.asarray(x, dtype=float)
+        span = np.ptp(x, axis=0)
+        return (x - x.min(axis=0)) / np.where(span > 0, span, 1.0)
+
+    @staticmethod
+    def firstOrder(x, y):
+        """First-order Sobol indices of a given sample
+
+        Uses the differences between outputs of samples adjacent in each
+        input, so any sample design can be used.
+        """
+        y = GlobalSensitivity._outputs(y)
+        v = np.var(y, axis=0)
+        ys = y[np.argsort(x, axis=0)]
+        evar = 0.5 * np.mean(np.diff(ys, axis=0) ** 2, axis=0)
+        return 1.0 - GlobalSensitivity._ratio(evar, v)
+
+    @staticmethod
+    def totalOrder(x, y):
+        """Total-order Sobol indices of a given sample
+
+        Nearest neighbours in all the other inputs need a dense sample, the
+        estimates are biased up when there are few samples per input.
+        """
+        y = GlobalSensitivity._outputs(y)
+        x = GlobalSensitivity._unitScale(x)
+        d = x.shape[1]
+        v = np.var(y, axis=0)
+        evar = np.array(
+            [
+                GlobalSensitivity._neighbourVariance(x, y, np.delete(np.arange(d), i))
+                for i in range(d)
+            ]
+        )
+        return GlobalSensitivity._ratio(evar, v)
+
+    @staticmethod
+    def secondOrder(x, y):
+        """Second-order Sobol indices of a given sample
+
+        Returns a numInputs x numInputs x outputs array with the first-order
+        indices on the diagonal.
+        """
+        y = GlobalSensitivity._outputs(y)
+        x = GlobalSensitivity._unitScale(x)
+        d = x.shape[1]
+        v = np.var(y, axis=0)
+        s1 = GlobalSensitivity.firstOrder(x, y)
+        s2 = np.zeros((d, d, y.shape[1]))
+        for i in range(d):
+            s2[i, i] = s1[i]
+            for j in range(i + 1, d):
+                evar = GlobalSensitivity._neighbourVariance(x, y, [i, j])
+                sij = 1.0 - GlobalSensitivity._ratio(evar, v) - s1[i] - s1[j]
+                s2[i, j] = s2[j, i] = sij
+        return s2
+
+    @staticmethod
+    def elementaryEffects(x, y, lower, upper):
+        """Elementary effects of the one-at-a-time steps in a sample
+
+        Consecutive samples that differ in exactly one input are a step of a
+        Morris trajectory.  Returns the input changed by each step and the
+        effects, scaled to the input ranges.
+        """
+        y = GlobalSensitivity._outputs(y)
+        dx = np.diff(x, axis=0) / (np.asarray(upper) - np.asarray(lower))
+        changed = np.abs(dx) > GlobalSensitivity.morrisTolerance
+        step = changed.sum(axis=1) == 1
+        inputs = np.argmax(changed[step], axis=1)
+        effects = np.diff(y, axis=0)[step] / dx[step, inputs][:, None]
+        return inputs, effects
+
+    @staticmethod
+    def morris(inputs, effects, numInputs):
+        """Morris measures from elementaryEffects()
+
+        Returns a dict of the mean "mu", mean absolute value "mustar" and
+        standard deviation "sigma" of the effects of each input.
+        """
+        n = np.bincount(inputs, minlength=numInputs)[:, None].astype(float)
+        total = np.zeros((numInputs, effects.shape[1]))
+        absTotal = np.zeros_like(total)
+        squares = np.zeros_like(total)
+        np.add.at(total, inputs, effects)
+        np.add.at(absTotal, inputs, np.abs(effects))
+        np.add.at(squares, inputs, effects**2)
+        with np.errstate(divide="ignore", invalid="ignore"):
+            mu = total / n
+            sigma = np.sqrt(np.maximum(squares - n * mu**2, 0.0) / (n - 1))
+            return {"mu": mu, "mustar": absTotal / n, "sigma": sigma}
+
+    @staticmethod
+    def correlation(x, y):
+        """Pearson "pearson" and Spearman "spearman" correlation coefficients"""
+        y = GlobalSensitivity._outputs(y)
+        x = np.asarray(x, dtype=float)
+
+        def pearson(a, b):
+            a = a - a.mean(axis=0)
+            b = b - b.mean(axis=0)
+            norm = np.outer(np.sqrt((a**2).sum(axis=0)), np.sqrt((b**2).sum(axis=0)))
+            return GlobalSensitivity._ratio(a.T @ b, norm)
+
+        return {
+            "pearson": pearson(x, y),
+            "spearman": pearson(stats.rankdata(x, axis=0), stats.rankdata(y, axis=0)),
+        }
+
+    @staticmethod
+    def bootstrap(
+        statistic, numSamples, nBootstrap=50, confidence=0.95, seed=None, workers=None
+    ):
+        """Bootstrap a statistic of numSamples rows
+
+        statistic is called with an array of row indices drawn with
+        replacement and returns an array or a dict of arrays.  Returns the
+        same structure with dicts of "mean", "std", "lower" and "upper"
+        arrays in place of the arrays.  The replicates run in a thread pool,
+        NumPy releases the GIL in the heavy parts.  Nearest neighbour
+        estimators should not be bootstrapped, repeated samples are their
+        own neighbours.
+        """
+        seeds = np.random.SeedSequence(seed).spawn(nBootstrap)
+
+        def replicate(ss):
+            rng = np.random.default_rng(ss)
+            return statistic(rng.integers(0, numSamples, numSamples))
+
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            reps = list(pool.map(replicate, seeds))
+        alpha = 0.5 * (1.0 - confidence)
+
+        def summarize(values):
+            values = np.array(values)
+            return {
+                "mean": np.nanmean(values, axis=0),
+                "std": np.nanstd(values, axis=0, ddof=1),
+                "lower": np.nanquantile(values, alpha, axis=0),
+                "upper": np.nanquantile(values, 1.0 - alpha, axis=0),
+            }
+
+        if isinstance(reps[0], dict):
+            return {k: summarize([r[k] for r in reps]) for k in reps[0]}
+        return summarize(reps)
+
+    @staticmethod
+    def writeMatlab(fname, **arrays):
+        """Write arrays as PSUADE matlab file variables, one value per line
+
+        Matrices are written in column-major order, as psuade does.
+        """
+        with open(fname, "w") as f:
+            for name, values in arrays.items():
+                f.write("%s = [\n" % name)
+                for v in np.ravel(values, order="F"):
+                    f.write(" %24.16e\n" % v)
+                f.write("];\n")
+        return fname
@@ -0,0 +1,217 @@
+#################################################################################
+# FOQUS Copyright (c) 2012 - 2026, by the software owners: Oak Ridge Institute
+# for Science and Education (ORISE), TRIAD National Security, LLC., Lawrence
+# Livermore National Security, LLC., The Regents of the University of
+# California, through Lawrence Berkeley National Laboratory, Battelle Memorial
+# Institute, Pacific Northwest Division through Pacific Northwest National
+# Laboratory, Carnegie Mellon University, West Virginia University, Boston
+# University, the Trustees of Princeton University, The University of Texas at
+# Austin, URS Energy & Construction, Inc., et al.  All rights reserved.
+#
+# Please see the file LICENSE.md for full copyright and license information,
+# respectively. This file is also available online at the URL
+# "https://github.com/CCSI-Toolset/FOQUS".
+#################################################################################
+"""
+In-process polynomial regression response surfaces
+
+Fits the linear, quadratic, cubic, quartic and Legendre response surfaces
+by least squares on a total-degree design matrix, without going through
+PSUADE.  Inputs are scaled to [-1, 1] with the input bounds before the
+basis is built, which keeps the design matrix well conditioned and is
+what the Legendre basis expects.
+
+Usage:
+    rs = PolynomialRS(ResponseSurfaces.QUADRATIC)
+    rs.fit(x, y)
+    mean, std = rs.predict(xnew, returnStd=True)
+    trainErrors, cvErrors, cvData = rs.validate(x, y, nCV=10)
+
+The error dictionaries use the same keys as RSAnalyzer.validateRS().
+"""
+
+import itertools
+
+import numpy as np
+from numpy.polynomial import legendre
+
+from .ResponseSurfaces import ResponseSurfaces
+
+
+class PolynomialRSError(Exception):
+    pass
+
+
+class PolynomialRS(object):
+    orders = {
+        ResponseSurfaces.LINEAR: 1,
+        ResponseSurfaces.QUADRATIC: 2,
+        ResponseSurfaces.CUBIC: 3,
+        ResponseSurfaces.QUARTIC: 4,
+    }
+    batchSize = 50000  # rows of the design matrix built at once in predict()
+
+    def __init__(self, rsMethod, legendreOrder=None, lower=None, upper=None):
+        self.rsIndex = ResponseSurfaces.getEnumValue(rsMethod)
+        if self.rsIndex == ResponseSurfaces.LEGENDRE:
+            if legendreOrder is None:
+                raise PolynomialRSError("Legendre response surface requires an order")
+            self.order = int(legendreOrder)
+        elif self.rsIndex in PolynomialRS.orders:
+            self.order = PolynomialRS.orders[self.rsIndex]
+        else:
+            raise PolynomialRSError(
+                "%s is not a polynomial response surface"
+                % ResponseSurfaces.getFullName(self.rsIndex)
+            )
+        self.lower = lower
+        self.upper = upper
+        self.exponents = None
+        self.coefs = None
+        self.covariance = None
+        self.sigma2 = None
+
+    @staticmethod
+    def isSupported(rsMethod):
+        rsIndex = ResponseSurfaces.getEnumValue(rsMethod)
+        return rsIndex == ResponseSurfaces.LEGENDRE or rsIndex in PolynomialRS.orders
+
+    @staticmethod
+    def totalDegreeExponents(nInputs, order):
+        # every multi-index with total degree <= order, constant term first
+        exps = [
+            e
+            for e in itertools.product(range(order + 1), repeat=nInputs)
+            if sum(e) <= order
+        ]
+        exps.sort(key=lambda e: (sum(e), tuple(-i for i in e)))
+        return np.array(exps, dtype=int).reshape(len(exps), nInputs)
+
+    def scale(self, x):
+        lo = self.lower
+        hi = self.upper
+        width = np.where(hi > lo, hi - lo, 1.0)
+        return 2.0 * (x - lo) / width - 1.0
+
+    def designMatrix(self, x):
+        u = self.scale(np.asarray(x, dtype=float))
+        n, nInputs = u.shape
+        if self.rsIndex == ResponseSurfaces.LEGENDRE:
+            vander = [legendre.legvander(u[:, i], self.order) for i in range(nInputs)]
+        else:
+            vander = [
+                np.vander(u[:, i], self.order + 1, increasing=True)
+                for i in range(nInputs)
+            ]
+        X = np.ones((n, len(self.exponents)))
+        for i in range(nInputs):
+            X *= vander[i][:, self.exponents[:, i]]
+        return X
+
+    def fit(self, x, y):
+        """
+        Least squares fit.  y may hold several outputs as columns, they
+        share one factorization of the design matrix.
+        """
+        x = np.array(x, dtype=float, ndmin=2)
+        y = np.asarray(y, dtype=float)
+        if self.lower is None:
+            self.lower = x.min(axis=0)
+        if self.upper is None:
+            self.upper = x.max(axis=0)
+        self.lower = np.asarray(self.lower, dtype=float)
+        self.upper = np.asarray(self.upper, dtype=float)
+        self.exponents = PolynomialRS.totalDegreeExponents(x.shape[1], self.order)
+        X = self.designMatrix(x)
+        nSamples, nTerms = X.shape
+        U, sv, Vt = np.linalg.svd(X, full_matrices=False)
+        tol = sv[0] * max(X.shape) * np.finfo(float).eps if len(sv) else 0.0
+        rank = int(np.sum(sv > tol))
+        if rank < nTerms:
+            # same wording as psuade so Common.showError() recognizes it
+            raise PolynomialRSError(
+                "Regression ERROR: true rank of sample = %d (need %d)" % (rank, nTerms)
+            )
+        vinv = Vt.T / sv
+        self.coefs = vinv @ (U.T @ y)
+        self.covariance = vinv @ vinv.T
+        resid = y - X @ self.coefs
+        dof = max(nSamples - nTerms, 1)
+        self.sigma2 = np.sum(resid**2, axis=0) / dof
+        return self
+
+    def predict(self, x, returnStd=False):
+        """Evaluate in batches of batchSize rows, optionally with std devs"""
+        if self.coefs is None:
+            raise PolynomialRSError("Response surface has not been fit")
+        x = np.array(x, dtype=float, ndmin=2)
+        shape = (x.shape[0],) + self.coefs.shape[1:]
+        mean = np.empty(shape)
+        std = np.empty(shape) if returnStd else None
+        for start in range(0, x.shape[0], PolynomialRS.batchSize):
+            stop = start + PolynomialRS.batchSize
+            X = self.designMatrix(x[start:stop])
+            mean[start:stop] = X @ self.coefs
+            if returnStd:
+                leverage = np.einsum("ij,jk,ik->i", X, self.covariance, X)
+                std[start:stop] = np.sqrt(
+                    np.multiply.outer(np.maximum(leverage, 0.0), self.sigma2)
+                )
+        if returnStd:
+            return mean, std
+        return mean
+
+    @staticmethod
+    def errorStats(truth, est):
+        # scaled errors are relative to the true value where it is nonzero
+        err = np.abs(est - truth)
+        denom = np.abs(truth)
+        scaled = np.where(denom > 1e-12, err / np.where(denom > 1e-12, denom, 1), err)
+        return {
+            "avg_unscaled": float(np.mean(err)),
+            "avg_scaled": float(np.mean(scaled)),
+            "rms_unscaled": float(np.sqrt(np.mean(err**2))),
+            "rms_scaled": float(np.sqrt(np.mean(scaled**2))),
+            "max_unscaled": float(np.max(err)),
+            "max_scaled": float(np.max(scaled)),
+        }
+
+    def validate(self, x, y, nCV=10, rseed=None):
+        """
+        Training errors and nCV-fold cross validation errors for one
+        output.  Returns (trainErrors, cvErrors, cvData) where cvData
+        holds the columns [error, actual, predicted, std] psuade writes to
+        RSFA_CV_err.m.
+        """
+        x = np.array(x, dtype=float, ndmin=2)
+        y = np.asarray(y, dtype=float).ravel()
+        nSamples = len(y)
+        nCV = int(max(2, min(nCV, nSamples)))
+
+        self.fit(x, y)
+        est = self.predict(x)
+        trainErrors = PolynomialRS.errorStats(y, est)
+        ssTot = np.sum((y - y.mean()) ** 2)
+        ssRes = np.sum((y - est) ** 2)
+        trainErrors["R-square"] = float(1.0 - ssRes / ssTot) if ssTot > 0 else 1.0
+
+        order = np.random.default_rng(rseed).permutation(nSamples)
+        cvEst = np.empty(nSamples)
+        cvStd = np.empty(nSamples)
+        for group in np.array_split(order, nCV):
+            train = np.ones(nSamples, dtype=bool)
+            train[group] = False
+            rs = PolynomialRS(
+                self.rsIndex,
+                legendreOrder=self.order,
+                lower=self.lower,
+                upper=self.upper,
+            )
+            rs.fit(x[train], y[train])
+            cvEst[group], cvStd[group] = rs.predict(x[group], returnStd=True)
+        cvErrors = PolynomialRS.errorStats(y, cvEst)
+        cvData = np.column_stack((y - cvEst, y, cvEst, cvStd))
+
+        # leave this object fit to the full sample
+        self.fit(x, y)
+        return trainErrors, cvErrors, cvData
@@ -0,0 +1,393 @@
+#################################################################################
+# FOQUS Copyright (c) 2012 - 2026, by the software owners: Oak Ridge Institute
+# for Science and Education (ORISE), TRIAD National Security, LLC., Lawrence
+# Livermore National Security, LLC., The Regents of the University of
+# California, through Lawrence Berkeley National Laboratory, Battelle Memorial
+# Institute, Pacific Northwest Division through Pacific Northwest National
+# Laboratory, Carnegie Mellon University, West Virginia University, Boston
+# University, the Trustees of Princeton University, The University of Texas at
+# Austin, URS Energy & Construction, Inc., et al.  All rights reserved.
+#
+# Please see the file LICENSE.md for full copyright and license information,
+# respectively. This file is also available online at the URL
+# "https://github.com/CCSI-Toolset/FOQUS".
+#################################################################################
+"""
+Persistent interactive PSUADE worker
+
+A PsuadeSession keeps one interactive psuade process alive and pipes
+successive command scripts through it, so a sequence of analyses on the
+same sample file pays for one process launch and one ``load``.
+
+Usage:
+    with PsuadeSession() as session:
+        RSAnalyzer.validateRS(...)
+        RSAnalyzer.performUA(...)
+
+While a session is active, Common.invokePsuade() routes script based
+calls through it.  Scripts may still start with ``load <file>`` and end
+with ``quit``; the load is skipped when the file is already loaded and
+unchanged, and the quit is dropped so the worker stays alive.
+
+The end of each script's output is found by sending an unknown command
+and waiting for psuade to complain about it.  That needs psuade to write
+its output line by line, which is only arranged on Linux (``stdbuf``).
+ensure() therefore opens a session only where it is supported and the
+worker answers a probe at start up; otherwise it yields None and
+invokePsuade() keeps starting one process per call.
+"""
+
+import contextlib
+import io
+import logging
+import os
+import platform
+import queue
+import shutil
+import subprocess
+import tempfile
+import threading
+import time
+
+_log = logging.getLogger("foqus." + __name__)
+
+
+class PsuadeSessionError(Exception):
+    pass
+
+
+class PsuadeSession(object):
+    # Commands that flip a mode on/off in interactive PSUADE.  Any mode a
+    # script toggles is toggled back afterwards so the next script starts
+    # from the same state as a fresh process.
+    toggleCommands = (
+        "rs_expert",
+        "io_expert",
+        "ana_expert",
+        "sam_expert",
+        "opt_expert",
+        "gen_expert",
+    )
+    quitCommands = ("quit", "q", "exit")
+    # Commands that replace or modify the data held in memory, after which
+    # the loaded file can no longer be reused by the next script
+    dataCommands = (
+        "load",
+        "read_std",
+        "read_csv",
+        "read_xls",
+        "iadd",
+        "idelete",
+        "ifilter",
+        "ireset",
+        "iscale",
+        "oadd",
+        "odelete",
+        "ofilter",
+        "oreset",
+        "sadd",
+        "sdelete",
+        "sfilter",
+        "rm_dup",
+    )
+    sentinel = "__foqus_psuade_session_done_%d__"
+
+    def __init__(
+        self,
+        psuadePath=None,
+        timeout=600.0,
+        logFile="psuadelog",
+        maxRetries=1,
+        startTimeout=30.0,
+    ):
+        self.psuadePath = psuadePath
+        self.timeout = timeout
+        self.startTimeout = startTimeout
+        self.logFile = logFile
+        self.maxRetries = maxRetries
+        self.process = None
+        self.loaded = None  # (path, mtime, size) of the loaded data file
+        self.restarts = 0
+        self._count = 0
+        self._stdout = None
+        self._stderr = None
+        self._lock = threading.RLock()
+        self._previous = None
+
+    def __enter__(self):
+        from .Common import Common
+
+        self.start()
+        self._previous = Common.psuadeSession
+        Common.psuadeSession = self
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        from .Common import Common
+
+        Common.psuadeSession = self._previous
+        self._previous = None
+        self.close()
+        return False
+
+    @staticmethod
+    def isSupported():
+        """True when psuade's piped output can be line buffered"""
+        return platform.system() == "Linux" and shutil.which("stdbuf") is not None
+
+    @staticmethod
+    @contextlib.contextmanager
+    def ensure(**kwargs):
+        """
+        Reuse the active session, or open one for the duration.  Yields
+        None when no session can be started, in which case invokePsuade()
+        runs one psuade process per call as before.
+        """
+        from .Common import Common
+
+        if Common.psuadeSession is not None:
+            yield Common.psuadeSession
+            return
+        session = None
+        if PsuadeSession.isSupported():
+            session = PsuadeSession(**kwargs)
+            try:
+                session.__enter__()
+            except (PsuadeSessionError, OSError) as e:
+                _log.warning("PSUADE session not started, %s", e)
+                session = None
+        try:
+            yield session
+        finally:
+            if session is not None:
+                session.__exit__(None, None, None)
+
+    def command(self):
+        psuadePath = self.psuadePath
+        if psuadePath is None:
+            from .LocalExecutionModule import LocalExecutionModule
+
+            # no prompt here, invokePsuade() asks if psuade is really needed
+            psuadePath = LocalExecutionModule.getPsuadePath(showErrorIfNotFound=False)
+            if psuadePath is None:
+                raise PsuadeSessionError("Location of PSUADE has not been set")
+        cmd = [psuadePath]
+        # psuade's stdout is block buffered when connected to a pipe, ask
+        # for line buffering so command output arrives as it is produced
+        if platform.system() == "Linux" and shutil.which("stdbuf") is not None:
+            cmd = ["stdbuf", "-oL"] + cmd
+        return cmd
+
+    def start(self):
+        with self._lock:
+            if self.isAlive():
+                return
+            self.process = subprocess.Popen(
+                self.command(),
+                stdin=subprocess.PIPE,
+                stdout=subprocess.PIPE,
+                stderr=subprocess.PIPE,
+                universal_newlines=True,
+                bufsize=1,
+            )
+            self.loaded = None
+            self._stdout = queue.Queue()
+            self._stderr = queue.Queue()
+            for stream, q in (
+                (self.process.stdout, self._stdout),
+                (self.process.stderr, self._stderr),
+            ):
+                t = threading.Thread(target=self._reader, args=(stream, q))
+                t.daemon = True
+                t.start()
+            # the sentinel must come back or every script would time out
+            out, error, status = self._execute([], self.startTimeout)
+            if status != "done":
+                self.close()
+                raise PsuadeSessionError(
+                    "PSUADE did not answer the session probe (%s)\n%s" % (status, error)
+                )
+
+    @staticmethod
+    def _reader(stream, q):
+        try:
+            for line in iter(stream.readline, ""):
+                q.put(line)
+        except (OSError, ValueError):
+            pass
+        q.put(None)  # end of stream
+
+    def isAlive(self):
+        return self.process is not None and self.process.poll() is None
+
+    def close(self):
+        with self._lock:
+            if self.process is None:
+                return
+            p = self.process
+            self.process = None
+            self.loaded = None
+            try:
+                if p.poll() is None:
+                    p.stdin.write("quit\n")
+                    p.stdin.flush()
+                    p.wait(timeout=5)
+            except (OSError, ValueError, subprocess.TimeoutExpired):
+                pass
+            if p.poll() is None:
+                p.kill()
+                p.wait()
+            for stream in (p.stdin, p.stdout, p.stderr):
+                try:
+                    stream.close()
+                except (OSError, ValueError):
+                    pass
+
+    def restart(self):
+        with self._lock:
+            self.close()
+            self.restarts += 1
+            self.start()
+
+    @staticmethod
+    def fileKey(fname):
+        st = os.stat(fname)
+        return (os.path.abspath(fname), st.st_mtime_ns, st.st_size)
+
+    @staticmethod
+    def scriptLines(script):
+        if isinstance(script, (io.IOBase, tempfile.SpooledTemporaryFile)):
+            script.seek(0)
+            script = script.read()
+        if isinstance(script, bytes):
+            script = script.decode("utf-8")
+        if isinstance(script, str):
+            script = script.splitlines()
+        return [line.rstrip("\r\n") for line in script]
+
+    def prepare(self, lines):
+        """Drop quit commands and redundant loads, restore toggled modes"""
+        lines = list(lines)
+        while lines and lines[-1].strip().lower() in self.quitCommands:
+            lines.pop()
+        loadKey = None
+        first = lines[0].split(None, 1) if lines else []
+        if len(first) == 2 and first[0] == "load":
+            try:
+                loadKey = self.fileKey(first[1].strip())
+            except OSError:
+                loadKey = None
+            if loadKey is not None and loadKey == self.loaded:
+                lines.pop(0)
+        toggled = []
+        for line in lines:
+            cmd = line.strip()
+            if cmd in self.toggleCommands:
+                if cmd in toggled:
+                    toggled.remove(cmd)
+                else:
+                    toggled.append(cmd)
+        return lines + toggled, loadKey
+
+    def loadedAfter(self, lines, loadKey):
+        """Key of the data file in memory after running lines"""
+        commands = [line.split(None, 1)[0] for line in lines if line.strip()]
+        if loadKey is not None and commands and commands[0] == "load":
+            commands.pop(0)  # the load this script asked for
+            loaded = loadKey
+        else:
+            loaded = self.loaded
+        if any(cmd in self.dataCommands for cmd in commands):
+            loaded = None
+        return loaded
+
+    def load(self, fname):
+        """Load a sample file into the worker unless it is already loaded"""
+        return self.run(["load %s" % fname])
+
+    def run(self, script, timeout=None, printOutputToScreen=False):
+        """
+        Run a psuade command script in the worker and return (out, error)
+        like Common.invokePsuade().  A worker that dies part way through is
+        restarted and the script replayed up to maxRetries times.  A worker
+        that does not finish within the timeout is killed and restarted,
+        and the timeout is reported as the error.
+        """
+        if timeout is None:
+            timeout = self.timeout
+        lines = self.scriptLines(script)
+        with self._lock:
+            attempt = 0
+            while True:
+                self.start()
+                body, loadKey = self.prepare(lines)
+                out, error, status = self._execute(body, timeout)
+                if status == "done":
+                    self.loaded = self.loadedAfter(body, loadKey)
+                    break
+                if status == "timeout":
+                    error = (
+                        "PSUADE session timed out after %g seconds\n" % timeout
+                    ) + error
+                    _log.error(error)
+                    self.restart()
+                    break
+                # worker crashed
+                _log.warning("PSUADE session worker exited, restarting")
+                self.restart()
+                attempt += 1
+                if attempt > self.maxRetries:
+                    error = "PSUADE session worker exited unexpectedly\n" + error
+                    break
+        if self.logFile:
+            with open(self.logFile, "w") as f:
+                f.write(out)
+        if printOutputToScreen:
+            print(out)
+        return (out, error)
+
+    def _execute(self, lines, timeout):
+        self._count += 1
+        token = self.sentinel % self._count
+        self._drain(self._stderr)
+        try:
+            self.process.stdin.write("\n".join(lines + [token]) + "\n")
+            self.process.stdin.flush()
+        except (OSError, ValueError):
+            return ("", "".join(self._drain(self._stderr)), "crashed")
+        out = []
+        status = "done"
+        deadline = time.time() + timeout
+        while True:
+            remaining = deadline - time.time()
+            if remaining <= 0:
+                status = "timeout"
+                break
+            try:
+                line = self._stdout.get(timeout=min(remaining, 0.5))
+            except queue.Empty:
+                continue
+            if line is None:
+                status = "crashed"
+                break
+            if token in line:
+                # psuade's complaint about the unknown sentinel command
+                break
+            out.append(line)
+        if status != "done":
+            # give the stderr reader a moment to catch the last words
+            time.sleep(0.05)
+        error = "".join(self._drain(self._stderr))
+        return ("".join(out), error, status)
+
+    @staticmethod
+    def _drain(q):
+        items = []
+        while True:
+            try:
+                item = q.get_nowait()
+            except queue.Empty:
+                break
+            if item is not None:
+                items.append(item)
+        return items
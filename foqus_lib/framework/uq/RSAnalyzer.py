@@ -24,11 +24,14 @@ from scipy import stats
 
 from .Common import Common
 from .Distribution import Distribution
+from .GlobalSensitivity import GlobalSensitivity
 from .LocalExecutionModule import LocalExecutionModule
 from .Model import Model
 from .Plotter import Plotter
+from .PolynomialRS import PolynomialRS, PolynomialRSError
 from .ResponseSurfaces import ResponseSurfaces
 from .SampleData import SampleData
+from .SampleGenerator import SampleGeneratorError
 from .SamplingMethods import SamplingMethods
 
 
@@ -37,6 +40,113 @@ class RSAnalyzer:
     dname = os.getcwd() + os.path.sep + "RSAnalyzer_files"
     Common.initFolder(dname)
 
+    # "native" fits polynomial and Legendre surfaces in process with
+    # PolynomialRS, every other surface always goes through psuade
+    backend = "psuade"
+
+    # base sample size of the Saltelli design used by performSANative()
+    nativeSASamples = 4096
+
+    @staticmethod
+    def useNative(rsMethodName):
+        return RSAnalyzer.backend == "native" and PolynomialRS.isSupported(rsMethodName)
+
+    @staticmethod
+    def nativeTrainingData(data, y):
+        # variable inputs and one output of the valid samples
+        x = np.array(data.getInputData(), dtype=float, ndmin=2)
+        types = data.getInputTypes()
+        lower = np.array(data.getInputMins(), dtype=float)
+        upper = np.array(data.getInputMaxs(), dtype=float)
+        if x.shape[1] == len(types):
+            var = [i for i, t in enumerate(types) if t == Model.VARIABLE]
+            x = x[:, var]
+            lower = lower[var]
+            upper = upper[var]
+        yvals = np.array(data.getOutputData(), dtype=float, ndmin=2)[:, y - 1]
+        valid = np.isfinite(yvals) & (np.abs(yvals) < 1e34)
+        return x[valid], yvals[valid], lower, upper
+
+    @staticmethod
+    def nativeRS(data, y, rsMethodName, legendreOrder=None):
+        x, yvals, lower, upper = RSAnalyzer.nativeTrainingData(data, y)
+        rs = PolynomialRS(rsMethodName, legendreOrder, lower=lower, upper=upper)
+        return rs, x, yvals
+
+    @staticmethod
+    def validateRSNative(data, y, rsMethodName, legendreOrder, nCV, error_tol_percent):
+        rs, x, yvals = RSAnalyzer.nativeRS(data, y, rsMethodName, legendreOrder)
+        nSamples = len(yvals)
+        if (nCV is None) or (math.floor(nCV) > nSamples):
+            nCV = min(nSamples, 10)  # default number of cross-validation groups
+        try:
+            trainErrors, cvErrors, cvData = rs.validate(x, yvals, nCV)
+        except PolynomialRSError as e:
+            Common.showError("RSAnalyzer: %s" % e, str(e))
+            return None
+
+        # same layout as the psuade validation file read by plotValidate()
+        mfile = RSAnalyzer.dname + os.path.sep + "RSFA_CV_err.m"
+        with open(mfile, "w") as f:
+            f.write("A = [\n")
+            for row in cvData:
+                f.write(" ".join("%24.16e" % v for v in row) + "\n")
+            f.write("];\n")
+
+        RSAnalyzer.plotValidate(data, y, rsMethodName, False, mfile, error_tol_percent)
+
+        return (mfile, trainErrors, cvErrors, None)
+
+    @staticmethod
+    def performSANative(data, y, rsMethodName, cmd, showErrorBars):
+        rsIndex = ResponseSurfaces.getEnumValue(rsMethodName)
+        legendreOrder = None
+        if rsIndex == ResponseSurfaces.LEGENDRE:
+            legendreOrder = data.getLegendreOrder()
+        x, yvals, lower, upper = RSAnalyzer.nativeTrainingData(data, y)
+        dists = data.getInputDistributions()
+        types = data.getInputTypes()
+        if len(dists) == len(types):
+            dists = [d for d, t in zip(dists, types) if t == Model.VARIABLE]
+
+        # evaluate the surface on a Saltelli design over the input PDFs
+        secondOrder = cmd == "rssobol2"
+        key = {"rssobol1": "S1", "rssobol2": "S2", "rssoboltsi": "ST"}[cmd]
+        try:
+            xsa = GlobalSensitivity.saltelliSample(
+                lower, upper, RSAnalyzer.nativeSASamples, dists, secondOrder
+            )
+        except SampleGeneratorError as e:
+            Common.showError("RSAnalyzer: %s" % e, str(e))
+            return None
+
+        def indices(rows):
+            rs = PolynomialRS(rsMethodName, legendreOrder, lower=lower, upper=upper)
+            rs.fit(x[rows], yvals[rows])
+            s = GlobalSensitivity.sobol(rs.predict(xsa), len(lower), secondOrder)
+            return s[key][..., 0]
+
+        # bootstrapped surfaces give the error bars, as in psuade
+        try:
+            if showErrorBars:
+                bs = GlobalSensitivity.bootstrap(indices, len(yvals), nBootstrap=50)
+                mfile = GlobalSensitivity.writeMatlab(
+                    RSAnalyzer.dname + os.path.sep + "matlab" + cmd + "b.m",
+                    Means=bs["mean"],
+                    Stds=bs["std"],
+                )
+            else:
+                mfile = GlobalSensitivity.writeMatlab(
+                    RSAnalyzer.dname + os.path.sep + "matlab" + cmd + ".m",
+                    Mids=indices(np.arange(len(yvals))),
+                )
+        except PolynomialRSError as e:
+            Common.showError("RSAnalyzer: %s" % e, str(e))
+            return None
+
+        RSAnalyzer.plotSA(data, y, rsMethodName, cmd, showErrorBars, mfile)
+        return mfile
+
     @staticmethod
     def writeRSdata(outfile, y, data, **kwargs):
 
@@ -417,6 +527,14 @@ class RSAnalyzer:
                     marsBases, marsInteractions, marsNormOutputs = marsOptions
                     setMARS = True
 
+        # psuade is still needed to generate response surface code
+        if RSAnalyzer.useNative(rsIndex) and not genCodeFile:
+            if rsIndex != ResponseSurfaces.LEGENDRE:
+                legendreOrder = None
+            return RSAnalyzer.validateRSNative(
+                data, y, rsMethodName, legendreOrder, nCV, error_tol_percent
+            )
+
         # write script
         f = tempfile.SpooledTemporaryFile(mode="wt")
         if platform.system() == "Windows":
@@ -790,6 +908,19 @@ class RSAnalyzer:
                     marsBases, marsInteractions, marsNormOutputs = marsOptions
                     setMARS = True
 
+        if RSAnalyzer.useNative(rsIndex):
+            if rsIndex != ResponseSurfaces.LEGENDRE:
+                legendreOrder = None
+            rs, x, yvals = RSAnalyzer.nativeRS(data, y, rsMethodName, legendreOrder)
+            try:
+                rs.fit(x, yvals)
+            except PolynomialRSError as e:
+                Common.showError("RSAnalyzer: %s" % e, str(e))
+                return None
+            xpoint = [[xi["value"] for xi in xtest]]
+            mean, std = rs.predict(xpoint, returnStd=True)
+            return [mean[0], std[0]]
+
         # write script
         f = tempfile.SpooledTemporaryFile(mode="wt")
         if platform.system() == "Windows":
@@ -1286,6 +1417,10 @@ class RSAnalyzer:
         cmd_ = cmd
         if showErrorBars:
             cmd = cmd + "b"
+        if RSAnalyzer.useNative(rsIndex):
+            return RSAnalyzer.performSANative(
+                data, y, rsMethodName, cmd_, showErrorBars
+            )
 
         # check for MARS options
         setMARS = False
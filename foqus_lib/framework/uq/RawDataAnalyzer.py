@@ -17,6 +17,7 @@ import platform
 import tempfile
 
 from .Common import Common
+from .GlobalSensitivity import GlobalSensitivity
 from .LocalExecutionModule import LocalExecutionModule
 from .Model import Model
 from .Plotter import Plotter
@@ -27,11 +28,86 @@ class RawDataAnalyzer:
 
     dname = os.getcwd() + os.path.sep + "RawDataAnalyzer_files"
 
+    # "native" runs MOAT screening, correlation and Sobol analyses in process
+    # with GlobalSensitivity, the other analyses always go through psuade
+    backend = "psuade"
+
+    @staticmethod
+    def nativeArrays(data, y):
+        x, yvals, lower, upper, _ = GlobalSensitivity.sampleArrays(data, [y])
+        if len(yvals) < 2:
+            Common.showError("RawDataAnalyzer: Too few valid samples.")
+            return None
+        return x, yvals, lower, upper
+
+    @staticmethod
+    def screenInputsNative(data, y):
+        arrays = RawDataAnalyzer.nativeArrays(data, y)
+        if arrays is None:
+            return None
+        x, yvals, lower, upper = arrays
+        inputs, effects = GlobalSensitivity.elementaryEffects(x, yvals, lower, upper)
+        if len(inputs) == 0:
+            Common.showError("RawDataAnalyzer: The sample has no MOAT steps.")
+            return None
+
+        # bootstrap of the modified means, as written by psuade moat
+        nInputs = x.shape[1]
+        bs = GlobalSensitivity.bootstrap(
+            lambda i: GlobalSensitivity.morris(inputs[i], effects[i], nInputs)[
+                "mustar"
+            ][:, 0],
+            len(inputs),
+        )
+        mfile = GlobalSensitivity.writeMatlab(
+            RawDataAnalyzer.dname + os.path.sep + "matlabmoatbs.m",
+            Means=bs["mean"],
+            Stds=bs["std"],
+        )
+        RawDataAnalyzer.plotScreenInputs(data, "moat", y, mfile)
+        return mfile
+
+    @staticmethod
+    def performCANative(data, y):
+        arrays = RawDataAnalyzer.nativeArrays(data, y)
+        if arrays is None:
+            return None
+        x, yvals, _, _ = arrays
+        corr = GlobalSensitivity.correlation(x, yvals)
+        mfile = GlobalSensitivity.writeMatlab(
+            RawDataAnalyzer.dname + os.path.sep + "matlabca.m",
+            PCC=corr["pearson"][:, 0],
+            SPEA=corr["spearman"][:, 0],
+        )
+        RawDataAnalyzer.plotCA(data, y, mfile)
+        return mfile
+
+    @staticmethod
+    def performSANative(data, y, cmd):
+        arrays = RawDataAnalyzer.nativeArrays(data, y)
+        if arrays is None:
+            return None
+        x, yvals, _, _ = arrays
+        if cmd == "me":
+            mids = GlobalSensitivity.firstOrder(x, yvals)[:, 0]
+        elif cmd == "ie":
+            mids = GlobalSensitivity.secondOrder(x, yvals)[:, :, 0]
+        else:
+            mids = GlobalSensitivity.totalOrder(x, yvals)[:, 0]
+        outfile = {"me": "matlabme.m", "ie": "matlabaie.m", "tsi": "matlabtsi.m"}
+        mfile = GlobalSensitivity.writeMatlab(
+            RawDataAnalyzer.dname + os.path.sep + outfile[cmd], Mids=mids
+        )
+        RawDataAnalyzer.plotSA(data, cmd, y, mfile)
+        return mfile
+
     @staticmethod
     def screenInputs(fname, y, cmd):
 
         # read data
         data = LocalExecutionModule.readSampleFromPsuadeFile(fname)
+        if RawDataAnalyzer.backend == "native" and cmd == "moat":
+            return RawDataAnalyzer.screenInputsNative(data, y)
 
         # write script
         f = tempfile.SpooledTemporaryFile(mode="wt")
@@ -235,6 +311,8 @@ class RawDataAnalyzer:
 
         # read data
         data = LocalExecutionModule.readSampleFromPsuadeFile(fname)
+        if RawDataAnalyzer.backend == "native":
+            return RawDataAnalyzer.performCANative(data, y)
 
         # write script
         cmd = "ca"
@@ -333,6 +411,9 @@ class RawDataAnalyzer:
                 Common.showError(error)
                 return None
 
+        if RawDataAnalyzer.backend == "native":
+            return RawDataAnalyzer.performSANative(data, y, cmd)
+
         # write script
         f = tempfile.SpooledTemporaryFile(mode="wt")
         if platform.system() == "Windows":
@@ -0,0 +1,188 @@
+#################################################################################
+# FOQUS Copyright (c) 2012 - 2026, by the software owners: Oak Ridge Institute
+# for Science and Education (ORISE), TRIAD National Security, LLC., Lawrence
+# Livermore National Security, LLC., The Regents of the University of
+# California, through Lawrence Berkeley National Laboratory, Battelle Memorial
+# Institute, Pacific Northwest Division through Pacific Northwest National
+# Laboratory, Carnegie Mellon University, West Virginia University, Boston
+# University, the Trustees of Princeton University, The University of Texas at
+# Austin, URS Energy & Construction, Inc., et al.  All rights reserved.
+#
+# Please see the file LICENSE.md for full copyright and license information,
+# respectively. This file is also available online at the URL
+# "https://github.com/CCSI-Toolset/FOQUS".
+#################################################################################
+"""
+In-process sample generation for UQ ensembles
+
+Generates Monte Carlo, Latin hypercube, scrambled Sobol (used for the
+PSUADE quasi Monte Carlo LPTAU method), scrambled Halton and full
+factorial designs without writing psuade.in or running PSUADE.  Points
+are drawn on the unit hypercube and mapped to the inputs by the inverse
+CDF of each input distribution, truncated to the input bounds.  Beta
+distributions are scaled to the input bounds.  Sample file (S)
+distributions and the other PSUADE methods are not supported here.
+
+Usage:
+    x = SampleGenerator.sample("LH", 100, lower, upper, dists, seed=1)
+    data = SampleGenerator.generate(sampleData, seed=1)
+"""
+
+import warnings
+
+import numpy as np
+from scipy import stats
+from scipy.stats import qmc
+
+from .Distribution import Distribution
+from .SamplingMethods import SamplingMethods
+
+
+class SampleGeneratorError(Exception):
+    pass
+
+
+class SampleGenerator(object):
+    # PSUADE names of the supported methods.  HALTON has no SamplingMethods
+    # value, so it can only be requested by name.
+    methods = ("MC", "LH", "LPTAU", "HALTON", "FACT")
+
+    @staticmethod
+    def methodName(method):
+        if isinstance(method, str):
+            name = method.upper()
+            if name == "SOBOL":
+                return "LPTAU"
+            if name in SampleGenerator.methods:
+                return name
+            try:
+                method = SamplingMethods.getEnumValue(method)
+            except ValueError:
+                return method
+        return SamplingMethods.getPsuadeName(method)
+
+    @staticmethod
+    def isSupported(method, distributions=()):
+        if SampleGenerator.methodName(method) not in SampleGenerator.methods:
+            return False
+        return all(
+            d.getDistributionType() != Distribution.SAMPLE for d in distributions
+        )
+
+    @staticmethod
+    def factorialLevels(numSamples, numInputs):
+        # largest number of levels per input with levels**numInputs samples
+        # not over numSamples, never fewer than 2
+        levels = int(np.floor(numSamples ** (1.0 / numInputs) + 1.0e-8))
+        return max(levels, 2)
+
+    @staticmethod
+    def unitSample(method, numSamples, numInputs, seed=None):
+        """Sample of the unit hypercube, one row per sample
+
+        A full factorial design has factorialLevels()**numInputs rows,
+        which may differ from numSamples.
+        """
+        name = SampleGenerator.methodName(method)
+        if name == "MC":
+            return np.random.default_rng(seed).random((numSamples, numInputs))
+        if name == "LH":
+            return qmc.LatinHypercube(d=numInputs, seed=seed).random(numSamples)
+        if name == "LPTAU":
+            with warnings.catch_warnings():
+                # Sobol warns if numSamples is not a power of 2
+                warnings.simplefilter("ignore")
+                return qmc.Sobol(d=numInputs, scramble=True, seed=seed).random(
+                    numSamples
+                )
+        if name == "HALTON":
+            return qmc.Halton(d=numInputs, scramble=True, seed=seed).random(numSamples)
+        if name == "FACT":
+            levels = SampleGenerator.factorialLevels(numSamples, numInputs)
+            # the first input varies fastest
+            grid = np.meshgrid(
+                *[np.linspace(0.0, 1.0, levels)] * numInputs, indexing="ij"
+            )
+            return np.column_stack([g.ravel(order="F") for g in grid])
+        raise SampleGeneratorError("Sampling method %s is not supported" % method)
+
+    @staticmethod
+    def frozenDistribution(dist):
+        """SciPy distribution for a Distribution with the PSUADE parameters"""
+        distType = dist.getDistributionType()
+        p1, p2 = dist.getParameterValues()
+        if distType == Distribution.UNIFORM:
+            return None
+        if distType == Distribution.NORMAL:
+            return stats.norm(loc=p1, scale=p2)
+        if distType == Distribution.LOGNORMAL:
+            # parameters are the mean and standard deviation of log(x)
+            return stats.lognorm(s=p2, scale=np.exp(p1))
+        if distType == Distribution.TRIANGLE:
+            # symmetric about the mode with half width p2
+            return stats.triang(c=0.5, loc=p1 - p2, scale=2.0 * p2)
+        if distType == Distribution.GAMMA:
+            return stats.gamma(a=p1, scale=1.0 / p2)
+        if distType == Distribution.BETA:
+            return stats.beta(a=p1, b=p2)
+        if distType == Distribution.EXPONENTIAL:
+            return stats.expon(scale=1.0 / p1)
+        if distType == Distribution.WEIBULL:
+            return stats.weibull_min(c=p2, scale=p1)
+        raise SampleGeneratorError(
+            "%s distributions are not supported" % Distribution.getFullName(distType)
+        )
+
+    @staticmethod
+    def transform(u, lower, upper, distributions=None):
+        """Map a unit hypercube sample to the inputs, column by column"""
+        u = np.array(u, dtype=float, ndmin=2)
+        lower = np.asarray(lower, dtype=float)
+        upper = np.asarray(upper, dtype=float)
+        x = lower + u * (upper - lower)
+        for i, dist in enumerate(distributions or ()):
+            frozen = SampleGenerator.frozenDistribution(dist)
+            if frozen is None:
+                continue
+            if dist.getDistributionType() == Distribution.BETA:
+                x[:, i] = lower[i] + (upper[i] - lower[i]) * frozen.ppf(u[:, i])
+                continue
+            lo, hi = frozen.cdf([lower[i], upper[i]])
+            if not hi > lo:
+                raise SampleGeneratorError(
+                    "%s has no probability between the bounds of input %d"
+                    % (dist, i + 1)
+                )
+            x[:, i] = np.clip(frozen.ppf(lo + u[:, i] * (hi - lo)), lower[i], upper[i])
+        return x
+
+    @staticmethod
+    def sample(method, numSamples, lower, upper, distributions=None, seed=None):
+        u = SampleGenerator.unitSample(method, numSamples, len(lower), seed)
+        return SampleGenerator.transform(u, lower, upper, distributions)
+
+    @staticmethod
+    def generate(data, seed=None):
+        """Fill the input data of a SampleData with its sampling method
+
+        The number of samples is changed to the size of the design for
+        full factorial sampling.
+        """
+        distributions = data.getInputDistributions()
+        if not SampleGenerator.isSupported(data.getSampleMethod(), distributions):
+            raise SampleGeneratorError(
+                "Sampling method %s is not supported"
+                % SamplingMethods.getPsuadeName(data.getSampleMethod())
+            )
+        x = SampleGenerator.sample(
+            data.getSampleMethod(),
+            data.getNumSamples(),
+            data.getInputMins(),
+            data.getInputMaxs(),
+            distributions,
+            seed,
+        )
+        if x.shape[0] != data.getNumSamples():
+            data.setNumSamples(x.shape[0])
+        data.setInputData(x)
+        return data
@@ -0,0 +1,247 @@
+#################################################################################
+# FOQUS Copyright (c) 2012 - 2026, by the software owners: Oak Ridge Institute
+# for Science and Education (ORISE), TRIAD National Security, LLC., Lawrence
+# Livermore National Security, LLC., The Regents of the University of
+# California, through Lawrence Berkeley National Laboratory, Battelle Memorial
+# Institute, Pacific Northwest Division through Pacific Northwest National
+# Laboratory, Carnegie Mellon University, West Virginia University, Boston
+# University, the Trustees of Princeton University, The University of Texas at
+# Austin, URS Energy & Construction, Inc., et al.  All rights reserved.
+#
+# Please see the file LICENSE.md for full copyright and license information,
+# respectively. This file is also available online at the URL
+# "https://github.com/CCSI-Toolset/FOQUS".
+#################################################################################
+import os
+import tempfile
+import unittest
+from unittest.mock import patch
+
+import numpy as np
+
+from foqus_lib.framework.uq.Distribution import Distribution
+from foqus_lib.framework.uq.GlobalSensitivity import GlobalSensitivity
+from foqus_lib.framework.uq.Model import Model
+from foqus_lib.framework.uq.Plotter import Plotter
+from foqus_lib.framework.uq.RawDataAnalyzer import RawDataAnalyzer
+from foqus_lib.framework.uq.RSAnalyzer import RSAnalyzer
+from foqus_lib.framework.uq.SampleData import SampleData
+
+PI = np.pi
+
+
+def ishigami(x, a=7.0, b=0.1):
+    return (
+        np.sin(x[:, 0]) + a * np.sin(x[:, 1]) ** 2 + b * x[:, 2] ** 4 * np.sin(x[:, 0])
+    )
+
+
+# analytic Sobol indices of the Ishigami function
+ISHIGAMI_S1 = [0.3139, 0.4424, 0.0]
+ISHIGAMI_ST = [0.5576, 0.4424, 0.2437]
+ISHIGAMI_S13 = 0.2437
+
+
+class TestGlobalSensitivity(unittest.TestCase):
+    """Test cases for the in-process sensitivity measures"""
+
+    def test_saltelli(self):
+        x = GlobalSensitivity.saltelliSample(
+            [-PI] * 3, [PI] * 3, 2**13, secondOrder=True, seed=1
+        )
+        self.assertEqual(x.shape, (8 * 2**13, 3))
+        y = ishigami(x)
+        s = GlobalSensitivity.sobol(np.column_stack([y, 3.0 * y]), 3, True)
+        self.assertEqual(s["S1"].shape, (3, 2))
+        np.testing.assert_allclose(s["S1"][:, 0], ISHIGAMI_S1, atol=0.01)
+        np.testing.assert_allclose(s["ST"][:, 0], ISHIGAMI_ST, atol=0.01)
+        # indices don't depend on the output scale
+        np.testing.assert_allclose(s["S1"][:, 1], s["S1"][:, 0])
+        s2 = s["S2"][:, :, 0]
+        np.testing.assert_allclose(s2, s2.T)
+        np.testing.assert_allclose(np.diag(s2), s["S1"][:, 0])
+        self.assertAlmostEqual(s2[0, 2], ISHIGAMI_S13, delta=0.02)
+        self.assertAlmostEqual(s2[0, 1], 0.0, delta=0.02)
+
+        # the first-order design drops the BA blocks
+        x1 = GlobalSensitivity.saltelliSample([-PI] * 3, [PI] * 3, 2**13, seed=1)
+        np.testing.assert_array_equal(x1, x[: 5 * 2**13])
+        s = GlobalSensitivity.sobol(ishigami(x1), 3)
+        self.assertNotIn("S2", s)
+
+    def test_given_data(self):
+        x = np.random.default_rng(0).uniform(-PI, PI, size=(20000, 3))
+        y = ishigami(x)
+        np.testing.assert_allclose(
+            GlobalSensitivity.firstOrder(x, y)[:, 0], ISHIGAMI_S1, atol=0.03
+        )
+        np.testing.assert_allclose(
+            GlobalSensitivity.totalOrder(x, y)[:, 0], ISHIGAMI_ST, atol=0.03
+        )
+        s2 = GlobalSensitivity.secondOrder(x, y)[:, :, 0]
+        np.testing.assert_allclose(s2, s2.T)
+        self.assertAlmostEqual(s2[0, 2], ISHIGAMI_S13, delta=0.03)
+        # a constant output has no indices
+        self.assertTrue(np.isnan(GlobalSensitivity.firstOrder(x, np.ones(20000))).all())
+
+    def test_morris(self):
+        # two trajectories of 3 inputs, y = 2 x1 + x2 x3, then a bad step
+        x = np.array(
+            [
+                [0.0, 0.0, 0.0],
+                [0.5, 0.0, 0.0],
+                [0.5, 0.5, 0.0],
+                [0.5, 0.5, 0.5],
+                [1.0, 1.0, 1.0],
+                [1.0, 1.0, 0.5],
+                [1.0, 0.5, 0.5],
+                [0.5, 0.5, 0.5],
+            ]
+        )
+        y = 2.0 * x[:, 0] + x[:, 1] * x[:, 2]
+        inputs, effects = GlobalSensitivity.elementaryEffects(x, y, [0] * 3, [1] * 3)
+        self.assertEqual(inputs.tolist(), [0, 1, 2, 2, 1, 0])
+        m = GlobalSensitivity.morris(inputs, effects, 4)
+        np.testing.assert_allclose(m["mu"][:3, 0], [2.0, 0.25, 0.75])
+        np.testing.assert_allclose(m["mustar"][:3, 0], [2.0, 0.25, 0.75])
+        np.testing.assert_allclose(
+            m["sigma"][:3, 0], [0.0, np.sqrt(0.125), np.sqrt(0.125)], atol=1e-12
+        )
+        self.assertTrue(np.isnan(m["mu"][3, 0]))
+
+    def test_correlation(self):
+        rng = np.random.default_rng(4)
+        x = rng.uniform(size=(500, 2))
+        y = np.column_stack([np.exp(5 * x[:, 0]), -x[:, 1]])
+        c = GlobalSensitivity.correlation(x, y)
+        self.assertAlmostEqual(c["spearman"][0, 0], 1.0)
+        self.assertAlmostEqual(c["spearman"][1, 1], -1.0)
+        self.assertAlmostEqual(c["pearson"][1, 1], -1.0)
+        self.assertLess(c["pearson"][0, 0], 0.95)
+        self.assertLess(abs(c["pearson"][0, 1]), 0.15)
+
+    def test_bootstrap(self):
+        rng = np.random.default_rng(2)
+        x = rng.uniform(size=(400, 3))
+        y = x @ [1.0, 0.5, 0.0] + 0.1 * rng.normal(size=400)
+
+        def statistic(rows):
+            return GlobalSensitivity.correlation(x[rows], y[rows])
+
+        bs = GlobalSensitivity.bootstrap(statistic, 400, 40, seed=7, workers=4)
+        again = GlobalSensitivity.bootstrap(statistic, 400, 40, seed=7, workers=1)
+        full = statistic(np.arange(400))
+        for key in ["pearson", "spearman"]:
+            np.testing.assert_array_equal(bs[key]["mean"], again[key]["mean"])
+            self.assertTrue((bs[key]["lower"] <= full[key]).all())
+            self.assertTrue((bs[key]["upper"] >= full[key]).all())
+            self.assertTrue((bs[key]["std"] > 0).all())
+        self.assertEqual(bs["pearson"]["mean"].shape, (3, 1))
+
+    def test_write_matlab(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            fname = os.path.join(tmp, "matlabaie.m")
+            mids = np.arange(9.0).reshape(3, 3)
+            GlobalSensitivity.writeMatlab(fname, Mids=mids, Stds=[0.5])
+            dat = Plotter.getdata(fname, "Mids")
+            np.testing.assert_array_equal(np.reshape(dat, [3, 3], order="F"), mids)
+            self.assertEqual(Plotter.getdata(fname, "Stds"), [0.5])
+
+
+class TestNativeAnalyzers(unittest.TestCase):
+    """Test the native RawDataAnalyzer and RSAnalyzer analyses"""
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.fname = os.path.join(self.tmp.name, "sample.dat")
+        rsdir = os.path.join(self.tmp.name, "rs")
+        os.mkdir(rsdir)
+        for cls, dname in [(RawDataAnalyzer, self.tmp.name), (RSAnalyzer, rsdir)]:
+            backend = patch.object(cls, "backend", "native")
+            backend.start()
+            self.addCleanup(backend.stop)
+            folder = patch.object(cls, "dname", dname)
+            folder.start()
+            self.addCleanup(folder.stop)
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def writeSample(self, x, y):
+        model = Model()
+        model.setInputNames(["x%d" % (i + 1) for i in range(x.shape[1])])
+        model.setOutputNames(["y"])
+        model.setInputTypes([Model.VARIABLE] * x.shape[1])
+        model.setInputMins(x.min(axis=0))
+        model.setInputMaxs(x.max(axis=0))
+        model.setInputDefaults(x.mean(axis=0))
+        model.setInputDistributions([Distribution(Distribution.UNIFORM)] * x.shape[1])
+        data = SampleData(model)
+        data.setNumSamples(len(x))
+        data.setInputData(x)
+        data.setOutputData(y[:, None])
+        data.setRunState([1] * len(x))
+        data.writeToPsuade(self.fname)
+
+    @patch.object(RawDataAnalyzer, "plotSA")
+    @patch.object(RawDataAnalyzer, "plotCA")
+    def test_raw_data(self, plotCA, plotSA):
+        x = np.random.default_rng(0).uniform(-PI, PI, size=(10000, 3))
+        self.writeSample(x, ishigami(x))
+        mfile = RawDataAnalyzer.performSA(self.fname, 1, "me")
+        self.assertEqual(mfile, os.path.join(self.tmp.name, "matlabme.m"))
+        np.testing.assert_allclose(
+            Plotter.getdata(mfile, "Mids"), ISHIGAMI_S1, atol=0.04
+        )
+        plotSA.assert_called_once()
+        mfile = RawDataAnalyzer.performSA(self.fname, 1, "ie")
+        self.assertEqual(len(Plotter.getdata(mfile, "Mids")), 9)
+        mfile = RawDataAnalyzer.performCA(self.fname, 1)
+        self.assertEqual(len(Plotter.getdata(mfile, "PCC")), 3)
+        self.assertEqual(len(Plotter.getdata(mfile, "SPEA")), 3)
+        plotCA.assert_called_once()
+
+    @patch.object(RawDataAnalyzer, "plotScreenInputs")
+    def test_moat(self, plotScreenInputs):
+        rng = np.random.default_rng(1)
+        rows = []
+        for _ in range(20):
+            p = rng.uniform(0.0, 0.5, 3)
+            rows.append(p.copy())
+            for i in rng.permutation(3):
+                p[i] += 0.5
+                rows.append(p.copy())
+        x = np.array(rows)
+        self.writeSample(x, 4.0 * x[:, 0] - x[:, 1])
+        mfile = RawDataAnalyzer.screenInputs(self.fname, 1, "moat")
+        self.assertEqual(mfile, os.path.join(self.tmp.name, "matlabmoatbs.m"))
+        means = Plotter.getdata(mfile, "Means")
+        stds = Plotter.getdata(mfile, "Stds")
+        # effects are scaled to the sampled input ranges
+        span = x.max(axis=0) - x.min(axis=0)
+        np.testing.assert_allclose(means, [4.0 * span[0], span[1], 0.0], rtol=1e-6)
+        np.testing.assert_allclose(stds, 0.0, atol=1e-6)
+        plotScreenInputs.assert_called_once()
+
+    @patch.object(RSAnalyzer, "plotSA")
+    def test_response_surface(self, plotSA):
+        # y = x1 + x2^2 on [-1, 1]^3 has S = 15/19, 4/19 and 0
+        x = np.random.default_rng(3).uniform(-1.0, 1.0, size=(40, 3))
+        x[0], x[1] = -1.0, 1.0
+        self.writeSample(x, x[:, 0] + x[:, 1] ** 2)
+        mfile = RSAnalyzer.performSA(
+            self.fname, 1, "rssobol1", False, "Quadratic Regression"
+        )
+        self.assertTrue(mfile.endswith("matlabrssobol1.m"))
+        np.testing.assert_allclose(
+            Plotter.getdata(mfile, "Mids"), [15 / 19, 4 / 19, 0.0], atol=0.01
+        )
+        mfile = RSAnalyzer.performSA(
+            self.fname, 1, "rssoboltsi", True, "Quadratic Regression"
+        )
+        self.assertTrue(mfile.endswith("matlabrssoboltsib.m"))
+        np.testing.assert_allclose(
+            Plotter.getdata(mfile, "Means"), [15 / 19, 4 / 19, 0.0], atol=0.01
+        )
+        self.assertEqual(len(Plotter.getdata(mfile, "Stds")), 3)
+        self.assertEqual(plotSA.call_count, 2)
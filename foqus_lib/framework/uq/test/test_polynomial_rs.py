@@ -0,0 +1,142 @@
+#################################################################################
+# FOQUS Copyright (c) 2012 - 2026, by the software owners: Oak Ridge Institute
+# for Science and Education (ORISE), TRIAD National Security, LLC., Lawrence
+# Livermore National Security, LLC., The Regents of the University of
+# California, through Lawrence Berkeley National Laboratory, Battelle Memorial
+# Institute, Pacific Northwest Division through Pacific Northwest National
+# Laboratory, Carnegie Mellon University, West Virginia University, Boston
+# University, the Trustees of Princeton University, The University of Texas at
+# Austin, URS Energy & Construction, Inc., et al.  All rights reserved.
+#
+# Please see the file LICENSE.md for full copyright and license information,
+# respectively. This file is also available online at the URL
+# "https://github.com/CCSI-Toolset/FOQUS".
+#################################################################################
+import os
+import tempfile
+import unittest
+from unittest.mock import Mock, patch
+
+import numpy as np
+
+from foqus_lib.framework.sdoe import odoeu
+from foqus_lib.framework.uq.LocalExecutionModule import LocalExecutionModule
+from foqus_lib.framework.uq.PolynomialRS import PolynomialRS, PolynomialRSError
+from foqus_lib.framework.uq.ResponseSurfaces import ResponseSurfaces
+from foqus_lib.framework.uq.RSAnalyzer import RSAnalyzer
+
+
+def quadratic(x):
+    return 1.0 + 2.0 * x[:, 0] - x[:, 1] ** 2 + 0.5 * x[:, 0] * x[:, 2]
+
+
+class TestPolynomialRS(unittest.TestCase):
+    """Test cases for the in-process polynomial response surfaces"""
+
+    def setUp(self):
+        rng = np.random.default_rng(7)
+        self.x = rng.uniform(-2.0, 3.0, size=(60, 3))
+        self.y = quadratic(self.x)
+
+    def test_supported(self):
+        self.assertTrue(PolynomialRS.isSupported("quadratic"))
+        self.assertTrue(PolynomialRS.isSupported(ResponseSurfaces.LEGENDRE))
+        self.assertFalse(PolynomialRS.isSupported("MARS"))
+        with self.assertRaises(PolynomialRSError):
+            PolynomialRS("MARS")
+        with self.assertRaises(PolynomialRSError):
+            PolynomialRS(ResponseSurfaces.LEGENDRE)
+
+    def test_exponents(self):
+        exps = PolynomialRS.totalDegreeExponents(3, 2)
+        self.assertEqual(len(exps), 10)
+        self.assertTrue((exps.sum(axis=1) <= 2).all())
+        self.assertEqual(exps[0].tolist(), [0, 0, 0])
+
+    def test_quadratic_recovers_function(self):
+        rs = PolynomialRS("Quadratic Regression").fit(self.x, self.y)
+        xnew = np.random.default_rng(1).uniform(-2.0, 3.0, size=(25, 3))
+        np.testing.assert_allclose(rs.predict(xnew), quadratic(xnew), atol=1e-10)
+
+    def test_legendre_spans_same_space(self):
+        quad = PolynomialRS(ResponseSurfaces.QUADRATIC).fit(self.x, self.y)
+        leg = PolynomialRS(ResponseSurfaces.LEGENDRE, legendreOrder=2).fit(
+            self.x, self.y
+        )
+        np.testing.assert_allclose(quad.predict(self.x), leg.predict(self.x))
+
+    def test_batched_prediction(self):
+        rs = PolynomialRS("linear").fit(self.x, self.y)
+        mean, std = rs.predict(self.x, returnStd=True)
+        with patch.object(PolynomialRS, "batchSize", 7):
+            mean7, std7 = rs.predict(self.x, returnStd=True)
+        np.testing.assert_allclose(mean, mean7)
+        np.testing.assert_allclose(std, std7)
+        self.assertTrue((std > 0).all())
+
+    def test_multiple_outputs(self):
+        y2 = np.column_stack((self.y, 3.0 * self.y))
+        rs = PolynomialRS("quadratic").fit(self.x, y2)
+        self.assertEqual(rs.predict(self.x[:4]).shape, (4, 2))
+
+    def test_rank_deficient(self):
+        with self.assertRaises(PolynomialRSError) as cm:
+            PolynomialRS("cubic").fit(self.x[:10], self.y[:10])
+        self.assertIn("true rank of sample", str(cm.exception))
+
+    def test_validate(self):
+        rs = PolynomialRS("linear")
+        trainErrors, cvErrors, cvData = rs.validate(self.x, self.y, nCV=5, rseed=0)
+        self.assertEqual(
+            set(trainErrors),
+            {
+                "avg_unscaled",
+                "avg_scaled",
+                "rms_unscaled",
+                "rms_scaled",
+                "max_unscaled",
+                "max_scaled",
+                "R-square",
+            },
+        )
+        self.assertEqual(set(cvErrors), set(trainErrors) - {"R-square"})
+        self.assertLess(trainErrors["R-square"], 1.0)
+        self.assertGreaterEqual(cvErrors["rms_unscaled"], trainErrors["rms_unscaled"])
+        self.assertEqual(cvData.shape, (60, 4))
+        np.testing.assert_allclose(cvData[:, 1], self.y)
+        np.testing.assert_allclose(cvData[:, 0], cvData[:, 1] - cvData[:, 2])
+
+
+class TestOdoeuNativeRseval(unittest.TestCase):
+    def test_rseval_native(self):
+        rng = np.random.default_rng(3)
+        x = rng.uniform(0.0, 1.0, size=(30, 3))
+        rsdata = Mock()
+        rsdata.getInputNames.return_value = ("d1", "u1", "d2")
+        rsdata.getInputData.return_value = x
+        rsdata.getOutputData.return_value = (x[:, 0] + 2.0 * x[:, 1] + x[:, 2])[
+            :, np.newaxis
+        ]
+        rsdata.getInputMins.return_value = [0.0] * 3
+        rsdata.getInputMaxs.return_value = [1.0] * 3
+        pdata = Mock()
+        pdata.getInputNames.return_value = ("u1",)
+        pdata.getInputData.return_value = np.array([[0.0], [1.0]])
+        cdata = Mock()
+        cdata.getInputData.return_value = np.array([[0.1, 0.5, 0.2], [0.3, 0.5, 0.4]])
+
+        cwd = os.getcwd()
+        with tempfile.TemporaryDirectory() as tmp:
+            os.chdir(tmp)
+            try:
+                with patch.object(RSAnalyzer, "backend", "native"):
+                    outfile = odoeu.rseval(rsdata, pdata, cdata, {0: "linear"})
+                data, _, nInputs, _ = LocalExecutionModule.readDataFromSimpleFile(
+                    outfile
+                )
+            finally:
+                os.chdir(cwd)
+        self.assertEqual(nInputs, 5)
+        # mean over u1 in {0, 1} is d1 + 1 + d2, std dev is 1
+        np.testing.assert_allclose(data[:, 3], [1.3, 1.7])
+        np.testing.assert_allclose(data[:, 4], [1.0, 1.0])
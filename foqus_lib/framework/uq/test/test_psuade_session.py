@@ -0,0 +1,211 @@
+#################################################################################
+# FOQUS Copyright (c) 2012 - 2026, by the software owners: Oak Ridge Institute
+# for Science and Education (ORISE), TRIAD National Security, LLC., Lawrence
+# Livermore National Security, LLC., The Regents of the University of
+# California, through Lawrence Berkeley National Laboratory, Battelle Memorial
+# Institute, Pacific Northwest Division through Pacific Northwest National
+# Laboratory, Carnegie Mellon University, West Virginia University, Boston
+# University, the Trustees of Princeton University, The University of Texas at
+# Austin, URS Energy & Construction, Inc., et al.  All rights reserved.
+#
+# Please see the file LICENSE.md for full copyright and license information,
+# respectively. This file is also available online at the URL
+# "https://github.com/CCSI-Toolset/FOQUS".
+#################################################################################
+import os
+import shutil
+import stat
+import sys
+import tempfile
+import unittest
+from unittest.mock import patch
+
+from foqus_lib.framework.uq.Common import Common
+from foqus_lib.framework.uq.LocalExecutionModule import LocalExecutionModule
+from foqus_lib.framework.uq.PsuadeSession import PsuadeSession, PsuadeSessionError
+
+# Scripted stand-in for interactive psuade.  It counts loads and starts in
+# a log file so the tests can tell whether work was reused.
+FAKE_PSUADE = """#!%s
+import sys, time
+log = open(%r, "a")
+log.write("start\\n")
+log.flush()
+expert = False
+while True:
+    sys.stdout.write("psuade> ")
+    sys.stdout.flush()
+    line = sys.stdin.readline()
+    if not line:
+        break
+    cmd = line.split()
+    if not cmd:
+        continue
+    if cmd[0] == "quit":
+        break
+    elif cmd[0] == "load":
+        log.write("load %%s\\n" %% cmd[1])
+        log.flush()
+        print("load complete : nSamples = 10")
+    elif cmd[0] == "rs_expert":
+        expert = not expert
+        print("response surface expert mode %%s" %% ("on" if expert else "off"))
+    elif cmd[0] == "rscheck":
+        print("rscheck expert=%%s" %% expert)
+        print("R-square    = 0.99")
+    elif cmd[0] == "crash":
+        sys.stderr.write("segmentation fault\\n")
+        sys.exit(11)
+    elif cmd[0] == "sleep":
+        time.sleep(float(cmd[1]))
+        print("awake")
+    else:
+        print("command %%s not recognized" %% cmd[0])
+    sys.stdout.flush()
+"""
+
+
+class TestPsuadeSession(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.log = os.path.join(self.tmp.name, "fake.log")
+        self.exe = self.writeFake("psuade", FAKE_PSUADE)
+        self.data = os.path.join(self.tmp.name, "sample.psuade")
+        with open(self.data, "w") as f:
+            f.write("PSUADE\nEND\n")
+        self.session = PsuadeSession(
+            psuadePath=self.exe,
+            timeout=10,
+            logFile=os.path.join(self.tmp.name, "psuadelog"),
+        )
+
+    def tearDown(self):
+        self.session.close()
+        self.tmp.cleanup()
+
+    def writeFake(self, name, source):
+        exe = os.path.join(self.tmp.name, name)
+        with open(exe, "w") as f:
+            f.write(source % (sys.executable, self.log))
+        os.chmod(exe, os.stat(exe).st_mode | stat.S_IEXEC)
+        return exe
+
+    def events(self):
+        with open(self.log) as f:
+            return [line.split()[0] for line in f]
+
+    def test_load_is_reused(self):
+        script = "load %s\nrscheck\nquit\n" % self.data
+        out, error = self.session.run(script)
+        self.assertEqual(error, "")
+        self.assertIn("R-square", out)
+        out, error = self.session.run(script)
+        self.assertIn("R-square", out)
+        self.assertNotIn("load complete", out)
+        self.assertEqual(self.events(), ["start", "load"])
+
+    def test_changed_file_is_reloaded(self):
+        script = "load %s\nrscheck\n" % self.data
+        self.session.run(script)
+        with open(self.data, "a") as f:
+            f.write("\n")
+        self.session.run(script)
+        self.assertEqual(self.events(), ["start", "load", "load"])
+
+    def test_toggled_modes_are_restored(self):
+        out, error = self.session.run("rs_expert\nrscheck\n")
+        self.assertIn("expert=True", out)
+        out, error = self.session.run("rscheck\n")
+        self.assertIn("expert=False", out)
+
+    def test_crashed_worker_is_replaced(self):
+        self.session.maxRetries = 0
+        out, error = self.session.run("load %s\ncrash\n" % self.data)
+        self.assertIn("exited unexpectedly", error)
+        self.assertIn("segmentation fault", error)
+        self.assertTrue(self.session.isAlive())
+        out, error = self.session.run("load %s\nrscheck\n" % self.data)
+        self.assertEqual(error, "")
+        self.assertIn("load complete", out)
+        self.assertEqual(self.session.restarts, 1)
+
+    def test_timeout_restarts_worker(self):
+        out, error = self.session.run("sleep 5\n", timeout=0.5)
+        self.assertIn("timed out", error)
+        out, error = self.session.run("rscheck\n")
+        self.assertEqual(error, "")
+        self.assertIn("R-square", out)
+        self.assertEqual(self.events(), ["start", "start"])
+
+    def test_invoke_psuade_uses_active_session(self):
+        with self.session:
+            self.assertIs(Common.psuadeSession, self.session)
+            with PsuadeSession.ensure() as session:
+                self.assertIs(session, self.session)
+            for i in range(3):
+                f = tempfile.SpooledTemporaryFile(mode="wt")
+                f.write("load %s\nrscheck\nquit\n" % self.data)
+                f.seek(0)
+                out, error = Common.invokePsuade(f)
+                f.close()
+                self.assertIn("R-square", out)
+        self.assertIsNone(Common.psuadeSession)
+        self.assertFalse(self.session.isAlive())
+        self.assertEqual(self.events(), ["start", "load"])
+
+    def test_start_requires_sentinel_echo(self):
+        # a psuade that stays silent about unknown commands
+        quiet = FAKE_PSUADE.replace(
+            'print("command %%s not recognized" %% cmd[0])', "pass"
+        )
+        session = PsuadeSession(psuadePath=self.writeFake("quiet", quiet))
+        session.startTimeout = 0.5
+        with self.assertRaises(PsuadeSessionError):
+            session.start()
+        self.assertFalse(session.isAlive())
+
+    def test_ensure_falls_back_without_session(self):
+        with patch.object(PsuadeSession, "isSupported", return_value=False):
+            with PsuadeSession.ensure(psuadePath=self.exe) as session:
+                self.assertIsNone(session)
+                self.assertIsNone(Common.psuadeSession)
+        with PsuadeSession.ensure(psuadePath=self.data) as session:
+            self.assertIsNone(session)
+            self.assertIsNone(Common.psuadeSession)
+        self.assertFalse(os.path.exists(self.log))
+
+    def test_invoke_psuade_falls_back_on_session_error(self):
+        f = tempfile.SpooledTemporaryFile(mode="wt")
+        f.write("rscheck\nquit\n")
+        with self.session, patch.object(
+            self.session, "run", side_effect=PsuadeSessionError("no psuade")
+        ), patch.object(
+            LocalExecutionModule, "getPsuadePath", return_value=self.exe
+        ), patch.object(
+            Common, "runCommandInWindow", return_value=("ok", "")
+        ) as rc:
+            self.assertEqual(Common.invokePsuade(f), ("ok", ""))
+        self.assertEqual(rc.call_args[0][0], self.exe + " ")
+        self.assertIs(rc.call_args[0][2], f)
+        self.assertEqual(f.tell(), 0)
+        f.close()
+
+
+@unittest.skipIf(shutil.which("psuade") is None, "psuade is not installed")
+class TestRealPsuadeSession(unittest.TestCase):
+    def test_sentinel_is_echoed(self):
+        # the session finds the end of each script from psuade's complaint
+        # about an unknown command
+        with tempfile.TemporaryDirectory() as tmp:
+            session = PsuadeSession(
+                psuadePath=shutil.which("psuade"),
+                timeout=30,
+                logFile=os.path.join(tmp, "psuadelog"),
+            )
+            try:
+                session.start()
+                out, error = session.run("help\n")
+                self.assertNotIn("timed out", error)
+                self.assertTrue(session.isAlive())
+            finally:
+                session.close()
@@ -0,0 +1,183 @@
+#################################################################################
+# FOQUS Copyright (c) 2012 - 2026, by the software owners: Oak Ridge Institute
+# for Science and Education (ORISE), TRIAD National Security, LLC., Lawrence
+# Livermore National Security, LLC., The Regents of the University of
+# California, through Lawrence Berkeley National Laboratory, Battelle Memorial
+# Institute, Pacific Northwest Division through Pacific Northwest National
+# Laboratory, Carnegie Mellon University, West Virginia University, Boston
+# University, the Trustees of Princeton University, The University of Texas at
+# Austin, URS Energy & Construction, Inc., et al.  All rights reserved.
+#
+# Please see the file LICENSE.md for full copyright and license information,
+# respectively. This file is also available online at the URL
+# "https://github.com/CCSI-Toolset/FOQUS".
+#################################################################################
+import os
+import tempfile
+import unittest
+from unittest.mock import patch
+
+import numpy as np
+from scipy import stats
+
+from foqus_lib.framework.uq.Distribution import Distribution
+from foqus_lib.framework.uq.ExperimentalDesign import ExperimentalDesign
+from foqus_lib.framework.uq.Model import Model
+from foqus_lib.framework.uq.SampleData import SampleData
+from foqus_lib.framework.uq.SampleGenerator import (
+    SampleGenerator,
+    SampleGeneratorError,
+)
+from foqus_lib.framework.uq.SamplingMethods import SamplingMethods
+
+
+def makeDist(distType, p1=None, p2=None):
+    dist = Distribution(distType)
+    dist.setParameterValues(p1, p2)
+    return dist
+
+
+class TestSampleGenerator(unittest.TestCase):
+    """Test cases for the in-process sample generation"""
+
+    def test_supported(self):
+        self.assertTrue(SampleGenerator.isSupported(SamplingMethods.LH))
+        self.assertTrue(SampleGenerator.isSupported("Quasi Monte Carlo"))
+        self.assertTrue(SampleGenerator.isSupported("Sobol"))
+        self.assertTrue(SampleGenerator.isSupported("halton"))
+        self.assertFalse(SampleGenerator.isSupported(SamplingMethods.METIS))
+        self.assertFalse(SampleGenerator.isSupported("OA"))
+        self.assertFalse(
+            SampleGenerator.isSupported(
+                SamplingMethods.MC, [makeDist(Distribution.SAMPLE, "x.smp", 1)]
+            )
+        )
+        with self.assertRaises(SampleGeneratorError):
+            SampleGenerator.unitSample(SamplingMethods.MOAT, 10, 2)
+
+    def test_unit_designs(self):
+        for method in SampleGenerator.methods[:-1]:
+            u = SampleGenerator.unitSample(method, 64, 3, seed=5)
+            self.assertEqual(u.shape, (64, 3))
+            self.assertTrue(((u >= 0) & (u <= 1)).all())
+            np.testing.assert_array_equal(
+                u, SampleGenerator.unitSample(method, 64, 3, seed=5)
+            )
+        # one sample in each of the 64 strata of every input
+        u = SampleGenerator.unitSample("LH", 64, 3, seed=1)
+        for col in u.T:
+            self.assertEqual(sorted(np.floor(col * 64).astype(int)), list(range(64)))
+
+    def test_factorial(self):
+        self.assertEqual(SampleGenerator.factorialLevels(27, 3), 3)
+        self.assertEqual(SampleGenerator.factorialLevels(30, 3), 3)
+        self.assertEqual(SampleGenerator.factorialLevels(3, 3), 2)
+        u = SampleGenerator.unitSample(SamplingMethods.FACT, 9, 2)
+        self.assertEqual(
+            u.tolist(),
+            [[a, b] for b in (0.0, 0.5, 1.0) for a in (0.0, 0.5, 1.0)],
+        )
+
+    def test_distributions(self):
+        dists = [
+            Distribution(Distribution.UNIFORM),
+            makeDist(Distribution.NORMAL, 0.0, 1.0),
+            makeDist(Distribution.LOGNORMAL, 0.0, 0.5),
+            makeDist(Distribution.TRIANGLE, 1.0, 1.0),
+            makeDist(Distribution.GAMMA, 2.0, 4.0),
+            makeDist(Distribution.BETA, 2.0, 5.0),
+            makeDist(Distribution.EXPONENTIAL, 2.0),
+            makeDist(Distribution.WEIBULL, 1.0, 1.5),
+        ]
+        lower = [-1.0, -10.0, 0.0, 0.0, 0.0, 10.0, 0.0, 0.0]
+        upper = [1.0, 10.0, 100.0, 2.0, 100.0, 20.0, 100.0, 100.0]
+        x = SampleGenerator.sample(
+            SamplingMethods.MC, 20000, lower, upper, dists, seed=3
+        )
+        self.assertTrue(((x >= lower) & (x <= upper)).all())
+        # bounds far in the tails leave the distributions unchanged
+        expected = [
+            stats.uniform(-1, 2),
+            stats.norm(0, 1),
+            stats.lognorm(0.5),
+            stats.triang(0.5, 0, 2),
+            stats.gamma(2, scale=0.25),
+            stats.beta(2, 5, loc=10, scale=10),
+            stats.expon(scale=0.5),
+            stats.weibull_min(1.5),
+        ]
+        for col, dist in zip(x.T, expected):
+            self.assertGreater(stats.kstest(col, dist.cdf).pvalue, 1e-3)
+
+    def test_truncation(self):
+        u = np.linspace(0.0, 1.0, 101)[:, None]
+        dist = makeDist(Distribution.NORMAL, 0.0, 1.0)
+        x = SampleGenerator.transform(u, [0.0], [1.0], [dist])
+        self.assertEqual(x[0, 0], 0.0)
+        self.assertEqual(x[-1, 0], 1.0)
+        self.assertAlmostEqual(x[50, 0], stats.norm.ppf((0.5 + 0.841345) / 2), 5)
+        with self.assertRaises(SampleGeneratorError):
+            SampleGenerator.transform(
+                u, [50.0], [60.0], [makeDist(Distribution.EXPONENTIAL, 10.0)]
+            )
+
+
+class TestNativeExperimentalDesign(unittest.TestCase):
+    """Test ExperimentalDesign.generateSamples without PSUADE"""
+
+    def setUp(self):
+        model = Model()
+        model.setInputNames(["x", "y", "z"])
+        model.setOutputNames(["f"])
+        model.setInputTypes([Model.VARIABLE, Model.FIXED, Model.VARIABLE])
+        model.setInputMins([0, 0, -1])
+        model.setInputMaxs([10, 1, 1])
+        model.setInputDefaults([5, 0.5, 0])
+        model.setInputDistributions(
+            [
+                Distribution(Distribution.UNIFORM),
+                Distribution(Distribution.UNIFORM),
+                makeDist(Distribution.NORMAL, 0.0, 0.5),
+            ]
+        )
+        self.data = SampleData(model)
+        self.data.setNumSamples(50)
+        self.data.setSampleMethod(SamplingMethods.LH)
+
+    @patch("foqus_lib.framework.uq.ExperimentalDesign.Common.invokePsuade")
+    def test_generate(self, invokePsuade):
+        sample = ExperimentalDesign.generateSamples(self.data, [0, 2], [0], seed=2)
+        invokePsuade.assert_not_called()
+        self.assertFalse(os.path.exists("psuade.in"))
+        self.assertEqual(sample.getInputNames(), ("x", "z"))
+        self.assertEqual(sample.getNumSamples(), 50)
+        self.assertEqual(sample.getSampleMethod(), SamplingMethods.LH)
+        x = sample.getInputData()
+        self.assertEqual(x.shape, (50, 2))
+        self.assertTrue(((x >= [0, -1]) & (x <= [10, 1])).all())
+        self.assertEqual(sorted(np.floor(x[:, 0] * 5).astype(int)), list(range(50)))
+        self.assertEqual(
+            sample.getInputDistributions()[1].getDistributionType(),
+            Distribution.NORMAL,
+        )
+        self.assertFalse(any(sample.getRunState()))
+
+        sample = ExperimentalDesign.generateSamples(
+            self.data, [0, 2], [0], numSamples=20, sampleMethod=SamplingMethods.FACT
+        )
+        self.assertEqual(sample.getNumSamples(), 16)
+        self.assertEqual(sample.getInputData().shape, (16, 2))
+
+    @patch("foqus_lib.framework.uq.ExperimentalDesign.Common.invokePsuade")
+    def test_psuade_backend(self, invokePsuade):
+        invokePsuade.return_value = ("", "")
+        self.data.setSampleMethod(SamplingMethods.OA)
+        cwd = os.getcwd()
+        try:
+            with tempfile.TemporaryDirectory() as tmp:
+                os.chdir(tmp)
+                ExperimentalDesign.generateSamples(self.data, [0, 2], [0])
+                self.assertTrue(os.path.exists("psuade.in"))
+        finally:
+            os.chdir(cwd)
+        invokePsuade.assert_called_once()
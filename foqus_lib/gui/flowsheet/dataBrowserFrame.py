@@ -170,7 +170,11 @@ class dataBrowserFrame(_dataBrowserFrame, _dataBrowserFrameUI):
         self.results.row_to_flow(self.dat.flowsheet, rows[0], filtered=True)
         self.dat.mainWin.refresh()  # pylint: disable=no-member
 
-    def refreshContents(self):
+    def refreshContents(self, changed=True):
+        """
+        Update the table for changes to the results, changed is False if
+        results were only added.
+        """
         if self.results is None:
             self.results = self.dat.flowsheet.results
         else:
@@ -178,9 +182,20 @@ class dataBrowserFrame(_dataBrowserFrame, _dataBrowserFrameUI):
                 self.results = self.dat.flowsheet.results
 
         self.updateFilterBox()
-        self.tableView.setModel(dataModel(self.results, self))
+        self.updateModel(changed)
         self.numRowsBox.setText(str(self.results.count_rows(filtered=True)))
 
+    def updateModel(self, changed=True):
+        """
+        Make a table model for the results or let the current one catch up
+        with added rows and columns, reading shown values again if changed.
+        """
+        model = self.tableView.model()
+        if not isinstance(model, dataModel) or model.results is not self.results:
+            self.tableView.setModel(dataModel(self.results, self))
+        elif not model.update() and changed:
+            model.refresh()
+
     def autoResizeCols(self):
         # if you resize the columns before showing Qt seems to
         # calculate the width of all the cells in the table
@@ -225,6 +240,7 @@ class dataBrowserFrame(_dataBrowserFrame, _dataBrowserFrameUI):
         )
         if ok and name != "":
             rl.edit_set_name(name, rows, filtered=True)
+            self.refreshContents()
 
     def importCSV(self):
         if self.results is None:
@@ -241,7 +257,7 @@ class dataBrowserFrame(_dataBrowserFrame, _dataBrowserFrameUI):
         )
         if fileName:
             self.results.read_csv(fileName)
-            self.refreshContents()
+            self.refreshContents(changed=False)
 
     def addEmptyResult(self):
         if self.results is None:
@@ -253,7 +269,7 @@ class dataBrowserFrame(_dataBrowserFrame, _dataBrowserFrameUI):
         self.results.add_result(
             sd=self.dat.flowsheet.saveValues(), result_name="empty", empty=True
         )
-        self.refreshContents()
+        self.refreshContents(changed=False)
 
     def selectedRows(self):
         rows = set()
@@ -340,7 +356,7 @@ class dataBrowserFrame(_dataBrowserFrame, _dataBrowserFrameUI):
             print("error")
         else:
             self.results.set_filter(filterName)
-        self.tableView.setModel(dataModel(self.results, self))
+        self.updateModel()
         self.numRowsBox.setText(str(self.results.count_rows(filtered=True)))
 
     def saveResultsToCSV(self):
@@ -395,4 +411,4 @@ class dataBrowserFrame(_dataBrowserFrame, _dataBrowserFrameUI):
         clipboard = QApplication.clipboard()
         s = str(clipboard.text())
         self.results.read_csv(s=s, sep="\t")
-        self.refreshContents()
+        self.refreshContents(changed=False)
@@ -16,35 +16,155 @@
 
 * This is a data model for displaying flowsheet results in a table view.
 
+The model keeps a snapshot of the filtered row labels and reads each shown
+column once into an array, so drawing a cell doesn't look anything up in
+the results data frame.  Cell strings are made a block of rows at a time
+and kept in a bounded cache.  Rows are given to the view in batches as it
+scrolls (canFetchMore/fetchMore) and update() tells the view about
+appended rows and columns without resetting the model.
+
 John Eslick, Carnegie Mellon University, 2014
 """
 
+import collections
 import json
 
 import numpy as np
+import pandas as pd
 from PyQt5 import QtCore
 
 
+def _value(x):
+    """A cell value, numpy scalars from typed columns as python values"""
+    if isinstance(x, np.generic):
+        return x.item()
+    return x
+
+
+def _shown_dtype(dtype):
+    """The part of a column dtype that changes how values are shown"""
+    if isinstance(dtype, pd.CategoricalDtype):
+        # adding categories doesn't change the values
+        return "category"
+    return dtype
+
+
+def cell_text(x):
+    """The json string shown for the cell value x"""
+    try:
+        return json.dumps(_value(x))
+    except Exception as e:
+        return "error {}".format(str(e))
+
+
 class dataModel(QtCore.QAbstractTableModel):
     """
     A data model for displaying flowsheet results in a QTableView
     """
 
-    def __init__(self, results, parent=None):
+    def __init__(
+        self, results, parent=None, fetchSize=1000, blockSize=64, cacheBlocks=2048
+    ):
+        """
+        Args:
+            results: the Results data frame to show
+            parent: parent QObject
+            fetchSize: number of rows to give the view at a time
+            blockSize: number of rows of a column formatted at once
+            cacheBlocks: maximum number of formatted blocks to keep
+        """
         QtCore.QAbstractTableModel.__init__(self, parent)
         self.results = results
+        self.fetchSize = max(1, int(fetchSize))
+        self.blockSize = max(1, int(blockSize))
+        self.cacheBlocks = cacheBlocks
+        self._snapshot()
+        self._loaded = min(len(self._rows), self.fetchSize)
+
+    def _snapshot(self):
+        """Take the row labels and columns to show from the results"""
+        self._rows = list(self.results.get_indexes(filtered=True))
+        self._cols = list(self.results.columns)
+        self._pos = self.results.index.get_indexer(self._rows)
+        self._dtypes = self._shown_dtypes()
+        self._arrays = {}  # column -> values of the shown rows
+        self._text = collections.OrderedDict()  # (column, block) -> strings
+
+    def _shown_dtypes(self):
+        """Shown dtype of each results column"""
+        return {
+            c: _shown_dtype(t)
+            for c, t in zip(self.results.columns, self.results.dtypes)
+        }
+
+    def _array(self, col):
+        """The values of column col for the snapshot rows"""
+        a = self._arrays.get(col)
+        if a is None:
+            a = self.results[col].to_numpy()[self._pos]
+            self._arrays[col] = a
+        return a
+
+    def _block(self, col, block):
+        """Cell strings for a block of rows of column col"""
+        key = (col, block)
+        text = self._text.get(key)
+        if text is None:
+            i = block * self.blockSize
+            vals = self._array(col)[i : i + self.blockSize].tolist()
+            text = [cell_text(x) for x in vals]
+            self._text[key] = text
+            if len(self._text) > self.cacheBlocks:
+                self._text.popitem(last=False)
+        else:
+            self._text.move_to_end(key)
+        return text
+
+    def _forget(self, cols=None, fromRow=0):
+        """Drop cached arrays and strings of cols from row fromRow down"""
+        cols = set(self._cols if cols is None else cols)
+        first = fromRow // self.blockSize
+        for col in cols:
+            self._arrays.pop(col, None)
+        for key in [k for k in self._text if k[0] in cols and k[1] >= first]:
+            del self._text[key]
 
     def rowCount(self, parent=QtCore.QModelIndex()):
         """
-        Return the number of rows in a column
+        Return the number of rows given to the view so far
         """
-        return self.results.count_rows(filtered=True)
+        if parent.isValid():
+            return 0
+        return self._loaded
 
     def columnCount(self, parent=QtCore.QModelIndex()):
         """
         Returns the number of columns in a table
         """
-        return self.results.count_cols()
+        if parent.isValid():
+            return 0
+        return len(self._cols)
+
+    def canFetchMore(self, parent=QtCore.QModelIndex()):
+        """
+        True if there are filtered rows not given to the view yet
+        """
+        if parent.isValid():
+            return False
+        return self._loaded < len(self._rows)
+
+    def fetchMore(self, parent=QtCore.QModelIndex()):
+        """
+        Give the view the next fetchSize rows
+        """
+        if parent.isValid():
+            return
+        n = min(len(self._rows) - self._loaded, self.fetchSize)
+        if n <= 0:
+            return
+        self.beginInsertRows(QtCore.QModelIndex(), self._loaded, self._loaded + n - 1)
+        self._loaded += n
+        self.endInsertRows()
 
     def flags(self, index):
         """
@@ -59,46 +179,97 @@ class dataModel(QtCore.QAbstractTableModel):
         Return the data to display in a cell.  Should return a json
         string dump of the value.
         """
-        row = self.results.get_indexes(filtered=True)[index.row()]
-        col = self.results.columns[index.column()]
-        if role == QtCore.Qt.DisplayRole:
-            try:
-                return json.dumps(self.results.loc[row, col])
-            except TypeError as e:
-                try:
-                    x = self.results.loc[row, col]
-                    if isinstance(x, np.bool_):
-                        return json.dumps(bool(x))
-                    else:
-                        return "error {}".format(str(e))
-                except:
-                    return "error {}".format(str(e))
-            except Exception as e:
-                return "error {}".format(str(e))
-        elif role == QtCore.Qt.EditRole:
-            return json.dumps(self.results.loc[row, col])
-        else:
+        if role != QtCore.Qt.DisplayRole and role != QtCore.Qt.EditRole:
             return None
+        row = index.row()
+        col = self._cols[index.column()]
+        return self._block(col, row // self.blockSize)[row % self.blockSize]
 
     def setData(self, index, value, role=QtCore.Qt.EditRole):
         """
         Called to set the value of a cell.  This will edit the result
         data
         """
+        if role != QtCore.Qt.EditRole:
+            return False
         row = index.row()
-        col = self.results.columns[index.column()]
-        if role == QtCore.Qt.EditRole:
-            self.results.loc[row, col] = json.loads(value)
-            return True
+        col = self._cols[index.column()]
+        self.results.set_row(self._rows[row], {col: json.loads(value)})
+        dtype = _shown_dtype(self.results[col].dtype)
+        if dtype != self._dtypes[col]:
+            # the column dtype changed so all its values may show differently
+            self._dtypes[col] = dtype
+            self._forget([col])
+            self._columnChanged(index.column())
+        else:
+            self._forget([col], fromRow=row)
+            self.dataChanged.emit(index, index)
+        return True
 
     def headerData(self, i, orientation, role=QtCore.Qt.DisplayRole):
         """
         Return the column headings for the horizontal header and
         index numbers for the vertical header.
         """
-        if orientation == QtCore.Qt.Horizontal and role == QtCore.Qt.DisplayRole:
-            return self.results.columns[i]
-        elif orientation == QtCore.Qt.Vertical and role == QtCore.Qt.DisplayRole:
-            return list(self.results.index)[i]
+        if role != QtCore.Qt.DisplayRole:
+            return None
+        if orientation == QtCore.Qt.Horizontal:
+            return self._cols[i]
+        elif orientation == QtCore.Qt.Vertical:
+            return int(self._rows[i])
         else:
             return None
+
+    def update(self):
+        """
+        Catch up with changes to the results.  If rows or columns were only
+        added after the ones shown, the view is told about the new rows and
+        columns and rows already shown are left alone, else the model is
+        reset.  Returns True if the model was reset.
+        """
+        rows = list(self.results.get_indexes(filtered=True))
+        cols = list(self.results.columns)
+        n, m = len(self._rows), len(self._cols)
+        if rows[:n] != self._rows or cols[:m] != self._cols:
+            self.beginResetModel()
+            self._snapshot()
+            self._loaded = min(len(self._rows), self.fetchSize)
+            self.endResetModel()
+            return True
+        dtypes = self._shown_dtypes()
+        for i, col in enumerate(self._cols):
+            if dtypes[col] != self._dtypes[col]:
+                # e.g. an integer column that got a missing value is now float
+                self._forget([col])
+                self._columnChanged(i)
+        self._dtypes = dtypes
+        root = QtCore.QModelIndex()
+        if len(cols) > m:
+            self.beginInsertColumns(root, m, len(cols) - 1)
+            self._cols = cols
+            self.endInsertColumns()
+        if len(rows) > n:
+            # the last partly filled block of each column is made again
+            self._forget(fromRow=n)
+            self._rows = rows
+            self._pos = self.results.index.get_indexer(rows)
+            if self._loaded == n:
+                # the view had every row so give it the new ones too
+                k = min(len(rows) - n, self.fetchSize)
+                self.beginInsertRows(root, n, n + k - 1)
+                self._loaded += k
+                self.endInsertRows()
+        return False
+
+    def _columnChanged(self, j):
+        """Tell the view the rows it has of column j changed"""
+        if self._loaded:
+            self.dataChanged.emit(self.index(0, j), self.index(self._loaded - 1, j))
+
+    def refresh(self):
+        """Values of the rows shown may have changed, read them again"""
+        self._forget()
+        if self._loaded and self._cols:
+            self.dataChanged.emit(
+                self.index(0, 0), self.index(self._loaded - 1, len(self._cols) - 1)
+            )
@@ -564,6 +564,9 @@ class odoeSimSetup(_odoeSimSetup, _SimSetupUI):
             self.generateStatusText.setText("")
             return
         selectedInputData = selectedRunData.getInputData()
+        if selectedRunData.getNumSamples() != runData.getNumSamples():
+            # full factorial designs round the number of samples
+            runData.setNumSamples(selectedRunData.getNumSamples())
 
         # Add fixed inputs back in
         fullInputData = [0] * runData.getNumSamples()
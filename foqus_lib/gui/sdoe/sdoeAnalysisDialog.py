@@ -649,6 +649,8 @@ class sdoeAnalysisDialog(_sdoeAnalysisDialog, _sdoeAnalysisDialogUI):
             f.write("design_size = %d\n" % self.designSize_spin.value())
         elif self.type == "IRSF":
             f.write("design_size = %d\n" % self.designSizeIRSF_spin.value())
+            # recorded so the run can be repeated from the saved config
+            f.write("rand_seed = %d\n" % np.random.SeedSequence().generate_state(1)[0])
 
         if test:
             if self.type == "USF":
@@ -12,6 +12,7 @@
 # respectively. This file is also available online at the URL
 # "https://github.com/CCSI-Toolset/FOQUS".
 #################################################################################
+import contextlib
 import copy
 import logging
 import math
@@ -47,6 +48,7 @@ from foqus_lib.framework.sdoe import df_utils, odoeu, sdoe
 from foqus_lib.framework.uq.Common import Common
 from foqus_lib.framework.uq.DataProcessor import DataProcessor
 from foqus_lib.framework.uq.LocalExecutionModule import LocalExecutionModule
+from foqus_lib.framework.uq.PsuadeSession import PsuadeSession
 from foqus_lib.framework.uq.RSAnalyzer import RSAnalyzer
 from foqus_lib.framework.uq.RSValidation import RSValidation
 from foqus_lib.framework.uq.SampleData import SampleData
@@ -2359,8 +2361,13 @@ class sdoeSetupFrame(_sdoeSetupFrame, _sdoeSetupFrameUI):
 
         genRSCode = True
 
-        for row in y:
-            self.rsValidate(y[row], rs[row], rsOptions[row], genRSCode)
+        # outputs fitted by psuade share one psuade worker
+        session = contextlib.nullcontext()
+        if sum(not RSAnalyzer.useNative(rs[row]) for row in y) > 1:
+            session = PsuadeSession.ensure()
+        with session:
+            for row in y:
+                self.rsValidate(y[row], rs[row], rsOptions[row], genRSCode)
 
         msgBox = QMessageBox()
         msgBox.setWindowTitle("Response Surface Validation Plots")
@@ -0,0 +1,130 @@
+#################################################################################
+# FOQUS Copyright (c) 2012 - 2026, by the software owners: Oak Ridge Institute
+# for Science and Education (ORISE), TRIAD National Security, LLC., Lawrence
+# Livermore National Security, LLC., The Regents of the University of
+# California, through Lawrence Berkeley National Laboratory, Battelle Memorial
+# Institute, Pacific Northwest Division through Pacific Northwest National
+# Laboratory, Carnegie Mellon University, West Virginia University, Boston
+# University, the Trustees of Princeton University, The University of Texas at
+# Austin, URS Energy & Construction, Inc., et al.  All rights reserved.
+#
+# Please see the file LICENSE.md for full copyright and license information,
+# respectively. This file is also available online at the URL
+# "https://github.com/CCSI-Toolset/FOQUS".
+#################################################################################
+"""Time scrolling and adding rows in the flowsheet data browser table model
+
+Drives dataModel through QAbstractItemModel calls the way a QTableView
+does, without showing a view: each repaint asks for the visible window of
+cells, and scrolling down fetches rows as needed.  Compared to a model
+that looks every cell up in the results data frame, as dataModel did
+before it cached column arrays and cell strings.
+
+    python -m foqus_lib.gui.tests.data_model_benchmark
+"""
+
+import json
+import sys
+import time
+
+import numpy as np
+from PyQt5 import QtCore
+
+from foqus_lib.framework.sampleResults import results
+from foqus_lib.gui.flowsheet.dataModel import dataModel
+
+
+class lookupModel(dataModel):
+    """Looks up and formats every cell when it is drawn"""
+
+    def rowCount(self, parent=QtCore.QModelIndex()):
+        return self.results.count_rows(filtered=True)
+
+    def canFetchMore(self, parent=QtCore.QModelIndex()):
+        return False
+
+    def data(self, index=QtCore.QModelIndex(), role=QtCore.Qt.DisplayRole):
+        row = self.results.get_indexes(filtered=True)[index.row()]
+        col = self.results.columns[index.column()]
+        x = self.results.loc[row, col]
+        if isinstance(x, np.generic):
+            x = x.item()
+        return json.dumps(x)
+
+    def update(self):
+        self.beginResetModel()
+        self._snapshot()
+        self.endResetModel()
+        return True
+
+
+def make_results(rows, cols, seed=0):
+    rng = np.random.default_rng(seed)
+    columns = ["set", "result", "time"] + [
+        "output.n.y{0}".format(j) for j in range(cols)
+    ]
+    values = rng.random((rows, cols)).tolist()
+    sd = {"__columns": columns, "__indexes": list(range(rows))}
+    for i, row in enumerate(values):
+        sd[str(i)] = ["bench", "r{0}".format(i), None] + row
+    res = results.Results()
+    res.loadDict(sd)
+    return res
+
+
+def paint(model, top, left, height, width):
+    """Ask for the cells of a window of the table like a view repaint"""
+    for i in range(top, min(top + height, model.rowCount())):
+        model.headerData(i, QtCore.Qt.Vertical)
+        for j in range(left, min(left + width, model.columnCount())):
+            model.data(model.index(i, j), QtCore.Qt.DisplayRole)
+
+
+def scroll(model, steps, height=40, width=15, repaints=3):
+    """Scroll down through the rows, repainting at each position"""
+    total = model.results.count_rows(filtered=True)
+    cols = model.columnCount()
+    for s in range(steps):
+        top = (total - height) * s // max(steps - 1, 1)
+        left = (cols - width) * s // max(steps - 1, 1)
+        while model.rowCount() < top + height and model.canFetchMore():
+            model.fetchMore()
+        for r in range(repaints):
+            paint(model, top, left, height, width)
+
+
+def append(model, n, height=40, width=15):
+    """Add results one at a time, showing the last rows after each"""
+    res = model.results
+    cols = [c for c in res.columns if c.startswith("output.")]
+    for k in range(n):
+        row = res.index[-1] + 1
+        res.set_row(row, {"set": "bench", "result": "new{0}".format(k), cols[0]: 1.0})
+        res.update_filter_indexes()
+        model.update()
+        while model.canFetchMore():
+            model.fetchMore()
+        paint(model, model.rowCount() - height, 0, height, width)
+
+
+def timeit(f):
+    t0 = time.perf_counter()
+    f()
+    return time.perf_counter() - t0
+
+
+def main(rows=50000, cols=200, steps=200, appends=20):
+    res = make_results(rows, cols)
+    print("{0} rows x {1} columns".format(rows, cols))
+    for name, model in (
+        ("Cell lookup", lookupModel(res)),
+        ("Cached arrays", dataModel(res)),
+    ):
+        t = timeit(lambda: scroll(model, steps))
+        print("{0:<16} scroll {1:8.1f} ms/step".format(name, 1000 * t / steps))
+        t = timeit(lambda: append(model, appends))
+        print("{0:<16} append {1:8.1f} ms/row".format(name, 1000 * t / appends))
+
+
+if __name__ == "__main__":
+    main(*map(int, sys.argv[1:]))
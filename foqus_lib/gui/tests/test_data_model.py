@@ -0,0 +1,161 @@
+#################################################################################
+# FOQUS Copyright (c) 2012 - 2026, by the software owners: Oak Ridge Institute
+# for Science and Education (ORISE), TRIAD National Security, LLC., Lawrence
+# Livermore National Security, LLC., The Regents of the University of
+# California, through Lawrence Berkeley National Laboratory, Battelle Memorial
+# Institute, Pacific Northwest Division through Pacific Northwest National
+# Laboratory, Carnegie Mellon University, West Virginia University, Boston
+# University, the Trustees of Princeton University, The University of Texas at
+# Austin, URS Energy & Construction, Inc., et al.  All rights reserved.
+#
+# Please see the file LICENSE.md for full copyright and license information,
+# respectively. This file is also available online at the URL
+# "https://github.com/CCSI-Toolset/FOQUS".
+#################################################################################
+import json
+
+import numpy as np
+from PyQt5 import QtCore, QtTest
+
+from foqus_lib.framework.sampleResults import results
+from foqus_lib.gui.flowsheet.dataModel import dataModel
+
+
+def result_dict(x, y, node_err=0):
+    return {
+        "solTime": 0.5,
+        "input": {"n": {"x": x}},
+        "output": {"n": {"y": y}},
+        "graphError": 0,
+        "nodeError": {"n": node_err},
+        "nodeSettings": {"n": {"method": "fast"}},
+        "turbineMessages": {},
+    }
+
+
+def make_results(n=5):
+    res = results.Results()
+    for i in range(n):
+        res.add_result(result_dict(float(i), i / 2.0), set_name="s", result_name="r")
+    return res
+
+
+class signals:
+    """Records the change signals of a model"""
+
+    def __init__(self, model):
+        self.calls = []
+        model.rowsInserted.connect(lambda p, a, b: self.calls.append(("rows", a, b)))
+        model.columnsInserted.connect(lambda p, a, b: self.calls.append(("cols", a, b)))
+        model.dataChanged.connect(
+            lambda tl, br, roles=[]: self.calls.append(
+                ("data", tl.row(), tl.column(), br.row(), br.column())
+            )
+        )
+        model.modelReset.connect(lambda: self.calls.append(("reset",)))
+
+
+def cell(model, i, j):
+    return model.data(model.index(i, j))
+
+
+def test_cells_match_results():
+    res = make_results()
+    res.add_result(result_dict(np.nan, 1.0), set_name="t", result_name="r")
+    model = dataModel(res, blockSize=2)
+    QtTest.QAbstractItemModelTester(model)
+    assert model.rowCount() == 6
+    assert model.columnCount() == len(res.columns)
+    for i, row in enumerate(res.get_indexes(filtered=True)):
+        assert model.headerData(i, QtCore.Qt.Vertical) == row
+        for j, col in enumerate(res.columns):
+            x = res.loc[row, col]
+            if isinstance(x, np.generic):
+                x = x.item()
+            assert cell(model, i, j) == json.dumps(x)
+    assert model.headerData(0, QtCore.Qt.Horizontal) == "set"
+
+
+def test_fetch_more():
+    res = make_results()
+    model = dataModel(res, fetchSize=2)
+    rec = signals(model)
+    counts = [model.rowCount()]
+    while model.canFetchMore():
+        model.fetchMore()
+        counts.append(model.rowCount())
+    assert counts == [2, 4, 5]
+    assert rec.calls == [("rows", 2, 3), ("rows", 4, 4)]
+
+
+def test_append_rows_and_columns():
+    res = make_results()
+    model = dataModel(res, blockSize=2)
+    QtTest.QAbstractItemModelTester(model)
+    j = list(res.columns).index("output.n.y")
+    assert cell(model, 4, j) == "2.0"
+    rec = signals(model)
+    sd = result_dict(7.0, 8.0)
+    sd["output"]["n"]["z"] = 1.5
+    res.add_result(sd, set_name="s", result_name="r")
+    assert not model.update()
+    m = len(res.columns) - 1
+    assert rec.calls == [("cols", m, m), ("rows", 5, 5)]
+    assert cell(model, 5, j) == "8.0"
+    assert cell(model, 5, m) == "1.5"
+    assert cell(model, 0, m) == "NaN"
+    # a missing error code makes the error column float
+    k = list(res.columns).index("node_err.n")
+    assert cell(model, 0, k) == "0"
+    rec.calls.clear()
+    sd = result_dict(9.0, 9.0)
+    sd["nodeError"] = {}
+    res.add_result(sd, set_name="s", result_name="r")
+    assert not model.update()
+    assert rec.calls == [("data", 0, k, 5, k), ("rows", 6, 6)]
+    assert cell(model, 0, k) == "0.0"
+
+
+def test_append_past_fetched_rows():
+    res = make_results()
+    model = dataModel(res, fetchSize=2)
+    rec = signals(model)
+    res.add_result(result_dict(1.0, 1.0), set_name="s", result_name="r")
+    assert not model.update()
+    # rows are given to the view when it scrolls down to them
+    assert rec.calls == []
+    assert model.rowCount() == 2
+    while model.canFetchMore():
+        model.fetchMore()
+    assert model.rowCount() == 6
+
+
+def test_set_data():
+    res = make_results()
+    model = dataModel(res)
+    rec = signals(model)
+    j = list(res.columns).index("input.n.x")
+    assert model.setData(model.index(3, j), "12.5")
+    assert res.loc[3, "input.n.x"] == 12.5
+    assert cell(model, 3, j) == "12.5"
+    assert rec.calls == [("data", 3, j, 3, j)]
+
+
+def test_changed_rows_reset():
+    res = make_results()
+    model = dataModel(res)
+    rec = signals(model)
+    j = list(res.columns).index("input.n.x")
+    res.delete_rows([0], filtered=True)
+    assert model.update()
+    assert rec.calls == [("reset",)]
+    assert model.rowCount() == 4
+    assert cell(model, 0, j) == "1.0"
+    # values changed in place are read again by refresh
+    res.set_row(2, {"input.n.x": -1.0})
+    rec.calls.clear()
+    assert not model.update()
+    assert cell(model, 1, j) == "2.0"
+    model.refresh()
+    assert cell(model, 1, j) == "-1.0"
+    assert rec.calls == [("data", 0, 0, 3, model.columnCount() - 1)]
@@ -19,12 +19,18 @@ Joshua Boverhof, Lawrence Berkeley National Lab
 
 """
 
+import collections
+import concurrent.futures
+import copy
 import errno
 import json
 import logging
 import logging.config
 import os
+import queue
+import shutil
 import socket
+import tempfile
 import threading
 import time
 import traceback
@@ -52,6 +58,9 @@ WORKING_DIRECTORY = os.path.abspath(
 )
 
 CURRENT_JOB_DIR = None
+# Session setup reads and writes the settings and turbine configuration
+# files in the shared working directory, build one session at a time
+_SESSION_LOCK = threading.Lock()
 _log = logging.getLogger("foqus.foqus_lib.service.flowsheet")
 
 
@@ -112,22 +121,24 @@ def _get_user_config_location(*args, **kw):
 
 def getfilenames(jid):
     global CURRENT_JOB_DIR
-    CURRENT_JOB_DIR = os.path.join(WORKING_DIRECTORY, str(jid))
+    # jobs may run concurrently, build the paths from the local job_dir
+    job_dir = os.path.join(WORKING_DIRECTORY, str(jid))
+    CURRENT_JOB_DIR = job_dir
 
-    _log.info("Job Directory: %s", CURRENT_JOB_DIR)
+    _log.info("Job Directory: %s", job_dir)
     try:
-        os.makedirs(CURRENT_JOB_DIR)
+        os.makedirs(job_dir)
     except OSError as e:
         if e.errno != errno.EEXIST:
             raise
 
-    sfile = os.path.join(CURRENT_JOB_DIR, "session.foqus")
+    sfile = os.path.join(job_dir, "session.foqus")
     # result session file to keep on record
-    rfile = os.path.join(CURRENT_JOB_DIR, "results_session.foqus")
+    rfile = os.path.join(job_dir, "results_session.foqus")
     # Input values files
-    vfile = os.path.join(CURRENT_JOB_DIR, "input_values.json")
+    vfile = os.path.join(job_dir, "input_values.json")
     # Output values file
-    ofile = os.path.join(CURRENT_JOB_DIR, "output.json")
+    ofile = os.path.join(job_dir, "output.json")
     return sfile, rfile, vfile, ofile
 
 
@@ -543,6 +554,104 @@ class _KeepAliveTimer(threading.Thread):
                 i = 0
 
 
+class _MetricPublisher(threading.Thread):
+    """Publish CloudWatch metric data from a background thread, batching
+    the data points queued since the last flush into put_metric_data calls.
+    """
+
+    batch_size = 20
+
+    def __init__(self, cloudwatch, namespace="foqus-cloud-backend", freq=10):
+        threading.Thread.__init__(self)
+        self.stop = threading.Event()  # flag to stop thread
+        self.freq = freq
+        self.cloudwatch = cloudwatch
+        self.namespace = namespace
+        self.data = queue.Queue()
+        self.daemon = True
+
+    def put(self, datum):
+        self.data.put(datum)
+
+    def terminate(self):
+        """Stop the thread after publishing what is queued"""
+        self.stop.set()
+        if self.is_alive():
+            self.join()
+
+    def flush(self):
+        data = []
+        while True:
+            try:
+                data.append(self.data.get_nowait())
+            except queue.Empty:
+                break
+        for i in range(0, len(data), self.batch_size):
+            try:
+                self.cloudwatch.put_metric_data(
+                    Namespace=self.namespace, MetricData=data[i : i + self.batch_size]
+                )
+            except Exception as ex:
+                _log.error("put metric data failed: %s", repr(ex))
+
+    def run(self):
+        while not self.stop.wait(self.freq):
+            self.flush()
+        self.flush()
+
+
+class _VisibilityTimer(threading.Thread):
+    """Keep received SQS messages invisible to other consumers until they
+    are deleted, by extending their visibility timeout every freq seconds.
+    """
+
+    batch_size = 10  # SQS limit for change_message_visibility_batch
+
+    def __init__(self, sqs, queue_url, timeout, freq=None):
+        threading.Thread.__init__(self)
+        self.stop = threading.Event()  # flag to stop thread
+        self.sqs = sqs
+        self.queue_url = queue_url
+        self.timeout = timeout
+        self.freq = freq or max(timeout // 2, 1)
+        self.handles = set()
+        self.lock = threading.Lock()
+        self.daemon = True
+
+    def add(self, handle):
+        with self.lock:
+            self.handles.add(handle)
+
+    def discard(self, handle):
+        with self.lock:
+            self.handles.discard(handle)
+
+    def terminate(self):
+        self.stop.set()
+
+    def extend(self):
+        with self.lock:
+            handles = list(self.handles)
+        for i in range(0, len(handles), self.batch_size):
+            entries = [
+                dict(Id=str(j), ReceiptHandle=h, VisibilityTimeout=self.timeout)
+                for j, h in enumerate(handles[i : i + self.batch_size])
+            ]
+            try:
+                response = self.sqs.change_message_visibility_batch(
+                    QueueUrl=self.queue_url, Entries=entries
+                )
+            except Exception as ex:
+                _log.error("extend message visibility failed: %s", repr(ex))
+                continue
+            for failed in response.get("Failed", []):
+                _log.warning("extend message visibility failed: %s", str(failed))
+
+    def run(self):
+        while not self.stop.wait(self.freq):
+            self.extend()
+
+
 class TurbineLiteDB:
     """ """
 
@@ -738,20 +847,39 @@ class FlowsheetControl:
 
     _is_set_working_directory = False
 
-    def __init__(self):
+    def __init__(self, max_workers=None):
         """
+        max_workers -- number of jobs run at once, default from the
+            FOQUS_SERVICE_MAX_WORKERS environment variable or 1
         _dat -- Session
         _kat -- keepAliveTimer
+        _session_key -- (user, simulation, S3 ETag) of the session in _dat
+        _job_session_key -- (user, simulation, S3 ETag) of the popped job
+        _job_session_s3 -- (bucket, key) of the popped job's session file
+        _work_dir -- private directory of the session in _dat and its
+            staged user plugins, removed on close
         """
-        self._metric_count_of_queue_peeks = 0
+        if max_workers is None:
+            max_workers = os.environ.get("FOQUS_SERVICE_MAX_WORKERS", 1)
+        self._max_workers = max(1, int(max_workers))
+        self._metric_count_of_queue_peeks = dict()
         self._metric_count_of_job_finished_dict = dict()
+        self._metric_lock = threading.Lock()
+        self._metrics = None
+        self._visibility = None
         self._set_working_directory()
         socket.setdefaulttimeout(60)
         self._dat = None
         self._kat = None
-        self._stop = False
+        self._stop_event = threading.Event()
         self._receipt_handle = None
+        self._messages = collections.deque()
         self._simulation_name = None
+        self._session_key = None
+        self._job_session_key = None
+        self._job_session_s3 = None
+        self._work_dir = None
+        self._dynamodb_table = None
         self._queue_url = FOQUSAWSConfig.get_instance().get_job_queue_url()
         self._sqs = boto3.client(
             "sqs", region_name=FOQUSAWSConfig.get_instance().get_region()
@@ -774,62 +902,69 @@ class FlowsheetControl:
         cls._is_set_working_directory = True
 
     def stop(self):
-        self._stop = True
+        self._stop_event.set()
 
-    def increment_metric_job_finished(self, event):
-        if not event in self._metric_count_of_job_finished_dict:
-            self._metric_count_of_job_finished_dict[event] = 0
-        self._metric_count_of_job_finished_dict[event] += 1
+    def _put_metric(self, datum):
+        """Queue for the background publisher while running, else publish"""
+        if self._metrics is not None:
+            self._metrics.put(datum)
+            return
         self._cloudwatch.put_metric_data(
-            Namespace="foqus-cloud-backend",
-            MetricData=[
-                {
-                    "MetricName": "count_of_job_finish",
-                    "Dimensions": [
-                        {
-                            "Name": "user_name",
-                            "Value": FOQUSAWSConfig.get_instance().get_user(),
-                        },
-                        {
-                            "Name": "instance_id",
-                            "Value": FOQUSAWSConfig.get_instance().get_instance_id(),
-                        },
-                        {"Name": "event", "Value": event},
-                    ],
-                    "Value": self._metric_count_of_job_finished_dict[event],
-                    "Unit": "Count",
-                },
-            ],
+            Namespace="foqus-cloud-backend", MetricData=[datum]
         )
 
-    def increment_metric_queue_peeks(self, state, reset=False):
-        if reset:
-            self._metric_count_of_queue_peeks = dict()
-        if not state in self._metric_count_of_queue_peeks:
-            self._metric_count_of_queue_peeks[state] = 0
-        if not reset:
-            self._metric_count_of_queue_peeks[state] += 1
+    def increment_metric_job_finished(self, event):
+        with self._metric_lock:
+            if not event in self._metric_count_of_job_finished_dict:
+                self._metric_count_of_job_finished_dict[event] = 0
+            self._metric_count_of_job_finished_dict[event] += 1
+            count = self._metric_count_of_job_finished_dict[event]
+        self._put_metric(
+            {
+                "MetricName": "count_of_job_finish",
+                "Dimensions": [
+                    {
+                        "Name": "user_name",
+                        "Value": FOQUSAWSConfig.get_instance().get_user(),
+                    },
+                    {
+                        "Name": "instance_id",
+                        "Value": FOQUSAWSConfig.get_instance().get_instance_id(),
+                    },
+                    {"Name": "event", "Value": event},
+                ],
+                "Value": count,
+                "Unit": "Count",
+            }
+        )
 
-        self._cloudwatch.put_metric_data(
-            Namespace="foqus-cloud-backend",
-            MetricData=[
-                {
-                    "MetricName": "count_of_queue_peeks",
-                    "Dimensions": [
-                        {
-                            "Name": "user_name",
-                            "Value": FOQUSAWSConfig.get_instance().get_user(),
-                        },
-                        {
-                            "Name": "instance_id",
-                            "Value": FOQUSAWSConfig.get_instance().get_instance_id(),
-                        },
-                        {"Name": "state", "Value": state},
-                    ],
-                    "Value": self._metric_count_of_queue_peeks[state],
-                    "Unit": "Count",
-                },
-            ],
+    def increment_metric_queue_peeks(self, state, reset=False):
+        with self._metric_lock:
+            if reset:
+                self._metric_count_of_queue_peeks = dict()
+            if not state in self._metric_count_of_queue_peeks:
+                self._metric_count_of_queue_peeks[state] = 0
+            if not reset:
+                self._metric_count_of_queue_peeks[state] += 1
+            count = self._metric_count_of_queue_peeks[state]
+
+        self._put_metric(
+            {
+                "MetricName": "count_of_queue_peeks",
+                "Dimensions": [
+                    {
+                        "Name": "user_name",
+                        "Value": FOQUSAWSConfig.get_instance().get_user(),
+                    },
+                    {
+                        "Name": "instance_id",
+                        "Value": FOQUSAWSConfig.get_instance().get_instance_id(),
+                    },
+                    {"Name": "state", "Value": state},
+                ],
+                "Value": count,
+                "Unit": "Count",
+            }
         )
 
     def run(self):
@@ -842,7 +977,9 @@ class FlowsheetControl:
 
     def _run(self):
         """main loop for running foqus
-        Pop a job off FOQUS-JOB-QUEUE, call setup, then delete the job and call run.
+        Pop a job off FOQUS-JOB-QUEUE and hand it to an idle worker, which
+        calls setup, then deletes the job and calls run.  Up to _max_workers
+        jobs run at once, each in its own job directory and FOQUS session.
         """
         _log.debug("main loop flowsheet service")
         try:
@@ -859,155 +996,253 @@ class FlowsheetControl:
         db.add_message("Consumer Registered")
         self._kat = _KeepAliveTimer(db, freq=60)
         self._kat.start()
-        dat = None
-        while not self._stop:
-            ret = None
-            try:
-                ret = self.pop_job(db, VisibilityTimeout=VisibilityTimeout)
-            except FOQUSJobException as ex:
-                job_desc = ex.job_desc
-                _log.exception("verify foqus exception: %s", repr(ex))
-                msg = traceback.format_exc()
-                db.job_change_status(job_desc, "error", message=msg)
-                db.add_message(
-                    "job failed in verify: %r" % (ex), job_desc["Id"], exception=msg
-                )
-                self._delete_sqs_job()
-                self.increment_metric_job_finished(event="error.job.verify")
-                continue
-            except Exception as ex:
-                _log.exception("pop_job exception: %s", repr(ex))
-                raise
+        self._describe_table()
+        self._metrics = _MetricPublisher(self._cloudwatch)
+        self._metrics.start()
+        self._visibility = _VisibilityTimer(
+            self._sqs, self._queue_url, VisibilityTimeout
+        )
+        self._visibility.start()
+        workers = [self._new_worker() for i in range(self._max_workers)]
+        idle = list(workers)
+        running = dict()
+        executor = concurrent.futures.ThreadPoolExecutor(
+            max_workers=self._max_workers, thread_name_prefix="foqus-job"
+        )
+        try:
+            while not self._stop_event.is_set():
+                self._collect_jobs(running, idle)
+                if not idle:
+                    concurrent.futures.wait(
+                        running,
+                        timeout=10,
+                        return_when=concurrent.futures.FIRST_COMPLETED,
+                    )
+                    continue
+                ret = None
+                try:
+                    ret = self.pop_job(
+                        db,
+                        VisibilityTimeout=VisibilityTimeout,
+                        MaxNumberOfMessages=len(idle),
+                    )
+                except FOQUSJobException as ex:
+                    job_desc = ex.job_desc
+                    _log.exception("verify foqus exception: %s", repr(ex))
+                    msg = traceback.format_exc()
+                    db.job_change_status(job_desc, "error", message=msg)
+                    db.add_message(
+                        "job failed in verify: %r" % (ex),
+                        job_desc["Id"],
+                        exception=msg,
+                    )
+                    self._delete_sqs_job()
+                    self.increment_metric_job_finished(event="error.job.verify")
+                    continue
+                except Exception as ex:
+                    _log.exception("pop_job exception: %s", repr(ex))
+                    raise
 
-            if not ret:
-                continue
+                if not ret:
+                    continue
 
-            assert type(ret) is tuple and len(ret) == 2
-            _log.debug("pop_job return:  %s", str(ret))
-            user_name, job_desc = ret
-            job_id = job_desc["Id"]
-            session_id = job_desc["sessionid"]
-            # if msg_attr_session_id != session_id:
-            #     _log.error("run: session IDs mismatch MessageAttributes(%s) and Message(%s)",
-            #         msg_attr_session_id, session_id)
-            #     db.job_change_status(job_desc, "error", message=msg)
-            #     db.add_message(
-            #         "run: job.submit session IDs mismatch MessageAttributes(%s) and Message(%s)" %(
-            #         msg_attr_session_id, session_id)
-            #     )
-            #     self._delete_sqs_job()
-            #     self.increment_metric_job_finished(event="error.session.mismatch")
-            #     continue
-            # session_id = uuid.UUID(sessionid)
-
-            """
-            TODO: check dynamodb table if job has been stopped or killed
-            cannot stop a running job.  If entry is missing job is ignored.
-            """
-            try:
-                table = self._dynamodb.describe_table(
-                    TableName=self._dynamodb_table_name
-                )
-            except botocore.exceptions.ClientError as ex:
-                _log.exception(
-                    "UserData Configuration Error No DynamoDB Table %s"
-                    % self._dynamodb_table_name
-                )
-                raise
+                assert type(ret) is tuple and len(ret) == 2
+                _log.debug("pop_job return:  %s", str(ret))
+                user_name, job_desc = ret
+                worker = self._checkout_worker(idle, self._job_session_key)
+                worker._receipt_handle = self._receipt_handle
+                worker._job_session_key = self._job_session_key
+                worker._job_session_s3 = self._job_session_s3
+                future = executor.submit(worker._process_job, db, user_name, job_desc)
+                running[future] = worker
+        except Exception:
+            # let the other running flowsheets terminate before exiting
+            self._stop_event.set()
+            raise
+        finally:
+            executor.shutdown(wait=True)
+            self._release_messages()
+            self._visibility.terminate()
+            self._metrics.terminate()
+            self._visibility = None
+            self._metrics = None
+            if self._kat is not None:
+                self._kat.terminate()
+            for worker in workers:
+                worker.close()
 
-            response = self._dynamodb.get_item(
-                TableName=self._dynamodb_table_name,
-                Key={"Id": {"S": str(job_id)}, "Type": {"S": "Job"}},
-            )
+        _log.debug("STOP CALLED")
+        self.close()
 
-            item = response.get("Item")
-            if not item:
-                msg = "Job %s expired:  Not in DynamoDB table %s" % (
-                    job_id,
-                    self._dynamodb_table_name,
-                )
-                _log.info(msg)
-                self._delete_sqs_job()
-                db.job_change_status(job_desc, "expired", message=msg)
-                db.add_message("Job has Expired", jobid=str(job_id))
-                self.increment_metric_job_finished(event="expired.job")
-                continue
+    def _new_worker(self):
+        """Copy of this controller for running jobs on a pool thread.  It
+        shares the AWS clients, metrics, message visibility and stop flag,
+        and keeps its own session and job state.
+        """
+        worker = copy.copy(self)
+        worker._dat = None
+        worker._kat = None
+        worker._simulation_name = None
+        worker._session_key = None
+        worker._job_session_key = None
+        worker._job_session_s3 = None
+        worker._work_dir = None
+        worker._receipt_handle = None
+        worker._messages = None
+        return worker
+
+    @staticmethod
+    def _checkout_worker(idle, session_key):
+        """Take an idle worker, preferring one with session_key loaded, then
+        one without a session, so warm sessions are not thrown away.
+        """
+        for match in (
+            lambda w: session_key is not None and w._session_key == session_key,
+            lambda w: w._dat is None,
+            lambda w: True,
+        ):
+            for worker in idle:
+                if match(worker):
+                    idle.remove(worker)
+                    return worker
+
+    @staticmethod
+    def _collect_jobs(running, idle):
+        """Return workers of finished jobs to idle, raise fatal job errors"""
+        for future in [f for f in running if f.done()]:
+            idle.append(running.pop(future))
+            future.result()
+
+    def _process_job(self, db, user_name, job_desc):
+        """Check job state in DynamoDB, setup, delete from queue and run"""
+        try:
+            self._run_job(db, user_name, job_desc)
+        finally:
+            if self._visibility is not None:
+                self._visibility.discard(self._receipt_handle)
+
+    def _run_job(self, db, user_name, job_desc):
+        job_id = job_desc["Id"]
+        session_id = job_desc["sessionid"]
+        # if msg_attr_session_id != session_id:
+        #     _log.error("run: session IDs mismatch MessageAttributes(%s) and Message(%s)",
+        #         msg_attr_session_id, session_id)
+        #     db.job_change_status(job_desc, "error", message=msg)
+        #     db.add_message(
+        #         "run: job.submit session IDs mismatch MessageAttributes(%s) and Message(%s)" %(
+        #         msg_attr_session_id, session_id)
+        #     )
+        #     self._delete_sqs_job()
+        #     self.increment_metric_job_finished(event="error.session.mismatch")
+        #     continue
+        # session_id = uuid.UUID(sessionid)
 
-            """ Job is Finished it is in state (terminate,stop,success,error)
-            """
-            if item.get("Finished", None):
-                _log.info("Job %s will be dequeued and ignored", str(job_id))
-                self._delete_sqs_job()
-                db.add_message("Job State %s" % item["Finished"], jobid=str(job_id))
-                self.increment_metric_job_finished(event="ignore.job.finished")
-                continue
-            try:
-                dat = self.setup_foqus(db, user_name, job_desc)
-            except NotImplementedError as ex:
-                _log.exception("setup foqus NotImplementedError")
-                msg = traceback.format_exc()
-                db.job_change_status(job_desc, "error", message=msg)
-                db.add_message(
-                    "job failed in setup NotImplementedError",
-                    job_desc["Id"],
-                    exception=msg,
-                )
-                self._delete_sqs_job()
-                raise
-            except foqusException as ex:
-                # TODO:
-                _log.exception("setup foqus exception: job fails, continue running")
-                msg = traceback.format_exc()
-                db.job_change_status(job_desc, "error", message=msg)
-                db.add_message(
-                    "job failed in setup: %r" % (ex), job_desc["Id"], exception=msg
-                )
-                self.increment_metric_job_finished(event="error.job.setup")
-                self._delete_sqs_job()
-                continue
-            except Exception as ex:
-                # TODO:
-                _log.exception("setup foqus exception:  fatal error")
-                msg = traceback.format_exc()
-                db.job_change_status(job_desc, "error", message=msg)
-                db.add_message(
-                    "job failed in setup: %r" % (ex), job_desc["Id"], exception=msg
-                )
-                self.increment_metric_job_finished(event="error.job.setup")
-                self._delete_sqs_job()
-                raise
+        """
+        TODO: check dynamodb table if job has been stopped or killed
+        cannot stop a running job.  If entry is missing job is ignored.
+        """
+        self._describe_table()
 
-            _log.debug("BEFORE run_foqus")
+        response = self._dynamodb.get_item(
+            TableName=self._dynamodb_table_name,
+            Key={"Id": {"S": str(job_id)}, "Type": {"S": "Job"}},
+        )
+
+        item = response.get("Item")
+        if not item:
+            msg = "Job %s expired:  Not in DynamoDB table %s" % (
+                job_id,
+                self._dynamodb_table_name,
+            )
+            _log.info(msg)
             self._delete_sqs_job()
-            try:
-                self.run_foqus(db, job_desc)
-            except foqusException as ex:
-                _log.exception("run_foqus foqusException")
-                self.increment_metric_job_finished(event="error.job.run")
-                msg = traceback.format_exc()
-                db.job_change_status(job_desc, "error", message=msg)
-                db.add_message(
-                    "job failed in setup: %r" % (ex), job_desc["Id"], exception=msg
-                )
-                self.close()
-                raise
-            except Exception as ex:
-                _log.exception("run_foqus Exception")
-                self.increment_metric_job_finished(event="error.job.run")
-                msg = traceback.format_exc()
-                db.job_change_status(job_desc, "error", message=msg)
-                db.add_message(
-                    "job failed in setup: %r" % (ex), job_desc["Id"], exception=msg
-                )
-                self.close()
-                raise
+            db.job_change_status(job_desc, "expired", message=msg)
+            db.add_message("Job has Expired", jobid=str(job_id))
+            self.increment_metric_job_finished(event="expired.job")
+            return
 
-        _log.debug("STOP CALLED")
-        self.close()
+        """ Job is Finished it is in state (terminate,stop,success,error)
+        """
+        if item.get("Finished", None):
+            _log.info("Job %s will be dequeued and ignored", str(job_id))
+            self._delete_sqs_job()
+            db.add_message("Job State %s" % item["Finished"], jobid=str(job_id))
+            self.increment_metric_job_finished(event="ignore.job.finished")
+            return
+        try:
+            dat = self.setup_foqus(db, user_name, job_desc)
+        except NotImplementedError as ex:
+            _log.exception("setup foqus NotImplementedError")
+            msg = traceback.format_exc()
+            db.job_change_status(job_desc, "error", message=msg)
+            db.add_message(
+                "job failed in setup NotImplementedError",
+                job_desc["Id"],
+                exception=msg,
+            )
+            self._delete_sqs_job()
+            raise
+        except foqusException as ex:
+            # TODO:
+            _log.exception("setup foqus exception: job fails, continue running")
+            msg = traceback.format_exc()
+            db.job_change_status(job_desc, "error", message=msg)
+            db.add_message(
+                "job failed in setup: %r" % (ex), job_desc["Id"], exception=msg
+            )
+            self.increment_metric_job_finished(event="error.job.setup")
+            self._delete_sqs_job()
+            return
+        except Exception as ex:
+            # TODO:
+            _log.exception("setup foqus exception:  fatal error")
+            msg = traceback.format_exc()
+            db.job_change_status(job_desc, "error", message=msg)
+            db.add_message(
+                "job failed in setup: %r" % (ex), job_desc["Id"], exception=msg
+            )
+            self.increment_metric_job_finished(event="error.job.setup")
+            self._delete_sqs_job()
+            raise
+
+        _log.debug("BEFORE run_foqus")
+        self._delete_sqs_job()
+        try:
+            self.run_foqus(db, job_desc)
+        except foqusException as ex:
+            _log.exception("run_foqus foqusException")
+            self.increment_metric_job_finished(event="error.job.run")
+            msg = traceback.format_exc()
+            db.job_change_status(job_desc, "error", message=msg)
+            db.add_message(
+                "job failed in setup: %r" % (ex), job_desc["Id"], exception=msg
+            )
+            self.close()
+            raise
+        except Exception as ex:
+            _log.exception("run_foqus Exception")
+            self.increment_metric_job_finished(event="error.job.run")
+            msg = traceback.format_exc()
+            db.job_change_status(job_desc, "error", message=msg)
+            db.add_message(
+                "job failed in setup: %r" % (ex), job_desc["Id"], exception=msg
+            )
+            self.close()
+            raise
 
     def close(self):
+        try:
+            self._close_session()
+        finally:
+            work_dir, self._work_dir = self._work_dir, None
+            if work_dir is not None:
+                _log.debug("close: remove %s", work_dir)
+                shutil.rmtree(work_dir, ignore_errors=True)
+
+    def _close_session(self):
         dat = self._dat
         kat = self._kat
+        self._session_key = None
         if not dat:
             _log.debug("close: session dat is None")
             return
@@ -1024,13 +1259,54 @@ class FlowsheetControl:
             _log.exception("reset close turbineLite")
             raise
 
+    def _session_cache_hit(self, session_key, reset=False):
+        """True when session_key names the session already loaded in _dat,
+        so the S3 download, session load and node staging can be skipped.
+        """
+        return (
+            reset is False
+            and session_key is not None
+            and self._dat is not None
+            and session_key == self._session_key
+        )
+
+    def _describe_table(self):
+        """DynamoDB table metadata, fetched once"""
+        if self._dynamodb_table is None:
+            try:
+                self._dynamodb_table = self._dynamodb.describe_table(
+                    TableName=self._dynamodb_table_name
+                )
+            except botocore.exceptions.ClientError as ex:
+                _log.exception(
+                    "UserData Configuration Error No DynamoDB Table %s"
+                    % self._dynamodb_table_name
+                )
+                raise
+        return self._dynamodb_table
+
     def _delete_sqs_job(self):
         """Delete the job after setup completes or there is an error."""
         _log.debug("DELETE received message from queue: %s", self._receipt_handle)
+        if self._visibility is not None:
+            self._visibility.discard(self._receipt_handle)
         self._sqs.delete_message(
             QueueUrl=self._queue_url, ReceiptHandle=self._receipt_handle
         )
 
+    def _release_messages(self):
+        """Make received messages not yet handed to a worker visible again"""
+        while self._messages:
+            message = self._messages.popleft()
+            try:
+                self._sqs.change_message_visibility(
+                    QueueUrl=self._queue_url,
+                    ReceiptHandle=message["ReceiptHandle"],
+                    VisibilityTimeout=0,
+                )
+            except Exception as ex:
+                _log.error("release message failed: %s", repr(ex))
+
     def _check_job_terminate(self, job_id):
         response = self._dynamodb.get_item(
             TableName=self._dynamodb_table_name,
@@ -1053,8 +1329,11 @@ class FlowsheetControl:
             return state == "terminate"
         return False
 
-    def pop_job(self, db, VisibilityTimeout=300):
-        """Pop job from AWS SQS, Download FOQUS Flowsheet from AWS S3
+    def pop_job(self, db, VisibilityTimeout=300, MaxNumberOfMessages=1):
+        """Pop job from AWS SQS, locate FOQUS Flowsheet in AWS S3.  Messages
+        are received up to MaxNumberOfMessages (at most 10) at a time and
+        handed out one per call.  The session file is downloaded by
+        setup_foqus unless it is already loaded.
 
         SQS Job Body Contain Job description, for example:
         [{"Initialize":false,
@@ -1064,27 +1343,35 @@ class FlowsheetControl:
         "Visible":false,
         "Id":"8a3033b4-6de2-409c-8552-904889929704"}]
         """
-        # Receive message from SQS queue
-        response = self._sqs.receive_message(
-            QueueUrl=self._queue_url,
-            AttributeNames=["SentTimestamp"],
-            MaxNumberOfMessages=1,
-            MessageAttributeNames=["All"],
-            VisibilityTimeout=VisibilityTimeout,
-            WaitTimeSeconds=10,
-        )
+        self._job_session_key = None
+        self._job_session_s3 = None
+        if not self._messages:
+            # Receive messages from SQS queue
+            response = self._sqs.receive_message(
+                QueueUrl=self._queue_url,
+                AttributeNames=["SentTimestamp"],
+                MaxNumberOfMessages=max(1, min(10, MaxNumberOfMessages)),
+                MessageAttributeNames=["All"],
+                VisibilityTimeout=VisibilityTimeout,
+                WaitTimeSeconds=10,
+            )
 
-        if not response.get("Messages", None):
-            _log.debug("Job Queue is Empty")
-            self.increment_metric_queue_peeks(state="empty")
-            return
+            if not response.get("Messages", None):
+                _log.debug("Job Queue is Empty")
+                self.increment_metric_queue_peeks(state="empty")
+                return
+
+            self._messages.extend(response["Messages"])
+            if self._visibility is not None:
+                for message in response["Messages"]:
+                    self._visibility.add(message["ReceiptHandle"])
 
         self.increment_metric_queue_peeks(state="start")
-        message = response["Messages"][0]
+        message = self._messages.popleft()
         self._receipt_handle = message["ReceiptHandle"]
         body = message["Body"]
         message_attr = message.get("MessageAttributes")
-        _log.info("RESPONSE: " + str(response))
+        _log.info("MESSAGE: " + str(message))
         _log.info("MessageAttributes: " + str(message_attr))
         if message_attr is None:
             _log.error("Reject: Job has no MessageAttributes")
@@ -1213,12 +1500,13 @@ class FlowsheetControl:
                 user_name,
             )
 
-        idx = foqus_keys.index(flowsheet_key)
-        _log.info("S3: Download Key %s", flowsheet_key)
-        s3.download_file(bucket_name, flowsheet_key, sfile)
+        etag = [i.get("ETag") for i in l["Contents"] if i["Key"] == flowsheet_key][0]
+        self._job_session_key = (user_name, simulation_name, etag)
+        self._job_session_s3 = (bucket_name, flowsheet_key)
 
         # WRITE CURRENT JOB TO FILE
-        with open(os.path.join(CURRENT_JOB_DIR, "current_foqus.json"), "w") as fd:
+        job_dir = os.path.dirname(sfile)
+        with open(os.path.join(job_dir, "current_foqus.json"), "w") as fd:
             json.dump(job_desc, fd)
 
         return user_name, job_desc
@@ -1243,11 +1531,24 @@ class FlowsheetControl:
 
         reset = job_desc.get("Reset", False)
         assert type(reset) is bool, "Bad type for reset %s" % type(reset)
+        session_key = self._job_session_key
+        if self._session_cache_hit(session_key, reset):
+            # Same session file as the last job, nodes are already staged
+            _log.debug("Warm Flowsheet: %s", str(session_key))
+            self._dat.loadFlowsheetValues(vfile)
+            return self._dat
+
+        if session_key is not None and session_key != self._session_key:
+            reset = True
+
         if self._dat != None:
             assert type(self._dat) is Session
         else:
             reset = True
 
+        if self._work_dir is None:
+            reset = True
+
         if self._simulation_name != simulation_name:
             reset = True
 
@@ -1255,9 +1556,23 @@ class FlowsheetControl:
         if reset == True:
             _log.debug("Reset Flowsheet")
             self.close()
-            self._dat = dat = Session(useCurrentWorkingDir=True)
-            _log.debug("New Session Created: next load")
-            dat.load(sfile, stopConsumers=True)
+            if self._job_session_s3 is not None:
+                bucket_name, flowsheet_key = self._job_session_s3
+                _log.info("S3: Download Key %s", flowsheet_key)
+                s3 = boto3.client(
+                    "s3", region_name=FOQUSAWSConfig.get_instance().get_region()
+                )
+                s3.download_file(bucket_name, flowsheet_key, sfile)
+            # concurrent workers share the process working directory, keep
+            # the session archive and user plugins in a directory per worker
+            self._work_dir = tempfile.mkdtemp(prefix="worker_", dir=WORKING_DIRECTORY)
+            _log.debug("Worker Directory: %s", self._work_dir)
+            wfile = os.path.join(self._work_dir, os.path.basename(sfile))
+            shutil.copyfile(sfile, wfile)
+            with _SESSION_LOCK:
+                self._dat = dat = Session(useCurrentWorkingDir=True)
+                _log.debug("New Session Created: next load")
+                dat.load(wfile, stopConsumers=True)
             _log.debug("Session load finished")
             self._simulation_name = simulation_name
         else:
@@ -1280,7 +1595,7 @@ class FlowsheetControl:
                 turb_app_nkey = i
                 count_turb_apps += 1
 
-        user_plugin_dir = os.path.join(WORKING_DIRECTORY, "user_plugins")
+        user_plugin_dir = os.path.join(self._work_dir, "user_plugins")
         for i in foqus_user_plugins:
             _setup_foqus_user_plugin(
                 dat, i, user_name=user_name, user_plugin_dir=user_plugin_dir
@@ -1322,7 +1637,9 @@ class FlowsheetControl:
                 db.job_change_status(
                     job_desc, "error", message="Error in job setup: %s" % ex
                 )
+                session_key = None
 
+        self._session_key = session_key
         return dat
 
     def run_foqus(self, db, job_desc):
@@ -1346,13 +1663,13 @@ class FlowsheetControl:
         while gt.is_alive():
             gt.join(10)
             status = db.consumer_status()
-            if status == "terminate" or self._stop or self._check_job_terminate(jid):
+            stop = self._stop_event.is_set()
+            if status == "terminate" or stop or self._check_job_terminate(jid):
                 terminate = True
                 db.job_change_status(
                     job_desc,
                     "error",
-                    message="terminate flowsheet: status=%s stop=%s"
-                    % (status, self._stop),
+                    message="terminate flowsheet: status=%s stop=%s" % (status, stop),
                 )
                 break
 
@@ -1393,7 +1710,7 @@ class FlowsheetControl:
             dat.flowsheet.errorStat = 19
 
         dat.saveFlowsheetValues(ofile)
-        db.job_save_output(job_desc, CURRENT_JOB_DIR)
+        db.job_save_output(job_desc, os.path.dirname(ofile))
         dat.save(
             filename=rfile,
             updateCurrentFile=False,
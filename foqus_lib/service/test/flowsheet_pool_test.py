@@ -0,0 +1,120 @@
+#################################################################################
+# FOQUS Copyright (c) 2012 - 2026, by the software owners: Oak Ridge Institute
+# for Science and Education (ORISE), TRIAD National Security, LLC., Lawrence
+# Livermore National Security, LLC., The Regents of the University of
+# California, through Lawrence Berkeley National Laboratory, Battelle Memorial
+# Institute, Pacific Northwest Division through Pacific Northwest National
+# Laboratory, Carnegie Mellon University, West Virginia University, Boston
+# University, the Trustees of Princeton University, The University of Texas at
+# Austin, URS Energy & Construction, Inc., et al.  All rights reserved.
+#
+# Please see the file LICENSE.md for full copyright and license information,
+# respectively. This file is also available online at the URL
+# "https://github.com/CCSI-Toolset/FOQUS".
+#################################################################################
+"""flowsheet_pool_test.py
+
+* Concurrent jobs, batched receive and background metrics of the cloud
+  flowsheet service, against moto S3/SQS/DynamoDB
+"""
+
+import threading
+import time
+
+import boto3
+import pytest
+
+try:
+    from unittest.mock import MagicMock, patch
+except ImportError:
+    from mock import MagicMock, patch
+
+from .. import flowsheet
+from .session_cache_test import REGION, _submit, _upload, aws, session_file
+
+
+def _create_job_table(job_ids):
+    dynamodb = boto3.client("dynamodb", region_name=REGION)
+    dynamodb.create_table(
+        TableName="FOQUS_Table",
+        KeySchema=[
+            dict(AttributeName="Id", KeyType="HASH"),
+            dict(AttributeName="Type", KeyType="RANGE"),
+        ],
+        AttributeDefinitions=[
+            dict(AttributeName="Id", AttributeType="S"),
+            dict(AttributeName="Type", AttributeType="S"),
+        ],
+        BillingMode="PAY_PER_REQUEST",
+    )
+    for job_id in job_ids:
+        dynamodb.put_item(
+            TableName="FOQUS_Table", Item={"Id": {"S": job_id}, "Type": {"S": "Job"}}
+        )
+
+
+def test_jobs_run_concurrently(aws, session_file):
+    s3, sqs, queue_url = aws
+    _upload(s3, session_file)
+    inputs = {_submit(sqs, queue_url, x1): x1 for x1 in (0.1, 0.2, 0.3, 0.4)}
+    _create_job_table(inputs)
+
+    lock = threading.Lock()
+    active = set()
+    finished = dict()
+    peak = [0]
+
+    def run_foqus(self, db, job_desc):
+        with lock:
+            active.add(job_desc["Id"])
+            peak[0] = max(peak[0], len(active))
+        time.sleep(0.5)
+        with lock:
+            active.discard(job_desc["Id"])
+            finished[job_desc["Id"]] = self._dat.flowsheet.input["calc"]["x1"].value
+            if len(finished) == len(inputs):
+                fc.stop()
+
+    load = flowsheet.Session.load
+    with patch.object(flowsheet, "TurbineLiteDB", MagicMock), patch.object(
+        flowsheet.FlowsheetControl, "run_foqus", run_foqus
+    ), patch.object(
+        flowsheet.Session, "load", autospec=True, side_effect=load
+    ) as mock_load:
+        fc = flowsheet.FlowsheetControl(max_workers=2)
+        fc.run()
+
+    assert finished == inputs
+    assert peak[0] == 2
+    # one session load per worker, the other jobs reuse the warm session
+    assert mock_load.call_count == 2
+    response = sqs.receive_message(QueueUrl=queue_url, MaxNumberOfMessages=10)
+    assert not response.get("Messages")
+
+
+def test_metric_publisher_batches():
+    cloudwatch = MagicMock()
+    publisher = flowsheet._MetricPublisher(cloudwatch, freq=60)
+    publisher.start()
+    for i in range(25):
+        publisher.put(dict(MetricName="m", Value=i, Unit="Count"))
+    publisher.terminate()
+    calls = cloudwatch.put_metric_data.call_args_list
+    assert [len(c.kwargs["MetricData"]) for c in calls] == [20, 5]
+
+
+def test_visibility_timer_extends(aws):
+    s3, sqs, queue_url = aws
+    sqs.send_message(QueueUrl=queue_url, MessageBody="{}")
+    response = sqs.receive_message(QueueUrl=queue_url, VisibilityTimeout=1)
+    handle = response["Messages"][0]["ReceiptHandle"]
+    timer = flowsheet._VisibilityTimer(sqs, queue_url, timeout=60)
+    timer.add(handle)
+    timer.extend()
+    time.sleep(1.5)
+    assert not sqs.receive_message(QueueUrl=queue_url).get("Messages")
+    timer.discard(handle)
+    sqs.change_message_visibility(
+        QueueUrl=queue_url, ReceiptHandle=handle, VisibilityTimeout=0
+    )
+    assert sqs.receive_message(QueueUrl=queue_url).get("Messages")
@@ -0,0 +1,196 @@
+#################################################################################
+# FOQUS Copyright (c) 2012 - 2026, by the software owners: Oak Ridge Institute
+# for Science and Education (ORISE), TRIAD National Security, LLC., Lawrence
+# Livermore National Security, LLC., The Regents of the University of
+# California, through Lawrence Berkeley National Laboratory, Battelle Memorial
+# Institute, Pacific Northwest Division through Pacific Northwest National
+# Laboratory, Carnegie Mellon University, West Virginia University, Boston
+# University, the Trustees of Princeton University, The University of Texas at
+# Austin, URS Energy & Construction, Inc., et al.  All rights reserved.
+#
+# Please see the file LICENSE.md for full copyright and license information,
+# respectively. This file is also available online at the URL
+# "https://github.com/CCSI-Toolset/FOQUS".
+#################################################################################
+"""session_cache_test.py
+
+* Warm session cache of the cloud flowsheet service, against moto S3/SQS
+"""
+
+import json
+import os
+import uuid
+
+import boto3
+import pytest
+
+try:
+    from unittest.mock import MagicMock, patch
+except ImportError:
+    from mock import MagicMock, patch
+
+moto = pytest.importorskip("moto")
+
+os.environ["FOQUS_SERVICE_WORKING_DIR"] = "/tmp/foqus_test"
+from .. import flowsheet
+
+# flowsheet_control_test replaces these on the class, keep the originals
+_POP_JOB = flowsheet.FlowsheetControl.pop_job
+_SETUP_FOQUS = flowsheet.FlowsheetControl.setup_foqus
+_DELETE_SQS_JOB = flowsheet.FlowsheetControl._delete_sqs_job
+
+REGION = "us-east-1"
+BUCKET = "foqussimulationtest"
+USER = "testuser"
+SIMULATION = "test"
+
+
+@pytest.fixture
+def aws():
+    env = dict(
+        AWS_ACCESS_KEY_ID="testing",
+        AWS_SECRET_ACCESS_KEY="testing",
+        AWS_DEFAULT_REGION=REGION,
+    )
+    with patch.dict(os.environ, env), moto.mock_aws():
+        s3 = boto3.client("s3", region_name=REGION)
+        s3.create_bucket(Bucket=BUCKET)
+        sqs = boto3.client("sqs", region_name=REGION)
+        queue_url = sqs.create_queue(QueueName="FOQUSJobSubmitQueue")["QueueUrl"]
+        config = flowsheet.FOQUSAWSConfig()
+        config.region = REGION
+        config.instance_id = "i-testing"
+        config._d = {
+            "FOQUS-Update-Topic-Arn": "arn:aws:sns:us-east-1:123456789012:update",
+            "FOQUS-Message-Topic-Arn": "arn:aws:sns:us-east-1:123456789012:message",
+            "FOQUS-Job-Queue-Url": queue_url,
+            "FOQUS-Simulation-Bucket-Name": BUCKET,
+            "FOQUS-DynamoDB-Table": "FOQUS_Table",
+            "FOQUS-User": USER,
+            "FOQUS-Session-Bucket-Name": "testbucket",
+        }
+        with patch.object(flowsheet.FOQUSAWSConfig, "_inst", config), patch.multiple(
+            flowsheet.FlowsheetControl,
+            pop_job=_POP_JOB,
+            setup_foqus=_SETUP_FOQUS,
+            _delete_sqs_job=_DELETE_SQS_JOB,
+        ):
+            yield s3, sqs, queue_url
+
+
+@pytest.fixture
+def session_file(foqus_examples_dir):
+    path = foqus_examples_dir / "tutorial_files/Flowsheets/Tutorial_1/Simple_flow.foqus"
+    with open(path) as fd:
+        return json.load(fd)
+
+
+def _upload(s3, sd):
+    s3.put_object(
+        Bucket=BUCKET,
+        Key="%s/%s/session.foqus" % (USER, SIMULATION),
+        Body=json.dumps(sd).encode("utf-8"),
+    )
+
+
+def _submit(sqs, queue_url, x1, reset=False):
+    job_id = str(uuid.uuid4())
+    sqs.send_message(
+        QueueUrl=queue_url,
+        MessageBody=json.dumps(
+            dict(
+                Simulation=SIMULATION,
+                Reset=reset,
+                Input={"calc": {"x1": x1, "x2": 1.0}},
+            )
+        ),
+        MessageAttributes=dict(
+            username=dict(DataType="String", StringValue=USER),
+            session=dict(DataType="String", StringValue=str(uuid.uuid4())),
+            job=dict(DataType="String", StringValue=job_id),
+        ),
+    )
+    return job_id
+
+
+def _next_job(fc, db):
+    user_name, job_desc = fc.pop_job(db, VisibilityTimeout=60)
+    dat = fc.setup_foqus(db, user_name, job_desc)
+    fc._delete_sqs_job()
+    return job_desc, dat
+
+
+def test_warm_session_skips_download_and_load(aws, session_file):
+    s3, sqs, queue_url = aws
+    db = MagicMock()
+    db.authorize_user_name.return_value = True
+    fc = flowsheet.FlowsheetControl()
+    _upload(s3, session_file)
+    for x1 in (0.5, 1.5):
+        _submit(sqs, queue_url, x1)
+
+    job1, dat1 = _next_job(fc, db)
+    sfile1 = flowsheet.getfilenames(job1["Id"])[0]
+    assert os.path.isfile(sfile1)
+
+    with patch.object(flowsheet.Session, "load") as load:
+        job2, dat2 = _next_job(fc, db)
+    load.assert_not_called()
+    assert dat2 is dat1
+    assert not os.path.exists(flowsheet.getfilenames(job2["Id"])[0])
+    assert dat2.flowsheet.input["calc"]["x1"].value == 1.5
+
+
+def test_changed_etag_or_reset_reloads(aws, session_file):
+    s3, sqs, queue_url = aws
+    db = MagicMock()
+    db.authorize_user_name.return_value = True
+    fc = flowsheet.FlowsheetControl()
+    _upload(s3, session_file)
+    _submit(sqs, queue_url, 0.5)
+    job1, dat1 = _next_job(fc, db)
+
+    # a new upload of the session changes the object ETag
+    session_file["flowsheet"]["input"]["calc"]["x2"]["max"] = 3.0
+    _upload(s3, session_file)
+    _submit(sqs, queue_url, 0.25)
+    job2, dat2 = _next_job(fc, db)
+    assert dat2 is not dat1
+    assert os.path.isfile(flowsheet.getfilenames(job2["Id"])[0])
+    assert dat2.flowsheet.input["calc"]["x2"].max == 3.0
+
+    _submit(sqs, queue_url, 0.75, reset=True)
+    job3, dat3 = _next_job(fc, db)
+    assert dat3 is not dat2
+    assert os.path.isfile(flowsheet.getfilenames(job3["Id"])[0])
+    assert dat3.flowsheet.input["calc"]["x1"].value == 0.75
+
+
+def test_workers_have_own_work_dir(aws, session_file):
+    s3, sqs, queue_url = aws
+    db = MagicMock()
+    db.authorize_user_name.return_value = True
+    fc = flowsheet.FlowsheetControl()
+    _upload(s3, session_file)
+    _submit(sqs, queue_url, 0.5)
+    _submit(sqs, queue_url, 1.5)
+
+    workers = [fc._new_worker(), fc._new_worker()]
+    for worker in workers:
+        user_name, job_desc = fc.pop_job(db, VisibilityTimeout=60)
+        worker._job_session_key = fc._job_session_key
+        worker._job_session_s3 = fc._job_session_s3
+        worker.setup_foqus(db, user_name, job_desc)
+        fc._delete_sqs_job()
+
+    work_dirs = [w._work_dir for w in workers]
+    assert work_dirs[0] != work_dirs[1]
+    for worker, work_dir in zip(workers, work_dirs):
+        assert os.path.isdir(work_dir)
+        assert os.path.dirname(worker._dat.currentFile) == work_dir
+        assert os.path.dirname(worker._dat.archiveFolder) == work_dir
+
+    for worker, work_dir in zip(workers, work_dirs):
+        worker.close()
+        assert worker._work_dir is None
+        assert not os.path.exists(work_dir)
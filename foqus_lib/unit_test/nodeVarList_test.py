@@ -14,9 +14,14 @@
 #################################################################################
 import unittest
 
+import numpy as np
+
 from foqus_lib.framework.graph.nodeVars import (
+    NodeVarEx,
     NodeVarList,
+    NodeVarListEx,
     NodeVars,
+    ivarScales,
 )
 
 
@@ -78,3 +83,117 @@ class testNodeVarListSteady(unittest.TestCase):
         v = l.unflatten(names, values, unScale=True)
         self.assertAlmostEqual(v["N1"]["V1"], 1.0, places=5)
         self.assertAlmostEqual(v["N2"]["V1"], 2.0, places=5)
+
+    def makeScaledList(self):
+        l = NodeVarList()
+        l.addNode("N1")
+        for i, scaling in enumerate(ivarScales):
+            var = NodeVars(value=1.5 + i, vmin=1.0, vmax=10.0)
+            var.scaling = scaling
+            l.addVariable("N1", "V{0}".format(i), var)
+        return l
+
+    def testScaleArray(self):
+        l = self.makeScaledList()
+        names = ["N1.V{0}".format(i) for i in range(len(ivarScales))]
+        va = l.varArray(names)
+        X = np.random.default_rng(0).uniform(1.0, 10.0, (20, len(names)))
+        S = va.scale(X)
+        for x, s in zip(X, S):
+            for var, a, b in zip(va.vars, x, s):
+                self.assertAlmostEqual(var.scale2(a), b, places=10)
+        np.testing.assert_allclose(va.unscale(S), X)
+        v = l.getFlat(names, scaled=True)
+        self.assertEqual(v, [var.scaled for var in va.vars])
+        self.assertAlmostEqual(v[3], va.vars[3].scale2(4.5))
+
+    def testUnflattenRows(self):
+        l = self.makeScaledList()
+        names = ["N1.V1", ("N1", "V2")]
+        X = [[0.0, 0.0], [10.0, 10.0]]
+        rows = l.unflattenRows(names, X, unScale=True)
+        self.assertEqual(len(rows), 2)
+        self.assertAlmostEqual(rows[0]["N1"]["V1"], 1.0)
+        self.assertAlmostEqual(rows[1]["N1"]["V2"], 10.0)
+        self.assertEqual(l.unflattenRows(names, X)[1], {"N1": {"V1": 10.0, "V2": 10.0}})
+
+    def testScaleArrayErrors(self):
+        l = self.makeScaledList()
+        va = l.varArray(["N1.V2"])
+        with self.assertRaises(NodeVarEx):
+            va.scale([[1.0], [-1.0]])
+        self.assertTrue(np.isnan(va.scale([np.nan])[0]))
+        l.get("N1.V2").scaling = "Cubic"
+        with self.assertRaises(NodeVarEx):
+            va.scale([1.0])
+        with self.assertRaises(NodeVarListEx):
+            l.getFlat(["N1.V9"])
+        with self.assertRaises(NodeVarListEx):
+            l.getFlat(["N3.V1"])
+
+    def testSetValues(self):
+        l = self.makeTestList1()
+        va = l.varArray(["N2.V1", "N1.V1"])
+        va.setValues(np.array([4.0, 5.0]))
+        self.assertEqual(l.saveValues(), {"N1": {"V1": 5.0}, "N2": {"V1": 4.0}})
+        self.assertIsInstance(l.get("N1.V1").value, float)
+        self.assertEqual(va.slot[("N1", "V1")], 1)
+
+    def makeTaggedList(self):
+        l = NodeVarList()
+        l.addNode("hx")
+        l.addNode("Cooler")
+        l.addVariable("hx", "Q", NodeVars(tags=["Block HX1", "HX_Hot", "Q"]))
+        l.addVariable("hx", "Tin", NodeVars(tags=["Block HX1", "HX_Hot", "T"]))
+        l.addVariable("Cooler", "Q", NodeVars(tags=["Block C1", "heater", "Q"]))
+        l.addVariable("Cooler", "x", NodeVars())
+        return l
+
+    def testTagIndex(self):
+        l = self.makeTaggedList()
+        index = l.tagIndex()
+        self.assertEqual(list(index.blockVars), ["Cooler.Q", "hx.Q", "hx.Tin"])
+        self.assertEqual(list(index.blocks["HX1"]), ["hx.Q", "hx.Tin"])
+        self.assertEqual(list(index.withTag("Q")), ["Cooler.Q", "hx.Q"])
+        self.assertIs(index.withTag("heater")["Cooler.Q"], l.get("Cooler.Q"))
+        self.assertEqual(len(index.withTag("Point_Hot")), 0)
+        self.assertIs(l.tagIndex(), index)
+
+    def testTagIndexUpdates(self):
+        l = self.makeTaggedList()
+        l.tagIndex()
+        l.get("Cooler.x").tags = ["Block C1", "heater", "T"]
+        self.assertEqual(list(l.tagIndex().blocks["C1"]), ["Cooler.Q", "Cooler.x"])
+        del l["hx"]["Q"]
+        self.assertEqual(list(l.tagIndex().withTag("HX_Hot")), ["hx.Tin"])
+        l.addVariable("hx", "Tout", NodeVars(tags=["Block HX1", "HX_Hot", "T"]))
+        self.assertEqual(list(l.tagIndex().withTag("T"))[-1], "hx.Tout")
+        l["HX"] = l.pop("hx")
+        l["HX"].pop("Tin")
+        self.assertEqual(list(l.tagIndex().blocks["HX1"]), ["HX.Tout"])
+        l.clear()
+        self.assertEqual(len(l.tagIndex().blockVars), 0)
+
+    def testTagIndexPerList(self):
+        l = self.makeTaggedList()
+        l2 = l.clone()
+        index = l.tagIndex()
+        # changes to another list, like a graph copy, keep this index
+        l2.get("Cooler.x").tags = ["Block C1"]
+        l2.addVariable("hx", "Tout", NodeVars())
+        l2.tagIndex()
+        self.assertIs(l.tagIndex(), index)
+        # a node dict moved between lists reports to its new list
+        l3 = NodeVarList()
+        l3["hx"] = l2.pop("hx")
+        index3 = l3.tagIndex()
+        l3.get("hx.Tout").tags = ["Block HX2"]
+        self.assertEqual(list(l3.tagIndex().blocks["HX2"]), ["hx.Tout"])
+        self.assertIsNot(l3.tagIndex(), index3)
+        self.assertIs(l.tagIndex(), index)
+
+    def testTagIndexLoadDict(self):
+        l = self.makeTaggedList()
+        l2 = l.clone()
+        self.assertEqual(list(l2.tagIndex().tags), list(l.tagIndex().tags))
+        self.assertIsNot(l2.tagIndex().blockVars["hx.Q"], l.get("hx.Q"))
@@ -0,0 +1,185 @@
+#################################################################################
+# FOQUS Copyright (c) 2012 - 2026, by the software owners: Oak Ridge Institute
+# for Science and Education (ORISE), TRIAD National Security, LLC., Lawrence
+# Livermore National Security, LLC., The Regents of the University of
+# California, through Lawrence Berkeley National Laboratory, Battelle Memorial
+# Institute, Pacific Northwest Division through Pacific Northwest National
+# Laboratory, Carnegie Mellon University, West Virginia University, Boston
+# University, the Trustees of Princeton University, The University of Texas at
+# Austin, URS Energy & Construction, Inc., et al.  All rights reserved.
+#
+# Please see the file LICENSE.md for full copyright and license information,
+# respectively. This file is also available online at the URL
+# "https://github.com/CCSI-Toolset/FOQUS".
+#################################################################################
+"""Time NodeVars attribute access and saving values of 50k variables
+
+Compares NodeVars to a copy of its old design, where value, min, max and
+default went through __getattr__/__setattr__ and every variable had an
+instance dict and its own copy of the default distribution.  Also times
+unscaling a population of decision variable vectors into input sets one
+value at a time with NodeVars.unscale2, and as arrays with unflattenRows.
+
+    python -m foqus_lib.unit_test.nodeVars_benchmark
+"""
+
+import copy
+import sys
+import time
+import tracemalloc
+
+import numpy as np
+
+from foqus_lib.framework.graph.nodeVars import NodeVarList, NodeVars, ivarScales
+from foqus_lib.framework.uq.Distribution import Distribution
+
+
+class dictNodeVars(object):
+    """The old NodeVars attribute handling"""
+
+    def __init__(self, value=0, vmin=0, vmax=1, vdflt=0, dtype=float):
+        self.dtype = dtype
+        self.min = vmin
+        self.max = vmax
+        self.default = vdflt
+        self.unit = ""
+        self.set = "user"
+        self.desc = ""
+        self.scaled = 0.0
+        self.scaling = "None"
+        self.minScaled = 0.0
+        self.maxScaled = 0.0
+        self.tags = []
+        self.con = False
+        self.value = value
+        self.ipvname = None
+        self.opvname = None
+        self.dist = copy.copy(Distribution(Distribution.UNIFORM))
+
+    def __getattr__(self, name):
+        if name == "value":
+            return self.__value
+        elif name == "min":
+            return self.__min
+        elif name == "max":
+            return self.__max
+        elif name == "default":
+            return self.__default
+        else:
+            raise AttributeError(name)
+
+    def __setattr__(self, name, val):
+        if name == "value":
+            self.__value = self.dtype(val)
+        elif name == "min":
+            self.__min = self.dtype(val)
+        elif name == "max":
+            self.__max = self.dtype(val)
+        elif name == "default":
+            self.__default = self.dtype(val)
+        else:
+            super().__setattr__(name, val)
+
+
+def timeit(f, repeat=5):
+    best = float("inf")
+    for i in range(repeat):
+        t0 = time.perf_counter()
+        f()
+        best = min(best, time.perf_counter() - t0)
+    return best
+
+
+def make_list(cls, nodes, nvars):
+    vl = NodeVarList()
+    for i in range(nodes):
+        node = "n{0}".format(i)
+        vl.addNode(node)
+        for j in range(nvars):
+            vl.addVariable(node, "x{0}".format(j), cls(value=float(j)))
+    return vl
+
+
+def memory(cls, n):
+    """Bytes allocated per variable"""
+    tracemalloc.start()
+    start = tracemalloc.get_traced_memory()[0]
+    keep = [cls(value=1.0) for i in range(n)]
+    used = tracemalloc.get_traced_memory()[0] - start
+    tracemalloc.stop()
+    return used / len(keep)
+
+
+def unflattenEach(vl, names, X):
+    """Unscale and unflatten one sample and variable at a time"""
+    res = []
+    for xvec in X:
+        sd = {}
+        for name, x in zip(names, xvec):
+            nkey, vkey = vl.splitName(name)
+            sd.setdefault(nkey, {})[vkey] = vl[nkey][vkey].unscale2(x)
+        res.append(sd)
+    return res
+
+
+def population(popSize=1000, nvars=50):
+    vl = make_list(NodeVars, 5, nvars // 5)
+    names = vl.compoundNames()
+    for i, name in enumerate(names):
+        var = vl.get(name)
+        var.min = 1.0
+        var.max = 100.0
+        var.scaling = ivarScales[1 + i % 5]
+    X = np.random.default_rng(0).uniform(0, 10, (popSize, len(names)))
+    each = unflattenEach(vl, names, X)
+    rows = vl.unflattenRows(names, X, unScale=True)
+    for a, b in zip(each, rows):
+        for nkey in a:
+            np.testing.assert_allclose(list(a[nkey].values()), list(b[nkey].values()))
+    print("\nUnscale {0} samples x {1} variables".format(popSize, len(names)))
+    t = timeit(lambda: unflattenEach(vl, names, X))
+    print("{0:<22}{1:14.1f} ms".format("unscale2 each", 1e3 * t))
+    t = timeit(lambda: vl.unflattenRows(names, X, unScale=True))
+    print("{0:<22}{1:14.1f} ms".format("unflattenRows", 1e3 * t))
+
+
+def main(nodes=500, nvars=100, n=1000000):
+    print("{0} variables, {1} attribute operations".format(nodes * nvars, n))
+    print("{0:<22}{1:>14}{2:>14}".format("", "dictNodeVars", "NodeVars"))
+    rows = {}
+    for cls in (dictNodeVars, NodeVars):
+        var = cls(value=2.5)
+        loop = range(n)
+
+        def get():
+            for i in loop:
+                var.value
+
+        def setValue():
+            for i in loop:
+                var.value = 1.5
+
+        def getPlain():
+            for i in loop:
+                var.scaling
+
+        vl = make_list(cls, nodes, nvars)
+        sv = vl.saveValues()
+        res = [
+            ("get value (ns)", 1e9 * timeit(get) / n),
+            ("set value (ns)", 1e9 * timeit(setValue) / n),
+            ("get scaling (ns)", 1e9 * timeit(getPlain) / n),
+            ("saveValues (ms)", 1e3 * timeit(vl.saveValues)),
+            ("loadValues (ms)", 1e3 * timeit(lambda: vl.loadValues(sv))),
+            ("make list (ms)", 1e3 * timeit(lambda: make_list(cls, nodes, nvars), 2)),
+            ("bytes per variable", memory(cls, nodes * nvars)),
+        ]
+        for name, t in res:
+            rows.setdefault(name, []).append(t)
+    for name, (a, b) in rows.items():
+        print("{0:<22}{1:14.1f}{2:14.1f}".format(name, a, b))
+    population()
+
+
+if __name__ == "__main__":
+    main(*map(int, sys.argv[1:]))
@@ -17,6 +17,7 @@ import json
 import unittest
 
 from foqus_lib.framework.graph.nodeVars import NodeVars
+from foqus_lib.framework.uq.Distribution import Distribution
 
 
 class testNodeVarsSteady(unittest.TestCase):
@@ -175,3 +176,33 @@ class testNodeVarsSteady(unittest.TestCase):
         var.scaling = "Power 2"
         var.unscale()
         self.assertAlmostEqual(var.value, 4.12, places=3)
+
+    def testTypedAttributes(self):
+        var = NodeVars(value=2, vmin=1, vmax=10, vdflt=3, dtype=int)
+        var.value = 4.7
+        var.max = "12"
+        self.assertEqual(var.value, 4)
+        self.assertEqual(var.max, 12)
+        var.setType(float)
+        self.assertIsInstance(var.min, float)
+        with self.assertRaises(AttributeError):
+            var.notAnAttribute = 1
+
+    def testSharedDefaultDist(self):
+        var = self.makeVar()
+        var2 = self.makeVar()
+        var.dist.setDistributionType(Distribution.NORMAL)
+        var.dist.setParameterValues(1.0, 0.5)
+        self.assertEqual(var2.dist.getDistributionType(), Distribution.UNIFORM)
+        self.assertEqual(self.makeVar().saveDict()["dist"], var2.dist.saveDict())
+        var3 = self.makeVar()
+        var3.loadDict(json.loads(json.dumps(var.saveDict())))
+        self.assertEqual(var3.dist.getParameterValues(), (1.0, 0.5))
+        self.assertEqual(var3.saveDict(), var.saveDict())
+
+    def testDistArgumentCopied(self):
+        dist = Distribution(Distribution.NORMAL)
+        var = NodeVars(value=1.0, dist=dist)
+        var.dist.setParameterValues(1.0, 0.1)
+        self.assertEqual(dist.getParameterValues(), (None, None))
+        self.assertEqual(var.saveDict()["dist"]["type"], "N")